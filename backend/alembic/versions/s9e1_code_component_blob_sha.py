@@ -0,0 +1,24 @@
+"""Add blob_sha to code_components for incremental repository re-analysis
+
+Revision ID: s9e1
+Revises: s9d1
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 's9e1'
+down_revision = 's9d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'code_components',
+        sa.Column('blob_sha', sa.String(40), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('code_components', 'blob_sha')
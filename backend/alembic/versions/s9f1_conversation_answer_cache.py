@@ -0,0 +1,24 @@
+"""Add answer_cache_enabled to conversations for the semantic answer cache opt-out
+
+Revision ID: s9f1
+Revises: s9e1
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 's9f1'
+down_revision = 's9e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'conversations',
+        sa.Column('answer_cache_enabled', sa.Boolean(), nullable=False, server_default=sa.true())
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('conversations', 'answer_cache_enabled')
@@ -0,0 +1,65 @@
+"""Rebuild embedding HNSW indexes as partial indexes on searchable rows
+
+Search only ever reads active concepts and current graph versions, so the
+global HNSW indexes from s4c1 are replaced by partial ones with the same
+predicate: smaller graphs, and the planner can use them for the filtered
+queries. Per-tenant indexes for large tenants are built at runtime by the
+build_vector_indexes task. Skipped when the embedding columns are the
+JSON fallback (no pgvector).
+
+Revision ID: s9g1
+Revises: s9f1
+Create Date: 2026-10-16
+"""
+from alembic import op
+from sqlalchemy import text
+
+revision = 's9g1'
+down_revision = 's9f1'
+branch_labels = None
+depends_on = None
+
+# table, old index, new index, predicate
+INDEXES = [
+    ("ontology_concepts", "idx_ontology_concepts_embedding_hnsw",
+     "idx_ontology_concepts_embedding_hnsw_active", "is_active = true"),
+    ("knowledge_graph_versions", "idx_kgv_embedding_hnsw",
+     "idx_kgv_embedding_hnsw_current", "is_current = true"),
+]
+
+
+def _is_vector_column(conn, table):
+    return conn.execute(text(
+        "SELECT 1 FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :t "
+        "AND column_name = 'embedding' AND udt_name = 'vector'"
+    ), {"t": table}).first() is not None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+    for table, old, new, predicate in INDEXES:
+        if not _is_vector_column(conn, table):
+            continue
+        op.execute(f"DROP INDEX IF EXISTS {old}")
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {new} ON {table} "
+            f"USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64) "
+            f"WHERE {predicate}"
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+    for table, old, new, _ in INDEXES:
+        if not _is_vector_column(conn, table):
+            continue
+        op.execute(f"DROP INDEX IF EXISTS {new}")
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {old} ON {table} "
+            f"USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+        )
@@ -0,0 +1,143 @@
+"""Full-text search: tsvector columns, GIN indexes and pg_trgm name indexes
+
+Adds a weighted search_vector to the tables retrieval searches:
+  - ontology_concepts, code_components, documents: STORED generated columns,
+    so Postgres recomputes them on every insert/update
+  - document_segments: a segment's text is a slice of documents.raw_text,
+    which a generated column can't reference, so triggers maintain it (on
+    segment insert/update and when the parent document's text changes)
+
+Each gets a GIN index. pg_trgm GIN indexes on names/filenames back fuzzy
+matching where the extension can be created.
+
+Revision ID: s9h1
+Revises: s9g1
+Create Date: 2026-10-16
+"""
+from alembic import op
+from sqlalchemy import text
+
+revision = 's9h1'
+down_revision = 's9g1'
+branch_labels = None
+depends_on = None
+
+# table -> weighted tsvector expression ('english' regconfig keeps it immutable)
+GENERATED = {
+    "ontology_concepts": (
+        "setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')"
+    ),
+    "code_components": (
+        "setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english'::regconfig, coalesce(summary, '')), 'B') || "
+        "setweight(to_tsvector('english'::regconfig, coalesce(location, '')), 'C')"
+    ),
+    # raw_text is capped: a tsvector must stay under 1 MB
+    "documents": (
+        "setweight(to_tsvector('english'::regconfig, coalesce(filename, '')), 'A') || "
+        "setweight(to_tsvector('english'::regconfig, coalesce(document_type, '')), 'B') || "
+        "setweight(to_tsvector('english'::regconfig, left(coalesce(raw_text, ''), 300000)), 'C')"
+    ),
+}
+
+TRIGRAM = {
+    "ontology_concepts": "name",
+    "code_components": "name",
+    "documents": "filename",
+}
+
+SEGMENT_VECTOR_SQL = """
+CREATE OR REPLACE FUNCTION document_segment_search_vector(seg document_segments) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english'::regconfig, coalesce(seg.segment_type, '')), 'A') ||
+           setweight(to_tsvector('english'::regconfig, left(coalesce(
+               substring(d.raw_text FROM seg.start_char_index + 1
+                         FOR greatest(seg.end_char_index - seg.start_char_index, 0)), ''), 300000)), 'B')
+    FROM documents d WHERE d.id = seg.document_id
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION document_segments_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := document_segment_search_vector(NEW);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER document_segments_search_vector_update
+    BEFORE INSERT OR UPDATE OF segment_type, start_char_index, end_char_index, document_id
+    ON document_segments
+    FOR EACH ROW EXECUTE FUNCTION document_segments_search_vector_trigger();
+
+CREATE OR REPLACE FUNCTION documents_refresh_segment_search_vectors() RETURNS trigger AS $$
+BEGIN
+    UPDATE document_segments ds SET search_vector = document_segment_search_vector(ds)
+    WHERE ds.document_id = NEW.id;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER documents_segment_search_vectors_refresh
+    AFTER UPDATE OF raw_text ON documents
+    FOR EACH ROW WHEN (OLD.raw_text IS DISTINCT FROM NEW.raw_text)
+    EXECUTE FUNCTION documents_refresh_segment_search_vectors();
+"""
+
+
+def _try_in_savepoint(conn, sql):
+    """Execute SQL in a savepoint so failures don't abort the transaction."""
+    nested = conn.begin_nested()
+    try:
+        conn.execute(text(sql))
+        nested.commit()
+        return True
+    except Exception:
+        nested.rollback()
+        return False
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    for table, expression in GENERATED.items():
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({expression}) STORED"
+        )
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING gin (search_vector)")
+
+    op.execute("ALTER TABLE document_segments ADD COLUMN IF NOT EXISTS search_vector tsvector")
+    op.execute(SEGMENT_VECTOR_SQL)
+    op.execute("UPDATE document_segments ds SET search_vector = document_segment_search_vector(ds)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_document_segments_search_vector "
+        "ON document_segments USING gin (search_vector)"
+    )
+
+    # Fuzzy name matching (requires CREATE privilege for the extension)
+    if _try_in_savepoint(conn, "CREATE EXTENSION IF NOT EXISTS pg_trgm"):
+        for table, column in TRIGRAM.items():
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm "
+                f"ON {table} USING gin ({column} gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    for table, column in TRIGRAM.items():
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_{column}_trgm")
+    op.execute("DROP TRIGGER IF EXISTS documents_segment_search_vectors_refresh ON documents")
+    op.execute("DROP TRIGGER IF EXISTS document_segments_search_vector_update ON document_segments")
+    op.execute("DROP FUNCTION IF EXISTS documents_refresh_segment_search_vectors()")
+    op.execute("DROP FUNCTION IF EXISTS document_segments_search_vector_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS document_segment_search_vector(document_segments)")
+    op.execute("DROP INDEX IF EXISTS ix_document_segments_search_vector")
+    op.execute("ALTER TABLE document_segments DROP COLUMN IF EXISTS search_vector")
+    for table in GENERATED:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
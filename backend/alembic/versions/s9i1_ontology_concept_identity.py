@@ -0,0 +1,130 @@
+"""Unique functional index on ontology concept identity
+
+Bulk ingestion upserts concepts with INSERT ... ON CONFLICT DO NOTHING
+against (tenant_id, lower(name), concept_type, source_type,
+coalesce(initiative_id, 0)) — the key get_or_create() has always matched on.
+The index is partial: 'both' rows are the promoted halves of a doc/code
+mapping and are never upserted, so twins may share that identity.
+
+get_or_create() was check-then-insert, so concurrent extractions could
+leave duplicates behind. Before the index is built, each duplicate group
+outside 'both' is merged into its lowest id: the keeper takes the highest confidence, any
+missing source links and is_active if any copy was active; relationships,
+concept mappings, cross-project mappings and Jira links are repointed;
+repointed edges that would collapse into a self-loop or duplicate another
+edge are dropped.
+(requirement_traces.code_concept_ids is a JSON list and is left as is —
+stale ids there are ignored by readers.)
+
+Revision ID: s9i1
+Revises: s9h1
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = 's9i1'
+down_revision = 's9h1'
+branch_labels = None
+depends_on = None
+
+IDENTITY = "tenant_id, lower(name), concept_type, source_type, coalesce(initiative_id, 0)"
+# Mapped concepts are promoted to 'both' in place, so a document concept and
+# its code twin legitimately share an identity once both are promoted.
+BOTH_EXCLUDED = "source_type <> 'both'"
+
+MERGE_DUPLICATES_SQL = f"""
+CREATE TEMP TABLE _concept_dups ON COMMIT DROP AS
+SELECT id AS dup_id, keep_id FROM (
+    SELECT id, min(id) OVER (PARTITION BY {IDENTITY}) AS keep_id
+    FROM ontology_concepts WHERE {BOTH_EXCLUDED}
+) grouped
+WHERE id <> keep_id;
+
+UPDATE ontology_concepts c SET
+    confidence_score = GREATEST(c.confidence_score, m.confidence_score),
+    source_component_id = coalesce(c.source_component_id, m.source_component_id),
+    source_document_id = coalesce(c.source_document_id, m.source_document_id),
+    is_active = c.is_active OR m.any_active
+FROM (
+    SELECT d.keep_id, max(o.confidence_score) AS confidence_score,
+           min(o.source_component_id) AS source_component_id,
+           min(o.source_document_id) AS source_document_id,
+           bool_or(o.is_active) AS any_active
+    FROM _concept_dups d JOIN ontology_concepts o ON o.id = d.dup_id
+    GROUP BY d.keep_id
+) m
+WHERE c.id = m.keep_id;
+
+-- Drop only the edges this merge collapses: self-loops between a concept and
+-- its own duplicate, and copies of an edge that repointing makes identical.
+-- Edges between untouched concepts are left as they are.
+DELETE FROM ontology_relationships r USING (
+    SELECT r.id,
+           (ds.dup_id IS NOT NULL OR dt.dup_id IS NOT NULL)
+               AND coalesce(ds.keep_id, r.source_concept_id) = coalesce(dt.keep_id, r.target_concept_id) AS self_loop,
+           row_number() OVER final_edge AS rn,
+           bool_or(ds.dup_id IS NOT NULL OR dt.dup_id IS NOT NULL) OVER final_edge AS repointed
+    FROM ontology_relationships r
+    LEFT JOIN _concept_dups ds ON ds.dup_id = r.source_concept_id
+    LEFT JOIN _concept_dups dt ON dt.dup_id = r.target_concept_id
+    WINDOW final_edge AS (
+        PARTITION BY r.tenant_id, coalesce(ds.keep_id, r.source_concept_id),
+                     coalesce(dt.keep_id, r.target_concept_id), r.relationship_type
+        ORDER BY r.confidence_score DESC NULLS LAST, r.id
+        ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+    )
+) ranked
+WHERE r.id = ranked.id AND (ranked.self_loop OR (ranked.repointed AND ranked.rn > 1));
+UPDATE ontology_relationships r SET source_concept_id = d.keep_id
+FROM _concept_dups d WHERE r.source_concept_id = d.dup_id;
+UPDATE ontology_relationships r SET target_concept_id = d.keep_id
+FROM _concept_dups d WHERE r.target_concept_id = d.dup_id;
+
+UPDATE jira_items j SET ontology_concept_id = d.keep_id
+FROM _concept_dups d WHERE j.ontology_concept_id = d.dup_id;
+
+UPDATE cross_project_mappings x SET concept_a_id = d.keep_id
+FROM _concept_dups d WHERE x.concept_a_id = d.dup_id;
+UPDATE cross_project_mappings x SET concept_b_id = d.keep_id
+FROM _concept_dups d WHERE x.concept_b_id = d.dup_id;
+
+-- uq_concept_mapping_pair: keep the best mapping per final pair, drop the rest
+DELETE FROM concept_mappings cm USING (
+    SELECT m.id, row_number() OVER (
+        PARTITION BY m.tenant_id, coalesce(dd.keep_id, m.document_concept_id),
+                     coalesce(cd.keep_id, m.code_concept_id)
+        ORDER BY CASE m.status WHEN 'confirmed' THEN 0 WHEN 'rejected' THEN 1 ELSE 2 END,
+                 m.confidence_score DESC NULLS LAST, m.id
+    ) AS rn
+    FROM concept_mappings m
+    LEFT JOIN _concept_dups dd ON dd.dup_id = m.document_concept_id
+    LEFT JOIN _concept_dups cd ON cd.dup_id = m.code_concept_id
+) ranked
+WHERE cm.id = ranked.id AND ranked.rn > 1;
+UPDATE concept_mappings m SET document_concept_id = d.keep_id
+FROM _concept_dups d WHERE m.document_concept_id = d.dup_id;
+UPDATE concept_mappings m SET code_concept_id = d.keep_id
+FROM _concept_dups d WHERE m.code_concept_id = d.dup_id;
+
+DELETE FROM ontology_concepts c USING _concept_dups d WHERE c.id = d.dup_id;
+"""
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    op.execute(MERGE_DUPLICATES_SQL)
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_ontology_concepts_identity "
+        f"ON ontology_concepts ({IDENTITY}) WHERE {BOTH_EXCLUDED}"
+    )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    op.execute("DROP INDEX IF EXISTS uq_ontology_concepts_identity")
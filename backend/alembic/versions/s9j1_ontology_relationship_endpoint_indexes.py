@@ -0,0 +1,41 @@
+"""Endpoint indexes on ontology relationships
+
+The graph query API expands neighborhoods hop by hop with
+WHERE tenant_id = :t AND source_concept_id IN (...) (and the same on
+target_concept_id). Without these indexes every hop scans all of the
+tenant's relationships.
+
+Revision ID: s9j1
+Revises: s9i1
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = 's9j1'
+down_revision = 's9i1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_ontology_relationships_tenant_source "
+        "ON ontology_relationships (tenant_id, source_concept_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_ontology_relationships_tenant_target "
+        "ON ontology_relationships (tenant_id, target_concept_id)"
+    )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_ontology_relationships_tenant_target")
+    op.execute("DROP INDEX IF EXISTS ix_ontology_relationships_tenant_source")
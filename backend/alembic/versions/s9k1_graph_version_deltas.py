@@ -0,0 +1,48 @@
+"""Delta storage for knowledge graph versions
+
+Superseded versions no longer keep a full copy of graph_data unless they
+are snapshots, so graph_data becomes nullable and is_snapshot marks the
+versions that keep it. Existing versions all hold their full graph and are
+marked as snapshots. graph_hashes holds the current version's per-node /
+per-edge hashes. ix_kgv_source_version serves the version-range reads
+used to rebuild and diff versions.
+
+Revision ID: s9k1
+Revises: s9j1
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = 's9k1'
+down_revision = 's9j1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE knowledge_graph_versions ALTER COLUMN graph_data DROP NOT NULL")
+    op.execute(
+        "ALTER TABLE knowledge_graph_versions "
+        "ADD COLUMN IF NOT EXISTS is_snapshot BOOLEAN NOT NULL DEFAULT true"
+    )
+    op.execute("ALTER TABLE knowledge_graph_versions ADD COLUMN IF NOT EXISTS graph_hashes JSONB")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_kgv_source_version "
+        "ON knowledge_graph_versions (tenant_id, source_type, source_id, version)"
+    )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    # Versions stored as deltas have no graph_data and can't satisfy NOT NULL again;
+    # they're left in place, so graph_data stays nullable.
+    op.execute("DROP INDEX IF EXISTS ix_kgv_source_version")
+    op.execute("ALTER TABLE knowledge_graph_versions DROP COLUMN IF EXISTS graph_hashes")
+    op.execute("ALTER TABLE knowledge_graph_versions DROP COLUMN IF EXISTS is_snapshot")
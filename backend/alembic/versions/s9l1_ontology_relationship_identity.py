@@ -0,0 +1,51 @@
+"""Unique index on ontology relationship identity
+
+create_if_not_exists() is check-then-insert, so concurrent extractions could
+store the same (source, target, type) edge twice. The in-memory graph index
+treats edges as a set: deleting one of two duplicate rows hid the edge that
+still existed until the next rebuild. Duplicates created since s9i1 are
+dropped (keeping the highest confidence, then the lowest id) before the
+index is built; inserts skip conflicts against it from here on.
+
+Revision ID: s9l1
+Revises: s9k1
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = 's9l1'
+down_revision = 's9k1'
+branch_labels = None
+depends_on = None
+
+IDENTITY = "tenant_id, source_concept_id, target_concept_id, relationship_type"
+
+DROP_DUPLICATES_SQL = f"""
+DELETE FROM ontology_relationships r USING (
+    SELECT id, row_number() OVER (
+        PARTITION BY {IDENTITY}
+        ORDER BY confidence_score DESC NULLS LAST, id
+    ) AS rn FROM ontology_relationships
+) ranked
+WHERE r.id = ranked.id AND ranked.rn > 1;
+"""
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    op.execute(DROP_DUPLICATES_SQL)
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_ontology_relationships_identity "
+        f"ON ontology_relationships ({IDENTITY})"
+    )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    op.execute("DROP INDEX IF EXISTS uq_ontology_relationships_identity")
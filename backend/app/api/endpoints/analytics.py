@@ -6,6 +6,7 @@ Provides aggregated metrics for the analytics dashboard:
   GET /costs      — daily cost time-series grouped by feature
   GET /concepts   — ontology concept & relationship growth over time
   GET /activity   — high-level entity counts across the tenant
+  GET /ai-rate-limits — AI provider budgets and queue-wait metrics (admin)
 """
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
@@ -136,3 +137,25 @@ def get_activity_metrics(
         f"concepts={result['total_concepts']}"
     )
     return result
+
+
+@router.get("/ai-rate-limits")
+def get_ai_rate_limit_metrics(
+    *,
+    current_user: models.User = Depends(deps.require_tenant_admin),
+):
+    """
+    Return AI provider rate-governor budgets and queue-wait metrics.
+
+    Includes, per provider/model:
+    - requests: calls that reserved capacity
+    - queued: calls that had to wait for a slot
+    - wait_seconds_total / wait_seconds_avg: time spent queued
+    - tokens_reserved: estimated input tokens drawn from the TPM budget
+
+    "local" covers this API process; "cluster" aggregates every worker via Redis.
+    """
+    from app.services.ai.rate_governor import rate_governor
+
+    logger.info(f"Fetching AI rate-limit metrics, user {current_user.email}")
+    return rate_governor.get_metrics()
@@ -9,27 +9,34 @@ Endpoints:
   GET    /chat/conversations                   -> list user's conversations
   GET    /chat/conversations/{id}              -> get conversation detail
   POST   /chat/conversations/{id}/messages     -> send message, get AI response
+  POST   /chat/conversations/{id}/messages/stream -> same, streamed as Server-Sent Events
   GET    /chat/conversations/{id}/messages     -> message history
   PUT    /chat/conversations/{id}              -> update title
   DELETE /chat/conversations/{id}              -> delete conversation
   PUT    /chat/conversations/{id}/model        -> switch AI model
+  PUT    /chat/conversations/{id}/answer-cache -> opt in/out of the answer cache
+  GET    /chat/answer-cache/stats              -> answer + query-embedding cache hit rates
   GET    /chat/suggested-prompts               -> role-based starter prompts (Task 10)
   POST   /chat/messages/{id}/feedback          -> thumbs up/down (Task 11)
   GET    /chat/conversations/search            -> search conversations (Task 12)
   GET    /chat/conversations/{id}/export       -> export conversation (Task 12)
 """
 
+import json
 import time
 from typing import Any, Optional, List
 from datetime import datetime, timedelta
 
+import anyio
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, desc
 
 from app import crud, models
 from app.api import deps
-from app.db.session import get_db
+from app.db.session import get_db, run_db
 from app.schemas.conversation import (
     ConversationCreate,
     ConversationResponse,
@@ -39,6 +46,7 @@ from app.schemas.conversation import (
     ChatSendResponse,
     ChatMessageListResponse,
     ModelPreferenceUpdate,
+    AnswerCacheUpdate,
     CommandRequest,
     CommandResponse,
 )
@@ -144,6 +152,7 @@ def create_conversation(
         context_type=payload.context_type,
         context_id=payload.context_id,
         model_preference=payload.model_preference,
+        answer_cache_enabled=payload.answer_cache_enabled,
     )
     return conv
 
@@ -242,32 +251,18 @@ def delete_conversation(
 # Messages — send + retrieve
 # -------------------------------------------------------------------
 
-@router.post("/conversations/{conversation_id}/messages", response_model=ChatSendResponse)
-@limiter.limit(CHAT_MESSAGE_RATE)
-async def send_message(
-    request: Request,
-    response: Response,
-    conversation_id: int,
-    payload: ChatMessageCreate,
-    tenant_id: int = Depends(deps.get_tenant_id),
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(deps.require_permission(Permission.CHAT_USE)),
-) -> Any:
+def _start_turn(
+    db: Session, *, conversation_id: int, content: str,
+    tenant_id: int, current_user: models.User,
+):
     """
-    Send a user message and get an AI response.
+    Shared first half of send_message / stream_message: validate, save the
+    user message, load history, then probe the answer cache and retrieve
+    context on a miss.
 
-    Pipeline:
-      1. Billing pre-check (Task 8)
-      2. Rate + conversation length check (Task 12)
-      3. Save user message
-      4. Retrieve relevant context (semantic search + graph)
-      5. Build prompt with conversation history
-      6. Generate AI answer
-      7. Save assistant message with context metadata
-      8. Log usage for billing analytics (Task 8)
+    Returns (conversation, user_message, context, history, cache_probe).
+    On a cache hit context is None and cache_probe.hit holds the answer.
     """
-    start_time = time.time()
-
     # Validate conversation
     conv = crud.conversation.get(db, id=conversation_id, tenant_id=tenant_id)
     if not conv:
@@ -291,19 +286,10 @@ async def send_message(
         db,
         conversation_id=conversation_id,
         role="user",
-        content=payload.content,
-    )
-
-    # 2. Retrieve context
-    from app.services.rag_service import rag_service
-    context = rag_service.retrieve_context(
-        db, payload.content, tenant_id,
-        context_type=conv.context_type,
-        context_id=conv.context_id,
-        user_id=current_user.id,
+        content=content,
     )
 
-    # 3. Get conversation history for multi-turn
+    # 2. Get conversation history for multi-turn
     recent_messages = crud.chat_message.get_recent(
         db, conversation_id=conversation_id, limit=8,
     )
@@ -313,42 +299,72 @@ async def send_message(
         if m.id != user_msg.id  # Exclude the message we just saved
     ]
 
-    # 4. Generate AI answer (role-aware + model selection)
-    result = await rag_service.generate_answer(
-        payload.content, context, history,
-        tenant_id=tenant_id,
+    # 3. Semantic answer cache — standalone questions only: a follow-up
+    # ("and its tests?") depends on history the cache doesn't key on
+    from app.services.rag_service import rag_service
+    cache_probe = None
+    if conv.answer_cache_enabled and not history:
+        cache_probe = rag_service.lookup_cached_answer(
+            content, tenant_id,
+            context_type=conv.context_type,
+            context_id=conv.context_id,
+            user_roles=current_user.roles,
+            model_preference=conv.model_preference,
+        )
+        if cache_probe and cache_probe.hit:
+            return conv, user_msg, None, history, cache_probe
+
+    # 4. Retrieve context
+    context = rag_service.retrieve_context(
+        db, content, tenant_id,
+        context_type=conv.context_type,
+        context_id=conv.context_id,
         user_id=current_user.id,
-        user_roles=current_user.roles,
-        model_preference=conv.model_preference,
-        db=db,
     )
+    return conv, user_msg, context, history, cache_probe
+
 
-    # 5. Save assistant message (include citations in context_used)
-    context_summary = context.to_summary_dict()
+def _save_assistant_reply(
+    db: Session, *, conv: models.Conversation, user_content: str,
+    result: dict, context_summary: dict,
+    tenant_id: int, user_id: int, start_time: float,
+    cache_probe=None,
+) -> Optional[models.ChatMessage]:
+    """
+    Persist the assistant message, conversation stats and usage/billing for
+    one turn. An empty answer (stream abandoned before the first token) is
+    billed but not saved as a message. A fresh answer is also offered to the
+    answer cache when the turn was probed (cache_probe from _start_turn) and
+    the model finished it; error, fallback and truncated answers are never
+    shared through the tenant's cache.
+    """
+    # Save assistant message (include citations in context_used)
     citations = result.get("citations", [])
     if citations:
         context_summary["citations"] = citations
-    assistant_msg = crud.chat_message.create(
-        db,
-        conversation_id=conversation_id,
-        role="assistant",
-        content=result["answer"],
-        context_used=context_summary,
-        input_tokens=result["input_tokens"],
-        output_tokens=result["output_tokens"],
-        cost_usd=result["cost_usd"],
-        model_used=result["model_used"],
-    )
+    assistant_msg = None
+    if result["answer"]:
+        assistant_msg = crud.chat_message.create(
+            db,
+            conversation_id=conv.id,
+            role="assistant",
+            content=result["answer"],
+            context_used=context_summary,
+            input_tokens=result["input_tokens"],
+            output_tokens=result["output_tokens"],
+            cost_usd=result["cost_usd"],
+            model_used=result["model_used"],
+        )
 
     # Update conversation stats (count both user + assistant messages)
     total_tokens = result["input_tokens"] + result["output_tokens"]
-    conv.message_count += 2
+    conv.message_count += 2 if assistant_msg else 1
     conv.total_tokens += total_tokens
     conv.total_cost_usd = float(conv.total_cost_usd or 0) + result["cost_usd"]
 
     # Auto-title on first message
     if conv.message_count <= 2 and conv.title == "New Conversation":
-        conv.title = payload.content[:80] + ("..." if len(payload.content) > 80 else "")
+        conv.title = user_content[:80] + ("..." if len(user_content) > 80 else "")
 
     db.commit()
 
@@ -360,7 +376,7 @@ async def send_message(
         _log_chat_usage(
             db,
             tenant_id=tenant_id,
-            user_id=current_user.id,
+            user_id=user_id,
             input_tokens=result["input_tokens"],
             output_tokens=result["output_tokens"],
             cost_usd=result["cost_usd"],
@@ -368,20 +384,192 @@ async def send_message(
             # the DB column is NOT NULL so supply a default to prevent a crash.
             model_used=result["model_used"] or "unknown",
             processing_time=processing_time,
-            conversation_id=conversation_id,
+            conversation_id=conv.id,
         )
     except Exception as log_err:
         logger.warning(f"Chat usage logging failed (non-fatal): {log_err}")
 
+    if cache_probe is not None and result.get("completed"):
+        from app.services.answer_cache_service import answer_cache_service
+        answer_cache_service.store(cache_probe, result=result, context_summary=context_summary)
+    return assistant_msg
+
+
+def _sse(event: str, data: Any) -> str:
+    """Encode one Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+@router.post("/conversations/{conversation_id}/messages", response_model=ChatSendResponse)
+@limiter.limit(CHAT_MESSAGE_RATE)
+async def send_message(
+    request: Request,
+    response: Response,
+    conversation_id: int,
+    payload: ChatMessageCreate,
+    tenant_id: int = Depends(deps.get_tenant_id),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.require_permission(Permission.CHAT_USE)),
+) -> Any:
+    """
+    Send a user message and get an AI response.
+
+    Pipeline:
+      1. Billing pre-check (Task 8)
+      2. Rate + conversation length check (Task 12)
+      3. Save user message
+      4. Semantic answer cache lookup (hit → skip 5-7)
+      5. Retrieve relevant context (semantic search + graph)
+      6. Build prompt with conversation history
+      7. Generate AI answer
+      8. Save assistant message with context metadata
+      9. Log usage for billing analytics (Task 8)
+    """
+    start_time = time.time()
+
+    # Sync Session work runs on the DB threadpool so the event loop stays free
+    conv, user_msg, context, history, cache_probe = await run_db(
+        _start_turn, db, conversation_id=conversation_id, content=payload.content,
+        tenant_id=tenant_id, current_user=current_user,
+    )
+
+    if cache_probe and cache_probe.hit:
+        result, context_summary = cache_probe.served_result()
+    else:
+        # Generate AI answer (role-aware + model selection)
+        from app.services.rag_service import rag_service
+        result = await rag_service.generate_answer(
+            payload.content, context, history,
+            tenant_id=tenant_id,
+            user_id=current_user.id,
+            user_roles=current_user.roles,
+            model_preference=conv.model_preference,
+            db=db,
+        )
+        context_summary = context.to_summary_dict()
+
+    # Save assistant message, stats and usage
+    assistant_msg = await run_db(
+        _save_assistant_reply, db, conv=conv, user_content=payload.content,
+        result=result, context_summary=context_summary,
+        tenant_id=tenant_id, user_id=current_user.id, start_time=start_time,
+        cache_probe=cache_probe,
+    )
+
     return {
         "user_message": user_msg,
         "assistant_message": assistant_msg,
         "context_summary": context_summary,
-        "citations": citations,
-        "approval_references": context.pending_approvals if context.pending_approvals else None,
+        "citations": result.get("citations", []),
+        "approval_references": context.pending_approvals if context and context.pending_approvals else None,
     }
 
 
+@router.post("/conversations/{conversation_id}/messages/stream")
+@limiter.limit(CHAT_MESSAGE_RATE)
+async def stream_message(
+    request: Request,
+    response: Response,
+    conversation_id: int,
+    payload: ChatMessageCreate,
+    tenant_id: int = Depends(deps.get_tenant_id),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.require_permission(Permission.CHAT_USE)),
+) -> Any:
+    """
+    Streaming variant of send_message (Server-Sent Events).
+
+    Same pipeline; validation errors still come back as plain HTTP errors.
+    Once retrieval is done the response streams:
+      event: retrieval  -> user message + context summary
+      event: token      -> answer text as the model produces it
+      event: error      -> generation failed (the error answer is still saved)
+      event: citations  -> citations found in the finished answer
+      event: done       -> saved assistant message
+
+    The assistant message, usage log and billing are written when the
+    stream ends. If the client disconnects, the upstream model call is
+    cancelled and the partial answer is saved and billed. A cache hit is
+    sent as a single token event.
+    """
+    start_time = time.time()
+
+    conv, user_msg, context, history, cache_probe = await run_db(
+        _start_turn, db, conversation_id=conversation_id, content=payload.content,
+        tenant_id=tenant_id, current_user=current_user,
+    )
+
+    answer = cached = None
+    if cache_probe and cache_probe.hit:
+        cached, context_summary = cache_probe.served_result()
+    else:
+        from app.services.rag_service import rag_service
+        answer = await run_db(
+            rag_service.stream_answer,
+            payload.content, context, history,
+            tenant_id=tenant_id,
+            user_id=current_user.id,
+            user_roles=current_user.roles,
+            model_preference=conv.model_preference,
+            db=db,
+        )
+        context_summary = context.to_summary_dict()
+    user_id = current_user.id
+
+    async def save(result: dict, probe=None) -> Optional[models.ChatMessage]:
+        return await run_db(
+            _save_assistant_reply, db, conv=conv, user_content=payload.content,
+            result=result, context_summary=context_summary,
+            tenant_id=tenant_id, user_id=user_id, start_time=start_time,
+            cache_probe=probe,
+        )
+
+    async def event_stream():
+        finished = cached is not None
+        try:
+            yield _sse("retrieval", {
+                "user_message": ChatMessageResponse.model_validate(user_msg),
+                "context_summary": context_summary,
+                "approval_references": (context.pending_approvals or None) if context else None,
+            })
+            if cached is not None:
+                yield _sse("token", {"text": cached["answer"]})
+            else:
+                async for event in answer:
+                    if await request.is_disconnected():
+                        break
+                    yield _sse("token", {"text": event["text"]})
+                else:
+                    finished = True
+        finally:
+            # Runs on disconnect too (the response task is cancelled then),
+            # so shield the close that stops the upstream generation and the save
+            if answer is not None:
+                with anyio.CancelScope(shield=True):
+                    await answer.aclose()
+                    if not finished:
+                        logger.info(f"Chat stream for conversation {conversation_id} abandoned by client")
+                        await save(answer.result)
+        if not finished:
+            return
+
+        result = cached or answer.result
+        if answer is not None and answer.error:
+            yield _sse("error", {"message": result["answer"]})
+        completed = answer is not None and answer.completed and not answer.error
+        assistant_msg = await save(result, cache_probe if completed else None)
+        yield _sse("citations", {"citations": result.get("citations", [])})
+        yield _sse("done", {
+            "assistant_message": ChatMessageResponse.model_validate(assistant_msg) if assistant_msg else None,
+        })
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/conversations/{conversation_id}/messages", response_model=ChatMessageListResponse)
 def list_messages(
     conversation_id: int,
@@ -432,6 +620,48 @@ def update_model_preference(
     return conv
 
 
+# -------------------------------------------------------------------
+# Semantic Answer Cache
+# -------------------------------------------------------------------
+
+@router.put("/conversations/{conversation_id}/answer-cache", response_model=ConversationResponse)
+def update_answer_cache(
+    conversation_id: int,
+    payload: AnswerCacheUpdate,
+    tenant_id: int = Depends(deps.get_tenant_id),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.require_permission(Permission.CHAT_USE)),
+) -> Any:
+    """Opt a conversation in or out of the tenant's semantic answer cache."""
+    conv = crud.conversation.get(db, id=conversation_id, tenant_id=tenant_id)
+    if not conv:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    if conv.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not your conversation")
+
+    conv.answer_cache_enabled = payload.enabled
+    db.commit()
+    db.refresh(conv)
+    return conv
+
+
+@router.get("/answer-cache/stats")
+def get_answer_cache_stats(
+    tenant_id: int = Depends(deps.get_tenant_id),
+    current_user: models.User = Depends(deps.require_permission(Permission.CHAT_USE)),
+) -> Any:
+    """
+    Hit / miss counters, hit rate and AI cost saved by the answer cache,
+    plus this process's query-embedding cache counters.
+    """
+    from app.services.answer_cache_service import answer_cache_service
+    from app.services.embedding_service import embedding_service
+    return {
+        **answer_cache_service.get_stats(tenant_id),
+        "query_embedding_cache": embedding_service.get_query_cache_stats(),
+    }
+
+
 # -------------------------------------------------------------------
 # Suggested Prompts (Task 10)
 # -------------------------------------------------------------------
@@ -678,7 +908,7 @@ def _handle_simple_command(
 
 
 @router.post("/conversations/{conversation_id}/command", response_model=CommandResponse)
-async def execute_command(
+def execute_command(
     conversation_id: int,
     payload: CommandRequest,
     tenant_id: int = Depends(deps.get_tenant_id),
@@ -689,6 +919,9 @@ async def execute_command(
     Execute a slash command without the full RAG/billing pipeline.
     Handles: /help, /status, /search, /export, /pending
     AI-powered commands (/summarize, /analyze, /compare) go through the normal send_message endpoint.
+
+    Plain `def`: the handler is all sync Session work, so FastAPI runs it in
+    its threadpool instead of on the event loop.
     """
     conv = crud.conversation.get(db, id=conversation_id, tenant_id=tenant_id)
     if not conv:
@@ -1,6 +1,7 @@
 # This is the final, updated content for your file at:
 # backend/app/api/endpoints/documents.py
 
+import asyncio
 import shutil
 from pathlib import Path
 from typing import List, Any
@@ -17,6 +18,7 @@ from app.api import deps
 from app.core.config import settings
 from app.core.logging import LoggerMixin
 from app.core.exceptions import DocumentProcessingException, ValidationException
+from app.db.session import run_db
 from app.middleware.rate_limiter import limiter, RateLimits
 
 # --- NEW: Import our Celery task ---
@@ -321,10 +323,14 @@ async def upload_document(
         storage_path = document_endpoints.upload_dir / unique_filename
         file_size_kb = 0
 
-        try:
+        def _save_file() -> int:
             with storage_path.open("wb") as buffer:
                 shutil.copyfileobj(file.file, buffer)
-            file_size_kb = round(os.path.getsize(storage_path) / 1024)
+            return round(os.path.getsize(storage_path) / 1024)
+
+        try:
+            # Disk copy off the event loop: uploads can be large
+            file_size_kb = await asyncio.to_thread(_save_file)
             logger.info(f"File saved to {storage_path}, size: {file_size_kb} KB")
         finally:
             file.file.close()
@@ -344,31 +350,35 @@ async def upload_document(
             file_size_kb=file_size_kb
         )
 
-        # SPRINT 2: Create document with tenant_id
-        document = crud.document.create_with_owner(
-            db=db,
-            obj_in=document_in,
-            owner_id=current_user.id,
-            storage_path=str(storage_path),
-            tenant_id=tenant_id  # SPRINT 2: Mandatory tenant assignment
-        )
-
-        # SPRINT 4: Auto-link document to initiative (project) if specified
-        if initiative_id:
-            try:
-                from app.schemas.initiative import InitiativeAssetCreate
-                crud.initiative_asset.create_asset(
-                    db=db,
-                    obj_in=InitiativeAssetCreate(
-                        initiative_id=initiative_id,
-                        asset_type="DOCUMENT",
-                        asset_id=document.id,
-                    ),
-                    tenant_id=tenant_id
-                )
-                logger.info(f"Document {document.id} auto-linked to initiative {initiative_id}")
-            except Exception as e:
-                logger.warning(f"Failed to auto-link document {document.id} to initiative {initiative_id}: {e}")
+        def _persist() -> models.Document:
+            # SPRINT 2: Create document with tenant_id
+            document = crud.document.create_with_owner(
+                db=db,
+                obj_in=document_in,
+                owner_id=current_user.id,
+                storage_path=str(storage_path),
+                tenant_id=tenant_id  # SPRINT 2: Mandatory tenant assignment
+            )
+
+            # SPRINT 4: Auto-link document to initiative (project) if specified
+            if initiative_id:
+                try:
+                    from app.schemas.initiative import InitiativeAssetCreate
+                    crud.initiative_asset.create_asset(
+                        db=db,
+                        obj_in=InitiativeAssetCreate(
+                            initiative_id=initiative_id,
+                            asset_type="DOCUMENT",
+                            asset_id=document.id,
+                        ),
+                        tenant_id=tenant_id
+                    )
+                    logger.info(f"Document {document.id} auto-linked to initiative {initiative_id}")
+                except Exception as e:
+                    logger.warning(f"Failed to auto-link document {document.id} to initiative {initiative_id}: {e}")
+            return document
+
+        document = await run_db(_persist)
 
         logger.info(f"Document {document.id} uploaded successfully to tenant {tenant_id}. Ready for analysis.")
         return document
@@ -48,7 +48,7 @@ from app import models
 from app.api import deps
 from app.core.config import settings
 from app.core.logging import get_logger
-from app.db.session import get_db
+from app.db.session import get_db, run_db
 from app.crud.crud_integration_config import crud_integration_config
 
 logger = get_logger("api.integrations")
@@ -754,8 +754,11 @@ async def import_page(
     """
     Fetch the full content of a Notion page, Jira issue, or Slack channel
     and store it as a DokuDoc Document (raw_text + filename set, status='uploaded').
+
+    Session work runs on the DB threadpool (run_db) so the event loop stays
+    free while the provider fetch is awaited.
     """
-    config = crud_integration_config.get_by_provider(db, tenant_id=tenant_id, provider=provider)
+    config = await run_db(crud_integration_config.get_by_provider, db, tenant_id=tenant_id, provider=provider)
     if not config or not config.is_active or not config.access_token:
         raise HTTPException(
             status_code=404,
@@ -789,12 +792,26 @@ async def import_page(
 
     final_title = payload.title or title or f"{provider}_{payload.external_id}"
 
+    doc = await run_db(
+        _store_imported_document, db, tenant_id=tenant_id, title=final_title, content=content,
+    )
+
+    return {
+        "status": "imported",
+        "document_id": doc.id,
+        "title": final_title,
+        "provider": provider,
+        "external_id": payload.external_id,
+    }
+
+
+def _store_imported_document(db: Session, *, tenant_id: int, title: str, content: str):
     from app.models.document import Document
     from datetime import datetime as dt
 
     doc = Document(
         tenant_id=tenant_id,
-        filename=f"{final_title}.md",
+        filename=f"{title}.md",
         document_type="imported",
         version="1",
         raw_text=content,
@@ -804,14 +821,7 @@ async def import_page(
     db.add(doc)
     db.commit()
     db.refresh(doc)
-
-    return {
-        "status": "imported",
-        "document_id": doc.id,
-        "title": final_title,
-        "provider": provider,
-        "external_id": payload.external_id,
-    }
+    return doc
 
 
 # ============================================================
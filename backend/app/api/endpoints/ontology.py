@@ -8,7 +8,7 @@ All endpoints are tenant-scoped via get_tenant_id dependency.
 """
 
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Query, Request
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
@@ -18,45 +18,24 @@ from app.schemas.ontology import (
     OntologyConceptCreate, OntologyConceptUpdate, OntologyConceptResponse,
     OntologyConceptWithRelationships,
     OntologyRelationshipCreate, OntologyRelationshipUpdate, OntologyRelationshipResponse,
-    OntologyGraphResponse, OntologyGraphNode, OntologyGraphEdge,
+    OntologyGraphResponse,
     BranchPreviewNode, BranchPreviewEdge, BranchPreviewGraphResponse,
 )
 from app.schemas.concept_mapping import (
     ConceptMappingCreate, ConceptMappingUpdate, ConceptMappingResponse,
     ConceptMappingWithConcepts,
 )
+from app.core.config import settings
 from app.core.logging import get_logger
+from app.services.graph_index_service import graph_index_service
+from app.services.graph_query_service import LAYERS, graph_query_service
+from app.services.graph_snapshot_service import graph_snapshot_service
 
 logger = get_logger("api.ontology")
 
 router = APIRouter()
 
 
-def _get_mapping_edges(db: Session, tenant_id: int, concept_ids: set, edge_id_offset: int = 0):
-    """
-    Convert confirmed ConceptMapping records into OntologyGraphEdge objects
-    so they appear as cross-graph bridge edges in the visualization.
-    Uses negative IDs (offset from -1000000) to distinguish from real relationship IDs.
-    """
-    from app.models.concept_mapping import ConceptMapping
-    mappings = db.query(ConceptMapping).filter(
-        ConceptMapping.tenant_id == tenant_id,
-        ConceptMapping.status.in_(["confirmed", "candidate"]),
-    ).all()
-
-    edges = []
-    for m in mappings:
-        if m.document_concept_id in concept_ids and m.code_concept_id in concept_ids:
-            edges.append(OntologyGraphEdge(
-                id=-(1000000 + m.id),  # Negative ID to distinguish from OntologyRelationship
-                source_concept_id=m.document_concept_id,
-                target_concept_id=m.code_concept_id,
-                relationship_type=f"mapping:{m.relationship_type}",
-                confidence_score=m.confidence_score,
-            ))
-    return edges
-
-
 # ============================================================
 # CONCEPT ENDPOINTS
 # ============================================================
@@ -251,8 +230,75 @@ def delete_relationship(
 # GRAPH ENDPOINT (for visualization)
 # ============================================================
 
+def _concept_graph(
+    db: Session, tenant_id: int, initiative_id: Optional[int],
+    layers: Optional[tuple] = None, mapping_edges: bool = True,
+) -> dict:
+    """
+    Nodes + edges for the concept graph views, read as plain columns (no ORM
+    objects or eager loads). Edges are relationships between visible concepts
+    plus, if mapping_edges, confirmed/candidate ConceptMappings as
+    cross-graph bridge edges. Mapping edges get negative ids
+    (-(1000000 + mapping id)) to keep them apart from relationship ids.
+    """
+    from sqlalchemy import or_
+    from app.models.concept_mapping import ConceptMapping
+    from app.models.ontology_concept import OntologyConcept
+    from app.models.ontology_relationship import OntologyRelationship
+
+    concept_query = db.query(
+        OntologyConcept.id, OntologyConcept.name, OntologyConcept.concept_type,
+        OntologyConcept.source_type, OntologyConcept.initiative_id, OntologyConcept.confidence_score,
+    ).filter(
+        OntologyConcept.tenant_id == tenant_id,
+        OntologyConcept.is_active == True,
+    )
+    if initiative_id is not None:
+        concept_query = concept_query.filter(or_(
+            OntologyConcept.initiative_id == initiative_id,
+            OntologyConcept.initiative_id.is_(None),
+        ))
+    if layers:
+        concept_query = concept_query.filter(OntologyConcept.source_type.in_(layers))
+    nodes = [row._asdict() for row in concept_query]
+    concept_ids = {n["id"] for n in nodes}
+
+    rels = db.query(
+        OntologyRelationship.id, OntologyRelationship.source_concept_id,
+        OntologyRelationship.target_concept_id, OntologyRelationship.relationship_type,
+        OntologyRelationship.confidence_score,
+    ).filter(OntologyRelationship.tenant_id == tenant_id)
+    edges = [
+        r._asdict() for r in rels
+        if r.source_concept_id in concept_ids and r.target_concept_id in concept_ids
+    ]
+
+    if mapping_edges:
+        mappings = db.query(
+            ConceptMapping.id, ConceptMapping.document_concept_id, ConceptMapping.code_concept_id,
+            ConceptMapping.relationship_type, ConceptMapping.confidence_score,
+        ).filter(
+            ConceptMapping.tenant_id == tenant_id,
+            ConceptMapping.status.in_(["confirmed", "candidate"]),
+        )
+        edges.extend(
+            {
+                "id": -(1000000 + m.id),
+                "source_concept_id": m.document_concept_id,
+                "target_concept_id": m.code_concept_id,
+                "relationship_type": f"mapping:{m.relationship_type}",
+                "confidence_score": m.confidence_score,
+            }
+            for m in mappings
+            if m.document_concept_id in concept_ids and m.code_concept_id in concept_ids
+        )
+
+    return {"nodes": nodes, "edges": edges, "total_nodes": len(nodes), "total_edges": len(edges)}
+
+
 @router.get("/graph", response_model=OntologyGraphResponse)
 def get_graph(
+    request: Request,
     tenant_id: int = Depends(deps.get_tenant_id),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(deps.get_current_user),
@@ -261,43 +307,11 @@ def get_graph(
     """
     Get the ontology graph for the tenant, optionally scoped to a project.
     Returns nodes (concepts) and edges (relationships + cross-graph mappings) for frontend visualization.
+    Served from the tenant's graph snapshot (ETag / If-None-Match supported).
     """
-    concepts = crud.ontology_concept.get_all_active(
-        db=db, tenant_id=tenant_id, initiative_id=initiative_id
-    )
-    concept_ids = {c.id for c in concepts}
-
-    relationships = crud.ontology_relationship.get_full_graph(db=db, tenant_id=tenant_id)
-    # Filter relationships to only include edges between visible concepts
-    filtered_rels = [
-        r for r in relationships
-        if r.source_concept_id in concept_ids and r.target_concept_id in concept_ids
-    ]
-
-    nodes = [
-        OntologyGraphNode(
-            id=c.id, name=c.name, concept_type=c.concept_type,
-            source_type=c.source_type, initiative_id=c.initiative_id,
-            confidence_score=c.confidence_score
-        ) for c in concepts
-    ]
-    edges = [
-        OntologyGraphEdge(
-            id=r.id, source_concept_id=r.source_concept_id,
-            target_concept_id=r.target_concept_id,
-            relationship_type=r.relationship_type,
-            confidence_score=r.confidence_score
-        ) for r in filtered_rels
-    ]
-
-    # Include confirmed ConceptMapping records as cross-graph bridge edges
-    # These connect document-layer concepts to code-layer concepts
-    mappings = _get_mapping_edges(db, tenant_id, concept_ids, edge_id_offset=len(edges))
-    edges.extend(mappings)
-
-    return OntologyGraphResponse(
-        nodes=nodes, edges=edges,
-        total_nodes=len(nodes), total_edges=len(edges)
+    return graph_snapshot_service.serve(
+        request, tenant_id, "graph", {"initiative_id": initiative_id},
+        lambda: _concept_graph(db, tenant_id, initiative_id),
     )
 
 
@@ -406,84 +420,172 @@ def trigger_synonym_detection(
 
 @router.get("/graph/document", response_model=OntologyGraphResponse)
 def get_document_graph(
+    request: Request,
     tenant_id: int = Depends(deps.get_tenant_id),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(deps.get_current_user),
     initiative_id: Optional[int] = Query(None, description="Filter by project/initiative"),
 ) -> Any:
     """Get only the document-layer concepts and their relationships, optionally scoped to a project."""
-    concepts = crud.ontology_concept.get_all_active(
-        db=db, tenant_id=tenant_id, initiative_id=initiative_id
+    return graph_snapshot_service.serve(
+        request, tenant_id, "graph.document", {"initiative_id": initiative_id},
+        lambda: _concept_graph(db, tenant_id, initiative_id, layers=("document", "both"), mapping_edges=False),
     )
-    doc_concepts = [c for c in concepts if c.source_type in ("document", "both")]
-    doc_ids = {c.id for c in doc_concepts}
-
-    relationships = crud.ontology_relationship.get_full_graph(db=db, tenant_id=tenant_id)
-    doc_relationships = [
-        r for r in relationships
-        if r.source_concept_id in doc_ids and r.target_concept_id in doc_ids
-    ]
-
-    nodes = [
-        OntologyGraphNode(
-            id=c.id, name=c.name, concept_type=c.concept_type,
-            source_type=c.source_type, initiative_id=c.initiative_id,
-            confidence_score=c.confidence_score
-        ) for c in doc_concepts
-    ]
-    edges = [
-        OntologyGraphEdge(
-            id=r.id, source_concept_id=r.source_concept_id,
-            target_concept_id=r.target_concept_id,
-            relationship_type=r.relationship_type,
-            confidence_score=r.confidence_score
-        ) for r in doc_relationships
-    ]
-
-    return OntologyGraphResponse(nodes=nodes, edges=edges, total_nodes=len(nodes), total_edges=len(edges))
 
 
 @router.get("/graph/code", response_model=OntologyGraphResponse)
 def get_code_graph(
+    request: Request,
     tenant_id: int = Depends(deps.get_tenant_id),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(deps.get_current_user),
     initiative_id: Optional[int] = Query(None, description="Filter by project/initiative"),
 ) -> Any:
     """Get only the code-layer concepts and their relationships, optionally scoped to a project."""
-    concepts = crud.ontology_concept.get_all_active(
-        db=db, tenant_id=tenant_id, initiative_id=initiative_id
+    return graph_snapshot_service.serve(
+        request, tenant_id, "graph.code", {"initiative_id": initiative_id},
+        lambda: _concept_graph(db, tenant_id, initiative_id, layers=("code", "both")),
     )
-    code_concepts = [c for c in concepts if c.source_type in ("code", "both")]
-    code_ids = {c.id for c in code_concepts}
 
-    relationships = crud.ontology_relationship.get_full_graph(db=db, tenant_id=tenant_id)
-    code_relationships = [
-        r for r in relationships
-        if r.source_concept_id in code_ids and r.target_concept_id in code_ids
-    ]
 
-    nodes = [
-        OntologyGraphNode(
-            id=c.id, name=c.name, concept_type=c.concept_type,
-            source_type=c.source_type, initiative_id=c.initiative_id,
-            confidence_score=c.confidence_score
-        ) for c in code_concepts
-    ]
-    edges = [
-        OntologyGraphEdge(
-            id=r.id, source_concept_id=r.source_concept_id,
-            target_concept_id=r.target_concept_id,
-            relationship_type=r.relationship_type,
-            confidence_score=r.confidence_score
-        ) for r in code_relationships
-    ]
+# ============================================================
+# GRAPH QUERY API (paged / neighborhood / level-of-detail)
+# ============================================================
+
+def _field_list(fields: Optional[str]) -> Optional[List[str]]:
+    return [f for f in fields.split(",") if f.strip()] if fields else None
 
-    # Include cross-graph mappings where code concepts are involved
-    mappings = _get_mapping_edges(db, tenant_id, code_ids, edge_id_offset=len(edges))
-    edges.extend(mappings)
 
-    return OntologyGraphResponse(nodes=nodes, edges=edges, total_nodes=len(nodes), total_edges=len(edges))
+@router.get("/graph/nodes")
+def get_graph_nodes(
+    tenant_id: int = Depends(deps.get_tenant_id),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_user),
+    initiative_id: Optional[int] = Query(None, description="Filter by project/initiative"),
+    layer: Optional[str] = Query(None, description="document or code"),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    page_size: int = Query(500, ge=1, le=5000),
+    fields: Optional[str] = Query(None, description="Comma-separated node fields (id is always included)"),
+) -> Any:
+    """Cursor-paginated concepts of the graph, in id order."""
+    try:
+        return graph_query_service.node_page(
+            db, tenant_id, initiative_id=initiative_id, layer=layer,
+            cursor=cursor, page_size=page_size, fields=_field_list(fields),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/graph/edges")
+def get_graph_edges(
+    tenant_id: int = Depends(deps.get_tenant_id),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_user),
+    initiative_id: Optional[int] = Query(None, description="Filter by project/initiative"),
+    layer: Optional[str] = Query(None, description="document or code"),
+    relationship_types: Optional[List[str]] = Query(None),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    page_size: int = Query(1000, ge=1, le=10000),
+    fields: Optional[str] = Query(None, description="Comma-separated edge fields (id and endpoints always included)"),
+) -> Any:
+    """Cursor-paginated relationships between the graph's visible concepts, in id order."""
+    try:
+        return graph_query_service.edge_page(
+            db, tenant_id, initiative_id=initiative_id, layer=layer, cursor=cursor,
+            page_size=page_size, fields=_field_list(fields), relationship_types=relationship_types,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/graph/neighborhood")
+def get_graph_neighborhood(
+    seeds: List[int] = Query(..., description="Concept ids to expand from"),
+    tenant_id: int = Depends(deps.get_tenant_id),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_user),
+    hops: int = Query(1, ge=0, le=settings.GRAPH_QUERY_MAX_HOPS),
+    max_nodes: Optional[int] = Query(None, ge=1, le=settings.GRAPH_QUERY_MAX_NODES),
+    direction: str = Query("both", description="both, out or in"),
+    relationship_types: Optional[List[str]] = Query(None),
+    initiative_id: Optional[int] = Query(None, description="Filter by project/initiative"),
+    layer: Optional[str] = Query(None, description="document or code"),
+    fields: Optional[str] = Query(None, description="Comma-separated node fields"),
+    edge_fields: Optional[str] = Query(None, description="Comma-separated edge fields"),
+) -> Any:
+    """
+    k-hop neighborhood of the seed concepts (nodes carry their hop distance).
+    Use it to expand a super-node from /graph/overview or to drill into a
+    concept without loading the whole graph.
+    """
+    try:
+        return graph_query_service.neighborhood(
+            db, tenant_id, seeds, hops=hops, max_nodes=max_nodes, direction=direction,
+            relationship_types=relationship_types, initiative_id=initiative_id, layer=layer,
+            fields=_field_list(fields), edge_fields=_field_list(edge_fields),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/graph/path")
+def get_graph_path(
+    source_id: int = Query(..., description="Start concept id"),
+    target_id: int = Query(..., description="End concept id"),
+    tenant_id: int = Depends(deps.get_tenant_id),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_user),
+    direction: str = Query("both", description="both, out (follow edge direction) or in"),
+    relationship_types: Optional[List[str]] = Query(None),
+    max_hops: int = Query(6, ge=1, le=12),
+) -> Any:
+    """Shortest path between two concepts (e.g. how a requirement reaches a code component)."""
+    from app.models.ontology_concept import OntologyConcept
+    try:
+        path = graph_index_service.get(db, tenant_id).shortest_path(
+            source_id, target_id, direction=direction,
+            relationship_types=relationship_types, max_hops=max_hops,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if path is None:
+        raise HTTPException(status_code=404, detail="No path between these concepts")
+    rows = {
+        row.id: row._asdict()
+        for row in db.query(OntologyConcept.id, OntologyConcept.name, OntologyConcept.concept_type).filter(
+            OntologyConcept.tenant_id == tenant_id, OntologyConcept.id.in_(path),
+        )
+    }
+    if len(rows) != len(set(path)):
+        raise HTTPException(status_code=404, detail="Concept not found")
+    return {"path": [rows[cid] for cid in path], "hops": len(path) - 1}
+
+
+@router.get("/graph/overview")
+def get_graph_overview(
+    request: Request,
+    tenant_id: int = Depends(deps.get_tenant_id),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_user),
+    initiative_id: Optional[int] = Query(None, description="Filter by project/initiative"),
+    layer: Optional[str] = Query(None, description="document or code"),
+    cluster_by: str = Query("community", description="community or type"),
+    max_clusters: int = Query(50, ge=2, le=500),
+) -> Any:
+    """
+    Level-of-detail view: concepts grouped into super-nodes with weighted
+    super-edges between them. Served from the tenant's graph snapshot.
+    """
+    if cluster_by not in ("community", "type"):
+        raise HTTPException(status_code=400, detail="cluster_by must be 'community' or 'type'")
+    if layer is not None and layer not in LAYERS:
+        raise HTTPException(status_code=400, detail=f"Unknown layer '{layer}'")
+    params = {"initiative_id": initiative_id, "layer": layer, "cluster_by": cluster_by, "max_clusters": max_clusters}
+    return graph_snapshot_service.serve(
+        request, tenant_id, "graph.overview", params,
+        lambda: graph_query_service.overview(db, tenant_id, **params),
+    )
 
 
 # ============================================================
@@ -496,10 +598,14 @@ def get_component_subgraph(
     tenant_id: int = Depends(deps.get_tenant_id),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(deps.get_current_user),
+    hops: int = Query(0, ge=0, le=settings.GRAPH_QUERY_MAX_HOPS,
+                      description="Also include concepts within this many hops of the file's concepts"),
 ) -> Any:
     """
     Get the subgraph for a specific code component (file).
-    Returns concepts created from this file and their inter-relationships.
+    Returns concepts created from this file and their inter-relationships;
+    with hops > 0, also the concepts around them (found via the graph index)
+    and the edges among all returned concepts.
     """
     concepts = crud.ontology_concept.get_by_component(
         db=db, component_id=component_id, tenant_id=tenant_id
@@ -519,6 +625,33 @@ def get_component_subgraph(
         for c in concepts
     ]
 
+    if hops:
+        from app.models.ontology_concept import OntologyConcept
+        reached = graph_index_service.get(db, tenant_id).k_hop(
+            concept_ids, hops, max_nodes=settings.GRAPH_QUERY_MAX_NODES,
+        )
+        neighbor_ids = [cid for cid in reached if cid not in concept_ids]
+        neighbors = db.query(
+            OntologyConcept.id, OntologyConcept.name, OntologyConcept.concept_type,
+            OntologyConcept.source_type, OntologyConcept.confidence_score,
+        ).filter(
+            OntologyConcept.tenant_id == tenant_id,
+            OntologyConcept.is_active == True,
+            OntologyConcept.id.in_(neighbor_ids),
+        ).all() if neighbor_ids else []
+        nodes.extend(
+            {
+                "id": n.id,
+                "name": n.name,
+                "concept_type": n.concept_type,
+                "source_type": n.source_type,
+                "confidence_score": n.confidence_score or 0,
+                "hop": reached[n.id],
+            }
+            for n in neighbors
+        )
+        concept_ids |= {n.id for n in neighbors}
+
     # Get relationships between these concepts
     from app.models.ontology_relationship import OntologyRelationship
     from sqlalchemy import or_
@@ -539,7 +672,8 @@ def get_component_subgraph(
             "confidence_score": r.confidence_score or 0,
         }
         for r in rels
-        if r.source_concept_id in concept_ids or r.target_concept_id in concept_ids
+        if (r.source_concept_id in concept_ids and r.target_concept_id in concept_ids)
+        or (not hops and (r.source_concept_id in concept_ids or r.target_concept_id in concept_ids))
     ]
 
     return {
@@ -743,6 +877,7 @@ def get_domain_cluster_graph(
 @router.get("/graph/system/{repo_id}")
 def get_system_architecture_graph(
     repo_id: int,
+    request: Request,
     tenant_id: int = Depends(deps.get_tenant_id),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(deps.get_current_user),
@@ -750,7 +885,15 @@ def get_system_architecture_graph(
     """
     Level 3 Brain: System Architecture Graph for a repository.
     Aggregates domains into system layers with inter-domain edge counts.
+    Served from the tenant's graph snapshot (ETag / If-None-Match supported).
     """
+    return graph_snapshot_service.serve(
+        request, tenant_id, "graph.system", {"repo_id": repo_id},
+        lambda: _system_architecture_graph(db, tenant_id, repo_id),
+    )
+
+
+def _system_architecture_graph(db: Session, tenant_id: int, repo_id: int) -> dict:
     from app.models.code_component import CodeComponent
     from app.models.ontology_relationship import OntologyRelationship
     from app.models.ontology_concept import OntologyConcept
@@ -1354,8 +1497,6 @@ def adaptive_path_drill(
     from collections import defaultdict
     from app.models.code_component import CodeComponent
     from app.models.ontology_concept import OntologyConcept
-    from app.models.ontology_relationship import OntologyRelationship
-    from sqlalchemy import or_
 
     def _safe_id(name: str) -> str:
         return re.sub(r"[^a-zA-Z0-9_]", "_", name).strip("_") or "node"
@@ -1526,26 +1667,17 @@ def adaptive_path_drill(
                 d = parts[0] if parts else "root"
             concept_to_domain[c.id] = d
 
-        concept_ids_set = {c.id for c in concepts_all}
-        # Cap to 300 concept IDs for the IN-clause — cross-domain edges are
-        # decorative; a sample is sufficient and avoids 1000-param queries.
-        concept_ids_sample = list(concept_ids_set)[:300]
-        rels_all = db.query(OntologyRelationship).filter(
-            OntologyRelationship.tenant_id == tenant_id,
-            or_(
-                OntologyRelationship.source_concept_id.in_(concept_ids_sample),
-                OntologyRelationship.target_concept_id.in_(concept_ids_sample),
-            ),
-        ).limit(800).all() if concept_ids_sample else []
+        # Every edge of these concepts, from the tenant's graph index (no IN-clause sampling)
+        rels_all = graph_index_service.get(db, tenant_id).edges_touching(concept_to_domain)
 
         cross_domain: dict = defaultdict(lambda: {"count": 0, "types": set()})
-        for r in rels_all:
-            sd = concept_to_domain.get(r.source_concept_id)
-            td = concept_to_domain.get(r.target_concept_id)
+        for source_id, target_id, rel_type in rels_all:
+            sd = concept_to_domain.get(source_id)
+            td = concept_to_domain.get(target_id)
             if sd and td and sd != td:
                 key = (sd, td)
                 cross_domain[key]["count"] += 1
-                cross_domain[key]["types"].add(r.relationship_type or "uses")
+                cross_domain[key]["types"].add(rel_type or "uses")
 
         layer_domains2: dict = defaultdict(list)
         domain_to_layer2: dict = {}
@@ -1701,17 +1833,9 @@ def adaptive_path_drill(
         if len(comp_key_concepts[c.source_component_id]) < 3:
             comp_key_concepts[c.source_component_id].append(c.name)
 
-    # Cap the IN-clause to 200 concept IDs to avoid 1000-param queries that
-    # cause PostgreSQL plan thrash and SQLAlchemy ROLLBACKs.  Relationships
-    # are only used for drawing edges between groups — a sample is enough.
-    concept_ids_for_rels = list(concept_ids)[:200]
-    rels = db.query(OntologyRelationship).filter(
-        OntologyRelationship.tenant_id == tenant_id,
-        or_(
-            OntologyRelationship.source_concept_id.in_(concept_ids_for_rels),
-            OntologyRelationship.target_concept_id.in_(concept_ids_for_rels),
-        ),
-    ).limit(500).all() if concept_ids_for_rels else []
+    # Relationships come from the tenant's graph index, so every concept's
+    # edges count — no capped IN-clause sample.
+    rels = graph_index_service.get(db, tenant_id).edges_touching(concept_ids)
 
     # Count cross-item relationships (between items at the current level)
     def seg_for_comp(comp_id: int) -> str:
@@ -1722,15 +1846,15 @@ def adaptive_path_drill(
 
     item_rel_count: dict = defaultdict(lambda: defaultdict(int))
     item_rel_types: dict = defaultdict(lambda: defaultdict(set))
-    for r in rels:
-        sc = concept_to_comp.get(r.source_concept_id)
-        tc = concept_to_comp.get(r.target_concept_id)
+    for source_id, target_id, rel_type in rels:
+        sc = concept_to_comp.get(source_id)
+        tc = concept_to_comp.get(target_id)
         if sc and tc and sc != tc:
             ss = seg_for_comp(sc)
             ts = seg_for_comp(tc)
             if ss and ts and ss != ts:
                 item_rel_count[ss][ts] += 1
-                item_rel_types[ss][ts].add(r.relationship_type or "uses")
+                item_rel_types[ss][ts].add(rel_type or "uses")
 
     # --- Build Mermaid + nodes metadata ---
     lines = ["graph TD"]
@@ -1994,6 +2118,7 @@ def trigger_repository_extraction(
 
 @router.get("/graph/brain")
 def get_organizational_brain(
+    request: Request,
     tenant_id: int = Depends(deps.get_tenant_id),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(deps.get_current_user),
@@ -2001,7 +2126,14 @@ def get_organizational_brain(
     """
     Level 5 Brain: Organizational Brain.
     Returns project-level bubbles with aggregated metrics and cross-project edges.
+    Served from the tenant's graph snapshot (ETag / If-None-Match supported).
     """
+    return graph_snapshot_service.serve(
+        request, tenant_id, "graph.brain", {}, lambda: _organizational_brain(db, tenant_id),
+    )
+
+
+def _organizational_brain(db: Session, tenant_id: int) -> dict:
     from app.models.concept_mapping import ConceptMapping
     from collections import defaultdict
 
@@ -2498,6 +2630,7 @@ def get_cross_project_stats(
 
 @router.get("/graph/meta", response_model=None)
 def get_meta_graph(
+    request: Request,
     tenant_id: int = Depends(deps.get_tenant_id),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(deps.get_current_user),
@@ -2506,7 +2639,14 @@ def get_meta_graph(
     Org-wide meta-graph: projects as aggregated nodes (not individual concepts).
     Each node represents a project with concept/relationship counts and top concepts.
     Cross-project edges show mapping counts between projects.
+    Served from the tenant's graph snapshot (ETag / If-None-Match supported).
     """
+    return graph_snapshot_service.serve(
+        request, tenant_id, "graph.meta", {}, lambda: _meta_graph(db, tenant_id),
+    )
+
+
+def _meta_graph(db: Session, tenant_id: int) -> dict:
     from app.models.initiative_asset import InitiativeAsset
     from app.models.code_component import CodeComponent
     from app.models.ontology_concept import OntologyConcept
@@ -2518,7 +2658,10 @@ def get_meta_graph(
 
     # Get all concepts and relationships for counts
     concepts = crud.ontology_concept.get_all_active(db=db, tenant_id=tenant_id)
-    relationships = crud.ontology_relationship.get_full_graph(db=db, tenant_id=tenant_id)
+    # Only source ids are needed (for counts) — no relationship objects / eager loads
+    relationships = db.query(OntologyRelationship.source_concept_id).filter(
+        OntologyRelationship.tenant_id == tenant_id
+    ).all()
 
     # Build concept-to-initiative map
     concept_initiative = {}
@@ -2849,6 +2992,22 @@ def get_component_graph_versions(
     ]
 
 
+@router.get("/graph/component/{component_id}/versions/{version}")
+def get_component_graph_version(
+    component_id: int,
+    version: int,
+    db: Session = Depends(get_db),
+    tenant_id: int = Depends(deps.get_tenant_id),
+):
+    """Get the graph of any version of a code component (rebuilt from the nearest snapshot if needed)."""
+    graph_data = crud.knowledge_graph_version.get_graph_data(
+        db, source_type="component", source_id=component_id, version=version, tenant_id=tenant_id
+    )
+    if graph_data is None:
+        raise HTTPException(status_code=404, detail="Graph version not found")
+    return {"version": version, "graph_data": graph_data}
+
+
 @router.get("/graph/component/{component_id}/diff")
 def get_component_graph_diff(
     component_id: int,
@@ -2909,6 +3068,22 @@ def get_document_graph_versions(
     ]
 
 
+@router.get("/graph/document/{document_id}/versions/{version}")
+def get_document_graph_version(
+    document_id: int,
+    version: int,
+    db: Session = Depends(get_db),
+    tenant_id: int = Depends(deps.get_tenant_id),
+):
+    """Get the graph of any version of a document (rebuilt from the nearest snapshot if needed)."""
+    graph_data = crud.knowledge_graph_version.get_graph_data(
+        db, source_type="document", source_id=document_id, version=version, tenant_id=tenant_id
+    )
+    if graph_data is None:
+        raise HTTPException(status_code=404, detail="Graph version not found")
+    return {"version": version, "graph_data": graph_data}
+
+
 @router.get("/graph/document/{document_id}/diff")
 def get_document_graph_diff(
     document_id: int,
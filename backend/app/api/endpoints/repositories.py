@@ -6,6 +6,7 @@ Provides endpoints for repository lifecycle:
   GET    /                   — List all repositories
   GET    /{id}               — Get repository details + progress
   POST   /{id}/analyze       — Trigger analysis for a repository
+  POST   /{id}/reanalyze     — Incremental re-analysis of changed files only
   DELETE /{id}               — Delete repository and its components
   GET    /{id}/components    — List code components in a repository
 """
@@ -237,8 +238,8 @@ def scan_repo_preview(
                   "by_language": {...}, "skipped_by_category": {...}}
     }
     """
-    import asyncio
     from app.services.code_analysis_service import code_analysis_service
+    from app.services.github_fetcher import github_fetcher
 
     url = body.get("url", "").strip()
     if not url:
@@ -250,8 +251,8 @@ def scan_repo_preview(
     github_token = gh_config.access_token if (gh_config and gh_config.is_active) else None
 
     try:
-        # Run the async scan synchronously
-        scan_result = asyncio.run(
+        # Run the async scan synchronously (closes the one-shot loop's client)
+        scan_result = github_fetcher.run(
             code_analysis_service._get_repo_file_list(
                 *code_analysis_service._detect_github_url_type(url)[1:3],  # owner, repo
                 body.get("branch"),  # branch (optional, None = auto-detect)
@@ -489,6 +490,91 @@ def resume_analysis(
     }
 
 
+# ============================================================
+# INCREMENTAL RE-ANALYSIS (git blob SHA delta)
+# ============================================================
+
+@router.post("/{repo_id}/reanalyze", status_code=status.HTTP_202_ACCEPTED)
+def reanalyze_repository(
+    repo_id: int,
+    *,
+    tenant_id: int = Depends(deps.get_tenant_id),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Re-scan the repository tree and analyze only files whose git blob SHA
+    changed since the last run. Unchanged files keep their analysis, files
+    removed from the tree are retired.
+    """
+    from app.services.code_analysis_service import code_analysis_service
+    from app.services.github_fetcher import github_fetcher
+
+    repo = crud.repository.get(db=db, id=repo_id, tenant_id=tenant_id)
+    if not repo:
+        raise HTTPException(status_code=404, detail="Repository not found")
+
+    if repo.analysis_status == "analyzing":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Repository is already being analyzed. Wait for completion."
+        )
+
+    url_type, owner, repo_name, _ = code_analysis_service._detect_github_url_type(repo.url)
+    if url_type != "repository":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Incremental re-analysis is only supported for GitHub repositories"
+        )
+
+    from app.crud.crud_integration_config import crud_integration_config
+    gh_config = crud_integration_config.get_by_provider(db, tenant_id=tenant_id, provider="github")
+    github_token = gh_config.access_token if (gh_config and gh_config.is_active) else None
+
+    try:
+        scan_result = github_fetcher.run(
+            code_analysis_service._get_repo_file_list(
+                owner, repo_name, repo.default_branch, github_token=github_token,
+            )
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not scan repository: {e}")
+
+    file_list = scan_result.get("to_analyze", [])
+    if not file_list:
+        # Never run a delta against an empty scan — it would retire every file
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Repository scan returned no files"
+        )
+
+    crud.repository.update_analysis_progress(
+        db=db, repo_id=repo_id, tenant_id=tenant_id,
+        analyzed_files=0, total_files=len(file_list),
+        status="analyzing"
+    )
+
+    from app.tasks.code_analysis_tasks import repo_analysis_task
+    task = repo_analysis_task.delay(
+        repo_id, tenant_id, file_list, github_token,
+        analysis_mode="delta", commit_sha=scan_result.get("commit_sha"),
+    )
+
+    logger.info(
+        f"Incremental re-analysis for repo {repo_id} ({len(file_list)} files in tree, "
+        f"commit={scan_result.get('commit_sha')}), task={task.id}"
+    )
+
+    return {
+        "message": "Incremental re-analysis started",
+        "repo_id": repo_id,
+        "task_id": task.id,
+        "total_files": len(file_list),
+        "previous_commit": repo.last_analyzed_commit,
+        "commit": scan_result.get("commit_sha"),
+    }
+
+
 # ============================================================
 # REPOSITORY COMPONENTS
 # ============================================================
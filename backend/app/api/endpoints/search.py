@@ -3,6 +3,10 @@ Sprint 5: Unified Semantic Search API
 
 Provides a single endpoint that searches across all entity types:
 ontology concepts, documents, code components, and knowledge graphs.
+
+Also exposes the database capability registry (pgvector, index methods)
+that decides which search strategies are available, and vector (ANN)
+index management.
 """
 
 from typing import Any, List, Optional
@@ -24,17 +28,23 @@ def unified_search(
     q: str = Query(..., min_length=1, description="Search query"),
     categories: Optional[str] = Query(
         None,
-        description="Comma-separated categories to search: concepts,documents,code,graphs",
+        description="Comma-separated categories to search: concepts,documents,segments,code,graphs",
     ),
     initiative_id: Optional[int] = Query(None, description="Filter by initiative"),
     limit: int = Query(30, ge=1, le=100, description="Max total results"),
+    recall: Optional[str] = Query(
+        None, pattern="^(fast|balanced|high)$",
+        description="Vector search recall/latency trade-off",
+    ),
+    rerank: Optional[bool] = Query(None, description="Term-coverage rerank (default: server setting)"),
     tenant_id: int = Depends(deps.get_tenant_id),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(deps.get_current_user),
 ) -> Any:
     """
-    Unified semantic search across concepts, documents, code, and graphs.
-    Returns results grouped by category with relevance scores and facet counts.
+    Unified hybrid search across concepts, documents, segments, code, and graphs.
+    Returns one ranked list (lexical and vector matches fused) with per-source
+    scores and facet counts.
     """
     from app.services.semantic_search_service import semantic_search_service
 
@@ -49,6 +59,8 @@ def unified_search(
         categories=cat_list,
         initiative_id=initiative_id,
         limit=limit,
+        recall=recall,
+        rerank=rerank,
     )
 
 
@@ -161,3 +173,46 @@ def search_suggestions(
             unique.append(s)
 
     return {"query": q, "suggestions": unique[:limit]}
+
+
+@router.get("/capabilities")
+def get_search_capabilities(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.require_tenant_admin),
+) -> Any:
+    """Cached database capabilities used by search and embedding (pgvector, indexes)."""
+    from app.db.capabilities import db_capabilities
+    return db_capabilities.get(db).to_dict()
+
+
+@router.post("/capabilities/refresh")
+def refresh_search_capabilities(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.require_tenant_admin),
+) -> Any:
+    """Re-probe database capabilities, e.g. after a migration or enabling pgvector."""
+    from app.db.capabilities import db_capabilities
+    caps = db_capabilities.refresh(db)
+    logger.info(f"Database capabilities refreshed by user {current_user.id}")
+    return caps.to_dict()
+
+
+@router.get("/vector-indexes")
+def list_vector_indexes(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.require_tenant_admin),
+) -> Any:
+    """ANN indexes on the embedding columns (global and per-tenant)."""
+    from app.services.vector_index_service import vector_index_service
+    return {"indexes": vector_index_service.list_indexes(db)}
+
+
+@router.post("/vector-indexes/build", status_code=202)
+def build_vector_indexes(
+    tenant_id: int = Depends(deps.get_tenant_id),
+    current_user: models.User = Depends(deps.require_tenant_admin),
+) -> Any:
+    """Build this tenant's partial HNSW indexes once it has enough embedded rows (background task)."""
+    from app.tasks.embedding_tasks import build_vector_indexes as build_task
+    build_task.delay(tenant_id)
+    return {"status": "accepted", "message": "Vector index build task enqueued"}
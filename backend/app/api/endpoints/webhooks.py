@@ -22,7 +22,7 @@ from typing import Optional
 from fastapi import APIRouter, Depends, Request, Header, HTTPException
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_db, run_db
 from app import crud
 from app.core.config import settings
 from app.core.logging import get_logger
@@ -186,6 +186,13 @@ async def handle_git_webhook(
 
     logger.info(f"Webhook received: provider={provider}, event_type={event_type}")
 
+    # Repo lookups, Celery dispatch, Redis cleanup and the PR comment are all
+    # blocking calls — run them on the DB threadpool, not the event loop
+    return await run_db(_dispatch_event, db, provider, event_type, payload)
+
+
+def _dispatch_event(db: Session, provider: str, event_type: str, payload: dict) -> dict:
+    """Act on a verified webhook event; returns the endpoint's JSON response."""
     # ── PULL REQUEST EVENT (Sprint 4 Phase 4) ──
     if event_type == "pull_request" and provider == "github":
         pr_data = _extract_github_pr(payload)
@@ -29,6 +29,9 @@ class Settings(BaseSettings):
     DATABASE_POOL_SIZE: int = Field(default=20, env="DATABASE_POOL_SIZE")
     DATABASE_MAX_OVERFLOW: int = Field(default=30, env="DATABASE_MAX_OVERFLOW")
     DATABASE_POOL_TIMEOUT: int = Field(default=30, env="DATABASE_POOL_TIMEOUT")
+    # Threads that run blocking Session work for async endpoints (run_db);
+    # more than DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW would only queue on checkout
+    DB_OFFLOAD_WORKERS: int = Field(default=20, env="DB_OFFLOAD_WORKERS")
     
     # --- Security Settings ---
     SECRET_KEY: str = Field(..., env="SECRET_KEY")
@@ -60,9 +63,100 @@ class Settings(BaseSettings):
     # "gemini" = Gemini only (default), "dual" = Claude for code + Gemini for docs
     AI_PROVIDER_MODE: str = Field(default="gemini", env="AI_PROVIDER_MODE")
 
+    # --- AI Rate Governor (shared token buckets across workers) ---
+    # Budgets are the REAL provider quota for the whole deployment, not per worker.
+    # 0 disables a dimension (e.g. GEMINI_TPM=0 → only RPM is enforced).
+    AI_RATE_GOVERNOR_ENABLED: bool = Field(default=True, env="AI_RATE_GOVERNOR_ENABLED")
+    AI_RATE_GOVERNOR_MAX_WAIT: int = Field(default=300, env="AI_RATE_GOVERNOR_MAX_WAIT")  # seconds
+    GEMINI_RPM: int = Field(default=15, env="GEMINI_RPM")
+    GEMINI_TPM: int = Field(default=1_000_000, env="GEMINI_TPM")
+    GEMINI_EMBEDDING_RPM: int = Field(default=1500, env="GEMINI_EMBEDDING_RPM")
+    ANTHROPIC_RPM: int = Field(default=50, env="ANTHROPIC_RPM")
+    ANTHROPIC_TPM: int = Field(default=40_000, env="ANTHROPIC_TPM")
+    AI_TENANT_RPM: int = Field(default=0, env="AI_TENANT_RPM")  # optional per-tenant sub-budget
+
     # --- Git Webhook Settings (ADHOC-09) ---
     WEBHOOK_SECRET: Optional[str] = Field(default=None, env="WEBHOOK_SECRET")
     GITHUB_TOKEN: Optional[str] = Field(default=None, env="GITHUB_TOKEN")
+    GITHUB_FETCH_CONCURRENCY: int = Field(default=16, env="GITHUB_FETCH_CONCURRENCY")
+    # Total response bytes kept for ETag revalidation (least recently used dropped first)
+    GITHUB_ETAG_CACHE_MAX_BYTES: int = Field(default=64 * 1024 * 1024, env="GITHUB_ETAG_CACHE_MAX_BYTES")
+    # Runs fetching at least this many files pull one tarball instead (0 = always per-file)
+    GITHUB_ARCHIVE_MIN_FILES: int = Field(default=500, env="GITHUB_ARCHIVE_MIN_FILES")
+
+    # --- Repository Analysis Scheduling ---
+    # In-flight file analyses per repo run adapt (AIMD) between 1 and the max
+    REPO_ANALYSIS_INITIAL_CONCURRENCY: int = Field(default=3, env="REPO_ANALYSIS_INITIAL_CONCURRENCY")
+    REPO_ANALYSIS_MAX_CONCURRENCY: int = Field(default=8, env="REPO_ANALYSIS_MAX_CONCURRENCY")
+    REPO_PROGRESS_FLUSH_SECONDS: float = Field(default=5.0, env="REPO_PROGRESS_FLUSH_SECONDS")
+
+    # --- Document Analysis (Pass 3) ---
+    # Segments extracted concurrently per document; provider quotas are still
+    # enforced by the shared rate governor inside the AI clients
+    PASS3_CONCURRENCY: int = Field(default=4, env="PASS3_CONCURRENCY")
+    # Results are written and progress / stop signal checked every N segments
+    PASS3_FLUSH_EVERY: int = Field(default=10, env="PASS3_FLUSH_EVERY")
+
+    # --- Chat Retrieval (RAG) ---
+    # Independent retrieval stages run concurrently, each on its own pooled
+    # session; keep RAG_STAGE_WORKERS well under DATABASE_POOL_SIZE
+    RAG_PARALLEL_STAGES: bool = Field(default=True, env="RAG_PARALLEL_STAGES")
+    RAG_STAGE_WORKERS: int = Field(default=8, env="RAG_STAGE_WORKERS")
+    RAG_STAGE_TIMEOUT_SECONDS: float = Field(default=5.0, env="RAG_STAGE_TIMEOUT_SECONDS")
+
+    # --- Vector Search (pgvector ANN indexes) ---
+    # Default hnsw.ef_search; the "fast" / "high" recall profiles override it per query
+    VECTOR_SEARCH_EF_SEARCH: int = Field(default=40, env="VECTOR_SEARCH_EF_SEARCH")
+    VECTOR_INDEX_HNSW_M: int = Field(default=16, env="VECTOR_INDEX_HNSW_M")
+    VECTOR_INDEX_EF_CONSTRUCTION: int = Field(default=64, env="VECTOR_INDEX_EF_CONSTRUCTION")
+    # Tenants with at least this many embedded rows get their own partial HNSW index
+    VECTOR_INDEX_TENANT_MIN_ROWS: int = Field(default=20000, env="VECTOR_INDEX_TENANT_MIN_ROWS")
+
+    # --- Hybrid Search (lexical + vector, reciprocal rank fusion) ---
+    HYBRID_RRF_K: int = Field(default=60, env="HYBRID_RRF_K")
+    # Candidates fetched per retriever before fusion
+    HYBRID_SEARCH_CANDIDATES: int = Field(default=20, env="HYBRID_SEARCH_CANDIDATES")
+    HYBRID_RERANK_ENABLED: bool = Field(default=True, env="HYBRID_RERANK_ENABLED")
+    # Share of the final relevance taken from query-term coverage (0 = pure RRF)
+    HYBRID_RERANK_WEIGHT: float = Field(default=0.3, env="HYBRID_RERANK_WEIGHT")
+
+    # --- Query Embedding Cache (in-process LRU + Redis) ---
+    QUERY_EMBEDDING_CACHE_ENABLED: bool = Field(default=True, env="QUERY_EMBEDDING_CACHE_ENABLED")
+    # In-process entries per worker (~6 KB each at 768 dimensions)
+    QUERY_EMBEDDING_CACHE_SIZE: int = Field(default=2048, env="QUERY_EMBEDDING_CACHE_SIZE")
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: int = Field(default=86400, env="QUERY_EMBEDDING_CACHE_TTL_SECONDS")
+
+    # --- Chat Answer Cache (tenant-scoped semantic cache, Redis) ---
+    ANSWER_CACHE_ENABLED: bool = Field(default=True, env="ANSWER_CACHE_ENABLED")
+    # Cosine similarity between query embeddings needed to reuse an answer
+    ANSWER_CACHE_SIMILARITY: float = Field(default=0.95, env="ANSWER_CACHE_SIMILARITY")
+    ANSWER_CACHE_TTL_SECONDS: int = Field(default=86400, env="ANSWER_CACHE_TTL_SECONDS")
+    # Entries kept per tenant/scope; least recently used are evicted first
+    ANSWER_CACHE_MAX_ENTRIES: int = Field(default=200, env="ANSWER_CACHE_MAX_ENTRIES")
+
+    # --- Graph Snapshots (materialized graph views, Redis) ---
+    GRAPH_SNAPSHOT_ENABLED: bool = Field(default=True, env="GRAPH_SNAPSHOT_ENABLED")
+    # Snapshots of superseded graph versions expire after this
+    GRAPH_SNAPSHOT_TTL_SECONDS: int = Field(default=86400, env="GRAPH_SNAPSHOT_TTL_SECONDS")
+
+    # --- Graph Query API (neighborhood / paged / overview views) ---
+    # Upper bound on nodes a neighborhood expansion returns
+    GRAPH_QUERY_MAX_NODES: int = Field(default=2000, env="GRAPH_QUERY_MAX_NODES")
+    GRAPH_QUERY_MAX_HOPS: int = Field(default=3, env="GRAPH_QUERY_MAX_HOPS")
+
+    # --- Graph Index (in-memory adjacency per tenant, shared via Redis) ---
+    # How often a worker checks Redis for new relationship deltas
+    GRAPH_INDEX_REFRESH_SECONDS: float = Field(default=1.0, env="GRAPH_INDEX_REFRESH_SECONDS")
+    # Overlay edges applied before the base index is rebuilt
+    GRAPH_INDEX_COMPACT_THRESHOLD: int = Field(default=10000, env="GRAPH_INDEX_COMPACT_THRESHOLD")
+    GRAPH_INDEX_TTL_SECONDS: int = Field(default=86400, env="GRAPH_INDEX_TTL_SECONDS")
+    # Without Redis, each worker rebuilds its own index after this
+    GRAPH_INDEX_LOCAL_TTL_SECONDS: int = Field(default=300, env="GRAPH_INDEX_LOCAL_TTL_SECONDS")
+    GRAPH_INDEX_MAX_TENANTS: int = Field(default=32, env="GRAPH_INDEX_MAX_TENANTS")
+
+    # --- Graph Versioning (knowledge_graph_versions) ---
+    # Superseded versions keep a full graph every N versions, deltas in between
+    GRAPH_VERSION_SNAPSHOT_INTERVAL: int = Field(default=10, env="GRAPH_VERSION_SNAPSHOT_INTERVAL")
 
     # --- OAuth Integration Settings (Sprint 8) ---
     FRONTEND_URL: str = Field(default="http://localhost:3000", env="FRONTEND_URL")
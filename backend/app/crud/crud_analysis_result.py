@@ -36,6 +36,35 @@ class CRUDAnalysisResult(CRUDBase[AnalysisResult, AnalysisResultCreate, None]):
         db.refresh(db_obj)
         return db_obj
 
+    def create_many_for_document(
+        self,
+        db: Session,
+        *,
+        objs_in: List[AnalysisResultCreate],
+        tenant_id: int,
+        commit: bool = True,
+    ) -> List[AnalysisResult]:
+        """
+        Bulk-create analysis results in a single flush/commit.
+
+        Used by concurrent Pass 3 extraction so a batch of segment results
+        costs one round-trip instead of one commit per segment.
+        """
+        if not tenant_id:
+            raise ValueError("tenant_id is REQUIRED for analysis result creation")
+
+        db_objs = []
+        for obj_in in objs_in:
+            obj_data = obj_in.model_dump()
+            obj_data["tenant_id"] = tenant_id
+            db_objs.append(self.model(**obj_data))
+        db.add_all(db_objs)
+        if commit:
+            db.commit()
+        else:
+            db.flush()
+        return db_objs
+
     def get_multi_by_document(
         self, db: Session, *, document_id: int, tenant_id: int
     ) -> List[AnalysisResult]:
@@ -1,13 +1,16 @@
 # This is the content for your NEW file at:
 # backend/app/crud/crud_code_component.py
 
-from typing import List
+from typing import Dict, List
+from sqlalchemy import case
 from sqlalchemy.orm import Session
 
 from app.crud.base import CRUDBase
 from app.models.code_component import CodeComponent
 from app.schemas.code_component import CodeComponentCreate, CodeComponentUpdate
 from app.models.document_code_link import DocumentCodeLink
+from app.models.mismatch import Mismatch
+from app.models.ontology_concept import OntologyConcept
 
 class CRUDCodeComponent(CRUDBase[CodeComponent, CodeComponentCreate, CodeComponentUpdate]):
     """
@@ -113,5 +116,75 @@ class CRUDCodeComponent(CRUDBase[CodeComponent, CodeComponentCreate, CodeCompone
 
         db.commit()
         return component
+
+    def retire_many(self, db: Session, *, ids: List[int], tenant_id: int) -> int:
+        """
+        Delete components whose files no longer exist in the repository,
+        together with their document links and mismatches. Ontology concepts
+        extracted from them are kept (they may be shared with documents) but
+        unlinked from the deleted file.
+
+        Args:
+            db: Database session
+            ids: Code component IDs to retire
+            tenant_id: REQUIRED tenant ID for multi-tenancy isolation
+
+        Returns:
+            Number of components deleted
+        """
+        if not tenant_id:
+            raise ValueError("tenant_id is REQUIRED for retire_many()")
+        if not ids:
+            return 0
+
+        db.query(DocumentCodeLink).filter(
+            DocumentCodeLink.code_component_id.in_(ids),
+            DocumentCodeLink.tenant_id == tenant_id,
+        ).delete(synchronize_session=False)
+        db.query(Mismatch).filter(
+            Mismatch.code_component_id.in_(ids),
+            Mismatch.tenant_id == tenant_id,
+        ).delete(synchronize_session=False)
+        db.query(OntologyConcept).filter(
+            OntologyConcept.source_component_id.in_(ids),
+            OntologyConcept.tenant_id == tenant_id,
+        ).update({OntologyConcept.source_component_id: None}, synchronize_session=False)
+        deleted = db.query(CodeComponent).filter(
+            CodeComponent.id.in_(ids),
+            CodeComponent.tenant_id == tenant_id,
+        ).delete(synchronize_session=False)
+
+        db.commit()
+        return deleted
+
+    def relocate_many(self, db: Session, *, locations: Dict[int, str], tenant_id: int) -> int:
+        """
+        Point components at new file URLs in one UPDATE (e.g. after the
+        repository's branch changed).
+
+        Args:
+            db: Database session
+            locations: Code component ID -> new location
+            tenant_id: REQUIRED tenant ID for multi-tenancy isolation
+
+        Returns:
+            Number of components updated
+        """
+        if not tenant_id:
+            raise ValueError("tenant_id is REQUIRED for relocate_many()")
+        if not locations:
+            return 0
+
+        updated = db.query(CodeComponent).filter(
+            CodeComponent.id.in_(list(locations)),
+            CodeComponent.tenant_id == tenant_id,
+        ).update(
+            {CodeComponent.location: case(locations, value=CodeComponent.id)},
+            synchronize_session=False,
+        )
+
+        db.commit()
+        return updated
+
 # Create a single instance that we can import and use in our API endpoints.
 code_component = CRUDCodeComponent(CodeComponent)
@@ -9,6 +9,8 @@ from typing import List, Optional, Dict
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app.crud.base import CRUDBase
 from app.models.concept_mapping import ConceptMapping
@@ -68,6 +70,60 @@ class CRUDConceptMapping(CRUDBase[ConceptMapping, ConceptMappingCreate, ConceptM
         db.refresh(db_obj)
         return db_obj
 
+    def bulk_upsert_mappings(
+        self, db: Session, *,
+        mappings: List[Dict],
+        tenant_id: int,
+        commit: bool = True,
+        chunk_size: int = 1000,
+    ) -> int:
+        """
+        Write many mappings with multi-row INSERT ... ON CONFLICT on the
+        (tenant_id, document_concept_id, code_concept_id) unique constraint.
+
+        Same outcome as calling create_mapping() per pair: new pairs are
+        inserted, existing pairs keep their status and only take the new
+        confidence / method when it is higher. Returns rows inserted or updated.
+        """
+        if not tenant_id:
+            raise ValueError("tenant_id is REQUIRED for bulk_upsert_mappings()")
+        if not mappings:
+            return 0
+
+        # A statement may touch each conflicting row only once — keep the best per pair
+        rows: Dict[tuple, Dict] = {}
+        for mapping in mappings:
+            key = (mapping["document_concept_id"], mapping["code_concept_id"])
+            if key not in rows or mapping["confidence_score"] > rows[key]["confidence_score"]:
+                rows[key] = {
+                    "relationship_type": "implements",
+                    "status": "candidate",
+                    "ai_reasoning": None,
+                    **mapping,
+                    "tenant_id": tenant_id,
+                }
+
+        insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        values = list(rows.values())
+        written = 0
+        for start in range(0, len(values), chunk_size):
+            stmt = insert(self.model).values(values[start:start + chunk_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["tenant_id", "document_concept_id", "code_concept_id"],
+                set_={
+                    "confidence_score": stmt.excluded.confidence_score,
+                    "mapping_method": stmt.excluded.mapping_method,
+                    "ai_reasoning": func.coalesce(stmt.excluded.ai_reasoning, self.model.ai_reasoning),
+                    "updated_at": func.now(),
+                },
+                where=stmt.excluded.confidence_score > self.model.confidence_score,
+            )
+            written += db.execute(stmt).rowcount or 0
+
+        if commit:
+            db.commit()
+        return written
+
     def get_by_document_concept(
         self, db: Session, *, document_concept_id: int, tenant_id: int
     ) -> List[ConceptMapping]:
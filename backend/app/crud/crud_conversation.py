@@ -14,7 +14,7 @@ class CRUDConversation:
 
     def create(self, db: Session, *, tenant_id: int, user_id: int, title: str = "New Conversation",
                context_type: str = "general", context_id: Optional[int] = None,
-               model_preference: str = "gemini") -> Conversation:
+               model_preference: str = "gemini", answer_cache_enabled: bool = True) -> Conversation:
         obj = Conversation(
             tenant_id=tenant_id,
             user_id=user_id,
@@ -22,6 +22,7 @@ class CRUDConversation:
             context_type=context_type,
             context_id=context_id,
             model_preference=model_preference,
+            answer_cache_enabled=answer_cache_enabled,
         )
         db.add(obj)
         db.commit()
@@ -1,21 +1,122 @@
 """
 CRUD operations for KnowledgeGraphVersion.
 
-Handles graph snapshot storage, versioning, and delta computation.
+Handles graph version storage, versioning, and delta computation.
+
+Storage: the current version always holds the full graph_data (fast
+rendering). Once superseded, a version keeps graph_data only if it is a
+snapshot — version 1 and every GRAPH_VERSION_SNAPSHOT_INTERVAL-th version
+after the previous snapshot; the rest keep just their structural delta
+from the version before. get_graph_data() rebuilds any version by replaying
+deltas onto the nearest snapshot at or before it.
+
+Hashing: nodes are identified by id (or name) and edges by
+source→target:type, and each gets its own leaf hash. A collection's hash is
+the sum of its leaf hashes (mod 2^64, so order-independent) and graph_hash
+is sha256 over the collection hashes, counts and metadata hash. The current
+version keeps its leaf hashes (graph_hashes), so saving compares leaf
+hashes and only reads the bodies of nodes/edges that changed.
+
+Deltas (format 2): added_* / removed_* bodies and changed_* {before, after}
+for nodes and edges, metadata {before, after} if it changed, and a summary.
+get_diff composes the deltas between two versions, in either direction,
+without rebuilding either graph; ranges spanning versions saved before
+format 2 (which all kept their full graph_data) are diffed graph to graph.
 """
 
 import hashlib
 import json
-from typing import Optional, List, Dict
-from sqlalchemy.orm import Session
+from typing import Optional, List, Dict, Iterable
+from sqlalchemy import func, null
+from sqlalchemy.orm import Session, defer
+from app.core.config import settings
+from app.core.logging import get_logger
 from app.models.knowledge_graph_version import KnowledgeGraphVersion
 
+logger = get_logger("crud.knowledge_graph_version")
+
+DELTA_FORMAT = 2
+_COLLECTIONS = ("nodes", "edges")
+_MASK = (1 << 64) - 1
+
+
+def _node_key(node: dict) -> str:
+    return str(node.get("id", node.get("name", "")))
+
+
+def _edge_key(edge: dict) -> str:
+    return f"{edge.get('source', '')}→{edge.get('target', '')}:{edge.get('type', '')}"
+
+
+_KEYS = {"nodes": _node_key, "edges": _edge_key}
+
+
+def _leaf(body) -> str:
+    canonical = json.dumps(body, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def _leaf_hashes(graph_data: dict) -> dict:
+    """Per-node / per-edge hashes plus the metadata hash."""
+    hashes = {
+        c: {_KEYS[c](item): _leaf(item) for item in graph_data.get(c, [])}
+        for c in _COLLECTIONS
+    }
+    hashes["metadata"] = _leaf(graph_data.get("metadata", {}))
+    return hashes
+
+
+def _root(hashes: dict) -> str:
+    """graph_hash from leaf hashes."""
+    parts = []
+    for c in _COLLECTIONS:
+        leaves = hashes[c]
+        total = sum(int(h, 16) for h in leaves.values()) & _MASK
+        parts.append(f"{c}:{len(leaves)}:{total:016x}")
+    parts.append(f"metadata:{hashes['metadata']}")
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+def _select(items: Iterable[dict], collection: str, keys: set) -> Dict[str, dict]:
+    """Bodies of just the wanted keys."""
+    if not keys:
+        return {}
+    key_of = _KEYS[collection]
+    return {k: item for item in items if (k := key_of(item)) in keys}
+
+
+def _summarize(delta: dict) -> str:
+    parts = []
+    for c in _COLLECTIONS:
+        if delta.get(f"added_{c}"):
+            parts.append(f"+{len(delta[f'added_{c}'])} {c}")
+        if delta.get(f"removed_{c}"):
+            parts.append(f"-{len(delta[f'removed_{c}'])} {c}")
+        if delta.get(f"changed_{c}"):
+            parts.append(f"~{len(delta[f'changed_{c}'])} {c}")
+    if not parts and "metadata" in delta:
+        parts.append("metadata changed")
+    return ", ".join(parts) if parts else "No changes"
+
+
+def _is_empty(delta: dict) -> bool:
+    return "metadata" not in delta and not any(
+        delta.get(f"{kind}_{c}") for kind in ("added", "removed", "changed") for c in _COLLECTIONS
+    )
+
 
 class CRUDKnowledgeGraphVersion:
 
     def __init__(self):
         self.model = KnowledgeGraphVersion
 
+    def _scope(self, query, source_type: str, source_id: int, tenant_id: int):
+        return query.filter(
+            self.model.tenant_id == tenant_id,
+            self.model.source_type == source_type,
+            self.model.source_id == source_id,
+        )
+
     def get_current(
         self, db: Session, *, source_type: str, source_id: int, tenant_id: int
     ) -> Optional[KnowledgeGraphVersion]:
@@ -30,8 +131,10 @@ class CRUDKnowledgeGraphVersion:
     def get_history(
         self, db: Session, *, source_type: str, source_id: int, tenant_id: int
     ) -> List[KnowledgeGraphVersion]:
-        """Get all versions for a source entity, newest first."""
-        return db.query(self.model).filter(
+        """Get all versions for a source entity, newest first (graph bodies not loaded)."""
+        return db.query(self.model).options(
+            defer(self.model.graph_data), defer(self.model.graph_hashes),
+        ).filter(
             self.model.tenant_id == tenant_id,
             self.model.source_type == source_type,
             self.model.source_id == source_id,
@@ -41,7 +144,7 @@ class CRUDKnowledgeGraphVersion:
         self, db: Session, *, source_type: str, source_id: int,
         version: int, tenant_id: int
     ) -> Optional[KnowledgeGraphVersion]:
-        """Get a specific version."""
+        """Get a specific version (graph_data is only set on current and snapshot versions)."""
         return db.query(self.model).filter(
             self.model.tenant_id == tenant_id,
             self.model.source_type == source_type,
@@ -49,6 +152,39 @@ class CRUDKnowledgeGraphVersion:
             self.model.version == version,
         ).first()
 
+    def get_graph_data(
+        self, db: Session, *, source_type: str, source_id: int,
+        version: int, tenant_id: int
+    ) -> Optional[dict]:
+        """The full graph of any version, rebuilt from the nearest snapshot if needed."""
+        target = self.get_by_version(
+            db, source_type=source_type, source_id=source_id, version=version, tenant_id=tenant_id
+        )
+        if not target:
+            return None
+        if target.graph_data is not None:
+            return target.graph_data
+
+        snapshot = self._scope(db.query(self.model), source_type, source_id, tenant_id).filter(
+            self.model.version < version,
+            self.model.is_snapshot == True,
+        ).order_by(self.model.version.desc()).first()
+        if not snapshot or snapshot.graph_data is None:
+            logger.error(f"No snapshot to rebuild {source_type}:{source_id} v{version} from")
+            return None
+
+        deltas = self._scope(
+            db.query(self.model.version, self.model.graph_delta), source_type, source_id, tenant_id,
+        ).filter(
+            self.model.version > snapshot.version,
+            self.model.version <= version,
+        ).order_by(self.model.version).all()
+
+        graph = self._replay(snapshot.graph_data, [delta for _, delta in deltas])
+        if _root(_leaf_hashes(graph)) != target.graph_hash:
+            logger.warning(f"Rebuilt graph hash mismatch for {source_type}:{source_id} v{version}")
+        return graph
+
     def save_version(
         self, db: Session, *, source_type: str, source_id: int,
         tenant_id: int, graph_data: dict
@@ -58,11 +194,13 @@ class CRUDKnowledgeGraphVersion:
         returns the existing current version without creating a new one.
 
         If changed:
-        1. Marks old current as not-current
-        2. Computes delta (added/removed nodes and edges)
+        1. Computes the delta from the current version's leaf hashes
+        2. Marks old current as not-current, dropping its graph_data
+           unless it is a snapshot
         3. Creates new version with is_current=True
         """
-        new_hash = self._compute_hash(graph_data)
+        hashes = _leaf_hashes(graph_data)
+        new_hash = _root(hashes)
 
         # Check if current version exists and has same hash
         current = self.get_current(
@@ -72,13 +210,33 @@ class CRUDKnowledgeGraphVersion:
         if current and current.graph_hash == new_hash:
             return current  # No changes — skip version creation
 
-        # Compute version number and delta
+        delta = None
+        if current:
+            old_hashes = current.graph_hashes or _leaf_hashes(current.graph_data or {})
+            delta = self._compute_delta(current.graph_data or {}, graph_data, old_hashes, hashes)
+            if _is_empty(delta):
+                # Saved before leaf hashing: same graph, older hash scheme
+                current.graph_hash = new_hash
+                current.graph_hashes = hashes
+                db.add(current)
+                db.flush()
+                return current
+
+        # Compute version number and snapshot cadence
         next_version = (current.version + 1) if current else 1
-        delta = self._compute_delta(current.graph_data, graph_data) if current else None
+        is_snapshot = True
+        if current:
+            last_snapshot = self._scope(
+                db.query(func.max(self.model.version)), source_type, source_id, tenant_id,
+            ).filter(self.model.is_snapshot == True).scalar() or 0
+            is_snapshot = next_version - last_snapshot >= settings.GRAPH_VERSION_SNAPSHOT_INTERVAL
 
-        # Mark old version as not-current
+        # Mark old version as not-current; only snapshots keep their full graph
         if current:
             current.is_current = False
+            current.graph_hashes = null()
+            if not current.is_snapshot:
+                current.graph_data = null()
             db.add(current)
 
         # Create new version
@@ -88,8 +246,10 @@ class CRUDKnowledgeGraphVersion:
             source_id=source_id,
             version=next_version,
             is_current=True,
+            is_snapshot=is_snapshot,
             graph_data=graph_data,
             graph_hash=new_hash,
+            graph_hashes=hashes,
             graph_delta=delta,
         )
         db.add(new_version)
@@ -100,63 +260,131 @@ class CRUDKnowledgeGraphVersion:
         self, db: Session, *, source_type: str, source_id: int,
         version_a: int, version_b: int, tenant_id: int
     ) -> Optional[dict]:
-        """Compute delta between any two versions."""
-        va = self.get_by_version(
-            db, source_type=source_type, source_id=source_id,
-            version=version_a, tenant_id=tenant_id
-        )
-        vb = self.get_by_version(
-            db, source_type=source_type, source_id=source_id,
-            version=version_b, tenant_id=tenant_id
+        """Compute delta between any two versions by composing the deltas between them."""
+        low, high = sorted((version_a, version_b))
+        rows = self._scope(
+            db.query(self.model.version, self.model.graph_delta), source_type, source_id, tenant_id,
+        ).filter(
+            self.model.version >= low,
+            self.model.version <= high,
+        ).order_by(self.model.version).all()
+        found = {v for v, _ in rows}
+        if low not in found or high not in found:
+            return None
+
+        deltas = [delta for v, delta in rows if v > low]
+        if all(delta and delta.get("format") == DELTA_FORMAT for delta in deltas):
+            composed = self._compose(deltas)
+            return composed if version_a <= version_b else self._invert(composed)
+
+        # Range includes versions saved before structural deltas: diff graph to graph
+        graph_a, graph_b = (
+            self.get_graph_data(db, source_type=source_type, source_id=source_id, version=v, tenant_id=tenant_id)
+            for v in (version_a, version_b)
         )
-        if not va or not vb:
+        if graph_a is None or graph_b is None:
             return None
-        return self._compute_delta(va.graph_data, vb.graph_data)
+        return self._compute_delta(graph_a, graph_b)
 
     @staticmethod
     def _compute_hash(graph_data: dict) -> str:
-        """SHA256 hash of graph data for change detection."""
-        # Sort keys for deterministic hashing
-        canonical = json.dumps(graph_data, sort_keys=True, default=str)
-        return hashlib.sha256(canonical.encode()).hexdigest()
+        """Merkle-style graph hash for change detection (see module docstring)."""
+        return _root(_leaf_hashes(graph_data))
+
+    @staticmethod
+    def _compute_delta(
+        old_data: dict, new_data: dict,
+        old_hashes: Optional[dict] = None, new_hashes: Optional[dict] = None,
+    ) -> dict:
+        """Compute what changed between two graph versions (leaf hashes computed if not given)."""
+        old_hashes = old_hashes or _leaf_hashes(old_data)
+        new_hashes = new_hashes or _leaf_hashes(new_data)
+
+        delta: dict = {"format": DELTA_FORMAT}
+        for c in _COLLECTIONS:
+            old_leaves, new_leaves = old_hashes[c], new_hashes[c]
+            added = [k for k in new_leaves if k not in old_leaves]
+            removed = [k for k in old_leaves if k not in new_leaves]
+            changed = [k for k, h in new_leaves.items() if k in old_leaves and old_leaves[k] != h]
+
+            old_bodies = _select(old_data.get(c, []), c, {*removed, *changed})
+            new_bodies = _select(new_data.get(c, []), c, {*added, *changed})
+            delta[f"added_{c}"] = [new_bodies[k] for k in added]
+            delta[f"removed_{c}"] = [old_bodies[k] for k in removed]
+            delta[f"changed_{c}"] = [{"before": old_bodies[k], "after": new_bodies[k]} for k in changed]
+
+        if old_hashes["metadata"] != new_hashes["metadata"]:
+            delta["metadata"] = {"before": old_data.get("metadata", {}), "after": new_data.get("metadata", {})}
+        delta["summary"] = _summarize(delta)
+        return delta
+
+    @staticmethod
+    def _replay(graph_data: dict, deltas: List[dict]) -> dict:
+        """Apply deltas in order to a full graph (node/edge order is not preserved)."""
+        state = {c: {_KEYS[c](item): item for item in graph_data.get(c, [])} for c in _COLLECTIONS}
+        metadata = graph_data.get("metadata", {})
+        for delta in deltas:
+            for c in _COLLECTIONS:
+                items, key_of = state[c], _KEYS[c]
+                for body in delta.get(f"removed_{c}", []):
+                    items.pop(key_of(body), None)
+                for change in delta.get(f"changed_{c}", []):
+                    items[key_of(change["after"])] = change["after"]
+                for body in delta.get(f"added_{c}", []):
+                    items[key_of(body)] = body
+            if "metadata" in delta:
+                metadata = delta["metadata"]["after"]
+        graph = {c: list(state[c].values()) for c in _COLLECTIONS}
+        graph["metadata"] = metadata
+        return graph
+
+    @staticmethod
+    def _compose(deltas: List[dict]) -> dict:
+        """Net delta of consecutive deltas, touching only the keys they mention."""
+        net: Dict[str, Dict[str, list]] = {c: {} for c in _COLLECTIONS}  # key -> [before, after]
+        metadata = None
+        for delta in deltas:
+            for c in _COLLECTIONS:
+                entries, key_of = net[c], _KEYS[c]
+                for body in delta.get(f"removed_{c}", []):
+                    entries.setdefault(key_of(body), [body, None])[1] = None
+                for change in delta.get(f"changed_{c}", []):
+                    entries.setdefault(key_of(change["after"]), [change["before"], None])[1] = change["after"]
+                for body in delta.get(f"added_{c}", []):
+                    entries.setdefault(key_of(body), [None, None])[1] = body
+            if "metadata" in delta:
+                before = metadata[0] if metadata else delta["metadata"]["before"]
+                metadata = [before, delta["metadata"]["after"]]
+
+        result: dict = {"format": DELTA_FORMAT}
+        for c in _COLLECTIONS:
+            result[f"added_{c}"], result[f"removed_{c}"], result[f"changed_{c}"] = [], [], []
+            for before, after in net[c].values():
+                if before is None and after is not None:
+                    result[f"added_{c}"].append(after)
+                elif after is None and before is not None:
+                    result[f"removed_{c}"].append(before)
+                elif before is not None and _leaf(before) != _leaf(after):
+                    result[f"changed_{c}"].append({"before": before, "after": after})
+        if metadata and _leaf(metadata[0]) != _leaf(metadata[1]):
+            result["metadata"] = {"before": metadata[0], "after": metadata[1]}
+        result["summary"] = _summarize(result)
+        return result
 
     @staticmethod
-    def _compute_delta(old_data: dict, new_data: dict) -> dict:
-        """Compute what changed between two graph versions."""
-        old_nodes = {n.get("id", n.get("name", "")): n for n in old_data.get("nodes", [])}
-        new_nodes = {n.get("id", n.get("name", "")): n for n in new_data.get("nodes", [])}
-
-        old_edges = {
-            f"{e.get('source', '')}→{e.get('target', '')}:{e.get('type', '')}": e
-            for e in old_data.get("edges", [])
-        }
-        new_edges = {
-            f"{e.get('source', '')}→{e.get('target', '')}:{e.get('type', '')}": e
-            for e in new_data.get("edges", [])
-        }
-
-        added_nodes = [new_nodes[k] for k in set(new_nodes) - set(old_nodes)]
-        removed_nodes = [old_nodes[k] for k in set(old_nodes) - set(new_nodes)]
-        added_edges = [new_edges[k] for k in set(new_edges) - set(old_edges)]
-        removed_edges = [old_edges[k] for k in set(old_edges) - set(new_edges)]
-
-        summary_parts = []
-        if added_nodes:
-            summary_parts.append(f"+{len(added_nodes)} nodes")
-        if removed_nodes:
-            summary_parts.append(f"-{len(removed_nodes)} nodes")
-        if added_edges:
-            summary_parts.append(f"+{len(added_edges)} edges")
-        if removed_edges:
-            summary_parts.append(f"-{len(removed_edges)} edges")
-
-        return {
-            "added_nodes": added_nodes,
-            "removed_nodes": removed_nodes,
-            "added_edges": added_edges,
-            "removed_edges": removed_edges,
-            "summary": ", ".join(summary_parts) if summary_parts else "No changes",
-        }
+    def _invert(delta: dict) -> dict:
+        """The same delta read backwards (newer → older)."""
+        inverted: dict = {"format": DELTA_FORMAT}
+        for c in _COLLECTIONS:
+            inverted[f"added_{c}"] = delta.get(f"removed_{c}", [])
+            inverted[f"removed_{c}"] = delta.get(f"added_{c}", [])
+            inverted[f"changed_{c}"] = [
+                {"before": ch["after"], "after": ch["before"]} for ch in delta.get(f"changed_{c}", [])
+            ]
+        if "metadata" in delta:
+            inverted["metadata"] = {"before": delta["metadata"]["after"], "after": delta["metadata"]["before"]}
+        inverted["summary"] = _summarize(inverted)
+        return inverted
 
 
 knowledge_graph_version = CRUDKnowledgeGraphVersion()
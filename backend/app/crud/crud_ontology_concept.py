@@ -1,11 +1,28 @@
 from typing import Dict, List, Optional
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy import and_, case, func, literal_column, null, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app.crud.base import CRUDBase
 from app.models.ontology_concept import OntologyConcept
 from app.schemas.ontology import OntologyConceptCreate, OntologyConceptUpdate
 
+IDENTITY_INDEX = "uq_ontology_concepts_identity"
+
+
+def _identity_columns(model) -> list:
+    """uq_ontology_concepts_identity's expressions (literal 0 so ON CONFLICT can match the index)."""
+    return [
+        model.tenant_id, func.lower(model.name), model.concept_type, model.source_type,
+        func.coalesce(model.initiative_id, literal_column("0")),
+    ]
+
+
+def concept_identity(name: str, concept_type: str, source_type: str, initiative_id: Optional[int]) -> tuple:
+    """The key get_or_create() deduplicates on (and uq_ontology_concepts_identity enforces)."""
+    return (name.strip().lower(), concept_type, source_type, initiative_id or None)
+
 
 class CRUDOntologyConcept(CRUDBase[OntologyConcept, OntologyConceptCreate, OntologyConceptUpdate]):
 
@@ -87,6 +104,160 @@ class CRUDOntologyConcept(CRUDBase[OntologyConcept, OntologyConceptCreate, Ontol
         db.refresh(db_obj)
         return db_obj
 
+    def bulk_get_or_create(
+        self, db: Session, *, concepts: List[Dict], tenant_id: int,
+        commit: bool = True, chunk_size: int = 500,
+    ) -> Dict[tuple, int]:
+        """
+        Set-based get_or_create() for many concepts. Each dict has name and
+        concept_type, optionally description, confidence_score, source_type
+        ("document"), initiative_id, source_component_id, source_document_id.
+
+        Same outcome as calling get_or_create() per concept, in order: existing
+        rows are resolved with one SELECT per chunk, new ones inserted with
+        INSERT ... ON CONFLICT DO NOTHING RETURNING, and higher confidence /
+        missing source links merged into existing rows with one UPDATE.
+        Returns {concept_identity(...): concept id}.
+        """
+        if not tenant_id:
+            raise ValueError("tenant_id is REQUIRED for bulk_get_or_create()")
+
+        # Merge repeats the way successive get_or_create() calls would:
+        # first name/description wins, highest confidence, first source links
+        wanted: Dict[tuple, Dict] = {}
+        for concept in concepts:
+            name = (concept.get("name") or "").strip()
+            if not name:
+                continue
+            source_type = concept.get("source_type") or "document"
+            key = concept_identity(name, concept["concept_type"], source_type, concept.get("initiative_id"))
+            row = wanted.get(key)
+            if row is None:
+                wanted[key] = {
+                    "name": name,
+                    "concept_type": concept["concept_type"],
+                    "description": concept.get("description"),
+                    "confidence_score": concept.get("confidence_score"),
+                    "source_type": source_type,
+                    "tenant_id": tenant_id,
+                    "initiative_id": key[3],
+                    "source_component_id": concept.get("source_component_id"),
+                    "source_document_id": concept.get("source_document_id"),
+                }
+                continue
+            score = concept.get("confidence_score")
+            if score and (row["confidence_score"] is None or score > row["confidence_score"]):
+                row["confidence_score"] = score
+            for link in ("source_component_id", "source_document_id"):
+                row[link] = row[link] or concept.get(link)
+
+        if not wanted:
+            return {}
+
+        existing = self._select_by_identity(db, list(wanted), tenant_id, chunk_size)
+        missing = [key for key in wanted if key not in existing]
+        ids = {key: row.id for key, row in existing.items()}
+
+        if missing:
+            for start in range(0, len(missing), chunk_size):
+                chunk = [wanted[key] for key in missing[start:start + chunk_size]]
+                for row in db.execute(self._insert_new(db, chunk)):
+                    ids[concept_identity(row.name, row.concept_type, row.source_type, row.initiative_id)] = row.id
+            # Lost an insert race to a concurrent writer: those rows exist now
+            raced = [key for key in missing if key not in ids]
+            if raced:
+                existing.update(self._select_by_identity(db, raced, tenant_id, chunk_size))
+                ids.update({key: existing[key].id for key in raced if key in existing})
+
+        self._merge_into_existing(db, existing, wanted, tenant_id, chunk_size)
+
+        if commit:
+            db.commit()
+        return ids
+
+    def _select_by_identity(self, db: Session, keys: List[tuple], tenant_id: int, chunk_size: int) -> Dict:
+        """Existing rows for identity keys (lowest id wins if legacy duplicates exist)."""
+        model = self.model
+        identity = tuple_(*_identity_columns(model)[1:])
+        found = {}
+        for start in range(0, len(keys), chunk_size):
+            chunk = [(name, ctype, stype, initiative or 0) for name, ctype, stype, initiative in keys[start:start + chunk_size]]
+            rows = db.execute(
+                select(
+                    model.id, model.name, model.concept_type, model.source_type, model.initiative_id,
+                    model.confidence_score, model.source_component_id, model.source_document_id,
+                )
+                .where(model.tenant_id == tenant_id, identity.in_(chunk))
+                .order_by(model.id)
+            ).all()
+            for row in rows:
+                found.setdefault(concept_identity(row.name, row.concept_type, row.source_type, row.initiative_id), row)
+        return found
+
+    def _insert_new(self, db: Session, rows: List[Dict]):
+        """Multi-row INSERT returning the new rows; skips conflicts when the identity index exists."""
+        model = self.model
+        dialect = db.get_bind().dialect.name
+        stmt = (pg_insert if dialect == "postgresql" else sqlite_insert)(model).values(rows)
+        if self._identity_index_ready(db, dialect):
+            stmt = stmt.on_conflict_do_nothing(
+                index_elements=_identity_columns(model), index_where=model.source_type != "both",
+            )
+        return stmt.returning(model.id, model.name, model.concept_type, model.source_type, model.initiative_id)
+
+    @staticmethod
+    def _identity_index_ready(db: Session, dialect: str) -> bool:
+        # PostgreSQL before migration s9i1 has no index to resolve ON CONFLICT
+        # against; other dialects get their schema from the models, which declare it
+        if dialect != "postgresql":
+            return True
+        from app.db.capabilities import db_capabilities
+        return IDENTITY_INDEX in db_capabilities.get(db).index_methods.get("ontology_concepts", {})
+
+    def _merge_into_existing(
+        self, db: Session, existing: Dict, wanted: Dict[tuple, Dict], tenant_id: int, chunk_size: int,
+    ) -> None:
+        """One UPDATE per chunk: raise confidence, backfill unset source links."""
+        model = self.model
+        changes = []
+        for key, row in existing.items():
+            new = wanted.get(key)
+            if not new:
+                continue
+            change = {"id": row.id}
+            if new["confidence_score"] and (row.confidence_score is None or new["confidence_score"] > row.confidence_score):
+                change["confidence_score"] = new["confidence_score"]
+            for link in ("source_component_id", "source_document_id"):
+                if new[link] and not getattr(row, link):
+                    change[link] = new[link]
+            if len(change) > 1:
+                changes.append(change)
+
+        for start in range(0, len(changes), chunk_size):
+            chunk = changes[start:start + chunk_size]
+
+            def new_value(field):
+                whens = {c["id"]: c[field] for c in chunk if field in c}
+                return case(whens, value=model.id, else_=None) if whens else null()
+
+            confidence = new_value("confidence_score")
+            values = {
+                # Conditions are re-checked in SQL so a concurrent write is never lowered
+                "confidence_score": case(
+                    (and_(confidence.is_not(None),
+                          or_(model.confidence_score.is_(None), model.confidence_score < confidence)),
+                     confidence),
+                    else_=model.confidence_score,
+                ),
+                "source_component_id": func.coalesce(model.source_component_id, new_value("source_component_id")),
+                "source_document_id": func.coalesce(model.source_document_id, new_value("source_document_id")),
+            }
+            db.query(model).filter(
+                model.tenant_id == tenant_id, model.id.in_([c["id"] for c in chunk])
+            ).update(
+                values, synchronize_session=False
+            )
+
     def promote_to_both(
         self, db: Session, *, concept_id: int, tenant_id: int
     ) -> Optional[OntologyConcept]:
@@ -105,11 +276,35 @@ class CRUDOntologyConcept(CRUDBase[OntologyConcept, OntologyConceptCreate, Ontol
             db.refresh(concept)
         return concept
 
+    def promote_many_to_both(
+        self, db: Session, *, concept_ids: List[int], tenant_id: int,
+        commit: bool = True, chunk_size: int = 5000
+    ) -> int:
+        """
+        Set-based promote_to_both(): one UPDATE per chunk of ids instead of a
+        SELECT + UPDATE per concept. Returns the number of concepts changed.
+        """
+        if not tenant_id:
+            raise ValueError("tenant_id is REQUIRED for promote_many_to_both()")
+
+        ids = sorted(set(concept_ids))
+        updated = 0
+        for start in range(0, len(ids), chunk_size):
+            updated += db.query(self.model).filter(
+                self.model.tenant_id == tenant_id,
+                self.model.id.in_(ids[start:start + chunk_size]),
+                self.model.source_type != "both",
+            ).update({"source_type": "both"}, synchronize_session=False)
+
+        if commit:
+            db.commit()
+        return updated
+
     def get_by_source_type(
         self, db: Session, *, source_type: str, tenant_id: int,
-        skip: int = 0, limit: int = 100
+        skip: int = 0, limit: Optional[int] = 100
     ) -> List[OntologyConcept]:
-        """Get concepts filtered by source_type (document, code, both)."""
+        """Get concepts filtered by source_type (document, code, both). limit=None returns all."""
         if not tenant_id:
             raise ValueError("tenant_id is REQUIRED for get_by_source_type()")
 
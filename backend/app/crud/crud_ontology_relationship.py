@@ -1,12 +1,17 @@
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, case, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 
 from app.crud.base import CRUDBase
 from app.models.ontology_relationship import OntologyRelationship
 from app.models.ontology_concept import OntologyConcept
 from app.schemas.ontology import OntologyRelationshipCreate, OntologyRelationshipUpdate
 
+IDENTITY_INDEX = "uq_ontology_relationships_identity"
+
 
 class CRUDOntologyRelationship(CRUDBase[OntologyRelationship, OntologyRelationshipCreate, OntologyRelationshipUpdate]):
 
@@ -44,11 +49,124 @@ class CRUDOntologyRelationship(CRUDBase[OntologyRelationship, OntologyRelationsh
             confidence_score=confidence_score,
             tenant_id=tenant_id
         )
-        db.add(db_obj)
+        try:
+            with db.begin_nested():
+                db.add(db_obj)
+        except IntegrityError:
+            # A concurrent writer inserted the same edge first (uq_ontology_relationships_identity)
+            existing = db.query(self.model).filter(
+                self.model.source_concept_id == source_concept_id,
+                self.model.target_concept_id == target_concept_id,
+                self.model.relationship_type == relationship_type,
+                self.model.tenant_id == tenant_id
+            ).first()
+            if existing is None:
+                raise
+            db.commit()
+            return existing
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def bulk_create_if_not_exists(
+        self, db: Session, *, relationships: Iterable[Dict], tenant_id: int,
+        commit: bool = True, chunk_size: int = 500,
+    ) -> int:
+        """
+        Set-based create_if_not_exists() for many edges. Each dict has
+        source_concept_id, target_concept_id, relationship_type and optionally
+        description / confidence_score.
+
+        Existing edges are found with one SELECT per chunk, new ones written
+        with one multi-row INSERT (skipping edges a concurrent writer just
+        inserted), and higher confidence scores raised with one UPDATE.
+        Self-edges are skipped. Returns the number of edges written.
+        """
+        if not tenant_id:
+            raise ValueError("tenant_id is REQUIRED for bulk_create_if_not_exists()")
+
+        model = self.model
+        wanted: Dict[tuple, Dict] = {}
+        for rel in relationships:
+            key = (rel["source_concept_id"], rel["target_concept_id"], rel["relationship_type"])
+            if key[0] == key[1]:
+                continue
+            row = wanted.get(key)
+            if row is None:
+                wanted[key] = {
+                    "source_concept_id": key[0],
+                    "target_concept_id": key[1],
+                    "relationship_type": key[2],
+                    "description": rel.get("description"),
+                    "confidence_score": rel.get("confidence_score"),
+                    "tenant_id": tenant_id,
+                }
+            elif rel.get("confidence_score") and (
+                row["confidence_score"] is None or rel["confidence_score"] > row["confidence_score"]
+            ):
+                row["confidence_score"] = rel["confidence_score"]
+
+        if not wanted:
+            return 0
+
+        identity = tuple_(model.source_concept_id, model.target_concept_id, model.relationship_type)
+        keys = list(wanted)
+        existing: Dict[tuple, tuple] = {}
+        for start in range(0, len(keys), chunk_size):
+            rows = db.execute(
+                select(model.id, model.source_concept_id, model.target_concept_id,
+                       model.relationship_type, model.confidence_score)
+                .where(model.tenant_id == tenant_id, identity.in_(keys[start:start + chunk_size]))
+            ).all()
+            for row in rows:
+                existing.setdefault((row.source_concept_id, row.target_concept_id, row.relationship_type), row)
+
+        new = [wanted[key] for key in keys if key not in existing]
+        if new:
+            stmt = self._insert_stmt(db)
+            for start in range(0, len(new), chunk_size):
+                db.execute(stmt, new[start:start + chunk_size])
+
+        raises = {
+            row.id: wanted[key]["confidence_score"]
+            for key, row in existing.items()
+            if wanted[key]["confidence_score"]
+            and (row.confidence_score is None or wanted[key]["confidence_score"] > row.confidence_score)
+        }
+        ids = list(raises)
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            confidence = case({i: raises[i] for i in chunk}, value=model.id)
+            db.query(model).filter(
+                model.tenant_id == tenant_id,
+                model.id.in_(chunk),
+                or_(model.confidence_score.is_(None), model.confidence_score < confidence),
+            ).update({"confidence_score": confidence}, synchronize_session=False)
+
+        if commit:
+            db.commit()
+        return len(new)
+
+    def _insert_stmt(self, db: Session):
+        """Executemany INSERT (rows stay visible to write tracking); skips conflicts when the identity index exists."""
+        model = self.model
+        dialect = db.get_bind().dialect.name
+        stmt = (pg_insert if dialect == "postgresql" else sqlite_insert)(model)
+        if self._identity_index_ready(db, dialect):
+            stmt = stmt.on_conflict_do_nothing(index_elements=[
+                model.tenant_id, model.source_concept_id, model.target_concept_id, model.relationship_type,
+            ])
+        return stmt
+
+    @staticmethod
+    def _identity_index_ready(db: Session, dialect: str) -> bool:
+        # PostgreSQL before migration s9l1 has no index to resolve ON CONFLICT
+        # against; other dialects get their schema from the models, which declare it
+        if dialect != "postgresql":
+            return True
+        from app.db.capabilities import db_capabilities
+        return IDENTITY_INDEX in db_capabilities.get(db).index_methods.get("ontology_relationships", {})
+
     def get_by_concept(
         self, db: Session, *, concept_id: int, tenant_id: int
     ) -> List[OntologyRelationship]:
@@ -0,0 +1,149 @@
+"""
+Database capability registry.
+
+Search and embedding code needs to know what the connected database can do:
+is pgvector installed, are the embedding columns real `vector` columns (the
+pgvector migration falls back to JSON without it), which index access
+methods (hnsw, ivfflat, gin) exist per table. Querying the catalog for that
+on every search or embedding write costs a round trip each time.
+
+The registry probes the catalog once per engine, on its own connection (a
+failed probe never aborts the caller's transaction), and serves the result
+from memory. Call refresh() after migrations or extension changes; the API
+probes on startup and admins can refresh via POST /search/capabilities/refresh.
+"""
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.logging import get_logger
+
+logger = get_logger("database")
+
+# Failed probes (database down, missing catalog access) are retried after this
+PROBE_RETRY_SECONDS = 60.0
+
+VECTOR_TABLES = ("ontology_concepts", "knowledge_graph_versions")
+
+
+@dataclass
+class DatabaseCapabilities:
+    """Snapshot of one database's extensions, column types and index methods."""
+    dialect: str = "unknown"
+    extensions: Dict[str, str] = field(default_factory=dict)       # extname -> version
+    column_types: Dict[str, str] = field(default_factory=dict)     # "table.column" -> udt name
+    index_methods: Dict[str, Dict[str, str]] = field(default_factory=dict)  # table -> index -> method
+    probed_at: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def pgvector(self) -> bool:
+        return "vector" in self.extensions
+
+    @property
+    def pg_trgm(self) -> bool:
+        return "pg_trgm" in self.extensions
+
+    def vector_column(self, table: str, column: str = "embedding") -> bool:
+        """True when `table.column` is a pgvector column (not the JSON fallback)."""
+        return self.pgvector and self.column_types.get(f"{table}.{column}") == "vector"
+
+    def has_index(self, table: str, method: str) -> bool:
+        return method in self.index_methods.get(table, {}).values()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "dialect": self.dialect,
+            "extensions": self.extensions,
+            "pgvector": self.pgvector,
+            "pg_trgm": self.pg_trgm,
+            "vector_columns": {table: self.vector_column(table) for table in VECTOR_TABLES},
+            "index_methods": self.index_methods,
+            "probed_at": self.probed_at,
+            "error": self.error,
+        }
+
+
+def _probe(engine) -> DatabaseCapabilities:
+    caps = DatabaseCapabilities(dialect=engine.dialect.name, probed_at=time.time())
+    if caps.dialect != "postgresql":
+        return caps
+
+    try:
+        with engine.connect() as conn:
+            caps.extensions = {
+                row[0]: row[1]
+                for row in conn.execute(text("SELECT extname, extversion FROM pg_extension"))
+            }
+            caps.column_types = {
+                f"{row[0]}.{row[1]}": row[2]
+                for row in conn.execute(text(
+                    "SELECT table_name, column_name, udt_name FROM information_schema.columns "
+                    "WHERE table_schema = current_schema()"
+                ))
+            }
+            for table, index, method in conn.execute(text(
+                "SELECT t.relname, i.relname, am.amname "
+                "FROM pg_index x "
+                "JOIN pg_class i ON i.oid = x.indexrelid "
+                "JOIN pg_class t ON t.oid = x.indrelid "
+                "JOIN pg_am am ON am.oid = i.relam "
+                "JOIN pg_namespace n ON n.oid = t.relnamespace "
+                "WHERE n.nspname = current_schema()"
+            )):
+                caps.index_methods.setdefault(table, {})[index] = method
+    except Exception as e:
+        logger.warning(f"Database capability probe failed: {e}")
+        caps.error = str(e)
+    return caps
+
+
+class CapabilityRegistry:
+    """Per-engine cache of DatabaseCapabilities (see module docstring)."""
+
+    def __init__(self):
+        self._by_engine: "weakref.WeakKeyDictionary[Any, DatabaseCapabilities]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _engine(bind):
+        # Session -> Engine; Engine / Connection pass through
+        if not isinstance(bind, (Engine, Connection)):
+            bind = bind.get_bind()
+        return bind.engine
+
+    def get(self, bind) -> DatabaseCapabilities:
+        """Capabilities of the database behind `bind` (a Session, Connection or Engine)."""
+        engine = self._engine(bind)
+        caps = self._by_engine.get(engine)
+        if caps is not None and not (caps.error and time.time() - caps.probed_at > PROBE_RETRY_SECONDS):
+            return caps
+
+        with self._lock:
+            caps = self._by_engine.get(engine)
+            if caps is None or (caps.error and time.time() - caps.probed_at > PROBE_RETRY_SECONDS):
+                caps = _probe(engine)
+                self._by_engine[engine] = caps
+                logger.info(
+                    f"Database capabilities: pgvector={caps.pgvector}, pg_trgm={caps.pg_trgm}, "
+                    f"vector columns={[t for t in VECTOR_TABLES if caps.vector_column(t)]}"
+                )
+            return caps
+
+    def refresh(self, bind=None) -> Optional[DatabaseCapabilities]:
+        """Drop cached probes (all engines, or just `bind`'s) and re-probe `bind` if given."""
+        with self._lock:
+            if bind is None:
+                self._by_engine.clear()
+            else:
+                self._by_engine.pop(self._engine(bind), None)
+        return self.get(bind) if bind is not None else None
+
+
+# Global capability registry
+db_capabilities = CapabilityRegistry()
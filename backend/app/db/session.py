@@ -1,4 +1,9 @@
-from typing import Generator, Optional
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Generator, Optional, TypeVar
 from contextlib import contextmanager
 from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, Session
@@ -10,6 +15,8 @@ from app.core.logging import get_logger
 
 logger = get_logger("database")
 
+T = TypeVar("T")
+
 # Enhanced database engine with connection pooling and monitoring
 engine = create_engine(
     settings.DATABASE_URL,
@@ -31,6 +38,14 @@ SessionLocal = sessionmaker(
     expire_on_commit=False,  # Keep objects accessible after commit
 )
 
+# Graph writes invalidate the tenant's cached graph views once they commit
+from app.services.graph_snapshot_service import track_graph_writes  # noqa: E402
+track_graph_writes(SessionLocal)
+
+# ...and keep the in-memory relationship indexes current
+from app.services.graph_index_service import track_adjacency_writes  # noqa: E402
+track_adjacency_writes(SessionLocal)
+
 # Database health check and monitoring
 @event.listens_for(engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
@@ -91,6 +106,38 @@ def get_db_context() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+_db_executor: Optional[ThreadPoolExecutor] = None
+_db_executor_lock = threading.Lock()
+
+
+def _get_db_executor() -> ThreadPoolExecutor:
+    global _db_executor
+    if _db_executor is None:
+        with _db_executor_lock:
+            if _db_executor is None:
+                _db_executor = ThreadPoolExecutor(
+                    max_workers=settings.DB_OFFLOAD_WORKERS, thread_name_prefix="db-offload",
+                )
+    return _db_executor
+
+
+async def run_db(fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run blocking database work from an async endpoint on the DB threadpool.
+
+    Sessions are synchronous: calling crud helpers or db.commit() directly
+    inside `async def` blocks the event loop and stalls every other request
+    on the worker. Awaiting run_db(fn, db, ...) keeps the loop free while the
+    queries run. Await each call before the next one that touches the same
+    Session — a Session must never be used from two threads at once.
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _get_db_executor(), functools.partial(ctx.run, fn, *args, **kwargs),
+    )
+
+
 def check_database_health() -> bool:
     """
     Check if the database is accessible and healthy.
@@ -181,4 +228,4 @@ def init_database():
         return False
 
 # Export the main dependency
-__all__ = ["get_db", "get_db_context", "check_database_health", "get_database_info", "init_database", "close_database_connections"]
+__all__ = ["get_db", "get_db_context", "run_db", "check_database_health", "get_database_info", "init_database", "close_database_connections"]
@@ -48,6 +48,10 @@ class CodeComponent(Base):
     # Hash of previous structured_analysis — used to detect whether re-analysis is needed
     previous_analysis_hash: Mapped[str] = mapped_column(String(64), nullable=True)
 
+    # Git blob SHA of the file content last analyzed — lets delta re-analysis
+    # skip files whose blob is unchanged without refetching them
+    blob_sha: Mapped[str] = mapped_column(String(40), nullable=True)
+
     # The status of the background analysis job.
     analysis_status: Mapped[str] = mapped_column(String, default="pending", index=True, nullable=False)
 
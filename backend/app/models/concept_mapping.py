@@ -15,7 +15,7 @@ Status Flow:
   candidate → rejected  (by AI or human)
 """
 
-from sqlalchemy import Integer, String, Text, DateTime, Float, ForeignKey
+from sqlalchemy import Integer, String, Text, DateTime, Float, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from typing import Optional
@@ -24,6 +24,13 @@ from app.db.base_class import Base
 
 class ConceptMapping(Base):
     __tablename__ = "concept_mappings"
+    __table_args__ = (
+        # One mapping per doc+code pair per tenant (created in s3a2)
+        UniqueConstraint(
+            "tenant_id", "document_concept_id", "code_concept_id",
+            name="uq_concept_mapping_pair",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     tenant_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
@@ -4,7 +4,7 @@ Sprint 7: Enables natural-language Q&A over documents, code, and knowledge graph
 """
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Integer, String, DateTime, ForeignKey, Text, JSON, Numeric
+from sqlalchemy import Integer, String, DateTime, ForeignKey, Text, JSON, Numeric, Boolean
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base_class import Base
@@ -35,6 +35,11 @@ class Conversation(Base):
     # Model selection (Task 6): "gemini" (default) | "claude" | "auto"
     model_preference: Mapped[str] = mapped_column(String(50), nullable=False, default="gemini")
 
+    # Semantic answer cache opt-out (answers may be served from / stored to the tenant cache)
+    answer_cache_enabled: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=True, server_default="true"
+    )
+
     # Aggregate stats
     message_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     total_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -2,8 +2,9 @@
 Knowledge Graph Version Model
 
 Stores pre-built graph snapshots for fast rendering and versioning.
-Each version captures the full graph (nodes + edges) for a source entity
-(code component or document) at a point in time.
+Each version captures the graph (nodes + edges) for a source entity
+(code component or document) at a point in time — in full for the current
+version and periodic snapshots, as a structural delta otherwise.
 
 Enables:
 - Fast graph loading (~50ms from pre-built JSON vs ~500ms from DB rebuild)
@@ -35,12 +36,17 @@ class KnowledgeGraphVersion(Base):
     is_current: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False, index=True)
 
     # Pre-built graph data: { nodes: [...], edges: [...], metadata: {...} }
-    graph_data: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    # Kept on the current version and on snapshots; other versions are
+    # rebuilt from the nearest snapshot plus deltas
+    graph_data: Mapped[dict] = mapped_column(JSONB, nullable=True)
+    is_snapshot: Mapped[bool] = mapped_column(Boolean, default=True, server_default="true", nullable=False)
 
-    # SHA256 hash of graph_data for fast change detection
+    # Merkle-style hash over per-node / per-edge hashes for fast change detection
     graph_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    # Leaf hashes { nodes: {key: hash}, edges: {key: hash}, metadata } — current version only
+    graph_hashes: Mapped[dict] = mapped_column(JSONB, nullable=True)
 
-    # Delta from previous version: { added_nodes, removed_nodes, added_edges, removed_edges, summary }
+    # Delta from previous version: { added_*, removed_*, changed_* (nodes/edges), metadata, summary, format }
     graph_delta: Mapped[dict] = mapped_column(JSONB, nullable=True)
 
     created_at: Mapped[DateTime] = mapped_column(
@@ -5,7 +5,7 @@ Represents a concept in the business ontology (e.g., "User Authentication", "Pay
 These are the nodes in the knowledge graph.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
@@ -13,6 +13,20 @@ from app.db.base_class import Base
 
 class OntologyConcept(Base):
     __tablename__ = "ontology_concepts"
+    __table_args__ = (
+        # One concept per name (case-insensitive) + type + source layer + project
+        # (created in s9i1). Bulk ingestion upserts against it. Mapped 'both'
+        # rows are left out so a doc concept and its code twin can both be
+        # promoted in place.
+        Index(
+            "uq_ontology_concepts_identity",
+            "tenant_id", text("lower(name)"), "concept_type", "source_type",
+            text("coalesce(initiative_id, 0)"),
+            unique=True,
+            postgresql_where=text("source_type <> 'both'"),
+            sqlite_where=text("source_type <> 'both'"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     tenant_id: Mapped[int] = mapped_column(Integer, default=1, nullable=False, index=True)  # Multi-tenancy support
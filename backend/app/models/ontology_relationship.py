@@ -5,7 +5,7 @@ Represents relationships between concepts in the business ontology (e.g., "User
 These are the edges in the knowledge graph.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
@@ -13,6 +13,18 @@ from app.db.base_class import Base
 
 class OntologyRelationship(Base):
     __tablename__ = "ontology_relationships"
+    __table_args__ = (
+        # Neighborhood expansion follows edges from a concept in either direction
+        Index("ix_ontology_relationships_tenant_source", "tenant_id", "source_concept_id"),
+        Index("ix_ontology_relationships_tenant_target", "tenant_id", "target_concept_id"),
+        # One edge per source + target + type (created in s9l1); the graph
+        # index treats edges as a set and relies on it
+        Index(
+            "uq_ontology_relationships_identity",
+            "tenant_id", "source_concept_id", "target_concept_id", "relationship_type",
+            unique=True,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     tenant_id: Mapped[int] = mapped_column(Integer, default=1, nullable=False, index=True)  # Multi-tenancy support
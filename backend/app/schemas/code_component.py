@@ -17,7 +17,7 @@ class CodeComponentBase(BaseModel):
 # Defines the properties required to create a new component.
 # This is what the API will expect in the request body on a POST.
 class CodeComponentCreate(CodeComponentBase):
-    pass
+    blob_sha: Optional[str] = None
 
 # --- Update Schema ---
 # Defines the properties that can be updated. All are optional.
@@ -48,6 +48,7 @@ class CodeComponentInDBBase(CodeComponentBase):
 
     # Link to parent repository (nullable for standalone file components)
     repository_id: Optional[int] = None
+    blob_sha: Optional[str] = None
 
     # Cost tracking fields
     ai_cost_inr: Optional[float] = None
@@ -25,6 +25,7 @@ class ConversationCreate(BaseModel):
     context_type: str = "general"  # "general" | "document" | "repository" | "initiative"
     context_id: Optional[int] = None
     model_preference: str = "gemini"  # "gemini" | "claude" | "auto"
+    answer_cache_enabled: bool = True
 
 
 class ModelPreferenceUpdate(BaseModel):
@@ -32,6 +33,11 @@ class ModelPreferenceUpdate(BaseModel):
     model_preference: str = Field(..., pattern="^(gemini|claude|auto)$")
 
 
+class AnswerCacheUpdate(BaseModel):
+    """Opt a conversation in or out of the semantic answer cache."""
+    enabled: bool
+
+
 class ConversationResponse(BaseModel):
     """Conversation in API responses."""
     id: int
@@ -41,6 +47,7 @@ class ConversationResponse(BaseModel):
     context_type: str
     context_id: Optional[int] = None
     model_preference: str = "gemini"
+    answer_cache_enabled: bool = True
     message_count: int
     total_tokens: int
     total_cost_usd: float
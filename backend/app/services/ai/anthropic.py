@@ -14,23 +14,32 @@ Cost: Claude Sonnet 4.5 pricing (per 1M tokens):
   - Output: $15.00
 """
 
+import asyncio
 import json
-from typing import Optional, Dict, Any
+import weakref
+from typing import Optional, Dict, Any, AsyncIterator
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from app.core.config import settings
 from app.core.logging import LoggerMixin
 from app.services.ai.prompt_manager import prompt_manager, PromptType
+from app.services.ai.rate_governor import rate_governor, estimate_tokens
 
 
 class AnthropicService(LoggerMixin):
     """
     Service for interacting with Anthropic's Claude API.
     Provides code analysis capabilities with retry logic and cost tracking.
+
+    Uses anthropic.AsyncAnthropic so a Claude request never blocks the event
+    loop it runs on (the shared Celery AI loop or FastAPI's) — Gemini calls
+    and other coroutines keep running while Claude is in flight. The client
+    keeps a pooled HTTP connection per event loop.
     """
 
     def __init__(self):
         super().__init__()
+        self._loop_clients = weakref.WeakKeyDictionary()
 
         if not settings.ANTHROPIC_API_KEY:
             self.logger.warning(
@@ -43,7 +52,8 @@ class AnthropicService(LoggerMixin):
 
         try:
             import anthropic
-            self.client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+            self._anthropic = anthropic
+            self.client = self._new_client()
             self.model = settings.ANTHROPIC_MODEL
             self.max_tokens = settings.ANTHROPIC_MAX_TOKENS
             self.available = True
@@ -61,14 +71,36 @@ class AnthropicService(LoggerMixin):
             self.client = None
             self.available = False
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-    )
-    async def generate_content(self, prompt: str, system: str = None) -> Dict[str, Any]:
+    def _new_client(self):
+        # Retries are handled by tenacity below; the SDK must not retry on top of that
+        return self._anthropic.AsyncAnthropic(
+            api_key=settings.ANTHROPIC_API_KEY,
+            timeout=float(settings.ANTHROPIC_TIMEOUT),
+            max_retries=0,
+        )
+
+    def _get_client(self):
+        """Async HTTP pools are bound to an event loop — one client per loop."""
+        loop = asyncio.get_running_loop()
+        client = self._loop_clients.get(loop)
+        if client is None:
+            client = self.client if not self._loop_clients else self._new_client()
+            self._loop_clients[loop] = client
+        return client
+
+    async def generate_content(
+        self, prompt: str, system: str = None, timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
         """
         Generate content using Claude API.
 
+        Args:
+            prompt: User message
+            system: Optional system prompt
+            timeout: Per-call timeout in seconds (default ANTHROPIC_TIMEOUT)
+
+        Cancelling the awaiting task aborts the in-flight HTTP request.
+
         Returns a dict with:
           - text: The response text
           - input_tokens: Number of input tokens consumed
@@ -76,22 +108,25 @@ class AnthropicService(LoggerMixin):
         """
         if not self.available:
             raise RuntimeError("AnthropicService not available (missing API key or anthropic package)")
+        return await self._generate_with_retry(prompt, system, timeout)
 
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+    )
+    async def _generate_with_retry(
+        self, prompt: str, system: Optional[str], timeout: Optional[float],
+    ) -> Dict[str, Any]:
         prompt_length = len(prompt)
         self.logger.info(f"CLAUDE API CALL - Prompt length: {prompt_length} chars")
 
-        messages = [{"role": "user", "content": prompt}]
-
-        kwargs = {
-            "model": self.model,
-            "max_tokens": self.max_tokens,
-            "messages": messages,
-        }
-        if system:
-            kwargs["system"] = system
+        kwargs = self._request_kwargs(prompt, system, timeout)
 
         try:
-            response = self.client.messages.create(**kwargs)
+            await rate_governor.acquire_async(
+                "anthropic", self.model, tokens=estimate_tokens(prompt) + estimate_tokens(system or ""),
+            )
+            response = await self._get_client().messages.create(**kwargs)
 
             response_text = response.content[0].text if response.content else ""
             input_tokens = response.usage.input_tokens
@@ -109,10 +144,68 @@ class AnthropicService(LoggerMixin):
                 "output_tokens": output_tokens,
             }
 
+        except asyncio.CancelledError:
+            self.logger.info("CLAUDE API CALL cancelled")
+            raise
         except Exception as e:
             self.logger.error(f"CLAUDE API ERROR: {e}")
             raise
 
+    def _request_kwargs(
+        self, prompt: str, system: Optional[str], timeout: Optional[float],
+    ) -> Dict[str, Any]:
+        kwargs = {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "messages": [{"role": "user", "content": prompt}],
+            "timeout": float(timeout or settings.ANTHROPIC_TIMEOUT),
+        }
+        if system:
+            kwargs["system"] = system
+        return kwargs
+
+    async def stream_content(
+        self, prompt: str, system: str = None, timeout: Optional[float] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of generate_content.
+
+        Yields {"type": "token", "text": ...} as Claude produces text, then one
+        {"type": "usage", "input_tokens": ..., "output_tokens": ...} event.
+        Not retried: a stream can't be replayed once text reached the caller.
+
+        Closing the generator early closes the HTTP stream, which stops the
+        generation on Anthropic's side.
+        """
+        if not self.available:
+            raise RuntimeError("AnthropicService not available (missing API key or anthropic package)")
+
+        self.logger.info(f"CLAUDE STREAM CALL - Prompt length: {len(prompt)} chars")
+        kwargs = self._request_kwargs(prompt, system, timeout)
+
+        try:
+            await rate_governor.acquire_async(
+                "anthropic", self.model, tokens=estimate_tokens(prompt) + estimate_tokens(system or ""),
+            )
+            async with self._get_client().messages.stream(**kwargs) as stream:
+                async for text in stream.text_stream:
+                    yield {"type": "token", "text": text}
+                message = await stream.get_final_message()
+
+            input_tokens = message.usage.input_tokens
+            output_tokens = message.usage.output_tokens
+            self.logger.info(
+                f"CLAUDE STREAM SUCCESS - Tokens: {input_tokens} input + {output_tokens} output"
+            )
+            yield {"type": "usage", "input_tokens": input_tokens, "output_tokens": output_tokens}
+
+        except asyncio.CancelledError:
+            self.logger.info("CLAUDE STREAM cancelled")
+            raise
+        except Exception as e:
+            self.logger.error(f"CLAUDE STREAM ERROR: {e}")
+            raise
+
     async def call_claude_for_code_analysis(self, code_content: str) -> dict:
         """
         Analyze code using Claude — universal adaptive prompt.
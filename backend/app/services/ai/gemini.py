@@ -2,7 +2,7 @@
 
 import json
 import asyncio
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator
 from enum import Enum
 from dataclasses import dataclass, field
 import google.generativeai as genai
@@ -11,6 +11,7 @@ from tenacity import retry, stop_after_attempt, wait_exponential
 from app.core.config import settings
 from app.core.logging import LoggerMixin
 from app.services.ai.prompt_manager import prompt_manager, PromptType
+from app.services.ai.rate_governor import rate_governor, estimate_tokens
 
 class GeminiService(LoggerMixin):
     """
@@ -89,6 +90,12 @@ class GeminiService(LoggerMixin):
             self.logger.info(f"🤖 GEMINI API CALL - Prompt length: {prompt_length} chars")
             self.logger.debug(f"Prompt preview: {prompt[:200]}...")
 
+            # Shared RPM/TPM budget across all workers (replaces fixed sleeps)
+            await rate_governor.acquire_async(
+                "gemini", settings.GEMINI_MODEL,
+                tokens=estimate_tokens(prompt), tenant_id=tenant_id,
+            )
+
             response = await self.model.generate_content_async(prompt, **kwargs)
 
             # Extract ALL token counts including thinking tokens
@@ -102,8 +109,11 @@ class GeminiService(LoggerMixin):
             )
 
             # CENTRALIZED BILLING: auto-log cost when tenant context is provided
+            # (its own Session + commit, so run it on the DB threadpool)
             if tenant_id and (tokens['input_tokens'] > 0 or tokens['output_tokens'] > 0):
-                self._auto_log_cost(
+                from app.db.session import run_db
+                await run_db(
+                    self._auto_log_cost,
                     tenant_id=tenant_id,
                     user_id=user_id,
                     operation=operation or "gemini_api_call",
@@ -115,6 +125,90 @@ class GeminiService(LoggerMixin):
             self.logger.error(f"❌ GEMINI API ERROR: {e}")
             raise
 
+    async def stream_content(
+        self, prompt: str,
+        *,
+        tenant_id: int = None,
+        user_id: int = None,
+        operation: str = None,
+        **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of generate_content.
+
+        Yields {"type": "token", "text": ...} as chunks arrive, then one
+        {"type": "usage", ...} event with the extract_token_usage() counts.
+        Not retried: a stream can't be replayed once text reached the caller.
+
+        Closing the generator early cancels the underlying gRPC stream. Billing
+        still runs (when tenant_id is given), from estimated counts if the
+        stream never reached its final usage metadata.
+        """
+        self.logger.info(f"🤖 GEMINI STREAM CALL - Prompt length: {len(prompt)} chars")
+
+        await rate_governor.acquire_async(
+            "gemini", settings.GEMINI_MODEL,
+            tokens=estimate_tokens(prompt), tenant_id=tenant_id,
+        )
+
+        response = None
+        streamed: List[str] = []
+        tokens = None
+        try:
+            response = await self.model.generate_content_async(prompt, stream=True, **kwargs)
+            async for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks without parts (e.g. the closing safety chunk)
+                    text = ""
+                if text:
+                    streamed.append(text)
+                    yield {"type": "token", "text": text}
+
+            tokens = self.extract_token_usage(response)
+            self.logger.info(
+                f"✅ GEMINI STREAM SUCCESS - Response: {sum(len(t) for t in streamed)} chars | "
+                f"Tokens: {tokens['input_tokens']} input + {tokens['output_tokens']} output + "
+                f"{tokens['thinking_tokens']} thinking = {tokens['total_tokens']} total"
+            )
+            yield {"type": "usage", **tokens}
+        except Exception as e:
+            self.logger.error(f"❌ GEMINI STREAM ERROR: {e}")
+            raise
+        finally:
+            if tokens is None and response is not None:
+                # Closed early or failed mid-stream: stop generation, bill what was produced
+                self._cancel_stream(response)
+                input_tokens = self.extract_token_usage(response)["input_tokens"] or estimate_tokens(prompt)
+                output_tokens = estimate_tokens("".join(streamed))
+                tokens = {
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                    "thinking_tokens": 0,
+                    "total_tokens": input_tokens + output_tokens,
+                }
+                self.logger.info(f"GEMINI STREAM closed early after {len(streamed)} chunks")
+            # Awaiting is fine here while the generator is being closed (aclose(),
+            # or the loop's finalizer for an abandoned one); only yielding isn't
+            if tenant_id and tokens and (tokens['input_tokens'] > 0 or tokens['output_tokens'] > 0):
+                from app.db.session import run_db
+                await run_db(
+                    self._auto_log_cost,
+                    tenant_id=tenant_id,
+                    user_id=user_id,
+                    operation=operation or "gemini_api_call",
+                    tokens=tokens,
+                )
+
+    @staticmethod
+    def _cancel_stream(response) -> None:
+        """Cancel the gRPC call behind a streaming response that was not read to the end."""
+        call = getattr(response, "_iterator", None)
+        cancel = getattr(call, "cancel", None)
+        if callable(cancel):
+            cancel()
+
     def _auto_log_cost(
         self,
         tenant_id: int,
@@ -197,6 +291,9 @@ class GeminiService(LoggerMixin):
         """
         try:
             self.logger.debug("Sending vision request to Gemini API")
+            await rate_governor.acquire_async(
+                "gemini", settings.GEMINI_VISION_MODEL, tokens=estimate_tokens(prompt),
+            )
             response = await self.vision_model.generate_content_async([prompt, image], **kwargs)
             self.logger.debug("Gemini Vision API response received successfully")
             return response
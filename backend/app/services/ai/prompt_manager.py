@@ -1,5 +1,6 @@
 from typing import Dict, Any, Optional
 from enum import Enum
+import hashlib
 import json
 from pathlib import Path
 
@@ -1404,6 +1405,19 @@ LANGUAGE-SPECIFIC GUIDANCE (TypeScript / Node.js):
         """List all available prompt types."""
         return list(self.prompts.keys())
     
+    def get_prompt_version(self, prompt_type: PromptType) -> str:
+        """
+        Version tag for cache keys: the declared version plus a short digest
+        of the template, so editing a prompt without bumping its version
+        still invalidates results produced by the old wording.
+        """
+        if prompt_type.value not in self.prompts:
+            raise ValueError(f"Unknown prompt type: {prompt_type.value}")
+
+        prompt_data = self.prompts[prompt_type.value]
+        digest = hashlib.sha256(prompt_data["prompt"].encode("utf-8")).hexdigest()[:8]
+        return f"{prompt_data['version']}-{digest}"
+
     def get_prompt_info(self, prompt_type: str) -> Dict[str, Any]:
         """Get information about a specific prompt type."""
         if prompt_type not in self.prompts:
@@ -69,6 +69,16 @@ class ProviderRouter(LoggerMixin):
             "document_provider": "gemini",
         }
 
+    def get_code_model_id(self, markdown: bool = False) -> str:
+        """
+        Provider/model that analyze_code*/analyze_markdown will route to.
+        Used as part of the analysis cache key so switching providers or
+        models never serves results produced by another model.
+        """
+        if self.dual_mode and not markdown:
+            return f"claude:{settings.ANTHROPIC_MODEL}"
+        return f"gemini:{settings.GEMINI_MODEL}"
+
     # ================================================================
     # CODE ANALYSIS ROUTING
     # ================================================================
@@ -0,0 +1,301 @@
+"""
+AI Rate Governor — shared token-bucket throttling for AI providers.
+
+Replaces the fixed time.sleep() throttles that were scattered across the
+analysis pipeline. Every Celery worker (and the API process) reserves
+capacity from the SAME Redis-backed buckets before calling a provider, so
+N workers share the real provider quota instead of each sleeping blindly.
+
+Bucket Key Strategy:
+    ai_ratelimit:{provider}:{model}:rpm            (requests per minute)
+    ai_ratelimit:{provider}:{model}:tpm            (input tokens per minute)
+    ai_ratelimit:{provider}:{model}:tenant:{id}:rpm (optional per-tenant sub-budget)
+
+Reservations are granted immediately and may drive a bucket negative; the
+caller then waits until its reserved slot is due. This queues callers in
+arrival order without polling. If Redis is unavailable the governor falls
+back to an in-process bucket (per worker) — graceful degradation, never a
+hard failure.
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("rate_governor")
+
+# Fraction of a minute's budget that may be spent as an initial burst.
+BURST_FRACTION = 0.25
+
+# Lua: atomically refill and reserve from one or more buckets.
+# KEYS = bucket keys; ARGV = max_wait, then (capacity, refill_per_sec, cost) per key.
+# Returns {granted(0|1), wait_seconds_as_string}.
+# Keys expire a minute after the bucket would have refilled from its current
+# level, so queued (negative) reservations outlive the TTL.
+_RESERVE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local max_wait = tonumber(ARGV[1])
+local wait = 0
+local after = {}
+for i = 1, #KEYS do
+  local capacity = tonumber(ARGV[2 + (i - 1) * 3])
+  local rate = tonumber(ARGV[3 + (i - 1) * 3])
+  local cost = tonumber(ARGV[4 + (i - 1) * 3])
+  if cost > capacity then cost = capacity end
+  local data = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+  local tokens = tonumber(data[1])
+  local ts = tonumber(data[2])
+  if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+  end
+  tokens = math.min(capacity, tokens + (now - ts) * rate) - cost
+  if tokens < 0 and (-tokens / rate) > wait then
+    wait = -tokens / rate
+  end
+  after[i] = {tokens, capacity, rate}
+end
+if wait > max_wait then
+  return {0, tostring(wait)}
+end
+for i = 1, #KEYS do
+  redis.call('HSET', KEYS[i], 'tokens', tostring(after[i][1]), 'ts', tostring(now))
+  local refill = math.ceil((after[i][2] - after[i][1]) / after[i][3])
+  redis.call('EXPIRE', KEYS[i], math.max(60, refill + 60))
+end
+return {1, tostring(wait)}
+"""
+
+
+class AIRateLimitTimeout(RuntimeError):
+    """Raised when the provider queue is longer than the caller is willing to wait."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap input-token estimate (chars/4) used for TPM reservations."""
+    return len(text or "") // 4 + 1
+
+
+class AIRateGovernor:
+    """
+    Token-bucket limiter shared across workers, keyed per provider/model
+    (and optionally per tenant), with RPM and TPM budgets.
+    """
+
+    def __init__(self):
+        self.enabled = settings.AI_RATE_GOVERNOR_ENABLED
+        self._local_buckets: Dict[str, Tuple[float, float]] = {}
+        self._local_lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, float]] = {}
+        self._metrics_lock = threading.Lock()
+        self._script = None
+        try:
+            self.redis_client = redis.from_url(
+                settings.REDIS_URL,
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+            )
+            self.redis_client.ping()
+            self._script = self.redis_client.register_script(_RESERVE_SCRIPT)
+            logger.info("AI rate governor using shared Redis buckets")
+        except RedisError as e:
+            logger.warning(f"AI rate governor falling back to per-process buckets: {e}")
+            self.redis_client = None
+
+    # ------------------------------------------------------------------ #
+    # Budgets
+    # ------------------------------------------------------------------ #
+
+    def get_budget(self, provider: str) -> Tuple[int, int]:
+        """Return (rpm, tpm) for a provider. 0 disables that dimension."""
+        budgets = {
+            "gemini": (settings.GEMINI_RPM, settings.GEMINI_TPM),
+            "gemini-embedding": (settings.GEMINI_EMBEDDING_RPM, 0),
+            "anthropic": (settings.ANTHROPIC_RPM, settings.ANTHROPIC_TPM),
+        }
+        return budgets.get(provider, (0, 0))
+
+    def _build_buckets(
+        self, provider: str, model: str, tokens: int, tenant_id: Optional[int]
+    ) -> List[Tuple[str, float, float, float]]:
+        """Build (key, capacity, refill_per_sec, cost) for every bucket this call draws from."""
+        rpm, tpm = self.get_budget(provider)
+        base = f"ai_ratelimit:{provider}:{model}"
+        buckets = []
+        if rpm > 0:
+            buckets.append((f"{base}:rpm", max(1.0, rpm * BURST_FRACTION), rpm / 60.0, 1.0))
+        if tpm > 0 and tokens > 0:
+            buckets.append((f"{base}:tpm", max(1.0, tpm * BURST_FRACTION), tpm / 60.0, float(tokens)))
+        tenant_rpm = settings.AI_TENANT_RPM
+        if tenant_id and tenant_rpm > 0:
+            buckets.append((
+                f"{base}:tenant:{tenant_id}:rpm",
+                max(1.0, tenant_rpm * BURST_FRACTION), tenant_rpm / 60.0, 1.0,
+            ))
+        return buckets
+
+    # ------------------------------------------------------------------ #
+    # Reservation
+    # ------------------------------------------------------------------ #
+
+    def _reserve_local(self, buckets, max_wait: float) -> Tuple[bool, float]:
+        """In-process equivalent of _RESERVE_SCRIPT."""
+        now = time.monotonic()
+        with self._local_lock:
+            wait = 0.0
+            after = []
+            for key, capacity, rate, cost in buckets:
+                tokens, ts = self._local_buckets.get(key, (capacity, now))
+                tokens = min(capacity, tokens + (now - ts) * rate) - min(cost, capacity)
+                if tokens < 0:
+                    wait = max(wait, -tokens / rate)
+                after.append((key, tokens))
+            if wait > max_wait:
+                return False, wait
+            for key, tokens in after:
+                self._local_buckets[key] = (tokens, now)
+            return True, wait
+
+    def reserve(
+        self, provider: str, model: str, *, tokens: int = 0,
+        tenant_id: Optional[int] = None, max_wait: Optional[float] = None,
+    ) -> float:
+        """
+        Reserve one request (and `tokens` input tokens) and return how long
+        the caller must wait before sending it.
+
+        Raises:
+            AIRateLimitTimeout: if the wait would exceed max_wait seconds.
+        """
+        if not self.enabled:
+            return 0.0
+        buckets = self._build_buckets(provider, model, tokens, tenant_id)
+        if not buckets:
+            return 0.0
+        max_wait = settings.AI_RATE_GOVERNOR_MAX_WAIT if max_wait is None else max_wait
+
+        granted, wait = None, 0.0
+        if self.redis_client and self._script:
+            try:
+                args = [max_wait]
+                for _, capacity, rate, cost in buckets:
+                    args.extend([capacity, rate, cost])
+                result = self._script(keys=[b[0] for b in buckets], args=args)
+                granted, wait = bool(int(result[0])), float(result[1])
+            except RedisError as e:
+                logger.warning(f"Rate governor Redis error, using local bucket: {e}")
+                granted = None
+        if granted is None:
+            granted, wait = self._reserve_local(buckets, max_wait)
+
+        if not granted:
+            raise AIRateLimitTimeout(
+                f"AI rate limit queue for {provider}/{model} is {wait:.1f}s "
+                f"(max {max_wait:.0f}s) — too many requests in flight"
+            )
+        self._record(provider, model, wait, tokens)
+        return wait
+
+    def acquire(
+        self, provider: str, model: str, *, tokens: int = 0,
+        tenant_id: Optional[int] = None, max_wait: Optional[float] = None,
+    ) -> float:
+        """Blocking acquire for synchronous callers. Returns seconds waited."""
+        wait = self.reserve(provider, model, tokens=tokens, tenant_id=tenant_id, max_wait=max_wait)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(
+        self, provider: str, model: str, *, tokens: int = 0,
+        tenant_id: Optional[int] = None, max_wait: Optional[float] = None,
+    ) -> float:
+        """Non-blocking acquire for coroutines — yields the event loop while queued."""
+        wait = self.reserve(provider, model, tokens=tokens, tenant_id=tenant_id, max_wait=max_wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    # ------------------------------------------------------------------ #
+    # Metrics
+    # ------------------------------------------------------------------ #
+
+    def _record(self, provider: str, model: str, wait: float, tokens: int) -> None:
+        label = f"{provider}:{model}"
+        with self._metrics_lock:
+            m = self._metrics.setdefault(label, {
+                "requests": 0, "queued": 0, "tokens_reserved": 0,
+                "wait_seconds_total": 0.0, "wait_seconds_max": 0.0,
+            })
+            m["requests"] += 1
+            m["tokens_reserved"] += tokens
+            if wait > 0:
+                m["queued"] += 1
+                m["wait_seconds_total"] += wait
+                m["wait_seconds_max"] = max(m["wait_seconds_max"], wait)
+
+        if wait > 1.0:
+            logger.info(f"AI rate governor: {label} queued {wait:.1f}s")
+
+        if self.redis_client:
+            try:
+                key = f"ai_ratelimit:metrics:{label}"
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.hincrby(key, "requests", 1)
+                pipe.hincrby(key, "tokens_reserved", tokens)
+                if wait > 0:
+                    pipe.hincrby(key, "queued", 1)
+                    pipe.hincrbyfloat(key, "wait_seconds_total", wait)
+                pipe.execute()
+            except RedisError:
+                pass
+
+    def get_metrics(self) -> dict:
+        """
+        Queue-wait metrics per provider/model.
+
+        Returns:
+            {"local": {...this process...}, "cluster": {...all workers via Redis...}}
+        """
+        def _with_avg(m: dict) -> dict:
+            out = dict(m)
+            out["wait_seconds_avg"] = round(
+                out.get("wait_seconds_total", 0.0) / out["requests"], 3
+            ) if out.get("requests") else 0.0
+            return out
+
+        with self._metrics_lock:
+            local = {label: _with_avg(m) for label, m in self._metrics.items()}
+
+        cluster = {}
+        if self.redis_client:
+            try:
+                prefix = "ai_ratelimit:metrics:"
+                for key in self.redis_client.scan_iter(f"{prefix}*"):
+                    raw = self.redis_client.hgetall(key)
+                    cluster[key[len(prefix):]] = _with_avg({
+                        "requests": int(raw.get("requests", 0)),
+                        "queued": int(raw.get("queued", 0)),
+                        "tokens_reserved": int(raw.get("tokens_reserved", 0)),
+                        "wait_seconds_total": float(raw.get("wait_seconds_total", 0.0)),
+                    })
+            except RedisError as e:
+                logger.warning(f"Rate governor metrics read failed: {e}")
+
+        budgets = {
+            p: dict(zip(("rpm", "tpm"), self.get_budget(p)))
+            for p in ("gemini", "gemini-embedding", "anthropic")
+        }
+        return {"enabled": self.enabled, "budgets": budgets, "local": local, "cluster": cluster}
+
+
+# Global instance
+rate_governor = AIRateGovernor()
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import time
 from typing import List, Dict, Optional
@@ -10,6 +11,7 @@ from app.services.ai.prompt_manager import prompt_manager, PromptType
 from app.services.analysis_run_service import AnalysisRunService
 from app.services.cost_service import cost_service  # ✅ SPRINT 1 PHASE 2 FIX
 from app.services.billing_enforcement_service import billing_enforcement_service, InsufficientBalanceException, MonthlyLimitExceededException  # ✅ SPRINT 2 BILLING FIX
+from app.core.config import settings
 from app.core.logging import LoggerMixin
 from app.core.exceptions import AIAnalysisException, DocumentProcessingException
 from app.models import SegmentStatus, AnalysisResultStatus
@@ -520,8 +522,68 @@ class DocumentAnalysisEngine(LoggerMixin):
             self.logger.error(f"Error in Pass 2: {e}")
             raise DocumentProcessingException("Content segmentation failed", document_id=document_id, details={"error": str(e)})
     
+    @staticmethod
+    def _build_segment_prompt(base_prompt: str, raw_text: str, segment) -> str:
+        """Builds the Pass 3 prompt for one segment with its surrounding context window."""
+        doc_length = len(raw_text)
+
+        # Calculate context boundaries (handle document edges safely)
+        context_start = max(0, segment.start_char_index - SEGMENT_CONTEXT_SIZE)
+        context_end = min(doc_length, segment.end_char_index + SEGMENT_CONTEXT_SIZE)
+
+        # Extract text sections
+        before_context = raw_text[context_start:segment.start_char_index]
+        segment_text = raw_text[segment.start_char_index:segment.end_char_index]
+        after_context = raw_text[segment.end_char_index:context_end]
+
+        # Build enhanced prompt with context markers
+        return f"""{base_prompt}
+
+SEGMENT TYPE: {segment.segment_type}
+
+--- CONTEXT BEFORE (for reference only) ---
+{before_context}
+
+--- PRIMARY SEGMENT TO ANALYZE ---
+{segment_text}
+
+--- CONTEXT AFTER (for reference only) ---
+{after_context}
+
+INSTRUCTIONS: Focus your analysis on the PRIMARY SEGMENT, but use the surrounding context to understand references, dependencies, and relationships."""
+
+    async def _extract_segment(self, segment_id: int, prompt: str, document_id: int, semaphore: asyncio.Semaphore) -> dict:
+        """
+        Runs one Pass 3 extraction. No DB access happens here — results are
+        returned to the caller, which writes them in batches.
+        """
+        async with semaphore:
+            self._increment_api_calls(document_id)
+            try:
+                response = await gemini_service.generate_content(prompt)
+            except Exception as e:
+                return {"segment_id": segment_id, "tokens": None, "data": None, "error": str(e)}
+
+        tokens = gemini_service.extract_token_usage(response)
+        try:
+            structured_data = json.loads(repair_json_response(response.text))
+        except json.JSONDecodeError:
+            # Double repair attempt
+            try:
+                structured_data = json.loads(repair_json_response(repair_json_response(response.text)))
+            except Exception:
+                return {"segment_id": segment_id, "tokens": tokens, "data": None, "error": "Failed to parse JSON"}
+        return {"segment_id": segment_id, "tokens": tokens, "data": structured_data, "error": None}
+
     async def _pass_3_structured_extraction(self, db: Session, document_id: int, tenant_id: int, analysis_run_id: int = None) -> bool:
-        """Pass 3: Performs structured extraction on each document segment."""
+        """
+        Pass 3: Performs structured extraction on each document segment.
+
+        Segments are extracted concurrently (bounded by PASS3_CONCURRENCY);
+        throttling is left to the shared rate governor in the Gemini client.
+        Results, progress and the stop-signal check are batched every
+        PASS3_FLUSH_EVERY completed segments.
+        """
         try:
             run_service = AnalysisRunService() if analysis_run_id else None
             segments = crud.document_segment.get_by_document(db=db, document_id=document_id, tenant_id=tenant_id)
@@ -539,6 +601,10 @@ class DocumentAnalysisEngine(LoggerMixin):
                 document = crud.document.get(db=db, id=document_id, tenant_id=tenant_id)
             else:
                 document = db.query(models.Document).filter(models.Document.id == document_id).first()
+            stop_tenant_id = document.tenant_id if document else tenant_id
+
+            if self._check_stop_signal(db, document_id, stop_tenant_id):
+                return False
 
             # Initialize Pass 3 cost tracking (includes thinking tokens)
             pass_3_cost_inr = 0
@@ -546,102 +612,91 @@ class DocumentAnalysisEngine(LoggerMixin):
             pass_3_output_tokens = 0
             pass_3_thinking_tokens = 0
 
-            for i, segment in enumerate(segments):
-                # --- CRITICAL: Check stop signal inside the loop ---
-                if self._check_stop_signal(db, document_id, document.tenant_id if document else tenant_id):
-                    return False
-                
-                # --- Rate Limit Throttle (Fix for 429 Error) ---
-                # Wait 4 seconds between segments to respect 15 RPM limit
-                time.sleep(4) 
-
-                try:
-                    segment.status = SegmentStatus.PROCESSING
-                    db.commit()
-                    
-                    # Extract segment with surrounding context for better AI understanding
-                    doc_length = len(document.raw_text)
-
-                    # Calculate context boundaries (handle document edges safely)
-                    context_start = max(0, segment.start_char_index - SEGMENT_CONTEXT_SIZE)
-                    context_end = min(doc_length, segment.end_char_index + SEGMENT_CONTEXT_SIZE)
-
-                    # Extract text sections
-                    before_context = document.raw_text[context_start:segment.start_char_index]
-                    segment_text = document.raw_text[segment.start_char_index:segment.end_char_index]
-                    after_context = document.raw_text[segment.end_char_index:context_end]
-
-                    # Build enhanced prompt with context markers
-                    full_prompt = f"""{base_prompt}
-
-SEGMENT TYPE: {segment.segment_type}
-
---- CONTEXT BEFORE (for reference only) ---
-{before_context}
-
---- PRIMARY SEGMENT TO ANALYZE ---
-{segment_text}
-
---- CONTEXT AFTER (for reference only) ---
-{after_context}
-
-INSTRUCTIONS: Focus your analysis on the PRIMARY SEGMENT, but use the surrounding context to understand references, dependencies, and relationships."""
-                    
-                    self.logger.info(f"🤖 Analyzing segment {segment.id} ({i+1}/{len(segments)})")
-                    self._increment_api_calls(document_id)
-
-                    response = await gemini_service.generate_content(full_prompt)
-
-                    # Extract ALL token counts including thinking tokens
-                    tokens = gemini_service.extract_token_usage(response)
-                    cost_data = cost_service.calculate_cost_from_actual_tokens(
-                        input_tokens=tokens['input_tokens'],
-                        output_tokens=tokens['output_tokens'],
-                        thinking_tokens=tokens['thinking_tokens'],
-                    )
-                    pass_3_cost_inr += cost_data['cost_inr']
-                    pass_3_input_tokens += tokens['input_tokens']
-                    pass_3_output_tokens += tokens['output_tokens']
-                    pass_3_thinking_tokens += tokens['thinking_tokens']
-
-                    try:
-                        structured_data = json.loads(repair_json_response(response.text))
-                    except json.JSONDecodeError:
-                        # Double repair attempt
-                        try:
-                            structured_data = json.loads(repair_json_response(repair_json_response(response.text)))
-                        except:
-                            self.logger.error(f"Failed to parse JSON for segment {segment.id}")
-                            continue
-                    
-                    if structured_data:
-                        crud.analysis_result.create_for_document(db=db, obj_in=schemas.AnalysisResultCreate(
+            segments_by_id = {segment.id: segment for segment in segments}
+            for segment in segments:
+                segment.status = SegmentStatus.PROCESSING
+            db.commit()
+
+            semaphore = asyncio.Semaphore(max(1, settings.PASS3_CONCURRENCY))
+            flush_every = max(1, settings.PASS3_FLUSH_EVERY)
+            tasks = [
+                asyncio.ensure_future(self._extract_segment(
+                    segment.id,
+                    self._build_segment_prompt(base_prompt, document.raw_text, segment),
+                    document_id,
+                    semaphore,
+                ))
+                for segment in segments
+            ]
+
+            pending_results: List[schemas.AnalysisResultCreate] = []
+            completed = 0
+            interrupted = None
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    outcome = await next_done
+                    segment = segments_by_id[outcome["segment_id"]]
+                    completed += 1
+
+                    tokens = outcome["tokens"]
+                    if tokens:
+                        cost_data = cost_service.calculate_cost_from_actual_tokens(
+                            input_tokens=tokens['input_tokens'],
+                            output_tokens=tokens['output_tokens'],
+                            thinking_tokens=tokens['thinking_tokens'],
+                        )
+                        pass_3_cost_inr += cost_data['cost_inr']
+                        pass_3_input_tokens += tokens['input_tokens']
+                        pass_3_output_tokens += tokens['output_tokens']
+                        pass_3_thinking_tokens += tokens['thinking_tokens']
+
+                    if outcome["error"]:
+                        self.logger.error(f"Error processing segment {segment.id}: {outcome['error']}")
+                        segment.status = SegmentStatus.FAILED
+                        segment.last_error = outcome["error"]
+                    elif outcome["data"]:
+                        pending_results.append(schemas.AnalysisResultCreate(
                             segment_id=segment.id,
                             document_id=document_id,
-                            structured_data=structured_data,
+                            structured_data=outcome["data"],
                             status=AnalysisResultStatus.SUCCESS
-                        ), tenant_id=tenant_id)
+                        ))
                         segment.status = SegmentStatus.COMPLETED
                     else:
                         segment.status = SegmentStatus.FAILED
                         segment.last_error = "Empty structured data"
-                    
-                    db.commit()
-                    
-                    # Update progress
-                    progress = int(((i + 1) / len(segments)) * 100)
+
+                    if completed % flush_every and completed != len(segments):
+                        continue
+
+                    # --- Batched write, progress update and stop-signal check ---
+                    self._flush_pass_3_results(db, pending_results, tenant_id)
+                    pending_results = []
+
+                    progress = int((completed / len(segments)) * 100)
                     total_progress = 50 + int(progress / 2)
                     crud.document.update(db=db, db_obj=document, obj_in={"progress": total_progress, "status": "pass_3_extraction"})
-                    
+                    self.logger.info(f"🤖 Pass 3 progress: {completed}/{len(segments)} segments")
+
                     if run_service and analysis_run_id:
                         run_service.update_run_progress(db=db, run_id=analysis_run_id)
 
-                except Exception as e:
-                    self.logger.error(f"Error processing segment {segment.id}: {e}")
-                    segment.status = SegmentStatus.FAILED
-                    segment.last_error = str(e)
-                    db.commit()
-                    continue
+                    if completed != len(segments) and self._check_stop_signal(db, document_id, stop_tenant_id):
+                        return False
+            except Exception as e:
+                interrupted = f"Pass 3 interrupted: {e}"
+                raise
+            finally:
+                # Stop signal or unexpected error: don't leave calls running on the shared loop
+                for task in tasks:
+                    task.cancel()
+                # Unfinished segments must not stay PROCESSING: a stop leaves them PENDING,
+                # an error marks them FAILED so retry_failed_segments() picks them up
+                for segment in segments:
+                    if segment.status == SegmentStatus.PROCESSING:
+                        segment.status = SegmentStatus.FAILED if interrupted else SegmentStatus.PENDING
+                        segment.last_error = interrupted
+                self._flush_pass_3_results(db, pending_results, tenant_id)
 
             # Save accumulated Pass 3 costs (includes thinking tokens)
             self._cost_tracker[document_id]['pass_3_extraction'] = {
@@ -657,6 +712,12 @@ INSTRUCTIONS: Focus your analysis on the PRIMARY SEGMENT, but use the surroundin
         except Exception as e:
             self.logger.error(f"Error in Pass 3: {e}")
             raise DocumentProcessingException("Structured extraction failed", document_id=document_id, details={"error": str(e)})
+
+    def _flush_pass_3_results(self, db: Session, results: List[schemas.AnalysisResultCreate], tenant_id: int) -> None:
+        """Writes a batch of Pass 3 results and segment status changes in one commit."""
+        if results:
+            crud.analysis_result.create_many_for_document(db=db, objs_in=results, tenant_id=tenant_id, commit=False)
+        db.commit()
     
     async def _feed_to_business_ontology(self, db: Session, document_id: int) -> bool:
         """
@@ -0,0 +1,291 @@
+"""
+Semantic answer cache for AskyDoc chat.
+
+Users in one tenant often ask the same question in slightly different words
+("what does the billing service do?"). A cache hit skips both the retrieval
+pipeline and the paid model call.
+
+Entries are scoped per tenant and per answer scope: the conversation's
+context (type / id), its model preference and the role prompt from
+RAGService._get_role_instructions. A CXO and a developer get differently
+styled answers, so they never share entries.
+
+Redis keys:
+    answer_cache_epoch:{tenant_id}                   -> freshness epoch (INCR)
+    answer_cache:{tenant_id}:{epoch}:{scope}:ans     -> hash entry_id -> answer JSON
+    answer_cache:{tenant_id}:{epoch}:{scope}:vec     -> hash entry_id -> unit query vector
+    answer_cache:{tenant_id}:{epoch}:{scope}:lru     -> zset entry_id -> last use
+    answer_cache_stats:{tenant_id}                   -> hash hits / misses / stores / saved_cost_usd
+
+The epoch is bumped whenever the tenant's knowledge base changes (document
+or code analysis completes, ontology / mapping runs, a new graph version is
+saved). Answers from older epochs are never read again and age out by TTL.
+
+Lookup tries an exact normalized-query match first (no embedding call),
+then cosine similarity of the query embedding against the scope's vectors.
+Without Redis the cache is simply off.
+"""
+import base64
+import hashlib
+import json
+import operator
+import re
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("answer_cache_service")
+
+# context_summary fields that describe the asking user or this one request,
+# not the answer; they are dropped before an entry is shared with the tenant
+_PER_REQUEST_SUMMARY_KEYS = frozenset({
+    "pending_approval_count", "retrieval_ms", "stage_timings_ms", "timed_out_stages",
+})
+
+
+def _normalize_query(query: str) -> str:
+    return re.sub(r"[^\w\s]", "", re.sub(r"\s+", " ", query.strip().lower())).strip()
+
+
+def _unit(vector: List[float]) -> List[float]:
+    norm = sum(v * v for v in vector) ** 0.5
+    return [v / norm for v in vector] if norm else list(vector)
+
+
+def _encode_vector(vector: List[float]) -> str:
+    return base64.b64encode(array("f", vector).tobytes()).decode("ascii")
+
+
+def _decode_vector(data: str) -> array:
+    vector = array("f")
+    vector.frombytes(base64.b64decode(data))
+    return vector
+
+
+@dataclass
+class AnswerCacheProbe:
+    """Result of one cache lookup; pass it back to store() on a miss."""
+    tenant_id: int
+    namespace: str
+    entry_id: str
+    query: str
+    embedding: Optional[List[float]] = None
+    hit: Optional[Dict[str, Any]] = None
+    similarity: float = 0.0
+
+    def served_result(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        (result, context_summary) for answering from the hit.
+
+        Same keys as RAGService.generate_answer's result; tokens and cost are
+        zero because no model call was made.
+        """
+        cached = self.hit["result"]
+        result = {
+            **cached,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cost_usd": 0.0,
+            "elapsed_seconds": 0,
+        }
+        context_summary = {
+            **self.hit.get("context_summary", {}),
+            "answer_cache": {
+                "hit": True,
+                "similarity": round(self.similarity, 4),
+                "source_query": self.hit.get("query"),
+                "original_model": cached.get("model_used"),
+            },
+        }
+        return result, context_summary
+
+
+class AnswerCacheService:
+    """Tenant-scoped semantic cache of chat answers (see module docstring)."""
+
+    @property
+    def redis(self):
+        from app.services.cache_service import cache_service
+        return cache_service.redis_client
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ANSWER_CACHE_ENABLED and self.redis is not None
+
+    # ------------------------------------------------------------------
+    # Freshness epoch
+    # ------------------------------------------------------------------
+
+    def get_epoch(self, tenant_id: int) -> int:
+        return int(self.redis.get(f"answer_cache_epoch:{tenant_id}") or 0)
+
+    def bump_epoch(self, tenant_id: Optional[int]) -> None:
+        """Invalidate the tenant's cached answers after a knowledge-base change."""
+        if not tenant_id or not self.enabled:
+            return
+        try:
+            self.redis.incr(f"answer_cache_epoch:{tenant_id}")
+        except RedisError as e:
+            logger.warning(f"Answer cache epoch bump failed for tenant {tenant_id}: {e}")
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def scope_key(**parts: Any) -> str:
+        """Stable short hash of everything besides the query that shapes an answer."""
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+    def lookup(self, *, tenant_id: int, query: str, scope: str) -> Optional[AnswerCacheProbe]:
+        """
+        Find a cached answer for `query` in `scope`.
+
+        Returns None when the cache is off or Redis fails, otherwise a probe
+        whose `hit` is set on a match.
+        """
+        if not self.enabled:
+            return None
+
+        normalized = _normalize_query(query)
+        try:
+            epoch = self.get_epoch(tenant_id)
+            probe = AnswerCacheProbe(
+                tenant_id=tenant_id,
+                namespace=f"answer_cache:{tenant_id}:{epoch}:{scope}",
+                entry_id=hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:24],
+                query=query,
+            )
+
+            exact = self.redis.hget(f"{probe.namespace}:ans", probe.entry_id)
+            if exact:
+                return self._record_hit(probe, probe.entry_id, json.loads(exact), 1.0)
+
+            from app.services.embedding_service import embedding_service
+            embedding = embedding_service.generate_query_embedding(query)
+            if embedding:
+                probe.embedding = _unit(embedding)
+                best_id, best_score = self._nearest(probe)
+                if best_id and best_score >= settings.ANSWER_CACHE_SIMILARITY:
+                    entry = self.redis.hget(f"{probe.namespace}:ans", best_id)
+                    if entry:
+                        return self._record_hit(probe, best_id, json.loads(entry), best_score)
+
+            self.redis.hincrby(f"answer_cache_stats:{tenant_id}", "misses", 1)
+            return probe
+        except (RedisError, ValueError, TypeError) as e:
+            logger.warning(f"Answer cache lookup failed (non-fatal): {e}")
+            return None
+
+    def _nearest(self, probe: AnswerCacheProbe) -> Tuple[Optional[str], float]:
+        best_id, best_score = None, 0.0
+        for entry_id, data in self.redis.hgetall(f"{probe.namespace}:vec").items():
+            vector = _decode_vector(data)
+            if len(vector) != len(probe.embedding):
+                continue
+            score = sum(map(operator.mul, probe.embedding, vector))
+            if score > best_score:
+                best_id, best_score = entry_id, score
+        return best_id, best_score
+
+    def _record_hit(
+        self, probe: AnswerCacheProbe, entry_id: str, entry: Dict[str, Any], similarity: float,
+    ) -> AnswerCacheProbe:
+        probe.hit = entry
+        probe.similarity = similarity
+        pipe = self.redis.pipeline()
+        pipe.zadd(f"{probe.namespace}:lru", {entry_id: time.time()})
+        stats_key = f"answer_cache_stats:{probe.tenant_id}"
+        pipe.hincrby(stats_key, "hits", 1)
+        pipe.hincrbyfloat(stats_key, "saved_cost_usd", float(entry["result"].get("cost_usd") or 0))
+        pipe.execute()
+        return probe
+
+    def store(
+        self, probe: Optional[AnswerCacheProbe], *, result: Dict[str, Any], context_summary: Dict[str, Any],
+    ) -> None:
+        """
+        Cache a freshly generated answer for the probe's query and scope.
+
+        Callers only pass finished answers (result["completed"]); per-user
+        and per-request context_summary fields are not stored.
+        """
+        if probe is None or probe.hit or not result.get("answer") or not result.get("model_used"):
+            return
+
+        entry = {
+            "query": probe.query,
+            "result": {
+                key: result.get(key)
+                for key in ("answer", "model_used", "citations", "cost_usd")
+            },
+            "context_summary": {
+                key: value for key, value in context_summary.items()
+                if key not in _PER_REQUEST_SUMMARY_KEYS
+            },
+            "created_at": time.time(),
+        }
+        ttl = settings.ANSWER_CACHE_TTL_SECONDS
+        keys = [f"{probe.namespace}:{suffix}" for suffix in ("ans", "vec", "lru")]
+        try:
+            pipe = self.redis.pipeline()
+            pipe.hset(keys[0], probe.entry_id, json.dumps(entry, default=str))
+            if probe.embedding:
+                pipe.hset(keys[1], probe.entry_id, _encode_vector(probe.embedding))
+            pipe.zadd(keys[2], {probe.entry_id: time.time()})
+            for key in keys:
+                pipe.expire(key, ttl)
+            pipe.hincrby(f"answer_cache_stats:{probe.tenant_id}", "stores", 1)
+            pipe.execute()
+            self._evict(probe.namespace)
+        except (RedisError, TypeError, ValueError) as e:
+            logger.warning(f"Answer cache store failed (non-fatal): {e}")
+
+    def _evict(self, namespace: str) -> None:
+        """Drop least-recently-used entries beyond ANSWER_CACHE_MAX_ENTRIES."""
+        overflow = self.redis.zcard(f"{namespace}:lru") - settings.ANSWER_CACHE_MAX_ENTRIES
+        if overflow <= 0:
+            return
+        stale = self.redis.zrange(f"{namespace}:lru", 0, overflow - 1)
+        if stale:
+            pipe = self.redis.pipeline()
+            pipe.hdel(f"{namespace}:ans", *stale)
+            pipe.hdel(f"{namespace}:vec", *stale)
+            pipe.zrem(f"{namespace}:lru", *stale)
+            pipe.execute()
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self, tenant_id: int) -> Dict[str, Any]:
+        """Hit-rate counters for the tenant's answer cache."""
+        if not self.enabled:
+            return {"enabled": False}
+        try:
+            raw = self.redis.hgetall(f"answer_cache_stats:{tenant_id}")
+            hits, misses = int(raw.get("hits", 0)), int(raw.get("misses", 0))
+            lookups = hits + misses
+            return {
+                "enabled": True,
+                "epoch": self.get_epoch(tenant_id),
+                "hits": hits,
+                "misses": misses,
+                "stores": int(raw.get("stores", 0)),
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "saved_cost_usd": round(float(raw.get("saved_cost_usd", 0)), 6),
+            }
+        except RedisError as e:
+            logger.error(f"Answer cache stats error: {e}")
+            return {"enabled": True, "error": str(e)}
+
+
+# Global answer cache instance
+answer_cache_service = AnswerCacheService()
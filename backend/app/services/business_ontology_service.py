@@ -18,7 +18,6 @@ Architecture:
 """
 
 import json
-import time
 from typing import List, Dict, Optional, Tuple
 from sqlalchemy.orm import Session
 
@@ -112,9 +111,6 @@ class BusinessOntologyService(LoggerMixin):
         prompt = prompt_manager.get_prompt(PromptType.ENTITY_EXTRACTION)
         full_prompt = f"{prompt}\n{json.dumps(combined_data, indent=2)}"
 
-        # Rate limiting: respect Gemini 15 RPM limit
-        time.sleep(4)
-
         try:
             response = await gemini_service.generate_content(full_prompt)
             cleaned = repair_json_response(response.text)
@@ -258,6 +254,8 @@ class BusinessOntologyService(LoggerMixin):
         extracts concepts + relationships directly from the structured fields.
 
         Replaces the old extract_entities_from_analysis() which made a 4th AI call.
+        Concepts and edges are collected in an OntologyIngestBatch and written
+        with set-based upserts in one commit.
         """
         self.logger.info(f"Building document graph for document {document_id} (no AI call)")
 
@@ -271,9 +269,15 @@ class BusinessOntologyService(LoggerMixin):
             db=db, document_id=document_id, tenant_id=tenant_id
         )
 
+        from app.services.ontology_ingest_service import OntologyIngestBatch
+
+        batch = OntologyIngestBatch(
+            tenant_id, "document",
+            initiative_id=initiative_id, source_document_id=document_id,
+        )
         entities_created = 0
         relationships_created = 0
-        concept_map = {}  # lowered name -> OntologyConcept
+        concept_map = {}  # lowered name -> batch key
 
         def _ensure_doc_concept(name: str, concept_type: str, description: str = None,
                                 confidence: float = 0.75):
@@ -284,30 +288,25 @@ class BusinessOntologyService(LoggerMixin):
             key = name.lower()
             if key in concept_map:
                 return concept_map[key]
-            concept = self.get_or_create_concept(
-                db=db, name=name, concept_type=concept_type,
-                tenant_id=tenant_id, description=description[:500] if description else None,
-                confidence_score=confidence, source_type="document",
-                initiative_id=initiative_id, source_document_id=document_id,
+            concept_map[key] = batch.concept(
+                name, concept_type,
+                description=description[:500] if description else None,
+                confidence_score=confidence,
             )
-            concept_map[key] = concept
             entities_created += 1
-            return concept
+            return concept_map[key]
 
         def _ensure_doc_rel(source_name: str, target_name: str, rel_type: str,
                             description: str = None, confidence: float = 0.8):
             nonlocal relationships_created
             src = concept_map.get((source_name or "").strip().lower())
             tgt = concept_map.get((target_name or "").strip().lower())
-            if not src or not tgt or src.id == tgt.id:
-                return
-            self.link_concepts(
-                db=db, source_id=src.id, target_id=tgt.id,
-                relationship_type=rel_type, tenant_id=tenant_id,
+            if batch.relationship(
+                src, tgt, rel_type,
                 description=description[:500] if description else None,
                 confidence_score=confidence,
-            )
-            relationships_created += 1
+            ):
+                relationships_created += 1
 
         # Create a root concept for the document itself
         document = crud.document.get(db=db, id=document_id, tenant_id=tenant_id)
@@ -460,6 +459,8 @@ class BusinessOntologyService(LoggerMixin):
                     _ensure_doc_concept(obj.strip(), "Process", confidence=0.7)
                     _ensure_doc_rel(doc_name, obj.strip(), "aims_for")
 
+        batch.flush(db)
+
         self.logger.info(
             f"Document graph built for {document_id}: "
             f"{entities_created} concepts, {relationships_created} relationships (no AI cost)"
@@ -542,9 +543,6 @@ class BusinessOntologyService(LoggerMixin):
             prompt = prompt_manager.get_prompt(PromptType.CODE_ENTITY_EXTRACTION)
             full_prompt = f"{prompt}\n{json.dumps(batch, indent=2)}"
 
-            # Rate limiting: respect Gemini 15 RPM limit
-            time.sleep(4)
-
             try:
                 response = await gemini_service.generate_content(full_prompt)
                 cleaned = repair_json_response(response.text)
@@ -643,8 +641,6 @@ class BusinessOntologyService(LoggerMixin):
         prompt = prompt_manager.get_prompt(PromptType.SOURCE_RECONCILIATION)
         full_prompt = f"{prompt}\n{json.dumps(reconciliation_data, indent=2)}"
 
-        time.sleep(4)  # Rate limiting
-
         try:
             response = await gemini_service.generate_content(full_prompt)
             cleaned = repair_json_response(response.text)
@@ -776,8 +772,6 @@ class BusinessOntologyService(LoggerMixin):
         prompt = prompt_manager.get_prompt(PromptType.SYNONYM_DETECTION)
         full_prompt = f"{prompt}\n{json.dumps(concept_names, indent=2)}"
 
-        time.sleep(4)
-
         try:
             response = await gemini_service.generate_content(full_prompt)
             cleaned = repair_json_response(response.text)
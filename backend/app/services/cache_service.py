@@ -23,6 +23,10 @@ class CacheService:
 
     Example:
         "analysis:1:8f7d9a2c3e5b...:code_analysis"
+
+    Per-file code analysis uses a content-addressed key instead (see
+    get_cached_file_analysis):
+        analysis:file:{tenant_id}:{sha256(raw file)}:{prompt_type}:{prompt_version}:{model_id}:{language}
     """
 
     def __init__(self):
@@ -196,6 +200,167 @@ class CacheService:
             logger.error(f"Cache clear error: {e}")
             return 0
 
+    # ============================================================
+    # CONTENT-ADDRESSED FILE ANALYSIS CACHE
+    # ============================================================
+
+    def _build_file_analysis_key(
+        self,
+        *,
+        raw_content: str,
+        prompt_type: str,
+        prompt_version: str,
+        model_id: str,
+        language: str,
+        tenant_id: int,
+    ) -> str:
+        """
+        Key on the full SHA-256 of the raw file bytes — never on the prompt
+        text sent to the model, which carries per-run repository context.
+        """
+        content_sha = hashlib.sha256(raw_content.encode("utf-8")).hexdigest()
+        return (
+            f"analysis:file:{tenant_id}:{content_sha}:{prompt_type}:"
+            f"{prompt_version}:{model_id}:{(language or 'unknown').lower()}"
+        )
+
+    def get_cached_file_analysis(
+        self,
+        *,
+        raw_content: str,
+        prompt_type: str,
+        prompt_version: str,
+        model_id: str,
+        language: str,
+        tenant_id: int,
+    ) -> Optional[dict]:
+        """
+        Retrieve a cached per-file analysis.
+
+        Args:
+            raw_content: The file content exactly as fetched (no context header)
+            prompt_type: PromptType value used for the analysis
+            prompt_version: PromptManager.get_prompt_version() for that prompt
+            model_id: Provider/model id, e.g. "gemini:gemini-2.5-flash"
+            language: Detected file language
+            tenant_id: Tenant ID for multi-tenancy isolation
+
+        Returns:
+            Cached result dict or None if cache miss
+        """
+        if not self.redis_client:
+            return None
+
+        try:
+            cache_key = self._build_file_analysis_key(
+                raw_content=raw_content, prompt_type=prompt_type,
+                prompt_version=prompt_version, model_id=model_id,
+                language=language, tenant_id=tenant_id,
+            )
+            cached_data = self.redis_client.get(cache_key)
+            if cached_data:
+                logger.info(f"✅ File cache HIT: {prompt_type} ({model_id})")
+                return json.loads(cached_data)
+            logger.info(f"❌ File cache MISS: {prompt_type} ({model_id})")
+            return None
+        except (RedisError, json.JSONDecodeError) as e:
+            logger.error(f"File cache retrieval error: {e}")
+            return None
+
+    def set_cached_file_analysis(
+        self,
+        *,
+        raw_content: str,
+        prompt_type: str,
+        prompt_version: str,
+        model_id: str,
+        language: str,
+        tenant_id: int,
+        result: dict,
+        ttl_seconds: int = 2592000,  # 30 days default
+    ) -> bool:
+        """
+        Cache a per-file analysis result under its content-addressed key.
+
+        Returns:
+            True if cached successfully, False otherwise
+        """
+        if not self.redis_client:
+            return False
+
+        try:
+            cache_key = self._build_file_analysis_key(
+                raw_content=raw_content, prompt_type=prompt_type,
+                prompt_version=prompt_version, model_id=model_id,
+                language=language, tenant_id=tenant_id,
+            )
+            self.redis_client.setex(name=cache_key, time=ttl_seconds, value=json.dumps(result))
+            logger.info(f"💾 File cache SET: {prompt_type} ({model_id}, TTL: {ttl_seconds}s)")
+            return True
+        except (RedisError, TypeError) as e:
+            logger.error(f"File cache storage error: {e}")
+            return False
+
+    # ============================================================
+    # PER-RUN CACHE COUNTERS
+    # ============================================================
+
+    def _build_run_stats_key(self, tenant_id: int, repo_id: int) -> str:
+        """Build Redis key for a repository's latest analysis-run cache counters."""
+        return f"analysis_run_stats:{tenant_id}:{repo_id}"
+
+    def start_run_stats(self, *, tenant_id: int, repo_id: int, run_id: str) -> None:
+        """Reset the repository's cache counters at the start of an analysis run."""
+        if not self.redis_client:
+            return
+
+        try:
+            key = self._build_run_stats_key(tenant_id, repo_id)
+            pipe = self.redis_client.pipeline()
+            pipe.delete(key)
+            pipe.hset(key, mapping={"run_id": run_id, "hits": 0, "misses": 0})
+            pipe.expire(key, 604800)  # 7 days
+            pipe.execute()
+        except RedisError as e:
+            logger.error(f"Run stats reset error: {e}")
+
+    def record_run_cache_result(self, *, tenant_id: int, repo_id: int, hit: bool) -> None:
+        """Increment the hit or miss counter for the repository's current run."""
+        if not self.redis_client:
+            return
+
+        try:
+            key = self._build_run_stats_key(tenant_id, repo_id)
+            self.redis_client.hincrby(key, "hits" if hit else "misses", 1)
+        except RedisError as e:
+            logger.error(f"Run stats update error: {e}")
+
+    def get_run_stats(self, *, tenant_id: int, repo_id: int) -> Optional[dict]:
+        """
+        Cache counters for the repository's latest analysis run.
+
+        Returns:
+            {"run_id", "hits", "misses", "hit_rate"} or None if unavailable
+        """
+        if not self.redis_client:
+            return None
+
+        try:
+            raw = self.redis_client.hgetall(self._build_run_stats_key(tenant_id, repo_id))
+            if not raw:
+                return None
+            hits, misses = int(raw.get("hits", 0)), int(raw.get("misses", 0))
+            total = hits + misses
+            return {
+                "run_id": raw.get("run_id"),
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / total, 3) if total else 0.0,
+            }
+        except RedisError as e:
+            logger.error(f"Run stats retrieval error: {e}")
+            return None
+
     # ============================================================
     # BRANCH PREVIEW METHODS (Sprint 4 Phase 4)
     # ============================================================
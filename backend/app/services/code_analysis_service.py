@@ -4,14 +4,16 @@ import re
 import httpx
 from typing import Optional
 from sqlalchemy.orm import Session
-import asyncio
 
 from app import crud
 from app.db.session import SessionLocal
 from app.services.ai.gemini import call_gemini_for_code_analysis
+from app.services.ai.prompt_manager import PromptType, prompt_manager
 from app.services.cache_service import cache_service
+from app.services.github_fetcher import github_fetcher
 from app.services.cost_service import cost_service
 from app.services.billing_enforcement_service import billing_enforcement_service, InsufficientBalanceException, MonthlyLimitExceededException
+from app.core.config import settings
 from app.core.logging import LoggerMixin
 from app.core.exceptions import DocumentProcessingException, AIAnalysisException
 
@@ -136,15 +138,9 @@ class CodeAnalysisService(LoggerMixin):
         """Fetch a single file from GitHub raw content."""
         raw_url = f"https://raw.githubusercontent.com/{owner}/{repo}/{blob_path}"
         self.logger.info(f"Fetching single file from GitHub: {raw_url}")
-        headers = {}
-        from app.core.config import settings
-        token = github_token or settings.GITHUB_TOKEN
-        if token:
-            headers["Authorization"] = f"Bearer {token}"
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            resp = await client.get(raw_url, headers=headers)
-            resp.raise_for_status()
-            return resp.text
+        resp = await github_fetcher.get(raw_url, github_token=github_token)
+        resp.raise_for_status()
+        return resp.text
 
     # Extensions that exist in repos but should NOT be AI-analyzed
     SKIP_EXTENSIONS = {
@@ -192,101 +188,107 @@ class CodeAnalysisService(LoggerMixin):
         """
         Get the file list for a GitHub repository.
         Returns dict:
-          - 'to_analyze': list of {path, url, language} for code files
+          - 'to_analyze': list of {path, url, language, sha} for code files
+            (sha is the git blob SHA, used for delta re-analysis)
           - 'skipped': list of {path, ext, category} for non-analyzed files
+          - 'commit_sha': head commit of the scanned branch
         """
         gh_headers = self._github_headers(github_token)
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            # Resolve branch → tree SHA
-            commits_url = f"https://api.github.com/repos/{owner}/{repo}/commits"
-            commits_resp = await client.get(
-                commits_url, headers=gh_headers, params={"sha": branch, "per_page": 1}
-            )
+        # Pooled client with ETag revalidation: an unchanged tree costs a 304,
+        # which does not count against the GitHub API rate limit
+        # Resolve branch → tree SHA
+        commits_url = f"https://api.github.com/repos/{owner}/{repo}/commits"
+        commits_resp = await github_fetcher.get(
+            commits_url, headers=gh_headers, params={"sha": branch, "per_page": 1}
+        )
 
-            if commits_resp.status_code != 200:
-                for fb in ["main", "master"]:
-                    if fb != branch:
-                        commits_resp = await client.get(
-                            commits_url, headers=gh_headers, params={"sha": fb, "per_page": 1}
-                        )
-                        if commits_resp.status_code == 200:
-                            branch = fb
-                            break
-
-            if commits_resp.status_code != 200:
-                self.logger.error(f"GitHub API error resolving branch: {commits_resp.status_code}")
-                return {"to_analyze": [], "skipped": []}
-
-            commits_data = commits_resp.json()
-            if not commits_data:
-                return {"to_analyze": [], "skipped": []}
-
-            tree_sha = commits_data[0]["commit"]["tree"]["sha"]
-
-            # Get recursive tree
-            tree_url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/{tree_sha}?recursive=1"
-            tree_resp = await client.get(tree_url, headers=gh_headers)
-            if tree_resp.status_code != 200:
-                return {"to_analyze": [], "skipped": []}
-
-            tree_data = tree_resp.json()
-            all_files = [
-                item for item in tree_data.get("tree", [])
-                if item["type"] == "blob"
-            ]
-
-            # Special filenames (no extension) that should be included
-            SPECIAL_FILENAMES = {
-                'Dockerfile': 'dockerfile',
-                'Makefile': 'makefile',
-                'Jenkinsfile': 'groovy',
-                'Vagrantfile': 'ruby',
-                'Procfile': 'procfile',
-                'Gemfile': 'ruby',
-                'Rakefile': 'ruby',
-                'docker-compose.yml': 'yaml',
-                'docker-compose.yaml': 'yaml',
-                '.gitignore': 'gitignore',
-                '.dockerignore': 'dockerignore',
-                '.eslintrc': 'json',
-                '.prettierrc': 'json',
-                'requirements.txt': 'pip',
-                'Pipfile': 'toml',
-                'pyproject.toml': 'toml',
-                'package.json': 'json',
-                'tsconfig.json': 'json',
-            }
+        if commits_resp.status_code != 200:
+            for fb in ["main", "master"]:
+                if fb != branch:
+                    commits_resp = await github_fetcher.get(
+                        commits_url, headers=gh_headers, params={"sha": fb, "per_page": 1}
+                    )
+                    if commits_resp.status_code == 200:
+                        branch = fb
+                        break
+
+        if commits_resp.status_code != 200:
+            self.logger.error(f"GitHub API error resolving branch: {commits_resp.status_code}")
+            return {"to_analyze": [], "skipped": []}
+
+        commits_data = commits_resp.json()
+        if not commits_data:
+            return {"to_analyze": [], "skipped": []}
+
+        commit_sha = commits_data[0].get("sha")
+        tree_sha = commits_data[0]["commit"]["tree"]["sha"]
+
+        # Get recursive tree
+        tree_url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/{tree_sha}?recursive=1"
+        tree_resp = await github_fetcher.get(tree_url, headers=gh_headers)
+        if tree_resp.status_code != 200:
+            return {"to_analyze": [], "skipped": []}
+
+        tree_data = tree_resp.json()
+        all_files = [
+            item for item in tree_data.get("tree", [])
+            if item["type"] == "blob"
+        ]
 
-            to_analyze = []
-            skipped = []
-
-            for item in all_files:
-                path = item["path"]
-                parts = path.split('/')
-                filename = parts[-1]
-                ext = ('.' + filename.rsplit('.', 1)[-1].lower()) if '.' in filename else ''
-
-                # Check if in a SKIP_DIR
-                skip_dir = next((d for d in parts[:-1] if d in self.SKIP_DIRS), None)
-                if skip_dir:
-                    category = self.SKIP_DIR_CATEGORIES.get(skip_dir, 'Build Artifact')
-                    skipped.append({"path": path, "ext": ext or '(no ext)', "category": category})
-                    continue
-
-                # Match by extension OR by special filename
-                if ext in self.CODE_EXTENSIONS or filename in SPECIAL_FILENAMES:
-                    raw_url = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{path}"
-                    language = self.EXT_TO_LANG.get(ext, '') or SPECIAL_FILENAMES.get(filename, '')
-                    to_analyze.append({"path": path, "url": raw_url, "language": language})
-                else:
-                    category = self.SKIP_EXTENSIONS.get(ext, 'Other')
-                    skipped.append({"path": path, "ext": ext or '(no ext)', "category": category})
+        # Special filenames (no extension) that should be included
+        SPECIAL_FILENAMES = {
+            'Dockerfile': 'dockerfile',
+            'Makefile': 'makefile',
+            'Jenkinsfile': 'groovy',
+            'Vagrantfile': 'ruby',
+            'Procfile': 'procfile',
+            'Gemfile': 'ruby',
+            'Rakefile': 'ruby',
+            'docker-compose.yml': 'yaml',
+            'docker-compose.yaml': 'yaml',
+            '.gitignore': 'gitignore',
+            '.dockerignore': 'dockerignore',
+            '.eslintrc': 'json',
+            '.prettierrc': 'json',
+            'requirements.txt': 'pip',
+            'Pipfile': 'toml',
+            'pyproject.toml': 'toml',
+            'package.json': 'json',
+            'tsconfig.json': 'json',
+        }
 
-            self.logger.info(
-                f"Repo {owner}/{repo}: {len(to_analyze)} to analyze, "
-                f"{len(skipped)} skipped (from {len(all_files)} total blobs)"
-            )
-            return {"to_analyze": to_analyze, "skipped": skipped}
+        to_analyze = []
+        skipped = []
+
+        for item in all_files:
+            path = item["path"]
+            parts = path.split('/')
+            filename = parts[-1]
+            ext = ('.' + filename.rsplit('.', 1)[-1].lower()) if '.' in filename else ''
+
+            # Check if in a SKIP_DIR
+            skip_dir = next((d for d in parts[:-1] if d in self.SKIP_DIRS), None)
+            if skip_dir:
+                category = self.SKIP_DIR_CATEGORIES.get(skip_dir, 'Build Artifact')
+                skipped.append({"path": path, "ext": ext or '(no ext)', "category": category})
+                continue
+
+            # Match by extension OR by special filename
+            if ext in self.CODE_EXTENSIONS or filename in SPECIAL_FILENAMES:
+                raw_url = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{path}"
+                language = self.EXT_TO_LANG.get(ext, '') or SPECIAL_FILENAMES.get(filename, '')
+                to_analyze.append({
+                    "path": path, "url": raw_url, "language": language, "sha": item.get("sha"),
+                })
+            else:
+                category = self.SKIP_EXTENSIONS.get(ext, 'Other')
+                skipped.append({"path": path, "ext": ext or '(no ext)', "category": category})
+
+        self.logger.info(
+            f"Repo {owner}/{repo}: {len(to_analyze)} to analyze, "
+            f"{len(skipped)} skipped (from {len(all_files)} total blobs)"
+        )
+        return {"to_analyze": to_analyze, "skipped": skipped, "commit_sha": commit_sha}
 
     async def _resolve_github_url(self, url: str) -> str | None:
         """
@@ -425,7 +427,7 @@ class CodeAnalysisService(LoggerMixin):
             tenant_id: Tenant ID for isolation (SPRINT 2)
         """
         self.logger.info(f"Setting up async analysis for component_id: {component_id}, tenant_id: {tenant_id}")
-        asyncio.run(self._async_analyze_component(component_id, tenant_id))
+        github_fetcher.run(self._async_analyze_component(component_id, tenant_id))
 
     async def _async_analyze_component(self, component_id: int, tenant_id: int = None) -> None:
         """
@@ -483,10 +485,15 @@ class CodeAnalysisService(LoggerMixin):
 
             # 3. Try to get cached analysis first (80% cost savings!)
             self.logger.info(f"Checking cache for component {component_id}...")
-            cached_result = cache_service.get_cached_analysis(
-                content=code_content,
-                analysis_type="code_analysis"
-            )
+            cache_key_parts = {
+                "raw_content": code_content,
+                "prompt_type": PromptType.CODE_ANALYSIS.value,
+                "prompt_version": prompt_manager.get_prompt_version(PromptType.CODE_ANALYSIS),
+                "model_id": f"gemini:{settings.GEMINI_MODEL}",
+                "language": "",
+                "tenant_id": tenant_id,
+            }
+            cached_result = cache_service.get_cached_file_analysis(**cache_key_parts)
 
             if cached_result:
                 # Cache HIT - use cached result (no AI cost!)
@@ -529,9 +536,8 @@ class CodeAnalysisService(LoggerMixin):
                 analysis_result = await call_gemini_for_code_analysis(code_content)
 
                 # Store result in cache for future use
-                cache_service.set_cached_analysis(
-                    content=code_content,
-                    analysis_type="code_analysis",
+                cache_service.set_cached_file_analysis(
+                    **cache_key_parts,
                     result=analysis_result,
                     ttl_seconds=2592000  # 30 days
                 )
@@ -718,17 +724,26 @@ class CodeAnalysisService(LoggerMixin):
         Extract ontology concepts AND relationships from code analysis results.
         Uses file-type-specific strategies to build rich, connected knowledge graphs.
         Creates concepts with source_type="code" — no additional AI calls needed.
+
+        Everything is collected in an OntologyIngestBatch and written with
+        set-based upserts and a single commit at the end.
         """
         if not structured_analysis or not tenant_id:
             return
 
+        from app.services.ontology_ingest_service import OntologyIngestBatch
+
+        batch = OntologyIngestBatch(
+            tenant_id, "code",
+            initiative_id=initiative_id, source_component_id=source_component_id,
+        )
         created_count = 0
         relationship_count = 0
-        concept_map = {}  # name (lowered) -> OntologyConcept for dedup + relationship linking
+        concept_map = {}  # name (lowered) -> batch key for dedup + relationship linking
 
-        # Helper: get-or-create a concept and track it in concept_map
+        # Helper: queue a concept and track it in concept_map
         def _ensure_concept(name: str, concept_type: str, description: str = None,
-                            confidence: float = 0.75) -> "OntologyConcept | None":
+                            confidence: float = 0.75) -> "tuple | None":
             nonlocal created_count
             name = (name or "").strip()
             if not name or len(name) < 2:
@@ -736,32 +751,26 @@ class CodeAnalysisService(LoggerMixin):
             key = name.lower()
             if key in concept_map:
                 return concept_map[key]
-            concept = crud.ontology_concept.get_or_create(
-                db, name=name, concept_type=concept_type,
-                tenant_id=tenant_id, source_type="code",
+            concept_map[key] = batch.concept(
+                name, concept_type,
                 description=description[:500] if description else None,
                 confidence_score=confidence,
-                source_component_id=source_component_id,
-                initiative_id=initiative_id,
             )
-            concept_map[key] = concept
             created_count += 1
-            return concept
+            return concept_map[key]
 
-        # Helper: create a relationship between two concepts
+        # Helper: queue a relationship between two concepts
         def _ensure_rel(source_name: str, target_name: str, rel_type: str,
                         description: str = None, confidence: float = 0.8) -> bool:
             nonlocal relationship_count
             src = concept_map.get((source_name or "").strip().lower())
             tgt = concept_map.get((target_name or "").strip().lower())
-            if not src or not tgt or src.id == tgt.id:
-                return False
-            crud.ontology_relationship.create_if_not_exists(
-                db, source_concept_id=src.id, target_concept_id=tgt.id,
-                relationship_type=rel_type, tenant_id=tenant_id,
+            if not batch.relationship(
+                src, tgt, rel_type,
                 description=description[:500] if description else None,
                 confidence_score=confidence,
-            )
+            ):
+                return False
             relationship_count += 1
             return True
 
@@ -863,6 +872,8 @@ class CodeAnalysisService(LoggerMixin):
             self._extract_config_file(structured_analysis, _ensure_concept, _ensure_rel, file_short)
         # Utility/Generic — common extraction above is sufficient
 
+        batch.flush(db)
+
         if created_count > 0 or relationship_count > 0:
             self.logger.info(
                 f"[{file_type}] Extracted {created_count} concepts + {relationship_count} "
@@ -11,8 +11,6 @@ BETWEEN two projects instead of between document and code layers.
 Typical cost: ~$0.02-0.05 per cross-project mapping run.
 """
 
-import re
-import time
 import json
 import asyncio
 from typing import List, Dict, Tuple
@@ -21,43 +19,7 @@ from sqlalchemy.orm import Session
 from app import crud
 from app.models.ontology_concept import OntologyConcept
 from app.core.logging import LoggerMixin
-
-
-# Reuse normalization utilities from mapping_service
-def _normalize(name: str) -> str:
-    n = name.strip().lower()
-    n = re.sub(r'[_\-.]', ' ', n)
-    n = re.sub(r'\s+', ' ', n).strip()
-    return n
-
-
-def _tokenize(name: str) -> set:
-    normalized = _normalize(name)
-    return {t for t in normalized.split() if len(t) > 1}
-
-
-def _levenshtein_distance(s1: str, s2: str) -> int:
-    if len(s1) < len(s2):
-        return _levenshtein_distance(s2, s1)
-    if len(s2) == 0:
-        return len(s1)
-    prev_row = range(len(s2) + 1)
-    for i, c1 in enumerate(s1):
-        curr_row = [i + 1]
-        for j, c2 in enumerate(s2):
-            insertions = prev_row[j + 1] + 1
-            deletions = curr_row[j] + 1
-            substitutions = prev_row[j] + (c1 != c2)
-            curr_row.append(min(insertions, deletions, substitutions))
-        prev_row = curr_row
-    return prev_row[-1]
-
-
-def _levenshtein_similarity(s1: str, s2: str) -> float:
-    max_len = max(len(s1), len(s2))
-    if max_len == 0:
-        return 1.0
-    return 1.0 - (_levenshtein_distance(s1, s2) / max_len)
+from app.services.fuzzy_matcher import FuzzyIndex, normalize_name as _normalize
 
 
 class CrossProjectMappingService(LoggerMixin):
@@ -161,34 +123,12 @@ class CrossProjectMappingService(LoggerMixin):
         unmapped_b = [cb for cb in concepts_b if cb.id not in mapped_b_ids]
         ambiguous_pairs = []
 
-        for ca in unmapped_a:
-            ca_tokens = _tokenize(ca.name)
-            ca_norm = _normalize(ca.name)
-            best_match = None
-            best_score = 0.0
-
-            for cb in unmapped_b:
-                if cb.id in mapped_b_ids:
-                    continue
-
-                cb_tokens = _tokenize(cb.name)
-                cb_norm = _normalize(cb.name)
-
-                # Token overlap
-                if ca_tokens and cb_tokens:
-                    overlap = len(ca_tokens & cb_tokens)
-                    union = len(ca_tokens | cb_tokens)
-                    token_score = overlap / union if union > 0 else 0.0
-                else:
-                    token_score = 0.0
+        b_index = FuzzyIndex(unmapped_b)
 
-                # Levenshtein
-                lev_score = _levenshtein_similarity(ca_norm, cb_norm)
-                combined = max(token_score, lev_score)
-
-                if combined > best_score:
-                    best_score = combined
-                    best_match = cb
+        for ca in unmapped_a:
+            best_match, best_score = b_index.best_match(
+                ca.name, min_score=self.FUZZY_MEDIUM_CONFIDENCE, exclude_ids=mapped_b_ids
+            )
 
             if best_match and best_score >= self.FUZZY_HIGH_CONFIDENCE:
                 status = "confirmed" if best_score >= 0.70 else "candidate"
@@ -303,8 +243,6 @@ RESPONSE FORMAT (valid JSON array):
 PAIRS TO VALIDATE:
 {json.dumps(pair_data, indent=2)}"""
 
-        time.sleep(4)
-
         try:
             response = asyncio.run(gemini_service.generate_content(prompt))
             cleaned = repair_json_response(response.text)
@@ -5,11 +5,21 @@ Generates vector embeddings for ontology concepts and knowledge graph summaries
 using Google's Gemini embedding API (text-embedding-004, 768 dimensions).
 
 Embeddings enable semantic search across the knowledge base.
+
+Query embeddings are cached in two tiers — an in-process LRU and Redis —
+keyed by model and normalized query text, so repeated searches (and the
+several searches inside one RAG retrieval) skip the embedding round trip.
 """
 
+import asyncio
+import hashlib
+import json
+import re
+import threading
 import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 from app.core.logging import logger
 
@@ -19,6 +29,23 @@ EMBEDDING_DIMENSIONS = 768
 BATCH_SIZE = 100  # Gemini supports up to 100 texts per batch
 
 
+def _acquire_embedding_slot():
+    """
+    Draw one request from the shared embedding budget (see rate_governor).
+
+    Called on an event-loop thread, the slot is reserved without queueing:
+    when the budget is spent AIRateLimitTimeout is raised (callers return
+    None) rather than time.sleep() stalling every request on the loop.
+    """
+    from app.services.ai.rate_governor import rate_governor
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        rate_governor.acquire("gemini-embedding", EMBEDDING_MODEL)
+    else:
+        rate_governor.reserve("gemini-embedding", EMBEDDING_MODEL, max_wait=0)
+
+
 def _get_genai():
     """Lazy import to avoid import-time failures if API key is not configured."""
     import google.generativeai as genai
@@ -27,19 +54,35 @@ def _get_genai():
     return genai
 
 
-def _check_pgvector_available(db) -> bool:
-    """Check if pgvector extension is available in the database."""
-    try:
-        from sqlalchemy import text
-        result = db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'vector'"))
-        return result.fetchone() is not None
-    except Exception:
-        return False
+def _check_pgvector_available(db, table: Optional[str] = None) -> bool:
+    """
+    Check if pgvector is available — and, given `table`, that its embedding
+    column is a vector column rather than the JSON fallback.
+
+    Served from the capability registry (probed once per engine), not a
+    catalog query per call.
+    """
+    from app.db.capabilities import db_capabilities
+    caps = db_capabilities.get(db)
+    return caps.vector_column(table) if table else caps.pgvector
+
+
+def _normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query.strip().lower())
 
 
 class EmbeddingService:
     """Service for generating and storing vector embeddings."""
 
+    def __init__(self):
+        # key -> (expires_at, embedding), most recently used last
+        self._query_cache: "OrderedDict[str, Tuple[float, list]]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        # One in-flight API call per key: parallel RAG stages embedding the
+        # same query wait for the first instead of each calling the API
+        self._query_inflight: Dict[str, threading.Lock] = {}
+        self._query_stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0}
+
     def generate_embedding(self, text: str) -> Optional[list]:
         """
         Generate a vector embedding for a text string.
@@ -52,6 +95,7 @@ class EmbeddingService:
 
         try:
             genai = _get_genai()
+            _acquire_embedding_slot()
             result = genai.embed_content(
                 model=EMBEDDING_MODEL,
                 content=text,
@@ -66,12 +110,97 @@ class EmbeddingService:
         """
         Generate an embedding optimized for search queries.
         Uses task_type="retrieval_query" for better search relevance.
+
+        Served from the query-embedding cache when possible; failures are
+        not cached.
         """
         if not query or not query.strip():
             return None
 
+        from app.core.config import settings
+        if not settings.QUERY_EMBEDDING_CACHE_ENABLED:
+            return self._embed_query(query)
+
+        key = hashlib.sha256(f"{EMBEDDING_MODEL}|{_normalize_query(query)}".encode("utf-8")).hexdigest()
+        embedding = self._cached_query_embedding(key)
+        if embedding is not None:
+            return embedding
+
+        with self._query_cache_lock:
+            inflight = self._query_inflight.setdefault(key, threading.Lock())
+        with inflight:
+            try:
+                # Another thread may have filled it while we waited
+                embedding = self._cached_query_embedding(key, count_miss=True)
+                if embedding is None:
+                    embedding = self._embed_query(query)
+                    if embedding is not None:
+                        self._remember_query_embedding(key, embedding, to_redis=True)
+                return embedding
+            finally:
+                with self._query_cache_lock:
+                    self._query_inflight.pop(key, None)
+
+    def _cached_query_embedding(self, key: str, count_miss: bool = False) -> Optional[list]:
+        """Look the key up in memory, then Redis (promoting Redis hits to memory)."""
+        now = time.monotonic()
+        with self._query_cache_lock:
+            entry = self._query_cache.get(key)
+            if entry and entry[0] > now:
+                self._query_cache.move_to_end(key)
+                self._query_stats["memory_hits"] += 1
+                return entry[1]
+            if entry:
+                del self._query_cache[key]
+
+        from app.services.cache_service import cache_service
+        if cache_service.redis_client:
+            try:
+                raw = cache_service.redis_client.get(f"query_embedding:{key}")
+                if raw:
+                    embedding = json.loads(raw)
+                    self._remember_query_embedding(key, embedding, to_redis=False)
+                    with self._query_cache_lock:
+                        self._query_stats["redis_hits"] += 1
+                    return embedding
+            except Exception as e:
+                logger.warning(f"Query embedding cache read failed (non-fatal): {e}")
+
+        if count_miss:
+            with self._query_cache_lock:
+                self._query_stats["misses"] += 1
+        return None
+
+    def _remember_query_embedding(self, key: str, embedding: list, *, to_redis: bool) -> None:
+        from app.core.config import settings
+        ttl = settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS
+        with self._query_cache_lock:
+            self._query_cache[key] = (time.monotonic() + ttl, embedding)
+            self._query_cache.move_to_end(key)
+            while len(self._query_cache) > settings.QUERY_EMBEDDING_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+
+        if to_redis:
+            from app.services.cache_service import cache_service
+            if cache_service.redis_client:
+                try:
+                    cache_service.redis_client.setex(f"query_embedding:{key}", ttl, json.dumps(embedding))
+                except Exception as e:
+                    logger.warning(f"Query embedding cache write failed (non-fatal): {e}")
+
+    def get_query_cache_stats(self) -> dict:
+        """Hit counters and size of the query-embedding cache."""
+        with self._query_cache_lock:
+            stats = dict(self._query_stats)
+            stats["memory_entries"] = len(self._query_cache)
+        lookups = stats["memory_hits"] + stats["redis_hits"] + stats["misses"]
+        stats["hit_rate"] = round((lookups - stats["misses"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+    def _embed_query(self, query: str) -> Optional[list]:
         try:
             genai = _get_genai()
+            _acquire_embedding_slot()
             result = genai.embed_content(
                 model=EMBEDDING_MODEL,
                 content=query,
@@ -110,11 +239,14 @@ class EmbeddingService:
 
         return "\n".join(parts)
 
-    def build_graph_summary_text(self, graph_version) -> str:
+    def build_graph_summary_text(self, graph_version, graph_data: Optional[dict] = None) -> str:
         """
         Build a text summary of a knowledge graph version for embedding.
+
+        Superseded non-snapshot versions store only a delta, so pass the
+        rebuilt graph (crud.knowledge_graph_version.get_graph_data) for those.
         """
-        graph_data = graph_version.graph_data or {}
+        graph_data = graph_data or graph_version.graph_data or {}
         nodes = graph_data.get("nodes", [])
         edges = graph_data.get("edges", [])
         metadata = graph_data.get("metadata", {})
@@ -154,7 +286,7 @@ class EmbeddingService:
             return False
 
         try:
-            if _check_pgvector_available(db):
+            if _check_pgvector_available(db, "ontology_concepts"):
                 from sqlalchemy import text as sql_text
                 db.execute(
                     sql_text(
@@ -175,7 +307,7 @@ class EmbeddingService:
                 import json
                 db.execute(
                     sql_text(
-                        "UPDATE ontology_concepts SET embedding = :emb::jsonb, "
+                        "UPDATE ontology_concepts SET embedding = CAST(:emb AS jsonb), "
                         "embedding_model = :model, embedded_at = :ts "
                         "WHERE id = :id"
                     ),
@@ -193,43 +325,172 @@ class EmbeddingService:
             db.rollback()
             return False
 
-    def embed_concepts_batch(self, db, tenant_id: int, concept_ids: list) -> dict:
+    def generate_embeddings_batch(
+        self, texts: List[str], task_type: str = "retrieval_document"
+    ) -> List[Optional[list]]:
         """
-        Batch-embed multiple concepts. Returns {embedded: N, failed: N, skipped: N}.
+        Generate embeddings for up to BATCH_SIZE texts in ONE API request.
+
+        Returns a list aligned with `texts`; entries are None for blank inputs
+        or when the whole request fails.
         """
-        from app import crud
+        results: List[Optional[list]] = [None] * len(texts)
+        indexed = [(i, t) for i, t in enumerate(texts) if t and t.strip()]
+        if not indexed:
+            return results
+
+        try:
+            genai = _get_genai()
+            # One multi-input request draws one request from the shared embedding budget
+            _acquire_embedding_slot()
+            response = genai.embed_content(
+                model=EMBEDDING_MODEL,
+                content=[t for _, t in indexed],
+                task_type=task_type,
+            )
+            vectors = response["embedding"]
+            # Single-input requests come back as a flat vector
+            if vectors and not isinstance(vectors[0], (list, tuple)):
+                vectors = [vectors]
+            for (i, _), vector in zip(indexed, vectors):
+                results[i] = list(vector) if vector else None
+        except Exception as e:
+            logger.warning(f"Batch embedding generation failed ({len(indexed)} texts): {e}")
+        return results
+
+    def _load_concepts_for_embedding(self, db, tenant_id: int, concept_ids: list) -> dict:
+        """
+        Load a chunk of concepts with their relationship context in a fixed
+        number of queries (instead of one get + lazy loads per concept).
+
+        Returns {concept_id: (concept, embedded_at)}.
+        """
+        from sqlalchemy import bindparam, text as sql_text
+        from sqlalchemy.orm import selectinload
+        from app.models.ontology_concept import OntologyConcept
+        from app.models.ontology_relationship import OntologyRelationship
+
+        concepts = db.query(OntologyConcept).filter(
+            OntologyConcept.id.in_(concept_ids),
+            OntologyConcept.tenant_id == tenant_id,
+        ).options(
+            selectinload(OntologyConcept.outgoing_relationships)
+            .selectinload(OntologyRelationship.target_concept),
+            selectinload(OntologyConcept.incoming_relationships)
+            .selectinload(OntologyRelationship.source_concept),
+        ).all()
+
+        # embedded_at is added by migration and not mapped on the ORM model
+        embedded_at = {}
+        try:
+            rows = db.execute(
+                sql_text(
+                    "SELECT id, embedded_at FROM ontology_concepts "
+                    "WHERE tenant_id = :tid AND id IN :ids"
+                ).bindparams(bindparam("ids", expanding=True)),
+                {"tid": tenant_id, "ids": list(concept_ids)},
+            ).fetchall()
+            embedded_at = {row[0]: row[1] for row in rows}
+        except Exception as e:
+            logger.warning(f"Could not read embedded_at for batch: {e}")
+            db.rollback()
+
+        return {c.id: (c, embedded_at.get(c.id)) for c in concepts}
+
+    def _store_concept_embeddings(
+        self, db, tenant_id: int, rows: List[Tuple[int, list]], use_pgvector: bool
+    ) -> bool:
+        """
+        Write a chunk of concept embeddings with ONE set-based UPDATE
+        (UPDATE ... FROM (VALUES ...)) inside a single transaction.
+        """
+        import json
+        from sqlalchemy import text as sql_text
+
+        if not rows:
+            return True
 
-        stats = {"embedded": 0, "failed": 0, "skipped": 0}
+        cast_type = "vector" if use_pgvector else "jsonb"
+        params = {"model": EMBEDDING_MODEL, "ts": datetime.utcnow(), "tid": tenant_id}
+        values = []
+        for i, (concept_id, embedding) in enumerate(rows):
+            values.append(f"(CAST(:id_{i} AS integer), CAST(:emb_{i} AS {cast_type}))")
+            params[f"id_{i}"] = concept_id
+            params[f"emb_{i}"] = str(embedding) if use_pgvector else json.dumps(embedding)
 
-        for i, cid in enumerate(concept_ids):
+        try:
+            db.execute(
+                sql_text(
+                    "UPDATE ontology_concepts AS c SET embedding = v.emb, "
+                    "embedding_model = :model, embedded_at = :ts "
+                    f"FROM (VALUES {', '.join(values)}) AS v(id, emb) "
+                    "WHERE c.id = v.id AND c.tenant_id = :tid"
+                ),
+                params,
+            )
+            db.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to store embedding batch ({len(rows)} concepts): {e}")
+            db.rollback()
+            return False
+
+    def embed_concepts_batch(self, db, tenant_id: int, concept_ids: list) -> dict:
+        """
+        Batch-embed multiple concepts, BATCH_SIZE at a time.
+
+        Each chunk costs one concept load, one multi-input embedding request
+        and one bulk UPDATE. Returns {embedded, failed, skipped} plus
+        throughput stats (batches, api_calls, duration_seconds, concepts_per_second).
+        """
+        stats = {"embedded": 0, "failed": 0, "skipped": 0, "batches": 0, "api_calls": 0}
+        started = time.monotonic()
+        use_pgvector = _check_pgvector_available(db, "ontology_concepts")
+        now = datetime.utcnow()
+
+        for start in range(0, len(concept_ids), BATCH_SIZE):
+            chunk = concept_ids[start:start + BATCH_SIZE]
+            stats["batches"] += 1
             try:
-                concept = crud.ontology_concept.get(db=db, id=cid, tenant_id=tenant_id)
-                if not concept:
+                loaded = self._load_concepts_for_embedding(db, tenant_id, chunk)
+            except Exception as e:
+                logger.warning(f"Batch embed load failed for {len(chunk)} concepts: {e}")
+                db.rollback()
+                stats["failed"] += len(chunk)
+                continue
+
+            to_embed = []
+            for cid in chunk:
+                if cid not in loaded:
                     stats["skipped"] += 1
                     continue
-
+                concept, embedded_at = loaded[cid]
                 # Skip if already embedded recently (within 24h)
-                if concept.embedded_at and hasattr(concept, 'embedded_at'):
+                if embedded_at is not None:
                     try:
-                        if (datetime.utcnow() - concept.embedded_at).total_seconds() < 86400:
+                        if (now - embedded_at.replace(tzinfo=None)).total_seconds() < 86400:
                             stats["skipped"] += 1
                             continue
                     except Exception:
                         pass
+                to_embed.append((cid, self.build_concept_text(concept)))
 
-                if self.embed_concept(db, cid, tenant_id):
-                    stats["embedded"] += 1
-                else:
-                    stats["failed"] += 1
+            if not to_embed:
+                continue
 
-                # Rate limiting: ~1500 RPM for Gemini embedding API
-                if (i + 1) % 50 == 0:
-                    time.sleep(2)
+            stats["api_calls"] += 1
+            vectors = self.generate_embeddings_batch([t for _, t in to_embed])
+            rows = [(cid, vec) for (cid, _), vec in zip(to_embed, vectors) if vec]
+            stats["failed"] += len(to_embed) - len(rows)
 
-            except Exception as e:
-                logger.warning(f"Batch embed failed for concept {cid}: {e}")
-                stats["failed"] += 1
+            if self._store_concept_embeddings(db, tenant_id, rows, use_pgvector):
+                stats["embedded"] += len(rows)
+            else:
+                stats["failed"] += len(rows)
 
+        elapsed = time.monotonic() - started
+        stats["duration_seconds"] = round(elapsed, 3)
+        stats["concepts_per_second"] = round(stats["embedded"] / elapsed, 2) if elapsed > 0 else 0.0
         return stats
 
     def embed_all_concepts(self, db, tenant_id: int) -> dict:
@@ -273,13 +534,22 @@ class EmbeddingService:
         if not version:
             return False
 
-        summary_text = self.build_graph_summary_text(version)
+        from app import crud
+        graph_data = crud.knowledge_graph_version.get_graph_data(
+            db, source_type=version.source_type, source_id=version.source_id,
+            version=version.version, tenant_id=tenant_id,
+        )
+        if graph_data is None:
+            logger.warning(f"Graph version {version_id} could not be rebuilt; skipping embedding")
+            return False
+
+        summary_text = self.build_graph_summary_text(version, graph_data)
         embedding = self.generate_embedding(summary_text)
         if not embedding:
             return False
 
         try:
-            if _check_pgvector_available(db):
+            if _check_pgvector_available(db, "knowledge_graph_versions"):
                 from sqlalchemy import text as sql_text
                 db.execute(
                     sql_text(
@@ -293,7 +563,7 @@ class EmbeddingService:
                 from sqlalchemy import text as sql_text
                 db.execute(
                     sql_text(
-                        "UPDATE knowledge_graph_versions SET embedding = :emb::jsonb, "
+                        "UPDATE knowledge_graph_versions SET embedding = CAST(:emb AS jsonb), "
                         "summary_text = :summary WHERE id = :id"
                     ),
                     {"emb": json.dumps(embedding), "summary": summary_text, "id": version_id},
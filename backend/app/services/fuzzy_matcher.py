@@ -0,0 +1,237 @@
+"""
+Shared fuzzy name matcher for concept mapping.
+
+MappingService and CrossProjectMappingService score a concept against the
+other side with max(token Jaccard, normalized Levenshtein similarity). As a
+double loop that is one pure-Python edit-distance DP per pair, which is why
+both sides used to be capped at 1000 concepts.
+
+FuzzyIndex is built once over the target side:
+  - normalized names and token sets are precomputed
+  - token → concepts index: any pair with a non-zero Jaccard shares a token
+  - character trigram → concepts index: shortlists spelling variants
+    ("authorisation" / "authorization") that share no whole token
+Only shortlisted candidates are scored. The edit distance is skipped when
+the shared-trigram count already rules the pair out, and otherwise runs as a
+bit-parallel DP that stops once the pair can no longer reach the current
+best score or the caller's minimum.
+"""
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a concept name for comparison: lowercase, strip, remove punctuation."""
+    n = name.strip().lower()
+    # Replace underscores, hyphens, dots with spaces
+    n = re.sub(r'[_\-.]', ' ', n)
+    # Remove extra whitespace
+    n = re.sub(r'\s+', ' ', n).strip()
+    return n
+
+
+def tokenize_name(name: str) -> set:
+    """Split a normalized name into tokens for overlap comparison."""
+    normalized = normalize_name(name)
+    # Split on spaces and remove very short tokens (1 char)
+    return {t for t in normalized.split() if len(t) > 1}
+
+
+def levenshtein_distance(s1: str, s2: str) -> int:
+    """Compute Levenshtein edit distance between two strings."""
+    if len(s1) < len(s2):
+        return levenshtein_distance(s2, s1)
+    if len(s2) == 0:
+        return len(s1)
+    prev_row = range(len(s2) + 1)
+    for i, c1 in enumerate(s1):
+        curr_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            insertions = prev_row[j + 1] + 1
+            deletions = curr_row[j] + 1
+            substitutions = prev_row[j] + (c1 != c2)
+            curr_row.append(min(insertions, deletions, substitutions))
+        prev_row = curr_row
+    return prev_row[-1]
+
+
+def levenshtein_similarity(s1: str, s2: str) -> float:
+    """Normalized Levenshtein similarity (0.0 to 1.0)."""
+    max_len = max(len(s1), len(s2))
+    if max_len == 0:
+        return 1.0
+    return 1.0 - (levenshtein_distance(s1, s2) / max_len)
+
+
+def _char_masks(pattern: str) -> Dict[str, int]:
+    masks: Dict[str, int] = {}
+    for i, ch in enumerate(pattern):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    return masks
+
+
+def bounded_levenshtein(
+    pattern: str, text: str, max_distance: int, masks: Optional[Dict[str, int]] = None
+) -> int:
+    """
+    Levenshtein distance with an early cut-off at max_distance.
+
+    Returns the exact distance when it is <= max_distance, otherwise
+    max_distance + 1. Uses the bit-parallel (Myers / Hyyrö) formulation: the
+    whole DP column for `pattern` lives in one integer, so each character of
+    `text` costs a handful of integer operations instead of a row of Python
+    loop iterations. Pass `masks` (from _char_masks) to reuse the pattern's
+    per-character bitmasks across many texts.
+
+    The last DP row can fall by at most one per remaining text character, so
+    the scan stops as soon as the bound can no longer be met.
+    """
+    over = max_distance + 1
+    m, n = len(pattern), len(text)
+    if abs(m - n) > max_distance:
+        return over
+    if m == 0:
+        return n
+    if masks is None:
+        masks = _char_masks(pattern)
+
+    full = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv, score = full, 0, m
+    for j, ch in enumerate(text):
+        eq = masks.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        if score - (n - j - 1) > max_distance:
+            return over
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return score if score <= max_distance else over
+
+
+def _trigrams(normalized: str) -> Set[str]:
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    """
+    Candidate index over one side of a mapping run.
+
+    Items only need `.id` and `.name`. best_match() returns the same winner
+    as scoring every item in order (first item wins ties) for all candidates
+    that share a token or enough trigrams with the query.
+    """
+
+    # Very common tokens ("service", "data") are scanned shortest-name first:
+    # with a single shared token the Jaccard score falls as names get longer
+    MAX_TOKEN_POSTINGS = 512
+    # Trigram-only candidates kept per query, ranked by shared trigram count
+    TRIGRAM_CANDIDATES = 32
+    # Trigrams shared by more names than this carry little signal and only
+    # cost counting time (small indexes keep every trigram)
+    TRIGRAM_MAX_POSTINGS = 1000
+
+    def __init__(self, items: Iterable[Any]):
+        self.items: List[Any] = list(items)
+        self.norms: List[str] = [normalize_name(item.name) for item in self.items]
+        self.tokens: List[set] = [
+            {t for t in norm.split() if len(t) > 1} for norm in self.norms
+        ]
+        self.grams: List[Set[str]] = [_trigrams(norm) for norm in self.norms]
+
+        token_index: Dict[str, List[int]] = {}
+        trigram_index: Dict[str, List[int]] = {}
+        for idx, norm in enumerate(self.norms):
+            for token in self.tokens[idx]:
+                token_index.setdefault(token, []).append(idx)
+            for gram in self.grams[idx]:
+                trigram_index.setdefault(gram, []).append(idx)
+        for posting in token_index.values():
+            posting.sort(key=lambda i: (len(self.tokens[i]), i))
+
+        self._token_index = token_index
+        self._trigram_index = trigram_index
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _candidates(self, grams: Set[str], tokens: set) -> Set[int]:
+        candidates = set()
+        for token in tokens:
+            posting = self._token_index.get(token)
+            if posting:
+                candidates.update(posting[:self.MAX_TOKEN_POSTINGS])
+
+        hits: Counter = Counter()
+        for gram in grams:
+            posting = self._trigram_index.get(gram)
+            if posting and len(posting) <= self.TRIGRAM_MAX_POSTINGS:
+                hits.update(posting)
+        candidates.update(idx for idx, _ in hits.most_common(self.TRIGRAM_CANDIDATES))
+        return candidates
+
+    def best_match(
+        self,
+        name: str,
+        *,
+        min_score: float = 0.0,
+        exclude_ids: Optional[Set[int]] = None,
+    ) -> Tuple[Optional[Any], float]:
+        """
+        Best-scoring item for `name` with score = max(token Jaccard, Levenshtein similarity).
+
+        Returns (None, 0.0) when nothing reaches min_score.
+        """
+        norm = normalize_name(name)
+        tokens = {t for t in norm.split() if len(t) > 1}
+        grams = _trigrams(norm)
+        masks = _char_masks(norm)
+        best_idx: Optional[int] = None
+        best_score = 0.0
+
+        # Most shared trigrams first: a good early best narrows the edit-distance
+        # band for everything after it
+        shared = {idx: len(grams & self.grams[idx]) for idx in self._candidates(grams, tokens)}
+        for idx in sorted(shared, key=lambda i: (-shared[i], i)):
+            item = self.items[idx]
+            if exclude_ids and item.id in exclude_ids:
+                continue
+
+            other_tokens = self.tokens[idx]
+            if tokens and other_tokens:
+                score = len(tokens & other_tokens) / len(tokens | other_tokens)
+            else:
+                score = 0.0
+
+            # The edit distance only matters if it can reach the best so far
+            other = self.norms[idx]
+            max_len = max(len(norm), len(other))
+            if max_len == 0:
+                score = 1.0
+            else:
+                floor = max(best_score, min_score, score)
+                max_distance = int((1.0 - floor) * max_len + 1e-9)
+                # Each edit removes at most 3 distinct trigrams (q-gram lemma)
+                missing = max(len(grams), len(self.grams[idx])) - shared[idx]
+                if (missing + 2) // 3 <= max_distance:
+                    distance = bounded_levenshtein(norm, other, max_distance, masks)
+                    if distance <= max_distance:
+                        score = max(score, 1.0 - distance / max_len)
+
+            # Lower index wins ties, matching a linear scan in input order
+            if score > best_score or (score == best_score and best_idx is not None and idx < best_idx):
+                best_idx, best_score = idx, score
+
+        if best_idx is None or best_score < min_score:
+            return None, 0.0
+        return self.items[best_idx], best_score
@@ -0,0 +1,362 @@
+"""
+Pooled async fetcher for GitHub raw content and the GitHub REST API.
+
+Replaces the per-file `httpx.Client` that paid a fresh TCP+TLS handshake for
+every file in a repository. One HTTP/2 client per event loop keeps
+connections to raw.githubusercontent.com / api.github.com open, and a
+semaphore bounds how many requests are in flight.
+
+Features:
+- HTTP/2 multiplexing when the `h2` package is installed (HTTP/1.1 keep-alive otherwise)
+- ETag / If-None-Match conditional requests (a 304 from the API does not
+  count against the GitHub rate limit)
+- Retry with backoff on rate limiting (429, rate-limited 403), 5xx and
+  transport errors, honouring Retry-After / X-RateLimit-Reset
+- Whole-repository tarball/zipball download streamed to disk, for runs
+  that would otherwise fetch thousands of files one by one
+
+Long-lived loops (the API server, the Celery AI loop) keep their client.
+Sync callers that spin up a loop per call go through run(), which closes
+that loop's client before the loop goes away.
+"""
+import asyncio
+import hashlib
+import random
+import tarfile
+import threading
+import time
+import weakref
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import LoggerMixin
+
+GITHUB_HOSTS = {"raw.githubusercontent.com", "api.github.com", "codeload.github.com"}
+
+try:
+    import h2  # noqa: F401 — imported only to detect HTTP/2 support
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def parse_raw_url(url: str, path: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Split a raw.githubusercontent.com URL into (owner, repo, ref).
+    The file path is needed because refs may themselves contain slashes.
+    """
+    marker = "raw.githubusercontent.com/"
+    if marker not in url or not path:
+        return None
+    owner_repo_ref_path = url.split(marker, 1)[1]
+    parts = owner_repo_ref_path.split("/", 2)
+    if len(parts) < 3 or not parts[2].endswith("/" + path):
+        return None
+    owner, repo, ref_and_path = parts
+    return owner, repo, ref_and_path[: -(len(path) + 1)]
+
+
+class _LoopState:
+    """Client + concurrency limit bound to one event loop."""
+
+    def __init__(self, concurrency: int):
+        limits = httpx.Limits(
+            max_connections=concurrency,
+            max_keepalive_connections=concurrency,
+        )
+        self.client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=limits,
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            follow_redirects=True,
+        )
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+
+class GitHubFetcher(LoggerMixin):
+    """Shared, connection-pooled GitHub HTTP client."""
+
+    MAX_RETRIES = 4
+    MAX_BACKOFF_SECONDS = 60.0
+
+    def __init__(self):
+        self.concurrency = settings.GITHUB_FETCH_CONCURRENCY
+        self.etag_cache_max_bytes = settings.GITHUB_ETAG_CACHE_MAX_BYTES
+        # asyncio clients cannot be shared across loops: keep one per loop,
+        # dropped automatically when the loop is garbage-collected
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._etags: "OrderedDict[str, Tuple[str, bytes, Dict[str, str]]]" = OrderedDict()
+        self._etag_bytes = 0
+        self._etags_lock = threading.Lock()
+        self._stats = {"requests": 0, "not_modified": 0, "retries": 0, "archives": 0}
+
+    # ------------------------------------------------------------------ #
+    # Internals
+    # ------------------------------------------------------------------ #
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = _LoopState(self.concurrency)
+            self._states[loop] = state
+        return state
+
+    def _auth_headers(self, url: str, github_token: Optional[str]) -> Dict[str, str]:
+        """Attach the token only for GitHub hosts — never leak it to other URLs."""
+        token = github_token or settings.GITHUB_TOKEN
+        if token and urlparse(url).hostname in GITHUB_HOSTS:
+            return {"Authorization": f"Bearer {token}"}
+        return {}
+
+    @staticmethod
+    def _etag_key(url: str, params: Optional[dict], headers: Dict[str, str]) -> str:
+        # Scope by credentials so one tenant's private content never answers another's request
+        raw = f"{url}|{sorted((params or {}).items())}|{headers.get('Authorization', '')}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, response: httpx.Response) -> None:
+        etag = response.headers.get("etag")
+        if not etag or len(response.content) > self.etag_cache_max_bytes:
+            return
+        with self._etags_lock:
+            previous = self._etags.pop(key, None)
+            if previous:
+                self._etag_bytes -= len(previous[1])
+            self._etags[key] = (
+                etag, response.content, {"content-type": response.headers.get("content-type", "")}
+            )
+            self._etag_bytes += len(response.content)
+            while self._etag_bytes > self.etag_cache_max_bytes:
+                _, (_, content, _) = self._etags.popitem(last=False)
+                self._etag_bytes -= len(content)
+
+    @staticmethod
+    def _is_rate_limited(response: httpx.Response) -> bool:
+        if response.status_code == 429:
+            return True
+        # 403 is also used for permission errors — only retry real rate limits
+        return response.status_code == 403 and (
+            "retry-after" in response.headers
+            or response.headers.get("x-ratelimit-remaining") == "0"
+        )
+
+    def _retry_delay(self, response: Optional[httpx.Response], attempt: int) -> float:
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.MAX_BACKOFF_SECONDS)
+            reset = response.headers.get("x-ratelimit-reset")
+            if response.headers.get("x-ratelimit-remaining") == "0" and reset and reset.isdigit():
+                return min(max(float(reset) - time.time(), 1.0), self.MAX_BACKOFF_SECONDS)
+        return min(2.0 ** attempt, self.MAX_BACKOFF_SECONDS) + random.uniform(0, 0.5)
+
+    # ------------------------------------------------------------------ #
+    # Client lifecycle
+    # ------------------------------------------------------------------ #
+
+    async def aclose(self) -> None:
+        """Close the running loop's client (a later request opens a new one)."""
+        state = self._states.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state.client.aclose()
+
+    def run(self, coro):
+        """
+        asyncio.run() for sync callers: run `coro` on a fresh loop and close
+        the client it opened there, so one-shot loops don't leak connections.
+        """
+        async def main():
+            try:
+                return await coro
+            finally:
+                await self.aclose()
+
+        return asyncio.run(main())
+
+    # ------------------------------------------------------------------ #
+    # Requests
+    # ------------------------------------------------------------------ #
+
+    async def get(
+        self,
+        url: str,
+        *,
+        github_token: Optional[str] = None,
+        params: Optional[dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> httpx.Response:
+        """
+        GET with connection pooling, bounded concurrency, conditional
+        requests and retry. A 304 is returned to the caller as the cached 200.
+
+        Raises:
+            httpx.TransportError: if the request still fails after MAX_RETRIES
+        """
+        state = self._state()
+        request_headers = {**(headers or {}), **self._auth_headers(url, github_token)}
+        key = self._etag_key(url, params, request_headers)
+        with self._etags_lock:
+            cached = self._etags.get(key)
+        if cached:
+            request_headers["If-None-Match"] = cached[0]
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            response = None
+            try:
+                async with state.semaphore:
+                    self._stats["requests"] += 1
+                    response = await state.client.get(url, params=params, headers=request_headers)
+            except httpx.TransportError as e:
+                if attempt == self.MAX_RETRIES:
+                    raise
+                self.logger.warning(f"GitHub fetch transport error ({url}): {e}")
+            else:
+                if response.status_code == 304 and cached:
+                    self._stats["not_modified"] += 1
+                    return httpx.Response(
+                        200, content=cached[1], headers=cached[2], request=response.request
+                    )
+                retryable = self._is_rate_limited(response) or response.status_code >= 500
+                if not retryable or attempt == self.MAX_RETRIES:
+                    if response.status_code == 200:
+                        self._remember(key, response)
+                    return response
+
+            self._stats["retries"] += 1
+            delay = self._retry_delay(response, attempt)
+            self.logger.info(
+                f"GitHub fetch retry {attempt + 1}/{self.MAX_RETRIES} in {delay:.1f}s "
+                f"({response.status_code if response is not None else 'transport error'}: {url})"
+            )
+            await asyncio.sleep(delay)
+
+        raise RuntimeError("unreachable")  # loop always returns or raises
+
+    async def fetch_text(self, url: str, *, github_token: Optional[str] = None) -> Optional[str]:
+        """Fetch one file's text content. Returns None on any failure."""
+        if not url:
+            return None
+        try:
+            response = await self.get(url, github_token=github_token)
+            response.raise_for_status()
+            return response.text
+        except Exception as e:
+            self.logger.warning(f"Failed to fetch {url}: {e}")
+            return None
+
+    async def fetch_many(
+        self, urls: Iterable[str], *, github_token: Optional[str] = None
+    ) -> Dict[str, Optional[str]]:
+        """Fetch many files concurrently over the pooled client (bounded by the semaphore)."""
+        unique = list(dict.fromkeys(u for u in urls if u))
+        results = await asyncio.gather(
+            *(self.fetch_text(u, github_token=github_token) for u in unique)
+        )
+        return dict(zip(unique, results))
+
+    # ------------------------------------------------------------------ #
+    # Whole-repository archive
+    # ------------------------------------------------------------------ #
+
+    async def download_archive(
+        self,
+        owner: str,
+        repo: str,
+        ref: str,
+        dest_dir: str,
+        *,
+        github_token: Optional[str] = None,
+        archive_format: str = "tarball",
+    ) -> Path:
+        """
+        Stream the repository at `ref` to disk as a single tarball/zipball and
+        extract it under dest_dir.
+
+        Returns:
+            Path of the extracted repository root
+        """
+        if archive_format not in ("tarball", "zipball"):
+            raise ValueError(f"Unknown archive format: {archive_format}")
+
+        state = self._state()
+        url = f"https://api.github.com/repos/{owner}/{repo}/{archive_format}/{ref}"
+        dest = Path(dest_dir)
+        archive_path = dest / ("repo.tar.gz" if archive_format == "tarball" else "repo.zip")
+        headers = self._auth_headers(url, github_token)
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            async with state.semaphore:
+                async with state.client.stream("GET", url, headers=headers, timeout=300.0) as response:
+                    if response.status_code == 200:
+                        with open(archive_path, "wb") as fh:
+                            async for chunk in response.aiter_bytes(1024 * 1024):
+                                fh.write(chunk)
+                        break
+                    retryable = self._is_rate_limited(response) or response.status_code >= 500
+                    if not retryable or attempt == self.MAX_RETRIES:
+                        await response.aread()
+                        raise httpx.HTTPStatusError(
+                            f"Archive download failed: HTTP {response.status_code} ({url})",
+                            request=response.request, response=response,
+                        )
+            self._stats["retries"] += 1
+            await asyncio.sleep(self._retry_delay(response, attempt))
+
+        self._stats["archives"] += 1
+        extract_dir = dest / "src"
+        await asyncio.to_thread(self._extract, archive_path, extract_dir, archive_format)
+        archive_path.unlink(missing_ok=True)
+
+        # GitHub archives contain one top-level "{owner}-{repo}-{sha}/" directory
+        roots = [p for p in extract_dir.iterdir() if p.is_dir()]
+        root = roots[0] if len(roots) == 1 else extract_dir
+        self.logger.info(f"Downloaded {owner}/{repo}@{ref} as {archive_format} → {root}")
+        return root
+
+    @staticmethod
+    def _extract(archive_path: Path, extract_dir: Path, archive_format: str) -> None:
+        extract_dir.mkdir(parents=True, exist_ok=True)
+        if archive_format == "zipball":
+            with zipfile.ZipFile(archive_path) as zf:
+                zf.extractall(extract_dir)  # zipfile strips absolute and ".." components
+            return
+        with tarfile.open(archive_path, "r:gz") as tf:
+            if hasattr(tarfile, "data_filter"):
+                tf.extractall(extract_dir, filter="data")
+            else:
+                base = extract_dir.resolve()
+                for member in tf.getmembers():
+                    target = (extract_dir / member.name).resolve()
+                    if not str(target).startswith(str(base)) or member.issym() or member.islnk():
+                        raise ValueError(f"Unsafe path in archive: {member.name}")
+                tf.extractall(extract_dir)
+
+    @staticmethod
+    def read_archive_file(root: Path, path: str) -> Optional[str]:
+        """Read one file from an extracted archive; None if it is not there."""
+        target = (root / path).resolve()
+        if not str(target).startswith(str(root.resolve())) or not target.is_file():
+            return None
+        return target.read_bytes().decode("utf-8", errors="replace")
+
+    def get_stats(self) -> dict:
+        return {
+            **self._stats,
+            "http2": HTTP2_AVAILABLE,
+            "concurrency": self.concurrency,
+            "etag_entries": len(self._etags),
+            "etag_bytes": self._etag_bytes,
+        }
+
+
+# Global instance
+github_fetcher = GitHubFetcher()
@@ -0,0 +1,662 @@
+"""
+In-memory adjacency index over ontology relationships.
+
+Multi-hop traversal with per-request SQL (one query per hop, re-run on
+every request) doesn't scale past one hop. Each tenant's relationships are
+held instead as compact CSR arrays — for node i, its outgoing edges are
+out_targets[out_offsets[i]:out_offsets[i + 1]] with relationship type codes
+in out_types (likewise for incoming edges) — so BFS / k-hop, shortest path
+and personalized PageRank run over flat int arrays with no queries at all.
+
+Freshness and sharing across workers (Redis, decode_responses=True):
+
+    graph_index_epoch                    -> global epoch (INCR)
+    graph_index_epoch:{tenant_id}        -> tenant epoch (INCR)
+    graph_index:{tenant_id}:{epoch}      -> hash {meta, data} serialized base index
+    graph_index_log:{tenant_id}:{epoch}  -> list of edge deltas since the epoch began
+
+Committed relationship inserts/deletes (ORM flushes and bulk inserts) are
+appended to the delta log and applied to each worker's copy as an overlay.
+Writes whose edges can't be read from the statement (bulk DELETE, UPDATEs
+of endpoints) bump the epoch, and the next reader rebuilds — once: the base
+is built from a column-only scan, stored under the new epoch and loaded by
+the other workers. Overlays larger than GRAPH_INDEX_COMPACT_THRESHOLD are
+folded back into a fresh base. Without Redis each worker builds its own
+index, applies its own writes and rebuilds after GRAPH_INDEX_LOCAL_TTL_SECONDS.
+
+Edges are treated as a set of (source, target, type) — one row per triple
+is enforced by uq_ontology_relationships_identity, so removing an edge never
+hides a duplicate that still exists. Concept rows are not read, so callers
+resolve names / is_active with one query over the ids a traversal returns.
+"""
+import base64
+import json
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.graph_snapshot_service import ALL_TENANTS, statement_tenants
+
+logger = get_logger("graph_index_service")
+
+_FORMAT_VERSION = 1
+# (attribute, typecode) in serialization order
+_ARRAYS = (
+    ("ids", "q"),
+    ("out_offsets", "q"), ("out_targets", "i"), ("out_types", "H"),
+    ("in_offsets", "q"), ("in_sources", "i"), ("in_types", "H"),
+)
+_DIRECTIONS = ("both", "out", "in")
+_REVERSE = {"both": "both", "out": "in", "in": "out"}
+
+Edge = Tuple[int, int, str]
+
+
+def _csr(rows: array, cols: array, types: array, n: int) -> Tuple[array, array, array]:
+    """Counting-sort (row, col, type) triples into CSR offsets / cols / types."""
+    offsets = array("q", [0]) * (n + 1)
+    for r in rows:
+        offsets[r + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    fill = array("q", offsets)
+    out_cols = array("i", [0]) * len(rows)
+    out_types = array("H", [0]) * len(rows)
+    for r, c, t in zip(rows, cols, types):
+        k = fill[r]
+        out_cols[k] = c
+        out_types[k] = t
+        fill[r] = k + 1
+    return offsets, out_cols, out_types
+
+
+class AdjacencyIndex:
+    """CSR adjacency for one tenant plus an overlay of edges changed since the base was built."""
+
+    def __init__(self, ids: array, types: Sequence[str], out_offsets: array, out_targets: array,
+                 out_types: array, in_offsets: array, in_sources: array, in_types: array,
+                 *, epoch: Optional[str] = None, offset: int = 0):
+        self.ids = ids
+        self.index: Dict[int, int] = {concept_id: i for i, concept_id in enumerate(ids)}
+        self.types: List[str] = list(types)
+        self.type_codes: Dict[str, int] = {t: i for i, t in enumerate(self.types)}
+        self.out_offsets, self.out_targets, self.out_types = out_offsets, out_targets, out_types
+        self.in_offsets, self.in_sources, self.in_types = in_offsets, in_sources, in_types
+        self.base_nodes = len(ids)
+        self.base_edges = len(out_targets)
+        # Overlay: edges added / removed since the base was built
+        self._extra_out: Dict[int, List[Tuple[int, int]]] = {}
+        self._extra_in: Dict[int, List[Tuple[int, int]]] = {}
+        self._removed: set = set()
+        self.overlay_size = 0
+        # Redis epoch and delta-log position this copy reflects
+        self.epoch = epoch
+        self.offset = offset
+        self.built_at = self.checked_at = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Construction / serialization
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, edges: Iterable[Edge], **kwargs) -> "AdjacencyIndex":
+        """Build from (source_concept_id, target_concept_id, relationship_type) rows."""
+        ids, index = array("q"), {}
+        types, type_codes = [], {}
+        src, tgt, typ = array("i"), array("i"), array("H")
+        for source_id, target_id, rel_type in edges:
+            for concept_id in (source_id, target_id):
+                if concept_id not in index:
+                    index[concept_id] = len(ids)
+                    ids.append(concept_id)
+            code = type_codes.get(rel_type)
+            if code is None:
+                code = type_codes[rel_type] = len(types)
+                types.append(rel_type)
+            src.append(index[source_id])
+            tgt.append(index[target_id])
+            typ.append(code)
+        n = len(ids)
+        out_offsets, out_targets, out_types = _csr(src, tgt, typ, n)
+        in_offsets, in_sources, in_types = _csr(tgt, src, typ, n)
+        return cls(ids, types, out_offsets, out_targets, out_types, in_offsets, in_sources, in_types, **kwargs)
+
+    def to_bytes(self) -> Tuple[str, bytes]:
+        """(meta json, zlib-compressed arrays) of the base index (the overlay isn't included)."""
+        arrays = [getattr(self, name) for name, _ in _ARRAYS]
+        meta = {
+            "version": _FORMAT_VERSION,
+            "types": self.types,
+            "lengths": [len(a) for a in arrays],
+            "itemsizes": [a.itemsize for a in arrays],
+            "offset": self.offset,
+        }
+        return json.dumps(meta), zlib.compress(b"".join(a.tobytes() for a in arrays), 1)
+
+    @classmethod
+    def from_bytes(cls, meta_json: str, data: bytes, *, epoch: Optional[str] = None) -> Optional["AdjacencyIndex"]:
+        meta = json.loads(meta_json)
+        arrays = [array(typecode) for _, typecode in _ARRAYS]
+        if meta.get("version") != _FORMAT_VERSION or meta["itemsizes"] != [a.itemsize for a in arrays]:
+            return None  # written by an incompatible worker; rebuild
+        raw, position = zlib.decompress(data), 0
+        for a, length in zip(arrays, meta["lengths"]):
+            size = length * a.itemsize
+            a.frombytes(raw[position:position + size])
+            position += size
+        ids, out_offsets, out_targets, out_types, in_offsets, in_sources, in_types = arrays
+        return cls(ids, meta["types"], out_offsets, out_targets, out_types, in_offsets, in_sources, in_types,
+                   epoch=epoch, offset=meta["offset"])
+
+    # ------------------------------------------------------------------
+    # Overlay updates
+    # ------------------------------------------------------------------
+
+    def _node(self, concept_id: int) -> int:
+        i = self.index.get(concept_id)
+        if i is None:
+            i = self.index[concept_id] = len(self.ids)
+            self.ids.append(concept_id)
+        return i
+
+    def _type(self, rel_type: str) -> int:
+        code = self.type_codes.get(rel_type)
+        if code is None:
+            code = self.type_codes[rel_type] = len(self.types)
+            self.types.append(rel_type)
+        return code
+
+    def _in_base(self, s: int, t: int, code: int) -> bool:
+        if s >= self.base_nodes:
+            return False
+        return any(
+            self.out_targets[k] == t and self.out_types[k] == code
+            for k in range(self.out_offsets[s], self.out_offsets[s + 1])
+        )
+
+    def add_edge(self, source_id: int, target_id: int, rel_type: str) -> None:
+        s, t, code = self._node(source_id), self._node(target_id), self._type(rel_type)
+        if (s, t, code) in self._removed:
+            self._removed.discard((s, t, code))
+        elif not self._in_base(s, t, code) and (t, code) not in self._extra_out.get(s, ()):
+            self._extra_out.setdefault(s, []).append((t, code))
+            self._extra_in.setdefault(t, []).append((s, code))
+        self.overlay_size += 1
+
+    def remove_edge(self, source_id: int, target_id: int, rel_type: str) -> None:
+        s, t = self.index.get(source_id), self.index.get(target_id)
+        code = self.type_codes.get(rel_type)
+        if s is None or t is None or code is None:
+            return
+        if (t, code) in self._extra_out.get(s, ()):
+            self._extra_out[s].remove((t, code))
+            self._extra_in[t].remove((s, code))
+        elif self._in_base(s, t, code):
+            self._removed.add((s, t, code))
+        self.overlay_size += 1
+
+    def apply(self, entries: Iterable[Union[str, Sequence]]) -> None:
+        """Apply delta-log entries: ["+" | "-", source_id, target_id, relationship_type]."""
+        for entry in entries:
+            op, source_id, target_id, rel_type = json.loads(entry) if isinstance(entry, str) else entry
+            if op == "+":
+                self.add_edge(source_id, target_id, rel_type)
+            else:
+                self.remove_edge(source_id, target_id, rel_type)
+
+    # ------------------------------------------------------------------
+    # Adjacency
+    # ------------------------------------------------------------------
+
+    @property
+    def edge_count(self) -> int:
+        return self.base_edges - len(self._removed) + sum(len(e) for e in self._extra_out.values())
+
+    def _codes(self, relationship_types: Optional[Iterable[str]]) -> Optional[set]:
+        if not relationship_types:
+            return None
+        return {self.type_codes[t] for t in relationship_types if t in self.type_codes}
+
+    def _out(self, i: int, codes: Optional[set]) -> Iterator[Tuple[int, int]]:
+        if i < self.base_nodes:
+            removed = self._removed
+            for k in range(self.out_offsets[i], self.out_offsets[i + 1]):
+                code = self.out_types[k]
+                if codes is None or code in codes:
+                    j = self.out_targets[k]
+                    if not removed or (i, j, code) not in removed:
+                        yield j, code
+        for j, code in self._extra_out.get(i, ()):
+            if codes is None or code in codes:
+                yield j, code
+
+    def _in(self, i: int, codes: Optional[set]) -> Iterator[Tuple[int, int]]:
+        if i < self.base_nodes:
+            removed = self._removed
+            for k in range(self.in_offsets[i], self.in_offsets[i + 1]):
+                code = self.in_types[k]
+                if codes is None or code in codes:
+                    j = self.in_sources[k]
+                    if not removed or (j, i, code) not in removed:
+                        yield j, code
+        for j, code in self._extra_in.get(i, ()):
+            if codes is None or code in codes:
+                yield j, code
+
+    def _adjacent(self, i: int, direction: str, codes: Optional[set]) -> Iterator[Tuple[int, int]]:
+        if direction != "in":
+            yield from self._out(i, codes)
+        if direction != "out":
+            yield from self._in(i, codes)
+
+    def neighbors(self, concept_id: int, *, direction: str = "both",
+                  relationship_types: Optional[Iterable[str]] = None) -> List[Tuple[int, str]]:
+        """(neighbor concept id, relationship type) pairs of one concept."""
+        i = self.index.get(concept_id)
+        if i is None:
+            return []
+        codes = self._codes(relationship_types)
+        return [(self.ids[j], self.types[code]) for j, code in self._adjacent(i, direction, codes)]
+
+    def edges_touching(self, concept_ids: Iterable[int], *,
+                       relationship_types: Optional[Iterable[str]] = None) -> List[Edge]:
+        """Distinct (source, target, type) edges with at least one endpoint in concept_ids."""
+        codes = self._codes(relationship_types)
+        edges = set()
+        for concept_id in concept_ids:
+            i = self.index.get(concept_id)
+            if i is None:
+                continue
+            edges.update((i, j, code) for j, code in self._out(i, codes))
+            edges.update((j, i, code) for j, code in self._in(i, codes))
+        return [(self.ids[s], self.ids[t], self.types[code]) for s, t, code in sorted(edges)]
+
+    # ------------------------------------------------------------------
+    # Traversal
+    # ------------------------------------------------------------------
+
+    def bfs(self, seeds: Iterable[int], *, hops: int = 1, direction: str = "both",
+            relationship_types: Optional[Iterable[str]] = None,
+            max_nodes: Optional[int] = None) -> Dict[int, Tuple[int, Optional[int], Optional[str]]]:
+        """
+        Breadth-first expansion from the seeds: {concept_id: (hop, parent concept id,
+        relationship type of the edge it was reached by)}, nearest first, at most
+        max_nodes entries (seeds included).
+        """
+        if direction not in _DIRECTIONS:
+            raise ValueError("direction must be 'both', 'out' or 'in'")
+        codes = self._codes(relationship_types)
+        reached: Dict[int, Tuple[int, Optional[int], Optional[str]]] = {}
+        frontier = []
+        for concept_id in seeds:
+            if concept_id not in reached:
+                reached[concept_id] = (0, None, None)
+                if concept_id in self.index:
+                    frontier.append(self.index[concept_id])
+        for hop in range(1, hops + 1):
+            next_frontier = []
+            for i in frontier:
+                for j, code in self._adjacent(i, direction, codes):
+                    concept_id = self.ids[j]
+                    if concept_id in reached:
+                        continue
+                    if max_nodes and len(reached) >= max_nodes:
+                        return reached
+                    reached[concept_id] = (hop, self.ids[i], self.types[code])
+                    next_frontier.append(j)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return reached
+
+    def k_hop(self, seeds: Iterable[int], hops: int = 1, **kwargs) -> Dict[int, int]:
+        """{concept_id: hop distance} within `hops` of the seeds."""
+        return {concept_id: hop for concept_id, (hop, _, _) in self.bfs(seeds, hops=hops, **kwargs).items()}
+
+    def shortest_path(self, source_id: int, target_id: int, *, direction: str = "both",
+                      relationship_types: Optional[Iterable[str]] = None,
+                      max_hops: int = 6) -> Optional[List[int]]:
+        """Concept ids on a shortest path (bidirectional BFS), or None if none within max_hops."""
+        if direction not in _DIRECTIONS:
+            raise ValueError("direction must be 'both', 'out' or 'in'")
+        if source_id == target_id:
+            return [source_id]
+        s, t = self.index.get(source_id), self.index.get(target_id)
+        if s is None or t is None:
+            return None
+        codes = self._codes(relationship_types)
+        forward, backward = {s: None}, {t: None}
+        forward_frontier, backward_frontier = [s], [t]
+        for _ in range(max_hops):
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meet = self._expand(forward_frontier, forward, backward, direction, codes)
+            else:
+                backward_frontier, meet = self._expand(backward_frontier, backward, forward, _REVERSE[direction], codes)
+            if meet is not None:
+                path, node = [], meet
+                while node is not None:
+                    path.append(node)
+                    node = forward[node]
+                path.reverse()
+                node = backward[meet]
+                while node is not None:
+                    path.append(node)
+                    node = backward[node]
+                return [self.ids[i] for i in path]
+            if not forward_frontier or not backward_frontier:
+                return None
+        return None
+
+    def _expand(self, frontier, parents, other, direction, codes):
+        next_frontier = []
+        for i in frontier:
+            for j, _ in self._adjacent(i, direction, codes):
+                if j not in parents:
+                    parents[j] = i
+                    if j in other:
+                        return next_frontier, j
+                    next_frontier.append(j)
+        return next_frontier, None
+
+    def personalized_pagerank(
+        self, seeds: Union[Iterable[int], Dict[int, float]], *, damping: float = 0.85,
+        epsilon: float = 1e-4, direction: str = "both",
+        relationship_types: Optional[Iterable[str]] = None, top_k: int = 20,
+    ) -> List[Tuple[int, float]]:
+        """
+        Personalized PageRank around the seeds by local forward push: only
+        nodes whose residual exceeds epsilon × degree are visited, so the cost
+        depends on the seeds' neighborhood rather than the graph size.
+        Returns the top_k (concept_id, score) pairs, seeds included.
+        """
+        if direction not in _DIRECTIONS:
+            raise ValueError("direction must be 'both', 'out' or 'in'")
+        weights = seeds if isinstance(seeds, dict) else {concept_id: 1.0 for concept_id in seeds}
+        weights = {self.index[c]: w for c, w in weights.items() if c in self.index and w > 0}
+        if not weights:
+            return []
+        total = sum(weights.values())
+        codes = self._codes(relationship_types)
+        alpha = 1.0 - damping
+
+        adjacency: Dict[int, List[int]] = {}
+
+        def adjacent(i: int) -> List[int]:
+            if i not in adjacency:
+                adjacency[i] = [j for j, _ in self._adjacent(i, direction, codes)]
+            return adjacency[i]
+
+        rank: Dict[int, float] = {}
+        residual = {i: w / total for i, w in weights.items()}
+        queue = deque(residual)
+        while queue:
+            i = queue.popleft()
+            r = residual.get(i, 0.0)
+            nbrs = adjacent(i)
+            if r <= epsilon * max(len(nbrs), 1):
+                continue
+            residual[i] = 0.0
+            if not nbrs:
+                rank[i] = rank.get(i, 0.0) + r
+                continue
+            rank[i] = rank.get(i, 0.0) + alpha * r
+            share = (1.0 - alpha) * r / len(nbrs)
+            for j in nbrs:
+                before = residual.get(j, 0.0)
+                residual[j] = before + share
+                threshold = epsilon * max(len(adjacent(j)), 1)
+                if before <= threshold < residual[j]:
+                    queue.append(j)
+        ranked = sorted(rank.items(), key=lambda kv: (-kv[1], self.ids[kv[0]]))[:top_k]
+        return [(self.ids[i], score) for i, score in ranked]
+
+
+class GraphIndexService:
+    """Per-tenant AdjacencyIndex cache (see module docstring)."""
+
+    def __init__(self):
+        self._indexes: "OrderedDict[int, AdjacencyIndex]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    @property
+    def redis(self):
+        from app.services.cache_service import cache_service
+        return cache_service.redis_client
+
+    @staticmethod
+    def _epoch_keys(tenant_id) -> Tuple[str, str]:
+        return "graph_index_epoch", f"graph_index_epoch:{tenant_id}"
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    def get(self, db: Session, tenant_id: int) -> AdjacencyIndex:
+        """The tenant's index, built or refreshed if needed."""
+        index = self._indexes.get(tenant_id)
+        if index is not None and time.monotonic() - index.checked_at < settings.GRAPH_INDEX_REFRESH_SECONDS:
+            return index
+        with self._lock:
+            index = self._refresh(db, tenant_id, self._indexes.get(tenant_id))
+            self._indexes[tenant_id] = index
+            self._indexes.move_to_end(tenant_id)
+            while len(self._indexes) > settings.GRAPH_INDEX_MAX_TENANTS:
+                self._indexes.popitem(last=False)
+            return index
+
+    def invalidate(self, tenant_id) -> None:
+        """Force a rebuild of a tenant's index (ALL_TENANTS: every tenant's) on next use."""
+        with self._lock:
+            if tenant_id == ALL_TENANTS:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(tenant_id, None)
+        if self.redis is None:
+            return
+        key = self._epoch_keys(tenant_id)[0 if tenant_id == ALL_TENANTS else 1]
+        try:
+            self.redis.incr(key)
+        except RedisError as e:
+            logger.warning(f"Graph index epoch bump failed for tenant {tenant_id}: {e}")
+
+    def record(self, tenant_id: int, entries: List[list]) -> None:
+        """Publish committed edge deltas to the delta log and this worker's copy."""
+        with self._lock:
+            index = self._indexes.get(tenant_id)
+            if index is not None:
+                index.apply(entries)
+        if self.redis is None:
+            return
+        try:
+            epoch = self._get_epoch(tenant_id)
+            log_key = f"graph_index_log:{tenant_id}:{epoch}"
+            pipe = self.redis.pipeline()
+            pipe.rpush(log_key, *(json.dumps(entry) for entry in entries))
+            pipe.expire(log_key, settings.GRAPH_INDEX_TTL_SECONDS)
+            pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Graph index delta log write failed for tenant {tenant_id}: {e}")
+
+    # ------------------------------------------------------------------
+    # Build / load
+    # ------------------------------------------------------------------
+
+    def _get_epoch(self, tenant_id) -> str:
+        global_epoch, tenant_epoch = self.redis.mget(*self._epoch_keys(tenant_id))
+        return f"{global_epoch or 0}.{tenant_epoch or 0}"
+
+    @staticmethod
+    def _build(db: Session, tenant_id: int, **kwargs) -> AdjacencyIndex:
+        from app.models.ontology_relationship import OntologyRelationship
+
+        started = time.perf_counter()
+        rows = db.query(
+            OntologyRelationship.source_concept_id,
+            OntologyRelationship.target_concept_id,
+            OntologyRelationship.relationship_type,
+        ).filter(OntologyRelationship.tenant_id == tenant_id).yield_per(10000)
+        index = AdjacencyIndex.build(rows, **kwargs)
+        logger.info(
+            f"Built graph index for tenant {tenant_id}: {index.base_nodes} nodes, "
+            f"{index.base_edges} edges in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        return index
+
+    def _refresh(self, db: Session, tenant_id: int, index: Optional[AdjacencyIndex]) -> AdjacencyIndex:
+        now = time.monotonic()
+        if self.redis is None:
+            if index is not None and now - index.built_at < settings.GRAPH_INDEX_LOCAL_TTL_SECONDS:
+                index.checked_at = now
+                return index
+            return self._build(db, tenant_id)
+
+        try:
+            epoch = self._get_epoch(tenant_id)
+            base_key, log_key = f"graph_index:{tenant_id}:{epoch}", f"graph_index_log:{tenant_id}:{epoch}"
+            if index is None or index.epoch != epoch:
+                cached = self.redis.hgetall(base_key)
+                index = None
+                if cached.get("data"):
+                    index = AdjacencyIndex.from_bytes(cached["meta"], base64.b64decode(cached["data"]), epoch=epoch)
+                if index is None:
+                    index = self._store(db, tenant_id, epoch)
+            entries = self.redis.lrange(log_key, index.offset, -1)
+            index.apply(entries)
+            index.offset += len(entries)
+            if index.overlay_size > settings.GRAPH_INDEX_COMPACT_THRESHOLD:
+                index = self._store(db, tenant_id, epoch)
+                entries = self.redis.lrange(log_key, index.offset, -1)
+                index.apply(entries)
+                index.offset += len(entries)
+            index.checked_at = now
+            return index
+        except RedisError as e:
+            logger.warning(f"Graph index refresh failed for tenant {tenant_id}: {e}")
+            return index if index is not None else self._build(db, tenant_id)
+
+    def _store(self, db: Session, tenant_id: int, epoch: str) -> AdjacencyIndex:
+        """Build from the database and publish as the base for this epoch."""
+        log_key = f"graph_index_log:{tenant_id}:{epoch}"
+        # Deltas logged from here on may already be in the scan; replaying them is idempotent
+        offset = self.redis.llen(log_key)
+        index = self._build(db, tenant_id, epoch=epoch, offset=offset)
+        meta, data = index.to_bytes()
+        base_key = f"graph_index:{tenant_id}:{epoch}"
+        pipe = self.redis.pipeline()
+        pipe.hset(base_key, mapping={"meta": meta, "data": base64.b64encode(data).decode("ascii")})
+        pipe.expire(base_key, settings.GRAPH_INDEX_TTL_SECONDS)
+        pipe.execute()
+        return index
+
+
+# ----------------------------------------------------------------------
+# Write tracking
+# ----------------------------------------------------------------------
+
+# Session.info key: {tenant_id: [delta entries] or None (rebuild)} for the open transaction
+_PENDING = "graph_index_pending"
+_TABLE = "ontology_relationships"
+_ENDPOINTS = ("source_concept_id", "target_concept_id", "relationship_type")
+
+
+def _pending(session) -> dict:
+    return session.info.setdefault(_PENDING, {})
+
+
+def _log(session, tenant_id, entry) -> None:
+    pending = _pending(session)
+    if tenant_id is None:
+        tenant_id = ALL_TENANTS
+    if tenant_id == ALL_TENANTS:
+        pending[ALL_TENANTS] = None
+    elif pending.get(tenant_id, []) is not None:
+        pending.setdefault(tenant_id, []).append(entry)
+
+
+def _rebuild(session, tenants) -> None:
+    pending = _pending(session)
+    for tenant_id in tenants or {ALL_TENANTS}:
+        pending[tenant_id] = None
+
+
+def _edge(obj, op: str) -> list:
+    return [op, obj.source_concept_id, obj.target_concept_id, obj.relationship_type]
+
+
+def _collect_flushed(session, flush_context) -> None:
+    for obj in session.new:
+        if getattr(obj, "__tablename__", None) == _TABLE:
+            _log(session, obj.tenant_id, _edge(obj, "+"))
+    for obj in session.deleted:
+        if getattr(obj, "__tablename__", None) == _TABLE:
+            _log(session, obj.tenant_id, _edge(obj, "-"))
+    for obj in session.dirty:
+        if getattr(obj, "__tablename__", None) == _TABLE:
+            state = sa_inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in _ENDPOINTS):
+                _rebuild(session, {obj.tenant_id})
+
+
+def _updated_columns(statement) -> set:
+    values = getattr(statement, "_values", None) or {}
+    return {getattr(key, "key", key) for key in values}
+
+
+def _collect_bulk(orm_execute_state) -> None:
+    statement = orm_execute_state.statement
+    if getattr(getattr(statement, "table", None), "name", None) != _TABLE:
+        return
+    session = orm_execute_state.session
+    if orm_execute_state.is_insert:
+        params = orm_execute_state.parameters
+        rows = params if isinstance(params, (list, tuple)) else [params or {}]
+        if rows and all(isinstance(row, dict) and all(k in row for k in _ENDPOINTS) for row in rows):
+            for row in rows:
+                _log(session, row.get("tenant_id"), ["+", *(row[k] for k in _ENDPOINTS)])
+            return
+        _rebuild(session, statement_tenants(orm_execute_state))
+    elif orm_execute_state.is_update:
+        columns = _updated_columns(statement)
+        if not columns or columns & set(_ENDPOINTS):
+            _rebuild(session, statement_tenants(orm_execute_state))
+    elif orm_execute_state.is_delete:
+        _rebuild(session, statement_tenants(orm_execute_state))
+
+
+def _publish_committed(session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+    if ALL_TENANTS in pending:
+        graph_index_service.invalidate(ALL_TENANTS)
+        return
+    for tenant_id, entries in pending.items():
+        if entries is None:
+            graph_index_service.invalidate(tenant_id)
+        elif entries:
+            graph_index_service.record(tenant_id, entries)
+
+
+def _discard_rolled_back(session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+def track_adjacency_writes(session_factory) -> None:
+    """Keep graph indexes fresh from relationship writes committed through these sessions."""
+    event.listen(session_factory, "after_flush", _collect_flushed)
+    event.listen(session_factory, "do_orm_execute", _collect_bulk)
+    event.listen(session_factory, "after_commit", _publish_committed)
+    event.listen(session_factory, "after_rollback", _discard_rolled_back)
+
+
+# Global graph index instance
+graph_index_service = GraphIndexService()
@@ -0,0 +1,397 @@
+"""
+Server-side graph queries for large ontology graphs.
+
+The /graph views return a tenant's whole graph at once; past a few thousand
+concepts that means multi-megabyte responses and a browser that can't lay
+it out. These queries return only what the current view needs:
+
+- node_page / edge_page: keyset (cursor) pages of nodes and of the edges
+  between visible nodes, with column-level field projection
+- neighborhood: k-hop expansion from seed concepts, one indexed frontier
+  query per hop, stopping at max_nodes
+- overview: level-of-detail view — concepts collapsed into super-nodes
+  (label-propagation communities or concept types) with weighted
+  super-edges between them
+
+Everything reads plain columns (never ORM objects). overview holds the
+scope's edges as compact int arrays, and the other queries are bounded
+by page size / max_nodes.
+"""
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, aliased
+
+from app.api.pagination import paginate_query
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.ontology_concept import OntologyConcept
+from app.models.ontology_relationship import OntologyRelationship
+
+logger = get_logger("graph_query_service")
+
+NODE_FIELDS = ("id", "name", "concept_type", "source_type", "initiative_id", "confidence_score", "description")
+EDGE_FIELDS = ("id", "source_concept_id", "target_concept_id", "relationship_type", "confidence_score", "description")
+DEFAULT_NODE_FIELDS = NODE_FIELDS[:-1]
+DEFAULT_EDGE_FIELDS = EDGE_FIELDS[:-1]
+
+# "document" view also shows concepts found in both layers, likewise "code"
+LAYERS = {"document": ("document", "both"), "code": ("code", "both")}
+
+# Label propagation passes; communities are stable well before this in practice
+_LPA_MAX_ITERATIONS = 10
+_CHUNK = 1000
+
+
+def _project(fields: Optional[Iterable[str]], allowed: Sequence[str], default: Sequence[str],
+             required: Sequence[str]) -> List[str]:
+    """Validated field list (order kept, required fields first)."""
+    if not fields:
+        return list(default)
+    wanted = [f.strip() for f in fields if f and f.strip()]
+    unknown = [f for f in wanted if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return list(dict.fromkeys([*required, *wanted]))
+
+
+def _chunks(items: List[int], size: int = _CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class GraphQueryService:
+    """Paged, neighborhood and level-of-detail graph queries (see module docstring)."""
+
+    # ------------------------------------------------------------------
+    # Scope
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _scoped(query, concept, tenant_id: int, initiative_id: Optional[int], layer: Optional[str]):
+        """Same visibility as the /graph views: active, project + unscoped, optional layer."""
+        query = query.filter(concept.tenant_id == tenant_id, concept.is_active == True)
+        if initiative_id is not None:
+            query = query.filter(or_(concept.initiative_id == initiative_id, concept.initiative_id.is_(None)))
+        if layer:
+            if layer not in LAYERS:
+                raise ValueError(f"Unknown layer '{layer}'. Allowed: {', '.join(LAYERS)}")
+            query = query.filter(concept.source_type.in_(LAYERS[layer]))
+        return query
+
+    def _visible_edges(self, db: Session, tenant_id: int, initiative_id, layer, columns):
+        """Relationship query restricted to edges whose endpoints are both visible."""
+        src, tgt = aliased(OntologyConcept), aliased(OntologyConcept)
+        query = (
+            db.query(*columns)
+            .join(src, src.id == OntologyRelationship.source_concept_id)
+            .join(tgt, tgt.id == OntologyRelationship.target_concept_id)
+            .filter(OntologyRelationship.tenant_id == tenant_id)
+        )
+        query = self._scoped(query, src, tenant_id, initiative_id, layer)
+        return self._scoped(query, tgt, tenant_id, initiative_id, layer)
+
+    # ------------------------------------------------------------------
+    # Cursor pages
+    # ------------------------------------------------------------------
+
+    def node_page(
+        self, db: Session, tenant_id: int, *, initiative_id: Optional[int] = None,
+        layer: Optional[str] = None, cursor: Optional[int] = None, page_size: int = 500,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Any]:
+        """One page of nodes in id order; next_cursor is the last id returned."""
+        columns = _project(fields, NODE_FIELDS, DEFAULT_NODE_FIELDS, ("id",))
+        query = self._scoped(
+            db.query(*(getattr(OntologyConcept, f) for f in columns)),
+            OntologyConcept, tenant_id, initiative_id, layer,
+        )
+        page = paginate_query(query, OntologyConcept.id, cursor=cursor, page_size=page_size, direction="asc")
+        page["items"] = [row._asdict() for row in page["items"]]
+        return page
+
+    def edge_page(
+        self, db: Session, tenant_id: int, *, initiative_id: Optional[int] = None,
+        layer: Optional[str] = None, cursor: Optional[int] = None, page_size: int = 1000,
+        fields: Optional[Iterable[str]] = None, relationship_types: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """One page of edges between visible nodes in id order."""
+        columns = _project(fields, EDGE_FIELDS, DEFAULT_EDGE_FIELDS,
+                           ("id", "source_concept_id", "target_concept_id"))
+        query = self._visible_edges(
+            db, tenant_id, initiative_id, layer, [getattr(OntologyRelationship, f) for f in columns],
+        )
+        if relationship_types:
+            query = query.filter(OntologyRelationship.relationship_type.in_(relationship_types))
+        page = paginate_query(query, OntologyRelationship.id, cursor=cursor, page_size=page_size, direction="asc")
+        page["items"] = [row._asdict() for row in page["items"]]
+        return page
+
+    # ------------------------------------------------------------------
+    # k-hop neighborhood
+    # ------------------------------------------------------------------
+
+    def neighborhood(
+        self, db: Session, tenant_id: int, seeds: List[int], *, hops: int = 1,
+        max_nodes: Optional[int] = None, direction: str = "both",
+        relationship_types: Optional[List[str]] = None, initiative_id: Optional[int] = None,
+        layer: Optional[str] = None, fields: Optional[Iterable[str]] = None,
+        edge_fields: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Concepts within `hops` of the seeds (breadth-first, nearest first) and
+        the edges among them. Each node carries its hop distance; `truncated`
+        is set when max_nodes cut the expansion short.
+        """
+        if direction not in ("both", "out", "in"):
+            raise ValueError("direction must be 'both', 'out' or 'in'")
+        hops = max(0, min(hops, settings.GRAPH_QUERY_MAX_HOPS))
+        max_nodes = min(max_nodes or settings.GRAPH_QUERY_MAX_NODES, settings.GRAPH_QUERY_MAX_NODES)
+        node_columns = _project(fields, NODE_FIELDS, DEFAULT_NODE_FIELDS, ("id",))
+        edge_columns = _project(edge_fields, EDGE_FIELDS, DEFAULT_EDGE_FIELDS,
+                                ("id", "source_concept_id", "target_concept_id"))
+
+        # Seeds must themselves be visible
+        seed_rows = self._scoped(
+            db.query(OntologyConcept.id).filter(OntologyConcept.id.in_(list(dict.fromkeys(seeds))[:max_nodes])),
+            OntologyConcept, tenant_id, initiative_id, layer,
+        ).all()
+        distance: Dict[int, int] = {row.id: 0 for row in seed_rows}
+        frontier = sorted(distance)
+        truncated = False
+
+        for hop in range(1, hops + 1):
+            if not frontier or truncated:
+                break
+            found = []
+            for column, other in self._hop_columns(direction):
+                other_concept = aliased(OntologyConcept)
+                for chunk in _chunks(frontier):
+                    query = (
+                        db.query(other)
+                        .join(other_concept, other_concept.id == other)
+                        .filter(OntologyRelationship.tenant_id == tenant_id, column.in_(chunk))
+                    )
+                    if relationship_types:
+                        query = query.filter(OntologyRelationship.relationship_type.in_(relationship_types))
+                    query = self._scoped(query, other_concept, tenant_id, initiative_id, layer)
+                    found.extend(row[0] for row in query.distinct())
+            frontier = []
+            for concept_id in sorted(set(found)):
+                if concept_id in distance:
+                    continue
+                if len(distance) >= max_nodes:
+                    truncated = True
+                    break
+                distance[concept_id] = hop
+                frontier.append(concept_id)
+
+        ids = list(distance)
+        nodes = []
+        for chunk in _chunks(ids):
+            rows = db.query(*(getattr(OntologyConcept, f) for f in node_columns)).filter(
+                OntologyConcept.id.in_(chunk)
+            )
+            nodes.extend({**row._asdict(), "hop": distance[row.id]} for row in rows)
+        nodes.sort(key=lambda n: (n["hop"], n["id"]))
+
+        edges = []
+        id_set = set(ids)
+        edge_query_columns = [getattr(OntologyRelationship, f) for f in edge_columns]
+        for chunk in _chunks(ids):
+            query = db.query(*edge_query_columns).filter(
+                OntologyRelationship.tenant_id == tenant_id,
+                OntologyRelationship.source_concept_id.in_(chunk),
+            )
+            if relationship_types:
+                query = query.filter(OntologyRelationship.relationship_type.in_(relationship_types))
+            edges.extend(row._asdict() for row in query if row.target_concept_id in id_set)
+        edges.sort(key=lambda e: e["id"])
+
+        return {
+            "seeds": sorted(row.id for row in seed_rows),
+            "hops": hops,
+            "nodes": nodes,
+            "edges": edges,
+            "total_nodes": len(nodes),
+            "total_edges": len(edges),
+            "truncated": truncated,
+        }
+
+    @staticmethod
+    def _hop_columns(direction: str):
+        """(frontier column, neighbor column) pairs to follow for a direction."""
+        out = (OntologyRelationship.source_concept_id, OntologyRelationship.target_concept_id)
+        inc = (OntologyRelationship.target_concept_id, OntologyRelationship.source_concept_id)
+        return {"out": [out], "in": [inc], "both": [out, inc]}[direction]
+
+    # ------------------------------------------------------------------
+    # Level of detail
+    # ------------------------------------------------------------------
+
+    def overview(
+        self, db: Session, tenant_id: int, *, initiative_id: Optional[int] = None,
+        layer: Optional[str] = None, cluster_by: str = "community",
+        max_clusters: int = 50, top_members: int = 5,
+    ) -> Dict[str, Any]:
+        """
+        Super-node view of the scope. cluster_by="community" groups densely
+        connected concepts (label propagation over the undirected graph);
+        "type" groups by concept_type. Clusters past max_clusters (smallest
+        first) are folded into one "other" super-node. Each super-node lists
+        its highest-degree members, which make good seeds for neighborhood().
+        """
+        if cluster_by not in ("community", "type"):
+            raise ValueError("cluster_by must be 'community' or 'type'")
+
+        # Dense indices: ids[i] is the concept id of node i
+        ids = array("q")
+        types: List[str] = []
+        index: Dict[int, int] = {}
+        node_query = self._scoped(
+            db.query(OntologyConcept.id, OntologyConcept.concept_type),
+            OntologyConcept, tenant_id, initiative_id, layer,
+        ).order_by(OntologyConcept.id)
+        for concept_id, concept_type in node_query.yield_per(5000):
+            index[concept_id] = len(ids)
+            ids.append(concept_id)
+            types.append(concept_type)
+        n = len(ids)
+
+        sources, targets = array("l"), array("l")
+        edge_query = self._visible_edges(
+            db, tenant_id, initiative_id, layer,
+            [OntologyRelationship.source_concept_id, OntologyRelationship.target_concept_id],
+        )
+        for source_id, target_id in edge_query.yield_per(10000):
+            if source_id != target_id:
+                sources.append(index[source_id])
+                targets.append(index[target_id])
+
+        # Undirected CSR adjacency
+        degree = array("l", [0]) * n
+        for s, t in zip(sources, targets):
+            degree[s] += 1
+            degree[t] += 1
+        offsets = array("l", [0]) * (n + 1)
+        for i in range(n):
+            offsets[i + 1] = offsets[i] + degree[i]
+        neighbors = array("l", [0]) * offsets[n]
+        fill = array("l", offsets[:n]) if n else array("l")
+        for s, t in zip(sources, targets):
+            neighbors[fill[s]] = t
+            fill[s] += 1
+            neighbors[fill[t]] = s
+            fill[t] += 1
+        del sources, targets, fill
+
+        if cluster_by == "type":
+            type_ids = {t: i for i, t in enumerate(sorted(set(types)))}
+            labels = array("l", (type_ids[t] for t in types))
+            names = {i: t for t, i in type_ids.items()}
+        else:
+            labels = self._label_propagation(n, offsets, neighbors, degree)
+            names = {}
+
+        # Rank clusters by size; fold the tail into "other"
+        sizes = Counter(labels)
+        ranked = [label for label, _ in sorted(sizes.items(), key=lambda kv: (-kv[1], kv[0]))]
+        keep = ranked[:max_clusters] if len(ranked) <= max_clusters else ranked[:max_clusters - 1]
+        cluster_of = {label: position for position, label in enumerate(keep)}
+        other = len(keep) if len(ranked) > len(keep) else None
+
+        def cluster(i: int) -> int:
+            return cluster_of.get(labels[i], other)
+
+        members: Dict[int, List[int]] = {}
+        type_counts: Dict[int, Counter] = {}
+        for i in range(n):
+            c = cluster(i)
+            members.setdefault(c, []).append(i)
+            type_counts.setdefault(c, Counter())[types[i]] += 1
+
+        super_edges: Counter = Counter()
+        for i in range(n):
+            ci = cluster(i)
+            for j in neighbors[offsets[i]:offsets[i + 1]]:
+                if i < j and ci != cluster(j):
+                    super_edges[(min(ci, cluster(j)), max(ci, cluster(j)))] += 1
+
+        top = {
+            c: sorted(nodes, key=lambda i: (-degree[i], ids[i]))[:top_members]
+            for c, nodes in members.items()
+        }
+        top_ids = [ids[i] for chosen in top.values() for i in chosen]
+        top_names = {}
+        for chunk in _chunks(top_ids):
+            top_names.update(db.query(OntologyConcept.id, OntologyConcept.name).filter(OntologyConcept.id.in_(chunk)))
+
+        super_nodes = []
+        for c in sorted(members, key=lambda c: (c == other, -len(members[c]))):
+            leaders = [{"id": ids[i], "name": top_names.get(ids[i]), "degree": degree[i]} for i in top[c]]
+            if c == other:
+                label = "Other"
+            elif cluster_by == "type":
+                label = names[keep[c]]
+            else:
+                label = leaders[0]["name"] if leaders else f"Cluster {c}"
+            internal = sum(degree[i] for i in members[c]) - sum(w for (a, b), w in super_edges.items() if c in (a, b))
+            super_nodes.append({
+                "id": f"cluster:{c}" if c != other else "cluster:other",
+                "label": label,
+                "size": len(members[c]),
+                "internal_edges": internal // 2,
+                "type_distribution": dict(type_counts[c].most_common()),
+                "top_members": leaders,
+            })
+
+        def node_key(c):
+            return "cluster:other" if c == other else f"cluster:{c}"
+
+        return {
+            "cluster_by": cluster_by,
+            "super_nodes": super_nodes,
+            "super_edges": [
+                {"source": node_key(a), "target": node_key(b), "weight": w}
+                for (a, b), w in sorted(super_edges.items(), key=lambda kv: -kv[1])
+            ],
+            "total_nodes": n,
+            "total_edges": offsets[n] // 2 if n else 0,
+        }
+
+    @staticmethod
+    def _label_propagation(n: int, offsets: array, neighbors: array, degree: array) -> array:
+        """
+        Deterministic asynchronous label propagation. Each node starts with
+        the label of the highest-degree node in its closed neighborhood (so
+        communities grow from local hubs rather than from whichever id is
+        smallest), then repeatedly takes the most common neighbor label,
+        keeping its own on ties (otherwise the smallest tied label).
+        """
+        labels = array("l", range(n))
+        for i in range(n):
+            best = i
+            for j in neighbors[offsets[i]:offsets[i + 1]]:
+                if degree[j] > degree[best]:
+                    best = j
+            labels[i] = best
+        for _ in range(_LPA_MAX_ITERATIONS):
+            changed = 0
+            for i in range(n):
+                start, end = offsets[i], offsets[i + 1]
+                if start == end:
+                    continue
+                counts = Counter(labels[j] for j in neighbors[start:end])
+                best = max(counts.values())
+                if counts.get(labels[i], 0) == best:
+                    continue
+                labels[i] = min(label for label, count in counts.items() if count == best)
+                changed += 1
+            if not changed:
+                break
+        return labels
+
+# Global graph query instance
+graph_query_service = GraphQueryService()
@@ -0,0 +1,259 @@
+"""
+Materialized graph snapshots for the ontology graph views.
+
+/ontology/graph, /graph/document, /graph/code, /graph/brain, /graph/meta
+and /graph/system/{repo_id} rebuild their payloads from full tenant scans.
+The result only changes when the tenant's graph data does, so each view is
+built once per graph version and kept in Redis as gzip-compressed JSON:
+
+    graph_snapshot_epoch                                  -> global epoch (INCR)
+    graph_snapshot_epoch:{tenant_id}                      -> tenant epoch (INCR)
+    graph_snapshot:{tenant_id}:{epoch}:{view}:{scope}     -> hash {etag, body}
+
+Invalidation is O(1): sessions registered with track_graph_writes() record
+which tenants' graph tables (concepts, relationships, mappings, projects,
+repositories, code components) a transaction touched — ORM flushes and bulk
+UPDATE/DELETE/INSERT statements alike — and bump those tenants' epochs once
+it commits. Nothing is rebuilt eagerly; the next request for a view builds
+it under the new epoch and older snapshots age out by TTL. A bulk statement
+whose tenant can't be read from its parameters bumps the global epoch.
+
+Responses carry a content-hash ETag, so If-None-Match gets a 304 without
+the body being read, and clients that accept gzip get the stored bytes as is.
+Without Redis every request builds its payload; ETag/304 still apply.
+"""
+import base64
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("graph_snapshot_service")
+
+# Tables whose rows feed the graph views
+GRAPH_TABLES = frozenset({
+    "ontology_concepts",
+    "ontology_relationships",
+    "concept_mappings",
+    "cross_project_mappings",
+    "initiatives",
+    "initiative_assets",
+    "repositories",
+    "code_components",
+})
+
+# Session.info key: tenant ids (or ALL_TENANTS) changed in the open transaction
+_CHANGED = "graph_snapshot_changed_tenants"
+ALL_TENANTS = "*"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, lists and * allowed)."""
+    if not if_none_match or not etag:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+@dataclass
+class GraphSnapshot:
+    etag: str
+    body: bytes  # gzip-compressed JSON
+    hit: bool = False
+
+    def json_bytes(self) -> bytes:
+        return gzip.decompress(self.body)
+
+
+class GraphSnapshotService:
+    """Versioned, compressed per-tenant graph payloads (see module docstring)."""
+
+    @property
+    def redis(self):
+        from app.services.cache_service import cache_service
+        return cache_service.redis_client
+
+    @property
+    def enabled(self) -> bool:
+        return settings.GRAPH_SNAPSHOT_ENABLED and self.redis is not None
+
+    # ------------------------------------------------------------------
+    # Versioning
+    # ------------------------------------------------------------------
+
+    def get_epoch(self, tenant_id: int) -> str:
+        global_epoch, tenant_epoch = self.redis.mget(
+            "graph_snapshot_epoch", f"graph_snapshot_epoch:{tenant_id}"
+        )
+        return f"{global_epoch or 0}.{tenant_epoch or 0}"
+
+    def bump_epoch(self, tenant_id) -> None:
+        """Invalidate a tenant's snapshots (ALL_TENANTS: every tenant's)."""
+        if not tenant_id or not self.enabled:
+            return
+        key = "graph_snapshot_epoch" if tenant_id == ALL_TENANTS else f"graph_snapshot_epoch:{tenant_id}"
+        try:
+            self.redis.incr(key)
+        except RedisError as e:
+            logger.warning(f"Graph snapshot epoch bump failed for tenant {tenant_id}: {e}")
+
+    @staticmethod
+    def mark_changed(db, tenant_id) -> None:
+        """Record a graph write the session events can't see (e.g. raw SQL)."""
+        db.info.setdefault(_CHANGED, set()).add(tenant_id or ALL_TENANTS)
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _scope(params: Dict[str, Any]) -> str:
+        raw = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def encode(payload: Any) -> GraphSnapshot:
+        data = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+        return GraphSnapshot(etag=etag, body=gzip.compress(data, compresslevel=5))
+
+    def get(
+        self, tenant_id: int, view: str, params: Dict[str, Any], build: Callable[[], Any],
+        *, if_none_match: Optional[str] = None,
+    ) -> GraphSnapshot:
+        """
+        The snapshot for (view, params), building and storing it on a miss.
+        If `if_none_match` equals the stored ETag the body isn't read
+        (the returned snapshot has an empty body).
+        """
+        key = None
+        if self.enabled:
+            try:
+                key = f"graph_snapshot:{tenant_id}:{self.get_epoch(tenant_id)}:{view}:{self._scope(params)}"
+                if if_none_match:
+                    etag = self.redis.hget(key, "etag")
+                    if etag_matches(if_none_match, etag):
+                        return GraphSnapshot(etag=etag, body=b"", hit=True)
+                cached = self.redis.hgetall(key)
+                if cached.get("body"):
+                    return GraphSnapshot(etag=cached["etag"], body=base64.b64decode(cached["body"]), hit=True)
+            except RedisError as e:
+                logger.warning(f"Graph snapshot read failed for {view} (tenant {tenant_id}): {e}")
+                key = None
+
+        snapshot = self.encode(build())
+        if key:
+            try:
+                pipe = self.redis.pipeline()
+                pipe.hset(key, mapping={"etag": snapshot.etag, "body": base64.b64encode(snapshot.body).decode("ascii")})
+                pipe.expire(key, settings.GRAPH_SNAPSHOT_TTL_SECONDS)
+                pipe.execute()
+            except RedisError as e:
+                logger.warning(f"Graph snapshot write failed for {view} (tenant {tenant_id}): {e}")
+        return snapshot
+
+    def serve(
+        self, request: Request, tenant_id: int, view: str, params: Dict[str, Any], build: Callable[[], Any],
+    ) -> Response:
+        """Serve a graph view from its snapshot, honouring If-None-Match and Accept-Encoding."""
+        if_none_match = request.headers.get("if-none-match")
+        snapshot = self.get(tenant_id, view, params, build, if_none_match=if_none_match)
+        headers = {
+            "ETag": snapshot.etag,
+            "Cache-Control": "private, no-cache",
+            "Vary": "Accept-Encoding",
+            "X-Graph-Snapshot": "hit" if snapshot.hit else "miss",
+        }
+        if etag_matches(if_none_match, snapshot.etag):
+            return Response(status_code=304, headers=headers)
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=snapshot.body, media_type="application/json", headers=headers)
+        return Response(content=snapshot.json_bytes(), media_type="application/json", headers=headers)
+
+
+# ----------------------------------------------------------------------
+# Write tracking
+# ----------------------------------------------------------------------
+
+def _row_tenant(obj) -> Any:
+    try:
+        return getattr(obj, "tenant_id", None) or ALL_TENANTS
+    except Exception:
+        return ALL_TENANTS
+
+
+def _collect_flushed(session, flush_context) -> None:
+    changed = None
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if getattr(obj, "__tablename__", None) in GRAPH_TABLES:
+            if changed is None:
+                changed = session.info.setdefault(_CHANGED, set())
+            changed.add(_row_tenant(obj))
+
+
+def statement_tenants(orm_execute_state) -> set:
+    """Tenant ids a bulk statement is scoped to: tenant_id = :x filters or inserted values."""
+    statement = orm_execute_state.statement
+    tenants = set()
+    if orm_execute_state.is_insert:
+        params = orm_execute_state.parameters
+        rows = params if isinstance(params, (list, tuple)) else [params or {}]
+        tenants.update(row.get("tenant_id") for row in rows if isinstance(row, dict))
+        compiled = statement.compile(dialect=orm_execute_state.session.get_bind().dialect).params
+        tenants.update(v for k, v in compiled.items() if k == "tenant_id" or k.startswith("tenant_id_m"))
+    elif statement.whereclause is not None:
+        for node in visitors.iterate(statement.whereclause):
+            if (isinstance(node, BinaryExpression) and node.operator is operators.eq
+                    and getattr(node.left, "key", None) == "tenant_id"
+                    and isinstance(node.right, BindParameter)):
+                tenants.add(node.right.effective_value)
+    tenants.discard(None)
+    return tenants
+
+
+def _collect_bulk(orm_execute_state) -> None:
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if getattr(table, "name", None) not in GRAPH_TABLES:
+        return
+    tenants = statement_tenants(orm_execute_state)
+    orm_execute_state.session.info.setdefault(_CHANGED, set()).update(tenants or {ALL_TENANTS})
+
+
+def _bump_committed(session) -> None:
+    changed = session.info.pop(_CHANGED, None)
+    if not changed:
+        return
+    if ALL_TENANTS in changed:
+        changed = {ALL_TENANTS}
+    for tenant_id in changed:
+        graph_snapshot_service.bump_epoch(tenant_id)
+
+
+def _discard_rolled_back(session) -> None:
+    session.info.pop(_CHANGED, None)
+
+
+def track_graph_writes(session_factory) -> None:
+    """Bump graph snapshot epochs for tenants whose graph rows a committed transaction changed."""
+    event.listen(session_factory, "after_flush", _collect_flushed)
+    event.listen(session_factory, "do_orm_execute", _collect_bulk)
+    event.listen(session_factory, "after_commit", _bump_committed)
+    event.listen(session_factory, "after_rollback", _discard_rolled_back)
+
+
+# Global graph snapshot instance
+graph_snapshot_service = GraphSnapshotService()
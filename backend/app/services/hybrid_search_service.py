@@ -0,0 +1,211 @@
+"""
+Hybrid retrieval: lexical and vector candidates fused with reciprocal rank fusion.
+
+Every source (concepts, graphs, documents, segments, code) has a lexical
+retriever (full-text, ILIKE before migration s9h1) and, where the source
+has embeddings and pgvector is available, a vector retriever. All of them
+run concurrently, each on its own pooled session (StageExecutor),
+and their ranked lists are fused into one global ranking:
+
+    rrf(item) = sum over retrievers that returned item of 1 / (k + rank)
+
+RRF only looks at ranks, so cosine similarities and ts_rank_cd scores never
+have to be put on one scale, and an item two retrievers agree on outranks
+one that only a single retriever found.
+
+Optional rerank: fused results are re-scored by the share of query terms
+their title/text contain, blended with the normalized RRF score
+(HYBRID_RERANK_WEIGHT). Cheap — no model call.
+
+Each result keeps its per-source scores ({"rrf", "vector", "lexical",
+"rerank"}) and the rank each retriever gave it.
+"""
+import re
+from functools import partial
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.embedding_service import _check_pgvector_available
+from app.services.semantic_search_service import semantic_search_service
+from app.services.stage_executor import StageExecutor
+
+logger = get_logger("hybrid_search_service")
+
+# unified_search category filter -> result "category"
+SOURCES = {
+    "concepts": "concept",
+    "documents": "document",
+    "segments": "segment",
+    "code": "code",
+    "graphs": "graph",
+}
+
+# Result fields the reranker reads
+_RERANK_FIELDS = ("name", "title", "filename", "description", "summary", "snippet", "text", "location")
+
+_TERM = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by do does for from how in is it of on or that the this "
+    "to was what when where which who why with".split()
+)
+
+
+def _terms(text: str) -> set:
+    return {t for t in _TERM.findall(text.lower()) if len(t) > 1 and t not in _STOPWORDS}
+
+
+def reciprocal_rank_fusion(
+    ranked: Dict[str, List[Hashable]], k: Optional[int] = None,
+) -> Dict[Hashable, Tuple[float, Dict[str, int]]]:
+    """
+    Fuse ranked lists ({retriever: [item, ...]}, best first) into
+    {item: (score, {retriever: rank})}, best first. Ranks are 1-based;
+    ties keep the order items were first seen in.
+    """
+    k = settings.HYBRID_RRF_K if k is None else k
+    scores: Dict[Hashable, float] = {}
+    ranks: Dict[Hashable, Dict[str, int]] = {}
+    for retriever, items in ranked.items():
+        for rank, item in enumerate(items, 1):
+            item_ranks = ranks.setdefault(item, {})
+            if retriever in item_ranks:
+                continue
+            item_ranks[retriever] = rank
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    order = sorted(scores, key=lambda item: -scores[item])
+    return {item: (scores[item], ranks[item]) for item in order}
+
+
+class HybridSearchService:
+    """Concurrent lexical + vector retrieval with one globally ranked result list."""
+
+    def _retrievers(self, db, sources, *, initiative_id, recall, candidates) -> List[tuple]:
+        """(source, retriever, fn) for each candidate list; fn(db, query, tenant_id)."""
+        search = semantic_search_service
+        concept_filters = dict(
+            concept_type=None, source_type=None, initiative_id=initiative_id,
+            min_confidence=0.0, limit=candidates,
+        )
+        plan = []
+        # Vector first: when both find an item, its vector row (with similarity) is kept
+        if "concepts" in sources:
+            if _check_pgvector_available(db, "ontology_concepts"):
+                plan.append(("concepts", "vector",
+                             partial(search._vector_search_concepts, recall=recall, **concept_filters)))
+            plan.append(("concepts", "lexical", partial(search._text_search_concepts, **concept_filters)))
+        if "graphs" in sources:
+            if _check_pgvector_available(db, "knowledge_graph_versions"):
+                plan.append(("graphs", "vector",
+                             partial(search._vector_search_graphs, source_type=None, limit=candidates, recall=recall)))
+            plan.append(("graphs", "lexical",
+                         partial(search._text_search_graphs, source_type=None, limit=candidates)))
+        if "documents" in sources:
+            plan.append(("documents", "lexical", partial(search.search_documents, limit=candidates)))
+        if "segments" in sources:
+            plan.append(("segments", "lexical", partial(search.search_document_segments, limit=candidates)))
+        if "code" in sources:
+            plan.append(("code", "lexical", partial(search.search_code_components, limit=candidates)))
+        return plan
+
+    def search(
+        self,
+        db,
+        query: str,
+        tenant_id: int,
+        *,
+        categories: Optional[List[str]] = None,
+        initiative_id: Optional[int] = None,
+        limit: int = 30,
+        recall: Optional[str] = None,
+        rerank: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """
+        Search all sources (or `categories`) and return one ranked list.
+        `rerank` defaults to HYBRID_RERANK_ENABLED.
+
+        Returns:
+            {
+                "query": str,
+                "total_count": int,
+                "results": [{category, relevance, scores, ranks, ...source fields}],
+                "facets": {"concepts": N, "documents": N, "segments": N, "code": N, "graphs": N},
+                "retrieval": {"timings_ms": {...}, "timed_out": [...], "failed": [...]}
+            }
+        """
+        sources = [source for source in SOURCES if not categories or source in categories]
+        candidates = max(settings.HYBRID_SEARCH_CANDIDATES, limit // max(1, len(sources)))
+        plan = self._retrievers(
+            db, sources, initiative_id=initiative_id, recall=recall, candidates=candidates,
+        )
+
+        stages = StageExecutor(
+            db,
+            parallel=settings.RAG_PARALLEL_STAGES,
+            timeout=settings.RAG_STAGE_TIMEOUT_SECONDS,
+        )
+        for source, retriever, fn in plan:
+            stages.submit(f"{source}.{retriever}", fn, query, tenant_id)
+
+        ranked: Dict[str, List[tuple]] = {}
+        rows: Dict[tuple, Dict[str, Any]] = {}
+        raw_scores: Dict[tuple, Dict[str, Any]] = {}
+        for source, retriever, _fn in plan:
+            name = f"{source}.{retriever}"
+            ranked[name] = []
+            for row in stages.result(name, []):
+                key = (source, row["id"])
+                ranked[name].append(key)
+                rows.setdefault(key, row)
+                if retriever == "vector":
+                    score = row.get("similarity")
+                else:
+                    score = row.get("lexical_score", row.get("relevance"))
+                raw_scores.setdefault(key, {})[retriever] = score
+
+        fused = reciprocal_rank_fusion(ranked)
+        top = next(iter(fused.values()))[0] if fused else 1.0
+
+        results = []
+        facets = {source: 0 for source in SOURCES}
+        for key, (score, ranks) in fused.items():
+            source = key[0]
+            facets[source] += 1
+            row = dict(rows[key])
+            row["category"] = SOURCES[source]
+            row["scores"] = {"rrf": round(score, 6), **raw_scores[key]}
+            row["ranks"] = {name.split(".", 1)[1]: rank for name, rank in ranks.items()}
+            row["relevance"] = round(score / top, 4)
+            results.append(row)
+
+        if settings.HYBRID_RERANK_ENABLED if rerank is None else rerank:
+            self._rerank(query, results)
+
+        return {
+            "query": query,
+            "total_count": len(results[:limit]),
+            "results": results[:limit],
+            "facets": facets,
+            "retrieval": {
+                "timings_ms": dict(stages.timings),
+                "timed_out": list(stages.timed_out),
+                "failed": list(stages.failed),
+            },
+        }
+
+    def _rerank(self, query: str, results: List[Dict[str, Any]]) -> None:
+        """Blend query-term coverage into each result's relevance and re-sort in place."""
+        terms = _terms(query)
+        if not terms:
+            return
+        weight = settings.HYBRID_RERANK_WEIGHT
+        for row in results:
+            text = " ".join(str(row[f]) for f in _RERANK_FIELDS if row.get(f))
+            coverage = len(terms & _terms(text)) / len(terms)
+            row["scores"]["rerank"] = round(coverage, 4)
+            row["relevance"] = round((1 - weight) * row["relevance"] + weight * coverage, 4)
+        results.sort(key=lambda row: -row["relevance"])
+
+
+# Global hybrid search instance
+hybrid_search_service = HybridSearchService()
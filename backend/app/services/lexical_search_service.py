@@ -0,0 +1,82 @@
+"""
+Lexical (full-text) search layer over PostgreSQL tsvector + GIN indexes.
+
+Migration s9h1 adds a weighted `search_vector` tsvector to ontology_concepts,
+code_components, documents (generated columns, so Postgres keeps them in
+sync on every insert/update) and document_segments (trigger-maintained,
+since a segment's text lives in its parent document's raw_text). Each has
+a GIN index; pg_trgm GIN indexes on names back fuzzy matching.
+
+build() returns the WHERE condition, rank expression and params for one
+table so search functions can splice them into their own SQL. It returns
+None when the column isn't there (pre-migration database, SQLite) — the
+caller keeps its ILIKE path for that case.
+
+Ranking is ts_rank_cd with length normalization (BM25-like: dense matches
+in short fields win), plus trigram similarity on the name when fuzzy
+matching is available.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from app.db.capabilities import db_capabilities
+
+FTS_CONFIG = "english"
+
+# ts_rank_cd normalization: 1 = divide by 1 + log(document length), 32 = scale to 0..1
+RANK_NORMALIZATION = 1 | 32
+
+# mode -> tsquery built from :fts_q
+#   all: web-search syntax, every term must match ("quotes", -exclusion, or)
+#   any: any term matches, ranking sorts out the best — for natural-language
+#        questions, where requiring every word of the question finds nothing
+_TSQUERY = {
+    "all": f"websearch_to_tsquery('{FTS_CONFIG}', :fts_q)",
+    "any": f"replace(plainto_tsquery('{FTS_CONFIG}', :fts_q)::text, ' & ', ' | ')::tsquery",
+}
+
+
+@dataclass
+class LexicalMatch:
+    """SQL fragments for one full-text match; params must be merged into the query's."""
+    where: str
+    rank: str
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+class LexicalSearchService:
+    """Builds full-text match/rank SQL when the search columns exist."""
+
+    def available(self, db, table: str) -> bool:
+        return db_capabilities.get(db).column_types.get(f"{table}.search_vector") == "tsvector"
+
+    def fuzzy_available(self, db) -> bool:
+        return db_capabilities.get(db).pg_trgm
+
+    def build(
+        self, db, table: str, alias: str, query: str, *,
+        mode: str = "all", fuzzy_column: Optional[str] = None,
+    ) -> Optional[LexicalMatch]:
+        """
+        Full-text condition + rank for `alias` (a `table` row), or None when
+        the table has no search_vector. `fuzzy_column` adds pg_trgm matching
+        on that column (typo-tolerant names) if the extension is installed.
+        """
+        if not query or not query.strip() or not self.available(db, table):
+            return None
+
+        tsquery = _TSQUERY[mode]
+        where = f"{alias}.search_vector @@ {tsquery}"
+        rank = f"ts_rank_cd({alias}.search_vector, {tsquery}, {RANK_NORMALIZATION})"
+        params: Dict[str, Any] = {"fts_q": query}
+
+        if fuzzy_column and self.fuzzy_available(db):
+            where = f"({where} OR {alias}.{fuzzy_column} % :fts_raw)"
+            rank = f"({rank} + similarity({alias}.{fuzzy_column}, :fts_raw))"
+            params["fts_raw"] = query[:200]
+
+        return LexicalMatch(where=where, rank=rank, params=params)
+
+
+# Global lexical search instance
+lexical_search_service = LexicalSearchService()
@@ -19,8 +19,6 @@ Also provides mismatch detection via pure graph comparison (FREE):
   - Contradictions: mappings with relationship_type == "contradicts"
 """
 
-import re
-import time
 import json
 import asyncio
 from typing import List, Dict, Tuple, Optional
@@ -29,50 +27,15 @@ from sqlalchemy.orm import Session
 from app import crud
 from app.models.ontology_concept import OntologyConcept
 from app.core.logging import LoggerMixin
-
-
-def _normalize(name: str) -> str:
-    """Normalize a concept name for comparison: lowercase, strip, remove punctuation."""
-    n = name.strip().lower()
-    # Replace underscores, hyphens, dots with spaces
-    n = re.sub(r'[_\-.]', ' ', n)
-    # Remove extra whitespace
-    n = re.sub(r'\s+', ' ', n).strip()
-    return n
-
-
-def _tokenize(name: str) -> set:
-    """Split a normalized name into tokens for overlap comparison."""
-    normalized = _normalize(name)
-    # Split on spaces and remove very short tokens (1 char)
-    tokens = {t for t in normalized.split() if len(t) > 1}
-    return tokens
-
-
-def _levenshtein_distance(s1: str, s2: str) -> int:
-    """Compute Levenshtein edit distance between two strings."""
-    if len(s1) < len(s2):
-        return _levenshtein_distance(s2, s1)
-    if len(s2) == 0:
-        return len(s1)
-    prev_row = range(len(s2) + 1)
-    for i, c1 in enumerate(s1):
-        curr_row = [i + 1]
-        for j, c2 in enumerate(s2):
-            insertions = prev_row[j + 1] + 1
-            deletions = curr_row[j] + 1
-            substitutions = prev_row[j] + (c1 != c2)
-            curr_row.append(min(insertions, deletions, substitutions))
-        prev_row = curr_row
-    return prev_row[-1]
-
-
-def _levenshtein_similarity(s1: str, s2: str) -> float:
-    """Normalized Levenshtein similarity (0.0 to 1.0)."""
-    max_len = max(len(s1), len(s2))
-    if max_len == 0:
-        return 1.0
-    return 1.0 - (_levenshtein_distance(s1, s2) / max_len)
+# Name helpers live in fuzzy_matcher (shared with CrossProjectMappingService);
+# the underscore aliases stay importable from here for existing callers
+from app.services.fuzzy_matcher import (  # noqa: F401
+    FuzzyIndex,
+    normalize_name as _normalize,
+    tokenize_name as _tokenize,
+    levenshtein_distance as _levenshtein_distance,
+    levenshtein_similarity as _levenshtein_similarity,
+)
 
 
 class MappingService(LoggerMixin):
@@ -157,10 +120,10 @@ class MappingService(LoggerMixin):
         self.logger.info(f"Starting 3-tier mapping for tenant {tenant_id}")
 
         doc_concepts = crud.ontology_concept.get_by_source_type(
-            db=db, source_type="document", tenant_id=tenant_id, limit=1000
+            db=db, source_type="document", tenant_id=tenant_id, limit=None
         )
         code_concepts = crud.ontology_concept.get_by_source_type(
-            db=db, source_type="code", tenant_id=tenant_id, limit=1000
+            db=db, source_type="code", tenant_id=tenant_id, limit=None
         )
 
         if not doc_concepts or not code_concepts:
@@ -183,6 +146,10 @@ class MappingService(LoggerMixin):
         mapped_doc_ids = set()
         mapped_code_ids = set()
 
+        # Tier 1/2 writes are collected and applied in bulk after Tier 2
+        pending_mappings: List[Dict] = []
+        promote_ids = set()
+
         # Build lookup for code concepts
         code_by_normalized = {}
         for cc in code_concepts:
@@ -198,26 +165,19 @@ class MappingService(LoggerMixin):
                 for cc in code_by_normalized[dc_norm]:
                     if cc.id in mapped_code_ids:
                         continue
-                    crud.concept_mapping.create_mapping(
-                        db=db,
-                        document_concept_id=dc.id,
-                        code_concept_id=cc.id,
-                        mapping_method="exact",
-                        confidence_score=1.0,
-                        status="confirmed",  # Exact matches auto-confirm
-                        relationship_type="implements",
-                        tenant_id=tenant_id,
-                    )
+                    pending_mappings.append({
+                        "document_concept_id": dc.id,
+                        "code_concept_id": cc.id,
+                        "mapping_method": "exact",
+                        "confidence_score": 1.0,
+                        "status": "confirmed",  # Exact matches auto-confirm
+                        "relationship_type": "implements",
+                    })
                     mapped_doc_ids.add(dc.id)
                     mapped_code_ids.add(cc.id)
                     exact_count += 1
                     # Promote both concepts to "both" since exact name match
-                    crud.ontology_concept.promote_to_both(
-                        db=db, concept_id=dc.id, tenant_id=tenant_id
-                    )
-                    crud.ontology_concept.promote_to_both(
-                        db=db, concept_id=cc.id, tenant_id=tenant_id
-                    )
+                    promote_ids.update((dc.id, cc.id))
 
         self.logger.info(f"Tier 1 (exact): {exact_count} matches")
 
@@ -228,61 +188,31 @@ class MappingService(LoggerMixin):
         unmapped_codes = [cc for cc in code_concepts if cc.id not in mapped_code_ids]
         ambiguous_pairs = []  # For Tier 3
 
-        for dc in unmapped_docs:
-            dc_tokens = _tokenize(dc.name)
-            dc_norm = _normalize(dc.name)
-            best_match = None
-            best_score = 0.0
-
-            for cc in unmapped_codes:
-                if cc.id in mapped_code_ids:
-                    continue
-
-                cc_tokens = _tokenize(cc.name)
-                cc_norm = _normalize(cc.name)
-
-                # Token overlap score
-                if dc_tokens and cc_tokens:
-                    overlap = len(dc_tokens & cc_tokens)
-                    union = len(dc_tokens | cc_tokens)
-                    token_score = overlap / union if union > 0 else 0.0
-                else:
-                    token_score = 0.0
-
-                # Levenshtein similarity
-                lev_score = _levenshtein_similarity(dc_norm, cc_norm)
+        # Candidates come from a token/trigram index instead of scoring every pair
+        code_index = FuzzyIndex(unmapped_codes)
 
-                # Combined score (weighted)
-                combined = max(token_score, lev_score)
-
-                if combined > best_score:
-                    best_score = combined
-                    best_match = cc
+        for dc in unmapped_docs:
+            best_match, best_score = code_index.best_match(
+                dc.name, min_score=self.FUZZY_MEDIUM_CONFIDENCE, exclude_ids=mapped_code_ids
+            )
 
             if best_match and best_score >= self.FUZZY_HIGH_CONFIDENCE:
                 # High confidence fuzzy — auto-create as candidate (will confirm if > 0.7)
                 status = "confirmed" if best_score >= 0.70 else "candidate"
-                crud.concept_mapping.create_mapping(
-                    db=db,
-                    document_concept_id=dc.id,
-                    code_concept_id=best_match.id,
-                    mapping_method="fuzzy",
-                    confidence_score=round(best_score, 3),
-                    status=status,
-                    relationship_type="implements",
-                    tenant_id=tenant_id,
-                )
+                pending_mappings.append({
+                    "document_concept_id": dc.id,
+                    "code_concept_id": best_match.id,
+                    "mapping_method": "fuzzy",
+                    "confidence_score": round(best_score, 3),
+                    "status": status,
+                    "relationship_type": "implements",
+                })
                 mapped_doc_ids.add(dc.id)
                 mapped_code_ids.add(best_match.id)
                 fuzzy_count += 1
 
                 if status == "confirmed" and best_score >= 0.80:
-                    crud.ontology_concept.promote_to_both(
-                        db=db, concept_id=dc.id, tenant_id=tenant_id
-                    )
-                    crud.ontology_concept.promote_to_both(
-                        db=db, concept_id=best_match.id, tenant_id=tenant_id
-                    )
+                    promote_ids.update((dc.id, best_match.id))
 
             elif best_match and best_score >= self.FUZZY_MEDIUM_CONFIDENCE:
                 # Ambiguous — queue for AI validation (Tier 3)
@@ -293,6 +223,8 @@ class MappingService(LoggerMixin):
             f"{len(ambiguous_pairs)} ambiguous pairs queued for AI"
         )
 
+        self._write_mappings(db, tenant_id=tenant_id, mappings=pending_mappings, promote_ids=promote_ids)
+
         # ============================
         # TIER 3: AI VALIDATION (PAID — only for ambiguous pairs)
         # ============================
@@ -332,6 +264,28 @@ class MappingService(LoggerMixin):
             "ai_output_tokens": ai_output_tokens,
         }
 
+    def _write_mappings(
+        self, db: Session, *, tenant_id: int, mappings: List[Dict], promote_ids: set
+    ) -> None:
+        """
+        Apply Tier 1/2 results in one transaction: a multi-row upsert for the
+        mappings and one set-based UPDATE for source_type promotion.
+        """
+        try:
+            crud.concept_mapping.bulk_upsert_mappings(
+                db=db, mappings=mappings, tenant_id=tenant_id, commit=False
+            )
+            crud.ontology_concept.promote_many_to_both(
+                db=db, concept_ids=list(promote_ids), tenant_id=tenant_id, commit=False
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        self.logger.info(
+            f"Wrote {len(mappings)} mappings, promoted {len(promote_ids)} concepts to 'both'"
+        )
+
     def run_incremental_mapping(
         self, db: Session, *, concept_ids: List[int], tenant_id: int
     ) -> Dict:
@@ -347,6 +301,8 @@ class MappingService(LoggerMixin):
         )
 
         mapped_count = 0
+        # One index per opposite layer, shared by every concept in this batch
+        indexes: Dict[str, FuzzyIndex] = {}
 
         for concept_id in concept_ids:
             concept = crud.ontology_concept.get(
@@ -357,45 +313,19 @@ class MappingService(LoggerMixin):
 
             # Determine which graph to search against
             if concept.source_type == "code":
-                targets = crud.ontology_concept.get_by_source_type(
-                    db=db, source_type="document", tenant_id=tenant_id, limit=1000
-                )
+                target_type = "document"
             elif concept.source_type == "document":
-                targets = crud.ontology_concept.get_by_source_type(
-                    db=db, source_type="code", tenant_id=tenant_id, limit=1000
-                )
+                target_type = "code"
             else:
                 continue
 
-            concept_norm = _normalize(concept.name)
-            concept_tokens = _tokenize(concept.name)
-            best_match = None
-            best_score = 0.0
-
-            for target in targets:
-                target_norm = _normalize(target.name)
-
-                # Exact check
-                if concept_norm == target_norm:
-                    best_match = target
-                    best_score = 1.0
-                    break
-
-                # Fuzzy check
-                target_tokens = _tokenize(target.name)
-                if concept_tokens and target_tokens:
-                    overlap = len(concept_tokens & target_tokens)
-                    union = len(concept_tokens | target_tokens)
-                    token_score = overlap / union if union > 0 else 0.0
-                else:
-                    token_score = 0.0
-
-                lev_score = _levenshtein_similarity(concept_norm, target_norm)
-                combined = max(token_score, lev_score)
-
-                if combined > best_score:
-                    best_score = combined
-                    best_match = target
+            if target_type not in indexes:
+                indexes[target_type] = FuzzyIndex(crud.ontology_concept.get_by_source_type(
+                    db=db, source_type=target_type, tenant_id=tenant_id, limit=None
+                ))
+            best_match, best_score = indexes[target_type].best_match(
+                concept.name, min_score=self.FUZZY_HIGH_CONFIDENCE
+            )
 
             if best_match and best_score >= self.FUZZY_HIGH_CONFIDENCE:
                 doc_id = concept.id if concept.source_type == "document" else best_match.id
@@ -520,8 +450,6 @@ RESPONSE FORMAT (valid JSON array):
 PAIRS TO VALIDATE:
 {json.dumps(pair_data, indent=2)}"""
 
-        time.sleep(4)  # Rate limiting
-
         try:
             response = asyncio.run(gemini_service.generate_content(prompt))
             cleaned = repair_json_response(response.text)
@@ -0,0 +1,130 @@
+"""
+Ontology Ingestion Unit of Work
+
+Extraction passes (code analysis, document graph building, branch preview
+promotion) used to call get_or_create() / create_if_not_exists() once per
+concept and edge, each with its own lookup and commits. An
+OntologyIngestBatch collects everything one pass produces and writes it in
+one go:
+
+    batch = OntologyIngestBatch(tenant_id, "code", initiative_id=...,
+                                source_component_id=component.id)
+    a = batch.concept("PaymentService", "Service", confidence_score=0.9)
+    b = batch.concept("Invoice", "Entity")
+    batch.relationship(a, b, "creates")
+    ids = batch.flush(db)          # one commit
+
+flush() resolves existing concepts with one SELECT per chunk, inserts new
+ones with INSERT ... ON CONFLICT DO NOTHING RETURNING, merges confidence
+and source links into existing rows with one UPDATE, then does the same
+for relationships.
+"""
+from typing import Dict, List, Optional, Union
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.crud.crud_ontology_concept import concept_identity
+from app.core.logging import get_logger
+
+logger = get_logger("ontology_ingest_service")
+
+# A relationship endpoint: a key returned by OntologyIngestBatch.concept(),
+# or the id of a concept that already exists
+ConceptRef = Union[tuple, int]
+
+
+class OntologyIngestBatch:
+    """Collects concepts and relationships from one extraction pass; flush() writes them."""
+
+    def __init__(
+        self, tenant_id: int, source_type: str = "document", *,
+        initiative_id: Optional[int] = None,
+        source_component_id: Optional[int] = None,
+        source_document_id: Optional[int] = None,
+    ):
+        if not tenant_id:
+            raise ValueError("tenant_id is REQUIRED for OntologyIngestBatch")
+        self.tenant_id = tenant_id
+        self.source_type = source_type
+        self.initiative_id = initiative_id
+        self.source_component_id = source_component_id
+        self.source_document_id = source_document_id
+        self.concepts: List[Dict] = []
+        self.relationships: List[Dict] = []
+        self._keys: set = set()
+
+    def concept(
+        self, name: str, concept_type: str, *,
+        description: Optional[str] = None, confidence_score: Optional[float] = None,
+    ) -> Optional[tuple]:
+        """Queue a concept; returns its key (for relationship()), or None for a blank name."""
+        name = (name or "").strip()
+        if not name:
+            return None
+        key = concept_identity(name, concept_type, self.source_type, self.initiative_id)
+        self._keys.add(key)
+        self.concepts.append({
+            "name": name,
+            "concept_type": concept_type,
+            "description": description,
+            "confidence_score": confidence_score,
+            "source_type": self.source_type,
+            "initiative_id": self.initiative_id,
+            "source_component_id": self.source_component_id,
+            "source_document_id": self.source_document_id,
+        })
+        return key
+
+    def relationship(
+        self, source: ConceptRef, target: ConceptRef, relationship_type: str, *,
+        description: Optional[str] = None, confidence_score: Optional[float] = None,
+    ) -> bool:
+        """Queue an edge between two queued concepts (or existing concept ids)."""
+        if source is None or target is None or source == target:
+            return False
+        for ref in (source, target):
+            if not isinstance(ref, int) and ref not in self._keys:
+                raise KeyError(f"Concept {ref!r} was not queued in this batch")
+        self.relationships.append({
+            "source": source,
+            "target": target,
+            "relationship_type": relationship_type,
+            "description": description,
+            "confidence_score": confidence_score,
+        })
+        return True
+
+    def flush(self, db: Session, *, commit: bool = True) -> Dict[tuple, int]:
+        """
+        Write the queued concepts and relationships. Returns {concept key: id}.
+        The batch is emptied, so it can be reused for a further pass.
+        """
+        ids = crud.ontology_concept.bulk_get_or_create(
+            db, concepts=self.concepts, tenant_id=self.tenant_id, commit=False,
+        )
+        edges = []
+        for rel in self.relationships:
+            source = rel["source"] if isinstance(rel["source"], int) else ids.get(rel["source"])
+            target = rel["target"] if isinstance(rel["target"], int) else ids.get(rel["target"])
+            if source is None or target is None:
+                continue
+            edges.append({
+                "source_concept_id": source,
+                "target_concept_id": target,
+                "relationship_type": rel["relationship_type"],
+                "description": rel["description"],
+                "confidence_score": rel["confidence_score"],
+            })
+        created = crud.ontology_relationship.bulk_create_if_not_exists(
+            db, relationships=edges, tenant_id=self.tenant_id, commit=False,
+        )
+        if commit:
+            db.commit()
+
+        logger.debug(
+            f"Ontology batch flushed: {len(ids)} concepts, {len(edges)} relationships "
+            f"({created} new) for tenant {self.tenant_id}"
+        )
+        self.concepts, self.relationships, self._keys = [], [], set()
+        return ids
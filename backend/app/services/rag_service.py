@@ -18,15 +18,81 @@ Enhanced 6-Stage Pipeline:
 import json
 import re
 import time
+from contextlib import aclosing
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass, field
+from functools import lru_cache
 from sqlalchemy.orm import Session
 from sqlalchemy import text as sql_text
 
+from app.core.config import settings
 from app.core.logging import logger
+from app.services.lexical_search_service import lexical_search_service
+from app.services.stage_executor import StageExecutor
 from app import crud
 
 
+# -------------------------------------------------------------------
+# Prompt rendering
+# -------------------------------------------------------------------
+
+# Prompt sections in render order: (attribute, max items shown, header).
+# Sections with a header render one line per item under it; the others
+# render each item as its own block.
+PROMPT_SECTIONS = (
+    ("live_data", 5, None),  # operational/billing/stats data — highest priority, show first
+    ("concepts", 20, "KNOWLEDGE BASE CONCEPTS:"),
+    ("relationships", 15, "CONCEPT RELATIONSHIPS:"),
+    ("cross_graph_links", 10, "CROSS-GRAPH LINKS (Document ↔ Code):"),
+    ("analysis_summaries", 3, None),
+    ("document_segments", 5, None),
+    ("code_summaries", 5, None),
+    ("requirement_traces", 8, "REQUIREMENT COVERAGE:"),
+)
+
+_COVERAGE_ICONS = {"fully_covered": "✓", "partially_covered": "◐", "not_covered": "✗", "contradicted": "⚠"}
+
+
+def _render_item(section: str, item: Dict) -> str:
+    """Prompt text for one retrieved item."""
+    if section == "live_data":
+        return f"{item.get('label', 'SYSTEM DATA')}:\n{item.get('content', '')}"
+    if section == "concepts":
+        desc = (item.get("description") or "")[:120]
+        return f"  - {item['name']} ({item.get('concept_type', '?')}): {desc}"
+    if section == "relationships":
+        return f"  - {item['source']} --[{item['type']}]--> {item['target']}"
+    if section == "cross_graph_links":
+        return (
+            f"  - [Doc] {item['doc_concept']} --[{item['relationship_type']}]--> "
+            f"[Code] {item['code_concept']} (confidence: {item.get('confidence', '?')})"
+        )
+    if section == "analysis_summaries":
+        return f"ANALYSIS SUMMARY: {item.get('document_name', 'Document')}\n{item.get('summary', '')[:500]}"
+    if section == "document_segments":
+        return f"DOCUMENT: {item.get('title', 'Document Segment')}\n{item.get('text', '')[:500]}"
+    if section == "code_summaries":
+        text = item.get("summary", "")[:400]
+        structured = item.get("structured_analysis_summary", "")
+        if structured:
+            text += f"\n  Key elements: {structured[:200]}"
+        return f"CODE FILE: {item.get('name', 'File')}\n{text}"
+    if section == "requirement_traces":
+        status_icon = _COVERAGE_ICONS.get(item.get("coverage_status", ""), "?")
+        return (
+            f"  - [{status_icon}] {item['requirement_key']}: {item.get('requirement_text', '')[:100]} "
+            f"({item.get('coverage_status', 'unknown')})"
+        )
+    raise ValueError(f"Unknown prompt section: {section}")
+
+
+@lru_cache(maxsize=8192)
+def _count_tokens(text: str) -> int:
+    """Tokens in one rendered item (cached — the same concepts and files recur across chats)."""
+    from app.services.cost_service import cost_service
+    return cost_service.count_tokens(text)
+
+
 # -------------------------------------------------------------------
 # Data classes
 # -------------------------------------------------------------------
@@ -44,72 +110,39 @@ class RetrievedContext:
     live_data: List[Dict] = field(default_factory=list)   # operational/billing/stats data
     pending_approvals: List[Dict] = field(default_factory=list)  # approvals assigned to current user
     token_estimate: int = 0
+    stage_timings_ms: Dict[str, float] = field(default_factory=dict)  # per retrieval stage
+    retrieval_ms: float = 0.0  # wall-clock time of retrieve_context
+    timed_out_stages: List[str] = field(default_factory=list)
+    vector_search: bool = False  # pgvector concept search was available
+    prompt_text: Optional[str] = None  # assembled by the token budgeter (RAGService._trim_context)
+
+    def render_items(self) -> Dict[str, List[str]]:
+        """Each prompt section's items rendered on their own (display caps applied)."""
+        return {
+            section: [_render_item(section, item) for item in getattr(self, section)[:cap]]
+            for section, cap, _header in PROMPT_SECTIONS
+        }
 
-    def to_prompt_text(self) -> str:
-        """Format retrieved context as a text block for the AI prompt."""
+    @staticmethod
+    def assemble_prompt(rendered: Dict[str, List[str]]) -> str:
+        """Join rendered items into the prompt text, in section order."""
         sections = []
-
-        # Live operational data (billing, stats, usage) — highest priority, show first
-        if self.live_data:
-            for ld in self.live_data[:5]:
-                label = ld.get("label", "SYSTEM DATA")
-                content = ld.get("content", "")
-                sections.append(f"{label}:\n{content}")
-
-        if self.concepts:
-            lines = []
-            for c in self.concepts[:20]:
-                desc = (c.get("description") or "")[:120]
-                lines.append(f"  - {c['name']} ({c.get('concept_type', '?')}): {desc}")
-            sections.append("KNOWLEDGE BASE CONCEPTS:\n" + "\n".join(lines))
-
-        if self.relationships:
-            lines = [
-                f"  - {r['source']} --[{r['type']}]--> {r['target']}"
-                for r in self.relationships[:15]
-            ]
-            sections.append("CONCEPT RELATIONSHIPS:\n" + "\n".join(lines))
-
-        if self.cross_graph_links:
-            lines = []
-            for link in self.cross_graph_links[:10]:
-                lines.append(
-                    f"  - [Doc] {link['doc_concept']} --[{link['relationship_type']}]--> "
-                    f"[Code] {link['code_concept']} (confidence: {link.get('confidence', '?')})"
-                )
-            sections.append("CROSS-GRAPH LINKS (Document ↔ Code):\n" + "\n".join(lines))
-
-        if self.analysis_summaries:
-            for a in self.analysis_summaries[:3]:
-                doc_name = a.get("document_name", "Document")
-                summary = a.get("summary", "")[:500]
-                sections.append(f"ANALYSIS SUMMARY: {doc_name}\n{summary}")
-
-        if self.document_segments:
-            for seg in self.document_segments[:5]:
-                title = seg.get("title", "Document Segment")
-                text = seg.get("text", "")[:500]
-                sections.append(f"DOCUMENT: {title}\n{text}")
-
-        if self.code_summaries:
-            for cs in self.code_summaries[:5]:
-                name = cs.get("name", "File")
-                summary = cs.get("summary", "")[:400]
-                structured = cs.get("structured_analysis_summary", "")
-                text = summary
-                if structured:
-                    text += f"\n  Key elements: {structured[:200]}"
-                sections.append(f"CODE FILE: {name}\n{text}")
-
-        if self.requirement_traces:
-            lines = []
-            for rt in self.requirement_traces[:8]:
-                status_icon = {"fully_covered": "✓", "partially_covered": "◐", "not_covered": "✗", "contradicted": "⚠"}.get(rt.get("coverage_status", ""), "?")
-                lines.append(f"  - [{status_icon}] {rt['requirement_key']}: {rt.get('requirement_text', '')[:100]} ({rt.get('coverage_status', 'unknown')})")
-            sections.append("REQUIREMENT COVERAGE:\n" + "\n".join(lines))
-
+        for section, _cap, header in PROMPT_SECTIONS:
+            parts = rendered.get(section)
+            if not parts:
+                continue
+            if header:
+                sections.append(header + "\n" + "\n".join(parts))
+            else:
+                sections.extend(parts)
         return "\n\n".join(sections) if sections else "No relevant context found in the knowledge base."
 
+    def to_prompt_text(self) -> str:
+        """Format retrieved context as a text block for the AI prompt."""
+        if self.prompt_text is not None:
+            return self.prompt_text
+        return self.assemble_prompt(self.render_items())
+
     def to_summary_dict(self) -> dict:
         """Summary of what context was used (stored on the message)."""
         return {
@@ -125,6 +158,10 @@ class RetrievedContext:
             "top_concepts": [c["name"] for c in self.concepts[:5]],
             "live_data_labels": [ld.get("label", "") for ld in self.live_data[:3]],
             "pending_approval_count": len(self.pending_approvals),
+            "retrieval_ms": self.retrieval_ms,
+            "stage_timings_ms": dict(self.stage_timings_ms),
+            "timed_out_stages": list(self.timed_out_stages),
+            "vector_search": self.vector_search,
         }
 
 
@@ -132,6 +169,142 @@ class RetrievedContext:
 # RAG Service
 # -------------------------------------------------------------------
 
+class AnswerStream:
+    """
+    One streamed chat answer, returned by RAGService.stream_answer().
+
+    Iterating yields {"type": "token", "text": ...} events as the model
+    produces them. Claude falls back to Gemini only if it fails before its
+    first token, since text already sent to the client can't be taken back.
+
+    `result` has the same keys as generate_answer's return value. It is final
+    once iteration finishes; if the stream is closed early it describes the
+    partial answer, with token counts estimated from the text produced so
+    far. aclose() cancels the upstream model call. result["completed"] is
+    True only for an answer the model finished without error.
+    """
+
+    def __init__(self, service: "RAGService", provider_router, prompt: str,
+                 context: RetrievedContext, *, use_claude: bool,
+                 tenant_id: int, user_id: int):
+        self._service = service
+        self._router = provider_router
+        self._prompt = prompt
+        self._context = context
+        self._tenant_id = tenant_id
+        self._user_id = user_id
+        self._start_time = time.time()
+        self.provider = "claude" if use_claude else "gemini"
+        self.parts: List[str] = []
+        self.usage: Optional[Dict[str, int]] = None
+        self.error: Optional[str] = None
+        self.completed = False
+        self._events = self._run(use_claude)
+
+    def __aiter__(self):
+        return self._events
+
+    async def aclose(self) -> None:
+        await self._events.aclose()
+
+    async def _run(self, use_claude: bool):
+        try:
+            if use_claude:
+                try:
+                    async with aclosing(self._router.claude.stream_content(self._prompt)) as stream:
+                        async for event in stream:
+                            if self._record(event):
+                                yield event
+                    self.completed = True
+                    return
+                except Exception as e:
+                    if self.parts:
+                        raise
+                    logger.warning(f"Claude stream failed, falling back to Gemini: {e}")
+                    self.provider = "gemini"
+                    self.usage = None
+
+            gemini_stream = self._router.gemini.stream_content(
+                self._prompt,
+                tenant_id=self._tenant_id,
+                user_id=self._user_id,
+                operation="chat_response",
+            )
+            async with aclosing(gemini_stream) as stream:
+                async for event in stream:
+                    if self._record(event):
+                        yield event
+            self.completed = True
+        except Exception as e:
+            logger.error(f"RAG streaming failed: {e}")
+            self.error = str(e)[:200]
+
+    def _record(self, event: Dict[str, Any]) -> bool:
+        """Track stream state; True for events that go on to the caller."""
+        if event["type"] == "token":
+            self.parts.append(event["text"])
+            return True
+        if event["type"] == "usage":
+            self.usage = event
+        return False
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    @property
+    def result(self) -> Dict[str, Any]:
+        answer_text = self.text
+        if self.error and not answer_text:
+            return {
+                "answer": f"I encountered an error while generating a response: {self.error}",
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "cost_usd": 0.0,
+                "model_used": None,
+                "elapsed_seconds": 0,
+                "citations": [],
+                "completed": False,
+            }
+
+        from app.services.ai.rate_governor import estimate_tokens
+        usage = self.usage or {
+            "input_tokens": estimate_tokens(self._prompt),
+            "output_tokens": estimate_tokens(answer_text),
+        }
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+
+        if self.provider == "claude":
+            cost_data = self._router.calculate_claude_cost(input_tokens, output_tokens)
+            cost_usd = float(cost_data.get("cost_usd", 0))
+            model_used = cost_data.get("model", "claude-sonnet")
+        else:
+            from app.services.cost_service import cost_service
+            cost_data = cost_service.calculate_cost_from_actual_tokens(
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                thinking_tokens=usage.get("thinking_tokens", 0),
+            )
+            cost_usd = float(cost_data.get("total_cost_usd", 0))
+            model_used = "gemini-2.5-flash"
+
+        completed = self.completed and not self.error and bool(answer_text)
+        if not answer_text and self.completed:
+            answer_text = "I couldn't generate a response. Please try rephrasing your question."
+
+        return {
+            "answer": answer_text,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cost_usd": cost_usd,
+            "model_used": model_used,
+            "elapsed_seconds": round(time.time() - self._start_time, 2),
+            "citations": self._service._extract_citations(answer_text, self._context),
+            "completed": completed,
+        }
+
+
 class RAGService:
     """Retrieval-Augmented Generation service for AskyDoc chat."""
 
@@ -155,157 +328,209 @@ class RAGService:
           - stats/count queries → live aggregate counts
           - project/what-is queries → repository synthesis + code overview
           - all queries → semantic concept search + doc/code/graph search
+
+        Independent stages run concurrently (see StageExecutor); only graph
+        expansion / cross-graph links (need concept_ids) and requirement
+        traces (need doc_ids from segment search) wait on earlier stages.
         """
+        started = time.perf_counter()
         ctx = RetrievedContext()
+        from app.db.capabilities import db_capabilities
+        ctx.vector_search = db_capabilities.get(db).vector_column("ontology_concepts")
+        stages = StageExecutor(
+            db,
+            parallel=settings.RAG_PARALLEL_STAGES,
+            timeout=settings.RAG_STAGE_TIMEOUT_SECONDS,
+        )
 
         # --- Intent Detection: route to appropriate live data sources first ---
         intents = self._detect_query_intent(query)
 
         if "billing" in intents:
-            try:
-                ctx.live_data.extend(
-                    self._fetch_billing_context(db, tenant_id, user_id=user_id)
-                )
-            except Exception as e:
-                logger.warning(f"RAG billing context failed: {e}")
-                db.rollback()
-
+            stages.submit("billing", self._fetch_billing_context, tenant_id, user_id)
         if "stats" in intents:
-            try:
-                ctx.live_data.extend(self._fetch_system_stats_context(db, tenant_id))
-            except Exception as e:
-                logger.warning(f"RAG stats context failed: {e}")
-                db.rollback()
-
-        if "project" in intents or not ctx.live_data:
-            # Always fetch project overview for project queries OR as base context
-            # when no live data was found (catches "what is dokydoc" type questions)
-            try:
-                ctx.live_data.extend(
-                    self._fetch_project_overview_context(db, tenant_id, query, context_type, context_id)
-                )
-            except Exception as e:
-                logger.warning(f"RAG project overview failed: {e}")
-                db.rollback()
-
-        # --- Stage 1: Semantic concept search ---
-        try:
-            from app.services.semantic_search_service import semantic_search_service
-            ctx.concepts = semantic_search_service.search_concepts(
-                db, query, tenant_id,
-                initiative_id=context_id if context_type == "initiative" else None,
-                limit=15,
+            stages.submit("stats", self._fetch_system_stats_context, tenant_id)
+
+        # Project overview is the base context when no live data was found
+        # (catches "what is dokydoc" type questions). Start it up front unless
+        # a billing/stats stage might make it unnecessary.
+        overview_upfront = "project" in intents or not ({"billing", "stats"} & intents)
+        if overview_upfront:
+            stages.submit(
+                "project_overview", self._fetch_project_overview_context,
+                tenant_id, query, context_type, context_id,
             )
-        except Exception as e:
-            logger.warning(f"RAG Stage 1 (concept search) failed: {e}")
-            db.rollback()
 
-        concept_ids = [c["id"] for c in ctx.concepts[:10]] if ctx.concepts else []
-
-        # --- Stage 2: Graph expansion + cross-graph links ---
-        if concept_ids:
-            ctx.relationships = self._expand_relationships(db, tenant_id, concept_ids)
-            ctx.cross_graph_links = self._fetch_cross_graph_links(db, tenant_id, concept_ids)
+        # --- Stage 1: Semantic concept search ---
+        stages.submit("concepts", self._search_concepts, query, tenant_id, context_type, context_id)
 
         # --- Stage 3: Consolidated analysis retrieval ---
         doc_ids = set()
         if context_type == "document" and context_id:
             doc_ids.add(context_id)
-        new_analysis_summaries = self._fetch_analysis_summaries(db, tenant_id, query, doc_ids)
-        # Append (not overwrite) — preserves any Stage 1b results
-        ctx.analysis_summaries.extend(new_analysis_summaries)
+        stages.submit("analysis_summaries", self._fetch_analysis_summaries, tenant_id, query, set(doc_ids))
 
         # --- Stage 4: Document segment search ---
-        ctx.document_segments = self._fetch_document_segments(
-            db, tenant_id, query, context_type, context_id
+        stages.submit(
+            "document_segments", self._fetch_document_segments,
+            tenant_id, query, context_type, context_id,
         )
-        for seg in ctx.document_segments:
-            if seg.get("document_id"):
-                doc_ids.add(seg["document_id"])
 
         # --- Stage 5: Code component search ---
-        ctx.code_summaries = self._fetch_code_summaries(
-            db, tenant_id, query, context_type, context_id
+        stages.submit(
+            "code_summaries", self._fetch_code_summaries,
+            tenant_id, query, context_type, context_id,
         )
 
-        # --- Stage 6: Requirement trace retrieval ---
-        if doc_ids:
-            ctx.requirement_traces = self._fetch_requirement_traces(db, tenant_id, doc_ids)
-
         # --- Stage 7: Pending approvals for current user ---
         if user_id:
-            try:
-                ctx.pending_approvals = self._fetch_pending_approvals(db, tenant_id, user_id)
-            except Exception as e:
-                logger.warning(f"RAG Stage 7 (pending approvals) failed: {e}")
-                db.rollback()
+            stages.submit("pending_approvals", self._fetch_pending_approvals, tenant_id, user_id)
 
-        # Estimate tokens
-        ctx.token_estimate = len(ctx.to_prompt_text()) // 4
+        # --- Stage 2: Graph expansion + cross-graph links (need concept_ids) ---
+        ctx.concepts = stages.result("concepts", [])
+        concept_ids = [c["id"] for c in ctx.concepts[:10]] if ctx.concepts else []
+        if concept_ids:
+            stages.submit("relationships", self._expand_relationships, tenant_id, concept_ids)
+            stages.submit("cross_graph_links", self._fetch_cross_graph_links, tenant_id, concept_ids)
 
-        # Priority-based trimming (lowest priority trimmed first)
+        # --- Stage 6: Requirement trace retrieval (needs doc_ids) ---
+        ctx.document_segments = stages.result("document_segments", [])
+        for seg in ctx.document_segments:
+            if seg.get("document_id"):
+                doc_ids.add(seg["document_id"])
+        if doc_ids:
+            stages.submit("requirement_traces", self._fetch_requirement_traces, tenant_id, doc_ids)
+
+        # --- Collect ---
+        ctx.live_data.extend(stages.result("billing", []))
+        ctx.live_data.extend(stages.result("stats", []))
+        if not overview_upfront and not ctx.live_data:
+            stages.submit(
+                "project_overview", self._fetch_project_overview_context,
+                tenant_id, query, context_type, context_id,
+            )
+        if overview_upfront or not ctx.live_data:
+            ctx.live_data.extend(stages.result("project_overview", []))
+
+        # Append (not overwrite) — preserves any Stage 1b results
+        ctx.analysis_summaries.extend(stages.result("analysis_summaries", []))
+        ctx.code_summaries = stages.result("code_summaries", [])
+        ctx.pending_approvals = stages.result("pending_approvals", [])
+        ctx.relationships = stages.result("relationships", [])
+        ctx.cross_graph_links = stages.result("cross_graph_links", [])
+        ctx.requirement_traces = stages.result("requirement_traces", [])
+
+        # Token budget: select items by priority and render the prompt in one pass
         self._trim_context(ctx)
 
+        ctx.stage_timings_ms = dict(stages.timings)
+        ctx.timed_out_stages = list(stages.timed_out)
+        ctx.retrieval_ms = round((time.perf_counter() - started) * 1000, 1)
         return ctx
 
+    def _search_concepts(
+        self, db: Session, query: str, tenant_id: int,
+        context_type: str, context_id: Optional[int],
+    ) -> List[Dict]:
+        """Stage 1: semantic concept search (scoped to the initiative in initiative chats)."""
+        from app.services.semantic_search_service import semantic_search_service
+        return semantic_search_service.search_concepts(
+            db, query, tenant_id,
+            initiative_id=context_id if context_type == "initiative" else None,
+            limit=15,
+        )
+
+    # Budgeted sections, highest value first, with the items always kept.
+    # live_data and relationships are never trimmed.
+    BUDGET_PRIORITY = (
+        ("concepts", 5),
+        ("cross_graph_links", 5),
+        ("document_segments", 2),
+        ("code_summaries", 2),
+        ("analysis_summaries", 2),
+        ("requirement_traces", 3),
+    )
+
     def _trim_context(self, ctx: RetrievedContext) -> None:
-        """Trim context to fit within token budget using priority-based ordering."""
-        while ctx.token_estimate > self.MAX_CONTEXT_TOKENS:
-            trimmed = False
-            # Priority order: trim lowest-value items first
-            if len(ctx.requirement_traces) > 3:
-                ctx.requirement_traces.pop()
-                trimmed = True
-            elif len(ctx.analysis_summaries) > 2:
-                ctx.analysis_summaries.pop()
-                trimmed = True
-            elif len(ctx.code_summaries) > 2:
-                ctx.code_summaries.pop()
-                trimmed = True
-            elif len(ctx.document_segments) > 2:
-                ctx.document_segments.pop()
-                trimmed = True
-            elif len(ctx.cross_graph_links) > 5:
-                ctx.cross_graph_links.pop()
-                trimmed = True
-            elif len(ctx.concepts) > 5:
-                ctx.concepts.pop()
-                trimmed = True
-            else:
-                break
-            if trimmed:
-                ctx.token_estimate = len(ctx.to_prompt_text()) // 4
+        """
+        Fit the context into MAX_CONTEXT_TOKENS in one pass.
+
+        Every item is rendered and token-counted once (counts are cached by
+        text). Items are then selected greedily: the untrimmed sections and
+        each section's kept minimum first, then the remaining items by
+        section priority and rank while they fit — an item that doesn't fit
+        is skipped, a smaller one after it may still fit. The section lists
+        are cut to the selected items and the prompt text is assembled from
+        the already-rendered items.
+        """
+        rendered = ctx.render_items()
+        costs = {section: [_count_tokens(text) for text in texts] for section, texts in rendered.items()}
+        header_costs = {section: _count_tokens(header) if header else 0 for section, _cap, header in PROMPT_SECTIONS}
+        selected: Dict[str, List[int]] = {section: [] for section in rendered}
+        used = 0
+
+        def cost_of(section: str, index: int) -> int:
+            # +1 for the newline/blank line joining it to the previous item
+            return costs[section][index] + 1 + (0 if selected[section] else header_costs[section])
+
+        def take(section: str, index: int) -> None:
+            nonlocal used
+            used += cost_of(section, index)
+            selected[section].append(index)
+
+        for section in ("live_data", "relationships"):
+            for index in range(len(rendered[section])):
+                take(section, index)
+        for section, keep in self.BUDGET_PRIORITY:
+            for index in range(min(keep, len(rendered[section]))):
+                take(section, index)
+        for section, keep in self.BUDGET_PRIORITY:
+            for index in range(keep, len(rendered[section])):
+                if used + cost_of(section, index) <= self.MAX_CONTEXT_TOKENS:
+                    take(section, index)
+
+        for section, _keep in self.BUDGET_PRIORITY:
+            items = getattr(ctx, section)
+            setattr(ctx, section, [items[index] for index in selected[section]])
+        ctx.prompt_text = ctx.assemble_prompt({
+            section: [rendered[section][index] for index in indexes]
+            for section, indexes in selected.items()
+        })
+        ctx.token_estimate = used
 
     # ------------------------------------------------------------------
     # Stage 2 helpers
     # ------------------------------------------------------------------
 
     def _expand_relationships(self, db: Session, tenant_id: int, concept_ids: List[int]) -> List[Dict]:
-        """Get relationships connecting the retrieved concepts."""
+        """
+        Relationships around the retrieved concepts, from the tenant's graph
+        index: edges touching the concepts, most relevant first by
+        personalized PageRank seeded with the concepts.
+        """
         if not concept_ids:
             return []
         try:
-            placeholders = ", ".join([f":cid{i}" for i in range(len(concept_ids))])
-            params = {f"cid{i}": cid for i, cid in enumerate(concept_ids)}
-            params["tid"] = tenant_id
-
-            sql = f"""
-                SELECT
-                    src.name AS source_name,
-                    r.relationship_type,
-                    tgt.name AS target_name
-                FROM ontology_relationships r
-                JOIN ontology_concepts src ON r.source_concept_id = src.id
-                JOIN ontology_concepts tgt ON r.target_concept_id = tgt.id
-                WHERE r.tenant_id = :tid
-                  AND (r.source_concept_id IN ({placeholders}) OR r.target_concept_id IN ({placeholders}))
-                LIMIT 20
-            """
-            rows = db.execute(sql_text(sql), params).fetchall()
+            from app.models.ontology_concept import OntologyConcept
+            from app.services.graph_index_service import graph_index_service
+
+            index = graph_index_service.get(db, tenant_id)
+            score = dict(index.personalized_pagerank(concept_ids, top_k=200))
+            edges = sorted(
+                index.edges_touching(concept_ids),
+                key=lambda e: -(score.get(e[0], 0.0) + score.get(e[1], 0.0)),
+            )[:60]
+            if not edges:
+                return []
+            names = dict(db.query(OntologyConcept.id, OntologyConcept.name).filter(
+                OntologyConcept.tenant_id == tenant_id,
+                OntologyConcept.id.in_({c for edge in edges for c in edge[:2]}),
+            ))
             return [
-                {"source": row[0], "type": row[1], "target": row[2]}
-                for row in rows
-            ]
+                {"source": names[source_id], "type": rel_type, "target": names[target_id]}
+                for source_id, target_id, rel_type in edges
+                if source_id in names and target_id in names
+            ][:20]
         except Exception as e:
             logger.warning(f"RAG relationship expansion failed: {e}")
             db.rollback()
@@ -434,48 +659,14 @@ class RAGService:
 
     def _fetch_document_segments(self, db: Session, tenant_id: int, query: str,
                                   context_type: str, context_id: Optional[int]) -> List[Dict]:
-        """Fetch relevant document segments with relevance scoring."""
-        try:
-            conditions = ["ds.tenant_id = :tid"]
-            params: Dict[str, Any] = {"tid": tenant_id, "lim": 5}
-
-            if context_type == "document" and context_id:
-                conditions.append("ds.document_id = :did")
-                params["did"] = context_id
-
-            conditions.append("(ds.content ILIKE :q OR ds.title ILIKE :q)")
-            params["q"] = f"%{query[:100]}%"
-            params["q_exact"] = query[:100]
-
-            where = " AND ".join(conditions)
-            # Relevance scoring: title exact > title partial > content match
-            sql = f"""
-                SELECT ds.id, ds.title, ds.content, ds.document_id,
-                    CASE
-                        WHEN ds.title ILIKE :q_exact THEN 3
-                        WHEN ds.title ILIKE :q THEN 2
-                        ELSE 1
-                    END AS relevance
-                FROM document_segments ds
-                WHERE {where}
-                ORDER BY relevance DESC, ds.id DESC
-                LIMIT :lim
-            """
-            rows = db.execute(sql_text(sql), params).fetchall()
-            return [
-                {
-                    "id": row[0],
-                    "title": row[1] or "Segment",
-                    "text": (row[2] or "")[:500],
-                    "document_id": row[3],
-                    "relevance": row[4],
-                }
-                for row in rows
-            ]
-        except Exception as e:
-            logger.warning(f"RAG document segment fetch failed: {e}")
-            db.rollback()
-            return []
+        """Fetch relevant document segments with relevance scoring (any query term may match)."""
+        from app.services.semantic_search_service import semantic_search_service
+        return semantic_search_service.search_document_segments(
+            db, query, tenant_id,
+            document_id=context_id if context_type == "document" else None,
+            mode="any",
+            limit=5,
+        )
 
     # ------------------------------------------------------------------
     # Stage 5 helper (enhanced)
@@ -485,8 +676,9 @@ class RAGService:
                                context_type: str, context_id: Optional[int]) -> List[Dict]:
         """Fetch code component summaries with structured_analysis JSONB.
 
-        First tries an ILIKE match on name/summary. If nothing found, falls back
-        to the most recently analyzed files so broad queries always get context.
+        First tries a full-text match on name/summary/location (ILIKE on
+        name/summary before the search index exists). If nothing found, falls
+        back to the most recently analyzed files so broad queries always get context.
         """
         try:
             conditions = ["cc.tenant_id = :tid", "cc.summary IS NOT NULL"]
@@ -496,15 +688,22 @@ class RAGService:
                 conditions.append("cc.repository_id = :rid")
                 params["rid"] = context_id
 
-            conditions.append("(cc.name ILIKE :q OR cc.summary ILIKE :q)")
-            params["q"] = f"%{query[:100]}%"
+            match = lexical_search_service.build(db, "code_components", "cc", query, mode="any")
+            if match:
+                conditions.append(match.where)
+                params.update(match.params)
+                order_by = f"{match.rank} DESC, cc.id DESC"
+            else:
+                conditions.append("(cc.name ILIKE :q OR cc.summary ILIKE :q)")
+                params["q"] = f"%{query[:100]}%"
+                order_by = "cc.id DESC"
 
             where = " AND ".join(conditions)
             sql = f"""
                 SELECT cc.id, cc.name, cc.summary, cc.location, cc.structured_analysis
                 FROM code_components cc
                 WHERE {where}
-                ORDER BY cc.id DESC
+                ORDER BY {order_by}
                 LIMIT :lim
             """
             rows = db.execute(sql_text(sql), params).fetchall()
@@ -1124,30 +1323,14 @@ class RAGService:
             model_preference: "gemini" (default) | "claude" | "auto"
             db: Database session (needed for org context fetch)
 
-        Returns dict with: answer, input_tokens, output_tokens, cost_usd, model_used, citations
+        Returns dict with: answer, input_tokens, output_tokens, cost_usd, model_used, citations,
+        completed (False for error and "couldn't generate" fallback answers)
         """
-        # Fetch org context and role instructions
-        org_context = ""
-        if db:
-            org_context = self._get_org_context(db, tenant_id)
-
-        role_info = self._get_role_instructions(user_roles or [])
-
-        # Build prompt with role awareness
-        system_context = context.to_prompt_text()
-
-        history_text = ""
-        if conversation_history:
-            history_lines = []
-            for msg in conversation_history[-6:]:
-                role_label = "User" if msg["role"] == "user" else "Assistant"
-                history_lines.append(f"{role_label}: {msg['content'][:300]}")
-            history_text = "\n".join(history_lines)
-
-        prompt = self._build_prompt(
-            query, system_context, history_text,
-            org_context=org_context,
-            role_info=role_info,
+        # Org context is a sync query — keep it off the event loop
+        from app.db.session import run_db
+        prompt = await run_db(
+            self._prepare_prompt, query, context, conversation_history,
+            tenant_id=tenant_id, user_roles=user_roles, db=db,
         )
 
         # Resolve model selection (Task 7: auto-detection)
@@ -1182,6 +1365,7 @@ class RAGService:
                 "model_used": model_used,
                 "elapsed_seconds": round(elapsed, 2),
                 "citations": citations,
+                "completed": result["completed"],
             }
         except Exception as e:
             logger.error(f"RAG generation failed: {e}")
@@ -1193,8 +1377,113 @@ class RAGService:
                 "model_used": None,
                 "elapsed_seconds": 0,
                 "citations": [],
+                "completed": False,
             }
 
+    def stream_answer(
+        self,
+        query: str,
+        context: RetrievedContext,
+        conversation_history: List[Dict],
+        *,
+        tenant_id: int,
+        user_id: int,
+        user_roles: Optional[List[str]] = None,
+        model_preference: str = "gemini",
+        db: Optional[Session] = None,
+    ) -> "AnswerStream":
+        """
+        Streaming counterpart of generate_answer (same prompt and model routing).
+
+        Returns an AnswerStream: iterate it for token events, then read
+        `.result` for the dict generate_answer would have returned.
+        """
+        prompt = self._prepare_prompt(
+            query, context, conversation_history,
+            tenant_id=tenant_id, user_roles=user_roles, db=db,
+        )
+        effective_model = self._resolve_model(model_preference, query, context)
+
+        from app.services.ai.provider_router import provider_router
+        return AnswerStream(
+            self, provider_router, prompt, context,
+            use_claude=effective_model == "claude" and provider_router.claude_available,
+            tenant_id=tenant_id, user_id=user_id,
+        )
+
+    def _prepare_prompt(
+        self,
+        query: str,
+        context: RetrievedContext,
+        conversation_history: List[Dict],
+        *,
+        tenant_id: int,
+        user_roles: Optional[List[str]],
+        db: Optional[Session],
+    ) -> str:
+        """Assemble the role-aware answer prompt from context and recent history."""
+        # Fetch org context and role instructions
+        org_context = ""
+        if db:
+            org_context = self._get_org_context(db, tenant_id)
+
+        role_info = self._get_role_instructions(user_roles or [])
+
+        # Build prompt with role awareness
+        system_context = context.to_prompt_text()
+
+        history_text = ""
+        if conversation_history:
+            history_lines = []
+            for msg in conversation_history[-6:]:
+                role_label = "User" if msg["role"] == "user" else "Assistant"
+                history_lines.append(f"{role_label}: {msg['content'][:300]}")
+            history_text = "\n".join(history_lines)
+
+        return self._build_prompt(
+            query, system_context, history_text,
+            org_context=org_context,
+            role_info=role_info,
+        )
+
+    # ------------------------------------------------------------------
+    # Semantic answer cache
+    # ------------------------------------------------------------------
+
+    # Billing / stats answers read live operational data, not the knowledge base
+    _UNCACHEABLE_INTENTS = {"billing", "stats"}
+
+    def lookup_cached_answer(
+        self,
+        query: str,
+        tenant_id: int,
+        *,
+        context_type: str = "general",
+        context_id: Optional[int] = None,
+        user_roles: Optional[List[str]] = None,
+        model_preference: str = "gemini",
+    ):
+        """
+        Probe the tenant's semantic answer cache for a standalone question.
+
+        The scope includes the role prompt, so users with different roles
+        never share answers. Returns None for uncacheable (live-data) queries
+        or when the cache is unavailable; otherwise an AnswerCacheProbe, with
+        `hit` set on a match. On a miss, hand the probe to
+        answer_cache_service.store() once the answer is generated.
+        """
+        if self._UNCACHEABLE_INTENTS & self._detect_query_intent(query):
+            return None
+
+        from app.services.answer_cache_service import answer_cache_service
+        scope = answer_cache_service.scope_key(
+            context_type=context_type,
+            context_id=context_id,
+            model_preference=model_preference,
+            role=self._get_role_instructions(user_roles or []),
+        )
+        return answer_cache_service.lookup(tenant_id=tenant_id, query=query, scope=scope)
+
     async def _call_gemini(self, provider_router, prompt: str,
                            tenant_id: int, user_id: int) -> Dict[str, Any]:
         """Call Gemini and return normalized result."""
@@ -1220,6 +1509,7 @@ class RAGService:
             "output_tokens": tokens.get("output_tokens", 0),
             "cost_usd": float(cost_data.get("total_cost_usd", 0)),
             "model_used": "gemini-2.5-flash",
+            "completed": bool(response.text),
         }
 
     async def _call_claude(self, provider_router, prompt: str,
@@ -1239,6 +1529,7 @@ class RAGService:
                 "output_tokens": output_tokens,
                 "cost_usd": float(cost_data.get("cost_usd", 0)),
                 "model_used": cost_data.get("model", "claude-sonnet"),
+                "completed": bool(response.get("text")),
             }
         except Exception as e:
             logger.warning(f"Claude call failed, falling back to Gemini: {e}")
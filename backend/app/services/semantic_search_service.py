@@ -3,7 +3,8 @@ Sprint 4: Semantic Search Service
 Sprint 5: Unified Search — search across concepts, documents, and code components.
 
 Provides vector-similarity search across ontology concepts and knowledge graphs.
-Falls back to text-based search when pgvector is not available.
+Falls back to text-based search when pgvector is not available. Concept and
+unified search fuse lexical and vector rankings (see hybrid_search_service).
 """
 
 from typing import Optional, List, Dict, Any
@@ -11,6 +12,8 @@ from sqlalchemy import text as sql_text
 
 from app.core.logging import logger
 from app.services.embedding_service import embedding_service, _check_pgvector_available
+from app.services.vector_index_service import vector_index_service, vector_bindparam
+from app.services.lexical_search_service import lexical_search_service
 
 
 class SemanticSearchService:
@@ -27,56 +30,59 @@ class SemanticSearchService:
         initiative_id: Optional[int] = None,
         min_confidence: float = 0.0,
         limit: int = 20,
+        recall: Optional[str] = None,
     ) -> list:
         """
-        Search ontology concepts by semantic similarity.
-        Falls back to ILIKE text search if pgvector is not available.
+        Search ontology concepts by semantic similarity and text match.
+        Vector and lexical result lists are fused with reciprocal rank
+        fusion, so a concept both retrievers rank highly comes first; only
+        lexical search runs if pgvector is not available.
+        `recall` ("fast" | "balanced" | "high") trades ANN latency for recall.
 
         Returns list of dicts: [{id, name, concept_type, description, source_type,
-                                  confidence_score, similarity, initiative_id}]
+                                  confidence_score, similarity, initiative_id,
+                                  match_type, rrf_score}]
         """
-        results = []
-
-        if _check_pgvector_available(db):
-            results = self._vector_search_concepts(
-                db, query, tenant_id,
-                concept_type=concept_type,
-                source_type=source_type,
-                initiative_id=initiative_id,
-                min_confidence=min_confidence,
-                limit=limit,
-            )
+        from app.services.hybrid_search_service import reciprocal_rank_fusion
+
+        filters = dict(
+            concept_type=concept_type,
+            source_type=source_type,
+            initiative_id=initiative_id,
+            min_confidence=min_confidence,
+            limit=limit,
+        )
+        ranked = {}
+        if _check_pgvector_available(db, "ontology_concepts"):
+            ranked["vector"] = self._vector_search_concepts(db, query, tenant_id, recall=recall, **filters)
+        ranked["lexical"] = self._text_search_concepts(db, query, tenant_id, **filters)
 
-        # Fallback or supplement with text search
-        if len(results) < limit:
-            text_results = self._text_search_concepts(
-                db, query, tenant_id,
-                concept_type=concept_type,
-                source_type=source_type,
-                initiative_id=initiative_id,
-                min_confidence=min_confidence,
-                limit=limit - len(results),
-            )
-            # Merge: avoid duplicates
-            seen_ids = {r["id"] for r in results}
-            for tr in text_results:
-                if tr["id"] not in seen_ids:
-                    results.append(tr)
+        fused = reciprocal_rank_fusion(
+            {name: [r["id"] for r in rows] for name, rows in ranked.items()}
+        )
+        by_id = {row["id"]: row for row in ranked.get("vector", [])}
+        for row in ranked["lexical"]:
+            if row["id"] in by_id:  # found by both: keep the vector row, it has the similarity
+                by_id[row["id"]].update(match_type="hybrid", lexical_score=row["lexical_score"])
+            else:
+                by_id[row["id"]] = row
+        for concept_id, (score, _ranks) in fused.items():
+            by_id[concept_id]["rrf_score"] = round(score, 6)
 
-        return results[:limit]
+        return [by_id[concept_id] for concept_id in fused][:limit]
 
     def _vector_search_concepts(
         self, db, query, tenant_id, *, concept_type, source_type,
-        initiative_id, min_confidence, limit,
+        initiative_id, min_confidence, limit, recall=None,
     ) -> list:
-        """Vector similarity search using pgvector cosine distance."""
+        """Vector similarity search using pgvector cosine distance (ANN index when present)."""
         query_embedding = embedding_service.generate_query_embedding(query)
         if not query_embedding:
             return []
 
-        # Build WHERE clauses
+        # Build WHERE clauses (tenant_id + is_active match the partial HNSW indexes)
         conditions = ["c.tenant_id = :tid", "c.is_active = true", "c.embedding IS NOT NULL"]
-        params = {"tid": tenant_id, "emb": str(query_embedding), "lim": limit}
+        params = {"tid": tenant_id, "emb": query_embedding, "lim": limit}
 
         if concept_type:
             conditions.append("c.concept_type = :ctype")
@@ -96,15 +102,16 @@ class SemanticSearchService:
         sql = f"""
             SELECT c.id, c.name, c.concept_type, c.description, c.source_type,
                    c.confidence_score, c.initiative_id,
-                   1 - (c.embedding <=> :emb::vector) AS similarity
+                   1 - (c.embedding <=> :emb) AS similarity
             FROM ontology_concepts c
             WHERE {where_clause}
-            ORDER BY c.embedding <=> :emb::vector
+            ORDER BY c.embedding <=> :emb
             LIMIT :lim
         """
 
         try:
-            rows = db.execute(sql_text(sql), params).fetchall()
+            vector_index_service.apply_search_knobs(db, "ontology_concepts", recall)
+            rows = db.execute(sql_text(sql).bindparams(vector_bindparam()), params).fetchall()
             return [
                 {
                     "id": row[0],
@@ -127,13 +134,26 @@ class SemanticSearchService:
         self, db, query, tenant_id, *, concept_type, source_type,
         initiative_id, min_confidence, limit,
     ) -> list:
-        """Fallback text search using ILIKE pattern matching."""
+        """
+        Lexical search on name and description: full-text (tsvector + fuzzy
+        name) when available, otherwise ILIKE pattern matching.
+        """
         conditions = ["c.tenant_id = :tid", "c.is_active = true"]
         params = {"tid": tenant_id, "lim": limit}
 
         # Search in name and description
-        conditions.append("(c.name ILIKE :q OR c.description ILIKE :q)")
-        params["q"] = f"%{query}%"
+        match = lexical_search_service.build(
+            db, "ontology_concepts", "c", query, mode="any", fuzzy_column="name",
+        )
+        if match:
+            conditions.append(match.where)
+            params.update(match.params)
+            order_by = f"{match.rank} DESC, c.confidence_score DESC NULLS LAST"
+        else:
+            conditions.append("(c.name ILIKE :q OR c.description ILIKE :q)")
+            params["q"] = f"%{query}%"
+            params["exact"] = f"%{query}%"
+            order_by = "CASE WHEN c.name ILIKE :exact THEN 0 ELSE 1 END, c.confidence_score DESC NULLS LAST"
 
         if concept_type:
             conditions.append("c.concept_type = :ctype")
@@ -152,15 +172,13 @@ class SemanticSearchService:
 
         sql = f"""
             SELECT c.id, c.name, c.concept_type, c.description, c.source_type,
-                   c.confidence_score, c.initiative_id
+                   c.confidence_score, c.initiative_id,
+                   {match.rank if match else "NULL"} AS lexical_score
             FROM ontology_concepts c
             WHERE {where_clause}
-            ORDER BY
-                CASE WHEN c.name ILIKE :exact THEN 0 ELSE 1 END,
-                c.confidence_score DESC NULLS LAST
+            ORDER BY {order_by}
             LIMIT :lim
         """
-        params["exact"] = f"%{query}%"
 
         try:
             rows = db.execute(sql_text(sql), params).fetchall()
@@ -174,6 +192,7 @@ class SemanticSearchService:
                     "confidence_score": float(row[5]) if row[5] else None,
                     "initiative_id": row[6],
                     "similarity": None,
+                    "lexical_score": round(float(row[7]), 4) if row[7] is not None else None,
                     "match_type": "text",
                 }
                 for row in rows
@@ -190,91 +209,108 @@ class SemanticSearchService:
         *,
         source_type: Optional[str] = None,
         limit: int = 10,
+        recall: Optional[str] = None,
     ) -> list:
         """
         Search knowledge graph versions by summary similarity.
         Returns list of dicts with graph metadata and similarity score.
         """
         results = []
-
-        if _check_pgvector_available(db):
-            query_embedding = embedding_service.generate_query_embedding(query)
-            if query_embedding:
-                conditions = ["kgv.tenant_id = :tid", "kgv.is_current = true", "kgv.embedding IS NOT NULL"]
-                params = {"tid": tenant_id, "emb": str(query_embedding), "lim": limit}
-
-                if source_type:
-                    conditions.append("kgv.source_type = :stype")
-                    params["stype"] = source_type
-
-                where_clause = " AND ".join(conditions)
-
-                sql = f"""
-                    SELECT kgv.id, kgv.source_type, kgv.source_id, kgv.version,
-                           kgv.summary_text, kgv.created_at,
-                           1 - (kgv.embedding <=> :emb::vector) AS similarity
-                    FROM knowledge_graph_versions kgv
-                    WHERE {where_clause}
-                    ORDER BY kgv.embedding <=> :emb::vector
-                    LIMIT :lim
-                """
-
-                try:
-                    rows = db.execute(sql_text(sql), params).fetchall()
-                    results = [
-                        {
-                            "id": row[0],
-                            "source_type": row[1],
-                            "source_id": row[2],
-                            "version": row[3],
-                            "summary": row[4],
-                            "created_at": str(row[5]) if row[5] else None,
-                            "similarity": round(float(row[6]), 4) if row[6] else 0,
-                        }
-                        for row in rows
-                    ]
-                except Exception as e:
-                    logger.warning(f"Graph vector search failed: {e}")
+        if _check_pgvector_available(db, "knowledge_graph_versions"):
+            results = self._vector_search_graphs(
+                db, query, tenant_id, source_type=source_type, limit=limit, recall=recall,
+            )
 
         # Fallback: text search on summary_text
         if not results:
-            conditions = ["kgv.tenant_id = :tid", "kgv.is_current = true", "kgv.summary_text IS NOT NULL"]
-            params = {"tid": tenant_id, "q": f"%{query}%", "lim": limit}
+            results = self._text_search_graphs(db, query, tenant_id, source_type=source_type, limit=limit)
 
-            if source_type:
-                conditions.append("kgv.source_type = :stype")
-                params["stype"] = source_type
+        return results
 
-            conditions.append("kgv.summary_text ILIKE :q")
-            where_clause = " AND ".join(conditions)
+    def _vector_search_graphs(
+        self, db, query, tenant_id, *, source_type, limit, recall=None,
+    ) -> list:
+        """Vector similarity search over current graph version summaries."""
+        query_embedding = embedding_service.generate_query_embedding(query)
+        if not query_embedding:
+            return []
 
-            sql = f"""
-                SELECT kgv.id, kgv.source_type, kgv.source_id, kgv.version,
-                       kgv.summary_text, kgv.created_at
-                FROM knowledge_graph_versions kgv
-                WHERE {where_clause}
-                ORDER BY kgv.created_at DESC
-                LIMIT :lim
-            """
+        conditions = ["kgv.tenant_id = :tid", "kgv.is_current = true", "kgv.embedding IS NOT NULL"]
+        params = {"tid": tenant_id, "emb": query_embedding, "lim": limit}
 
-            try:
-                rows = db.execute(sql_text(sql), params).fetchall()
-                results = [
-                    {
-                        "id": row[0],
-                        "source_type": row[1],
-                        "source_id": row[2],
-                        "version": row[3],
-                        "summary": row[4],
-                        "created_at": str(row[5]) if row[5] else None,
-                        "similarity": None,
-                    }
-                    for row in rows
-                ]
-            except Exception as e:
-                logger.error(f"Graph text search failed: {e}")
+        if source_type:
+            conditions.append("kgv.source_type = :stype")
+            params["stype"] = source_type
 
-        return results
+        where_clause = " AND ".join(conditions)
+
+        sql = f"""
+            SELECT kgv.id, kgv.source_type, kgv.source_id, kgv.version,
+                   kgv.summary_text, kgv.created_at,
+                   1 - (kgv.embedding <=> :emb) AS similarity
+            FROM knowledge_graph_versions kgv
+            WHERE {where_clause}
+            ORDER BY kgv.embedding <=> :emb
+            LIMIT :lim
+        """
+
+        try:
+            vector_index_service.apply_search_knobs(db, "knowledge_graph_versions", recall)
+            rows = db.execute(sql_text(sql).bindparams(vector_bindparam()), params).fetchall()
+            return [
+                {
+                    "id": row[0],
+                    "source_type": row[1],
+                    "source_id": row[2],
+                    "version": row[3],
+                    "summary": row[4],
+                    "created_at": str(row[5]) if row[5] else None,
+                    "similarity": round(float(row[6]), 4) if row[6] else 0,
+                }
+                for row in rows
+            ]
+        except Exception as e:
+            logger.warning(f"Graph vector search failed: {e}")
+            return []
+
+    def _text_search_graphs(self, db, query, tenant_id, *, source_type, limit) -> list:
+        """ILIKE search on current graph version summaries, newest first."""
+        conditions = ["kgv.tenant_id = :tid", "kgv.is_current = true", "kgv.summary_text IS NOT NULL"]
+        params = {"tid": tenant_id, "q": f"%{query}%", "lim": limit}
+
+        if source_type:
+            conditions.append("kgv.source_type = :stype")
+            params["stype"] = source_type
+
+        conditions.append("kgv.summary_text ILIKE :q")
+        where_clause = " AND ".join(conditions)
+
+        sql = f"""
+            SELECT kgv.id, kgv.source_type, kgv.source_id, kgv.version,
+                   kgv.summary_text, kgv.created_at
+            FROM knowledge_graph_versions kgv
+            WHERE {where_clause}
+            ORDER BY kgv.created_at DESC
+            LIMIT :lim
+        """
+
+        try:
+            rows = db.execute(sql_text(sql), params).fetchall()
+            return [
+                {
+                    "id": row[0],
+                    "source_type": row[1],
+                    "source_id": row[2],
+                    "version": row[3],
+                    "summary": row[4],
+                    "created_at": str(row[5]) if row[5] else None,
+                    "similarity": None,
+                }
+                for row in rows
+            ]
+        except Exception as e:
+            logger.error(f"Graph text search failed: {e}")
+            return []
 
     def find_related(
         self,
@@ -294,45 +330,43 @@ class SemanticSearchService:
         results = []
         seen_ids = {concept_id}
 
-        # Graph traversal: walk outgoing and incoming edges
-        sql = """
-            SELECT DISTINCT c.id, c.name, c.concept_type, c.description,
-                   c.source_type, c.confidence_score,
-                   r.relationship_type, 1 as distance
-            FROM ontology_relationships r
-            JOIN ontology_concepts c ON (
-                (r.source_concept_id = :cid AND c.id = r.target_concept_id)
-                OR (r.target_concept_id = :cid AND c.id = r.source_concept_id)
-            )
-            WHERE r.tenant_id = :tid AND c.is_active = true
-            LIMIT :lim
-        """
-
+        # Graph traversal: walk outgoing and incoming edges up to `depth` hops
         try:
-            rows = db.execute(
-                sql_text(sql),
-                {"cid": concept_id, "tid": tenant_id, "lim": limit},
-            ).fetchall()
-
-            for row in rows:
-                if row[0] not in seen_ids:
-                    seen_ids.add(row[0])
-                    results.append({
-                        "id": row[0],
-                        "name": row[1],
-                        "concept_type": row[2],
-                        "description": row[3],
-                        "source_type": row[4],
-                        "confidence_score": float(row[5]) if row[5] else None,
-                        "relationship_type": row[6],
-                        "distance": row[7],
-                        "match_type": "graph",
-                    })
+            from app.models.ontology_concept import OntologyConcept
+            from app.services.graph_index_service import graph_index_service
+
+            reached = graph_index_service.get(db, tenant_id).bfs(
+                [concept_id], hops=depth, max_nodes=limit * 5,
+            )
+            candidates = [cid for cid in reached if cid not in seen_ids]
+            rows = db.query(
+                OntologyConcept.id, OntologyConcept.name, OntologyConcept.concept_type,
+                OntologyConcept.description, OntologyConcept.source_type, OntologyConcept.confidence_score,
+            ).filter(
+                OntologyConcept.tenant_id == tenant_id,
+                OntologyConcept.is_active == True,
+                OntologyConcept.id.in_(candidates),
+            ).all() if candidates else []
+
+            for row in sorted(rows, key=lambda r: (reached[r.id][0], r.id))[:limit]:
+                seen_ids.add(row.id)
+                distance, _, relationship_type = reached[row.id]
+                results.append({
+                    "id": row.id,
+                    "name": row.name,
+                    "concept_type": row.concept_type,
+                    "description": row.description,
+                    "source_type": row.source_type,
+                    "confidence_score": float(row.confidence_score) if row.confidence_score else None,
+                    "relationship_type": relationship_type,
+                    "distance": distance,
+                    "match_type": "graph",
+                })
         except Exception as e:
             logger.error(f"Graph traversal failed for concept {concept_id}: {e}")
 
         # Optionally supplement with vector-similar concepts (not graph-connected)
-        if len(results) < limit and _check_pgvector_available(db):
+        if len(results) < limit and _check_pgvector_available(db, "ontology_concepts"):
             try:
                 from app import crud
                 concept = crud.ontology_concept.get(db=db, id=concept_id, tenant_id=tenant_id)
@@ -391,15 +425,29 @@ class SemanticSearchService:
         limit: int = 10,
     ) -> list:
         """
-        Search documents by filename, raw_text content, and document_type.
+        Search documents by filename, raw_text content, and document_type
+        (full-text ranked when the search index exists, ILIKE otherwise).
         Returns list of dicts with document metadata and match highlights.
         """
         conditions = ["d.tenant_id = :tid"]
-        params: Dict[str, Any] = {"tid": tenant_id, "q": f"%{query}%", "lim": limit}
-
-        conditions.append(
-            "(d.filename ILIKE :q OR d.raw_text ILIKE :q OR d.document_type ILIKE :q)"
-        )
+        params: Dict[str, Any] = {"tid": tenant_id, "lim": limit}
+
+        match = lexical_search_service.build(db, "documents", "d", query, fuzzy_column="filename")
+        if match:
+            conditions.append(match.where)
+            params.update(match.params)
+            relevance = match.rank
+            order_by = "relevance DESC, d.created_at DESC"
+        else:
+            conditions.append(
+                "(d.filename ILIKE :q OR d.raw_text ILIKE :q OR d.document_type ILIKE :q)"
+            )
+            params["q"] = f"%{query}%"
+            relevance = """CASE WHEN d.filename ILIKE :q THEN 1.0
+                        WHEN d.document_type ILIKE :q THEN 0.8
+                        ELSE 0.6
+                   END"""
+            order_by = "CASE WHEN d.filename ILIKE :q THEN 0 ELSE 1 END, d.created_at DESC"
 
         if document_type:
             conditions.append("d.document_type = :dtype")
@@ -410,16 +458,11 @@ class SemanticSearchService:
         sql = f"""
             SELECT d.id, d.filename, d.document_type, d.status,
                    d.file_size_kb, d.created_at,
-                   CASE WHEN d.filename ILIKE :q THEN 1.0
-                        WHEN d.document_type ILIKE :q THEN 0.8
-                        ELSE 0.6
-                   END AS relevance,
+                   {relevance} AS relevance,
                    SUBSTRING(d.raw_text FROM 1 FOR 200) AS snippet
             FROM documents d
             WHERE {where_clause}
-            ORDER BY
-                CASE WHEN d.filename ILIKE :q THEN 0 ELSE 1 END,
-                d.created_at DESC
+            ORDER BY {order_by}
             LIMIT :lim
         """
 
@@ -458,15 +501,29 @@ class SemanticSearchService:
         limit: int = 10,
     ) -> list:
         """
-        Search code components by name, summary, and location.
+        Search code components by name, summary, and location
+        (full-text ranked when the search index exists, ILIKE otherwise).
         Returns list of dicts with code component metadata.
         """
         conditions = ["cc.tenant_id = :tid"]
-        params: Dict[str, Any] = {"tid": tenant_id, "q": f"%{query}%", "lim": limit}
-
-        conditions.append(
-            "(cc.name ILIKE :q OR cc.summary ILIKE :q OR cc.location ILIKE :q)"
-        )
+        params: Dict[str, Any] = {"tid": tenant_id, "lim": limit}
+
+        match = lexical_search_service.build(db, "code_components", "cc", query, fuzzy_column="name")
+        if match:
+            conditions.append(match.where)
+            params.update(match.params)
+            relevance = match.rank
+            order_by = "relevance DESC, cc.created_at DESC"
+        else:
+            conditions.append(
+                "(cc.name ILIKE :q OR cc.summary ILIKE :q OR cc.location ILIKE :q)"
+            )
+            params["q"] = f"%{query}%"
+            relevance = """CASE WHEN cc.name ILIKE :q THEN 1.0
+                        WHEN cc.summary ILIKE :q THEN 0.7
+                        ELSE 0.5
+                   END"""
+            order_by = "CASE WHEN cc.name ILIKE :q THEN 0 ELSE 1 END, cc.created_at DESC"
 
         if component_type:
             conditions.append("cc.component_type = :ctype")
@@ -481,16 +538,11 @@ class SemanticSearchService:
             SELECT cc.id, cc.name, cc.component_type, cc.location,
                    cc.analysis_status, cc.summary, cc.created_at,
                    r.name AS repo_name,
-                   CASE WHEN cc.name ILIKE :q THEN 1.0
-                        WHEN cc.summary ILIKE :q THEN 0.7
-                        ELSE 0.5
-                   END AS relevance
+                   {relevance} AS relevance
             FROM code_components cc
             LEFT JOIN repositories r ON cc.repository_id = r.id
             WHERE {where_clause}
-            ORDER BY
-                CASE WHEN cc.name ILIKE :q THEN 0 ELSE 1 END,
-                cc.created_at DESC
+            ORDER BY {order_by}
             LIMIT :lim
         """
 
@@ -515,6 +567,85 @@ class SemanticSearchService:
             logger.error(f"Code component search failed: {e}")
             return []
 
+    # ============================================================
+    # Document Segment Search
+    # ============================================================
+
+    def search_document_segments(
+        self,
+        db,
+        query: str,
+        tenant_id: int,
+        *,
+        document_id: Optional[int] = None,
+        mode: str = "all",
+        limit: int = 10,
+    ) -> list:
+        """
+        Search document segments (character ranges of a document's raw_text,
+        labelled by segment_type). Ranked full-text search when the segment
+        search_vector exists, ILIKE on the segment text otherwise. `mode` is
+        the full-text query mode ("all" terms or "any" term).
+        Returns list of dicts: [{id, title, text, document_id, relevance}]
+        """
+        conditions = ["ds.tenant_id = :tid"]
+        params: Dict[str, Any] = {"tid": tenant_id, "lim": limit}
+
+        if document_id:
+            conditions.append("ds.document_id = :did")
+            params["did"] = document_id
+
+        segment_text = (
+            "SUBSTRING(d.raw_text FROM ds.start_char_index + 1 "
+            "FOR GREATEST(ds.end_char_index - ds.start_char_index, 0))"
+        )
+        match = lexical_search_service.build(db, "document_segments", "ds", query, mode=mode)
+        if match:
+            conditions.append(match.where)
+            params.update(match.params)
+            relevance = match.rank
+        else:
+            conditions.append(f"({segment_text} ILIKE :q OR ds.segment_type ILIKE :q)")
+            params["q"] = f"%{query[:100]}%"
+            params["q_exact"] = query[:100]
+            # Relevance scoring: type exact > type partial > text match
+            relevance = """CASE
+                    WHEN ds.segment_type ILIKE :q_exact THEN 3
+                    WHEN ds.segment_type ILIKE :q THEN 2
+                    ELSE 1
+                END"""
+
+        where_clause = " AND ".join(conditions)
+        sql = f"""
+            SELECT ds.id, ds.segment_type,
+                SUBSTRING(d.raw_text FROM ds.start_char_index + 1
+                          FOR LEAST(GREATEST(ds.end_char_index - ds.start_char_index, 0), 500)),
+                ds.document_id,
+                {relevance} AS relevance
+            FROM document_segments ds
+            JOIN documents d ON d.id = ds.document_id
+            WHERE {where_clause}
+            ORDER BY relevance DESC, ds.id DESC
+            LIMIT :lim
+        """
+
+        try:
+            rows = db.execute(sql_text(sql), params).fetchall()
+            return [
+                {
+                    "id": row[0],
+                    "title": row[1] or "Segment",
+                    "text": (row[2] or "")[:500],
+                    "document_id": row[3],
+                    "relevance": round(float(row[4]), 4) if row[4] is not None else 0,
+                }
+                for row in rows
+            ]
+        except Exception as e:
+            logger.error(f"Document segment search failed: {e}")
+            db.rollback()
+            return []
+
     # ============================================================
     # SPRINT 5: Unified Search
     # ============================================================
@@ -528,90 +659,42 @@ class SemanticSearchService:
         categories: Optional[List[str]] = None,
         initiative_id: Optional[int] = None,
         limit: int = 30,
+        recall: Optional[str] = None,
+        rerank: Optional[bool] = None,
     ) -> dict:
         """
-        Search across all entity types: concepts, documents, code, and graphs.
+        Search across all entity types: concepts, documents, segments, code,
+        and graphs. Lexical and vector candidates are retrieved concurrently
+        and fused into one ranking (see hybrid_search_service).
 
         Args:
             categories: Filter to specific categories. Options:
-                        ["concepts", "documents", "code", "graphs"].
+                        ["concepts", "documents", "segments", "code", "graphs"].
                         None = search all.
             initiative_id: Filter concepts by initiative.
-            limit: Max total results (distributed across categories).
+            limit: Max total results.
+            recall: ANN recall profile for the vector searches ("fast" | "balanced" | "high").
+            rerank: Apply the term-coverage rerank (None = HYBRID_RERANK_ENABLED).
 
         Returns:
             {
                 "query": str,
                 "total_count": int,
-                "results": [{category, ...}],
-                "facets": {"concepts": N, "documents": N, "code": N, "graphs": N}
+                "results": [{category, relevance, scores, ranks, ...}],
+                "facets": {"concepts": N, "documents": N, "segments": N, "code": N, "graphs": N},
+                "retrieval": {"timings_ms": {...}, "timed_out": [...], "failed": [...]}
             }
         """
-        search_all = not categories
-        per_category = max(5, limit // 4)
-
-        all_results: List[Dict[str, Any]] = []
-        facets = {"concepts": 0, "documents": 0, "code": 0, "graphs": 0}
-
-        # 1. Search ontology concepts
-        if search_all or "concepts" in categories:
-            concept_results = self.search_concepts(
-                db, query, tenant_id,
-                initiative_id=initiative_id,
-                limit=per_category,
-            )
-            for r in concept_results:
-                r["category"] = "concept"
-                r["relevance"] = r.get("similarity") or 0.5
-            all_results.extend(concept_results)
-            facets["concepts"] = len(concept_results)
-
-        # 2. Search documents
-        if search_all or "documents" in categories:
-            doc_results = self.search_documents(
-                db, query, tenant_id,
-                limit=per_category,
-            )
-            all_results.extend(doc_results)
-            facets["documents"] = len(doc_results)
-
-        # 3. Search code components
-        if search_all or "code" in categories:
-            code_results = self.search_code_components(
-                db, query, tenant_id,
-                limit=per_category,
-            )
-            all_results.extend(code_results)
-            facets["code"] = len(code_results)
-
-        # 4. Search knowledge graphs
-        if search_all or "graphs" in categories:
-            graph_results = self.search_graphs(
-                db, query, tenant_id,
-                limit=per_category,
-            )
-            for r in graph_results:
-                r["category"] = "graph"
-                r["relevance"] = r.get("similarity") or 0.3
-            all_results.extend(graph_results)
-            facets["graphs"] = len(graph_results)
-
-        # Sort by relevance (higher first), then by category priority
-        category_priority = {"concept": 0, "document": 1, "code": 2, "graph": 3}
-        all_results.sort(
-            key=lambda r: (
-                -float(r.get("relevance") or r.get("similarity") or 0),
-                category_priority.get(r.get("category", ""), 9),
-            )
+        from app.services.hybrid_search_service import hybrid_search_service
+        return hybrid_search_service.search(
+            db, query, tenant_id,
+            categories=categories,
+            initiative_id=initiative_id,
+            limit=limit,
+            recall=recall,
+            rerank=rerank,
         )
 
-        return {
-            "query": query,
-            "total_count": len(all_results[:limit]),
-            "results": all_results[:limit],
-            "facets": facets,
-        }
-
 
 # Singleton
 semantic_search_service = SemanticSearchService()
@@ -0,0 +1,123 @@
+"""
+Concurrent retrieval stages on pooled sessions.
+
+RAG context assembly and hybrid search both fan independent queries out at
+once: StageExecutor runs each stage on a process-wide thread pool with its
+own Session on the caller's engine, collects results under a per-stage
+timeout budget and records how long every stage took. With parallel=False
+the same stages run inline on the caller's session.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("stage_executor")
+
+
+_stage_pool: Optional[ThreadPoolExecutor] = None
+_stage_pool_lock = threading.Lock()
+
+
+def _get_stage_pool() -> ThreadPoolExecutor:
+    """Process-wide pool for retrieval stages (created on first use)."""
+    global _stage_pool
+    if _stage_pool is None:
+        with _stage_pool_lock:
+            if _stage_pool is None:
+                _stage_pool = ThreadPoolExecutor(
+                    max_workers=max(1, settings.RAG_STAGE_WORKERS),
+                    thread_name_prefix="rag-stage",
+                )
+    return _stage_pool
+
+
+class StageExecutor:
+    """
+    Runs retrieval stages for one query and records how long each took.
+
+    Parallel mode: every stage gets its own Session on the caller's engine
+    (connections come from the shared pool) and runs on the stage pool.
+    Results are collected with a per-stage timeout budget measured from when
+    the stage starts running, so time spent queued behind other requests on
+    the shared pool does not count against it. A stage still queued after one
+    budget is cancelled; a stage that starts but misses its budget has its
+    result dropped (the worker still finishes and closes its session). Both
+    are reported as "timeout".
+
+    Sequential mode (RAG_PARALLEL_STAGES=False): stages run inline on the
+    caller's session, in submission order, with the same timing output.
+    """
+
+    def __init__(self, db: Session, *, parallel: bool, timeout: float):
+        self._db = db
+        self._parallel = parallel
+        self._timeout = timeout
+        self._pending: Dict[str, tuple] = {}  # name -> (future or value, started event)
+        self._started_at: Dict[str, float] = {}
+        self.timings: Dict[str, float] = {}
+        self.timed_out: List[str] = []
+        self.failed: List[str] = []
+
+    def _run(
+        self, name: str, fn: Callable, args: tuple, db: Optional[Session],
+        started: Optional[threading.Event] = None,
+    ) -> Any:
+        start = time.perf_counter()
+        self._started_at[name] = start
+        if started is not None:
+            started.set()
+        own_session = db is None
+        if own_session:
+            db = Session(bind=self._db.get_bind())
+        try:
+            return fn(db, *args)
+        except Exception as e:
+            logger.warning(f"Stage {name} failed: {e}")
+            self.failed.append(name)
+            db.rollback()
+            return None
+        finally:
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 1)
+            if own_session:
+                db.close()
+
+    def submit(self, name: str, fn: Callable, *args) -> None:
+        """Start a stage. fn is called as fn(db, *args)."""
+        if self._parallel:
+            started = threading.Event()
+            future = _get_stage_pool().submit(self._run, name, fn, args, None, started)
+            self._pending[name] = (future, started)
+        else:
+            self._pending[name] = (self._run(name, fn, args, self._db), None)
+
+    def result(self, name: str, default: Any = None) -> Any:
+        """Result of a submitted stage, or default if it failed, timed out or never ran."""
+        if name not in self._pending:
+            return default
+        value, started = self._pending.pop(name)
+        if started is None:
+            return default if value is None else value
+        if not started.wait(self._timeout) and value.cancel():
+            logger.warning(
+                f"Stage {name} still queued after {self._timeout:.1f}s "
+                f"(stage pool saturated) — skipped"
+            )
+            return self._timeout_result(name, default)
+        remaining = self._timeout - (time.perf_counter() - self._started_at[name])
+        try:
+            value = value.result(timeout=max(0.0, remaining))
+        except FutureTimeoutError:
+            logger.warning(f"Stage {name} exceeded {self._timeout:.1f}s budget after starting — skipped")
+            return self._timeout_result(name, default)
+        return default if value is None else value
+
+    def _timeout_result(self, name: str, default: Any) -> Any:
+        self.timed_out.append(name)
+        self.timings.setdefault(name, round(self._timeout * 1000, 1))
+        return default
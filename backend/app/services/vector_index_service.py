@@ -0,0 +1,172 @@
+"""
+Vector index management and ANN query tuning for pgvector.
+
+Indexes:
+  - Global HNSW indexes on ontology_concepts.embedding and
+    knowledge_graph_versions.embedding are partial on the rows search can
+    return (is_active / is_current), created by migration s9g1.
+  - Tenants with many embedded rows additionally get their own partial HNSW
+    index (WHERE tenant_id = N AND ...). The planner picks it for that
+    tenant's queries, so the graph walk never visits other tenants' vectors
+    and the tenant filter doesn't eat into ef_search. Built by the
+    build_vector_indexes task (CREATE INDEX CONCURRENTLY, no write lock).
+
+Query knobs (per query, via SET LOCAL so they end with the transaction):
+  - recall profile "fast" | "balanced" | "high" → hnsw.ef_search / ivfflat.probes
+  - pgvector >= 0.8: hnsw.iterative_scan keeps scanning when filters drop
+    candidates, so filtered queries still return `limit` rows.
+
+Query vectors are bound as typed pgvector parameters (vector_bindparam)
+instead of str(list) spliced next to a `::vector` cast.
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import bindparam, text as sql_text
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.capabilities import db_capabilities
+
+logger = get_logger("vector_index_service")
+
+# Table -> predicate every search on it applies (so partial indexes match)
+INDEXED_TABLES = {
+    "ontology_concepts": "is_active = true",
+    "knowledge_graph_versions": "is_current = true",
+}
+
+# recall profile -> (hnsw.ef_search, ivfflat.probes); "balanced" uses the configured default
+RECALL_PROFILES = {
+    "fast": (20, 1),
+    "balanced": (None, 10),
+    "high": (200, 40),
+}
+
+
+def vector_bindparam(name: str = "emb"):
+    """Bind parameter that sends a Python list as a pgvector value."""
+    from pgvector.sqlalchemy import Vector
+    from app.services.embedding_service import EMBEDDING_DIMENSIONS
+    return bindparam(name, type_=Vector(EMBEDDING_DIMENSIONS))
+
+
+def _version_tuple(version: str) -> tuple:
+    parts = []
+    for part in (version or "0").split("."):
+        digits = "".join(ch for ch in part if ch.isdigit())
+        parts.append(int(digits or 0))
+    return tuple(parts)
+
+
+class VectorIndexService:
+    """Builds and inspects ANN indexes; applies per-query recall knobs."""
+
+    # ------------------------------------------------------------------
+    # Query tuning
+    # ------------------------------------------------------------------
+
+    def apply_search_knobs(self, db, table: str, recall: Optional[str] = None) -> None:
+        """SET LOCAL the ANN knobs for the next vector query on `table` in this transaction."""
+        caps = db_capabilities.get(db)
+        if not caps.vector_column(table):
+            return
+
+        ef_search, probes = RECALL_PROFILES.get(recall or "balanced", RECALL_PROFILES["balanced"])
+        ef_search = int(ef_search or settings.VECTOR_SEARCH_EF_SEARCH)
+        statements = []
+        if caps.has_index(table, "hnsw"):
+            statements.append(f"SET LOCAL hnsw.ef_search = {ef_search}")
+            if _version_tuple(caps.extensions.get("vector")) >= (0, 8):
+                statements.append("SET LOCAL hnsw.iterative_scan = relaxed_order")
+        if caps.has_index(table, "ivfflat"):
+            statements.append(f"SET LOCAL ivfflat.probes = {int(probes)}")
+
+        for statement in statements:
+            db.execute(sql_text(statement))
+
+    # ------------------------------------------------------------------
+    # Index management
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def tenant_index_name(table: str, tenant_id: int) -> str:
+        short = {"ontology_concepts": "oc", "knowledge_graph_versions": "kgv"}[table]
+        return f"ix_{short}_embedding_hnsw_t{int(tenant_id)}"
+
+    def tenant_index_ddl(self, table: str, tenant_id: int) -> str:
+        return (
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {self.tenant_index_name(table, tenant_id)} "
+            f"ON {table} USING hnsw (embedding vector_cosine_ops) "
+            f"WITH (m = {int(settings.VECTOR_INDEX_HNSW_M)}, "
+            f"ef_construction = {int(settings.VECTOR_INDEX_EF_CONSTRUCTION)}) "
+            f"WHERE tenant_id = {int(tenant_id)} AND {INDEXED_TABLES[table]}"
+        )
+
+    def tenants_needing_index(self, db, table: str, tenant_id: Optional[int] = None) -> List[int]:
+        """Tenants with at least VECTOR_INDEX_TENANT_MIN_ROWS searchable embedded rows."""
+        sql = (
+            f"SELECT tenant_id FROM {table} "
+            f"WHERE embedding IS NOT NULL AND {INDEXED_TABLES[table]}"
+            + (" AND tenant_id = :tid" if tenant_id else "")
+            + " GROUP BY tenant_id HAVING COUNT(*) >= :min_rows"
+        )
+        params = {"min_rows": settings.VECTOR_INDEX_TENANT_MIN_ROWS}
+        if tenant_id:
+            params["tid"] = tenant_id
+        return [row[0] for row in db.execute(sql_text(sql), params).fetchall()]
+
+    def build_tenant_indexes(self, db, tenant_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Create per-tenant HNSW indexes for every large-enough tenant (or just
+        `tenant_id`). CONCURRENTLY can't run inside a transaction, so the DDL
+        goes through a separate autocommit connection.
+        """
+        summary: Dict[str, Any] = {"created": [], "existing": [], "failed": [], "skipped_tables": []}
+        caps = db_capabilities.get(db)
+        engine = db.get_bind()
+
+        for table in INDEXED_TABLES:
+            if not caps.vector_column(table):
+                summary["skipped_tables"].append(table)
+                continue
+            existing = set(caps.index_methods.get(table, {}))
+            for tid in self.tenants_needing_index(db, table, tenant_id):
+                name = self.tenant_index_name(table, tid)
+                if name in existing:
+                    summary["existing"].append(name)
+                    continue
+                try:
+                    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                        conn.execute(sql_text(self.tenant_index_ddl(table, tid)))
+                    summary["created"].append(name)
+                    logger.info(f"Built vector index {name}")
+                except Exception as e:
+                    logger.error(f"Vector index build failed for {name}: {e}")
+                    summary["failed"].append(name)
+                    # A failed CONCURRENTLY build leaves an INVALID index behind,
+                    # which IF NOT EXISTS would then skip forever
+                    try:
+                        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                            conn.execute(sql_text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                    except Exception:
+                        pass
+
+        if summary["created"]:
+            db_capabilities.refresh(db)
+        return summary
+
+    def list_indexes(self, db) -> Dict[str, Dict[str, str]]:
+        """ANN indexes (hnsw / ivfflat) per vector table, from the capability registry."""
+        caps = db_capabilities.get(db)
+        return {
+            table: {
+                name: method
+                for name, method in caps.index_methods.get(table, {}).items()
+                if method in ("hnsw", "ivfflat")
+            }
+            for table in INDEXED_TABLES
+        }
+
+
+# Global vector index service instance
+vector_index_service = VectorIndexService()
@@ -0,0 +1,137 @@
+"""
+Adaptive work-queue scheduler for per-file AI analysis.
+
+Replaces fixed-size batches (where every batch waited for its slowest file)
+with a sliding window of in-flight items: as soon as one finishes the next
+is submitted, in the caller's priority order.
+
+The window size follows AIMD (additive increase, multiplicative decrease),
+the same control loop TCP uses for congestion:
+  - each successful call grows the window by 1/limit (≈ +1 per full window)
+  - a rate-limit / timeout halves it, at most once per "epoch" so a burst of
+    429s from the same window only counts as one congestion signal
+The shared rate governor still enforces provider quotas; the window keeps
+Celery from parking threads on calls that the provider is rejecting.
+"""
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from app.core.logging import get_logger
+
+logger = get_logger("adaptive_scheduler")
+
+SUCCESS = "success"
+OVERLOAD = "overload"
+NEUTRAL = "neutral"
+
+_OVERLOAD_MARKERS = (
+    "429", "resource_exhausted", "quota", "rate limit", "ratelimit",
+    "too many requests", "overloaded", "timeout", "timed out", "deadline exceeded",
+)
+
+
+def is_overload_error(error: Optional[str]) -> bool:
+    """True when an error message indicates provider throttling or a timeout."""
+    if not error:
+        return False
+    lowered = error.lower()
+    return any(marker in lowered for marker in _OVERLOAD_MARKERS)
+
+
+class AIMDConcurrencyLimiter:
+    """Thread-safe AIMD concurrency window."""
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 8, backoff: float = 0.5):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.backoff = backoff
+        self._limit = float(min(max(initial, self.minimum), self.maximum))
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.peak = int(self._limit)
+        self.decreases = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def epoch(self) -> int:
+        return self._epoch
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._limit = min(self.maximum, self._limit + 1.0 / self._limit)
+            self.peak = max(self.peak, int(self._limit))
+
+    def on_overload(self, epoch: int) -> bool:
+        """
+        Shrink the window if the failing call was started in the current epoch.
+        Returns True if the window was reduced.
+        """
+        with self._lock:
+            if epoch != self._epoch:
+                return False
+            self._limit = max(self.minimum, self._limit * self.backoff)
+            self._epoch += 1
+            self.decreases += 1
+            return True
+
+
+def run_adaptive(
+    items: Iterable[Any],
+    work_fn: Callable[[Any], Any],
+    on_done: Callable[[Any, Any, Optional[BaseException]], None],
+    limiter: AIMDConcurrencyLimiter,
+    classify: Callable[[Any, Optional[BaseException]], str],
+) -> Dict[str, int]:
+    """
+    Run work_fn over items with an adaptive in-flight window.
+
+    Items are submitted in iteration order. on_done(item, result, exc) is
+    called from the CALLING thread, so it can update counters or write to
+    the caller's DB session without locks.
+
+    Returns:
+        {"submitted", "peak_concurrency", "final_concurrency", "decreases"}
+    """
+    queue = iter(items)
+    exhausted = False
+    in_flight: Dict[Any, tuple] = {}  # future -> (item, epoch at submit)
+    submitted = 0
+
+    with ThreadPoolExecutor(max_workers=limiter.maximum) as pool:
+        while True:
+            while not exhausted and len(in_flight) < limiter.limit:
+                try:
+                    item = next(queue)
+                except StopIteration:
+                    exhausted = True
+                    break
+                in_flight[pool.submit(work_fn, item)] = (item, limiter.epoch)
+                submitted += 1
+
+            if not in_flight:
+                break
+
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in done:
+                item, epoch = in_flight.pop(future)
+                exc = future.exception()
+                result = None if exc else future.result()
+
+                outcome = classify(result, exc)
+                if outcome == SUCCESS:
+                    limiter.on_success()
+                elif outcome == OVERLOAD and limiter.on_overload(epoch):
+                    logger.info(f"Provider pushback — concurrency reduced to {limiter.limit}")
+
+                on_done(item, result, exc)
+
+    return {
+        "submitted": submitted,
+        "peak_concurrency": limiter.peak,
+        "final_concurrency": limiter.limit,
+        "decreases": limiter.decreases,
+    }
@@ -19,12 +19,11 @@ for each, linking them back to the parent Repository via repository_id.
 """
 
 import asyncio
+import functools
 import hashlib
 import json
-import httpx
-import time as _time
-import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional
 
@@ -135,11 +134,16 @@ def _build_error_with_solution(error_str: str, file_path: str) -> str:
 @celery_app.task(name="static_analysis_worker", bind=True, max_retries=2)
 def static_analysis_worker(
     self, component_id: int, tenant_id: int, code_content: str,
-    repo_name: str = "", file_path: str = "", language: str = ""
+    repo_name: str = "", file_path: str = "", language: str = "",
+    raw_content: Optional[str] = None,
 ):
     """
     Worker: Runs enhanced semantic analysis on a single file.
 
+    code_content is what the model sees (possibly prefixed with repository
+    context); raw_content is the file as fetched and keys the analysis cache.
+    It defaults to code_content when the caller sends the file unmodified.
+
     SPRINT 3 Day 5 enhancements:
     - Uses ENHANCED_SEMANTIC_ANALYSIS prompt (business rules, API contracts,
       data models, security patterns) when repo context is available
@@ -173,16 +177,36 @@ def static_analysis_worker(
             }
         )
 
-        # Check cache first
+        # Route to AI provider (ADHOC-08: Claude for code in dual mode, Gemini otherwise)
+        from app.services.ai.provider_router import provider_router
+        from app.services.ai.prompt_manager import PromptType, prompt_manager
+
+        # Route markdown files to specialized documentation analysis
+        is_markdown = file_path.lower().endswith(".md")
+        if is_markdown:
+            prompt_type = PromptType.MARKDOWN_ANALYSIS
+        elif repo_name:
+            prompt_type = PromptType.ENHANCED_SEMANTIC_ANALYSIS
+        else:
+            prompt_type = PromptType.CODE_ANALYSIS
+
+        # Check cache first — content-addressed on the raw file, so the rolling
+        # repository-context header never changes the key
         from app.services.cache_service import cache_service
-        cache_type = "enhanced_analysis" if repo_name else "code_analysis"
-        cached = cache_service.get_cached_analysis(
-            content=code_content, analysis_type=cache_type
-        )
+        cache_key_parts = {
+            "raw_content": raw_content if raw_content is not None else code_content,
+            "prompt_type": prompt_type.value,
+            "prompt_version": prompt_manager.get_prompt_version(prompt_type),
+            "model_id": provider_router.get_code_model_id(markdown=is_markdown),
+            "language": language,
+            "tenant_id": tenant_id,
+        }
+        cached = cache_service.get_cached_file_analysis(**cache_key_parts)
 
         if cached:
             logger.info(f"Cache HIT for component {component_id}")
-            analysis_result = cached
+            # Token usage belongs to the run that paid for it — a hit costs nothing
+            analysis_result = {k: v for k, v in cached.items() if k != "_token_usage"}
         else:
             # Billing check
             from app.services.billing_enforcement_service import billing_enforcement_service
@@ -199,9 +223,6 @@ def static_analysis_worker(
             except Exception as billing_err:
                 logger.warning(f"Billing check failed (proceeding): {billing_err}")
 
-            # Route to AI provider (ADHOC-08: Claude for code in dual mode, Gemini otherwise)
-            from app.services.ai.provider_router import provider_router
-
             # Build product context from BOE (zero AI cost — DB queries only)
             product_context = ""
             try:
@@ -216,9 +237,6 @@ def static_analysis_worker(
             except Exception as ctx_err:
                 logger.warning(f"Context assembly failed (proceeding without): {ctx_err}")
 
-            # Route markdown files to specialized documentation analysis
-            is_markdown = file_path.lower().endswith(".md")
-
             if is_markdown:
                 analysis_result = _run_async(
                     provider_router.analyze_markdown(
@@ -247,9 +265,8 @@ def static_analysis_worker(
                 )
 
             # Cache the result
-            cache_service.set_cached_analysis(
-                content=code_content,
-                analysis_type=cache_type,
+            cache_service.set_cached_file_analysis(
+                **cache_key_parts,
                 result=analysis_result,
                 ttl_seconds=2592000  # 30 days
             )
@@ -320,6 +337,10 @@ def static_analysis_worker(
 
         crud.code_component.update(db, db_obj=component, obj_in=update_data)
 
+        # Cached chat answers may cite the old analysis
+        from app.services.answer_cache_service import answer_cache_service
+        answer_cache_service.bump_epoch(tenant_id)
+
         # Extract ontology concepts inline (source_type="code") so Code tab
         # populates immediately — no need to wait for full repo completion
         if new_analysis and tenant_id:
@@ -344,6 +365,7 @@ def static_analysis_worker(
             "status": "completed",
             "component_id": component_id,
             "has_delta": delta_result is not None and delta_result.get("has_changes", False),
+            "cache_hit": bool(cached),
         }
 
     except Exception as e:
@@ -406,10 +428,85 @@ def _file_analysis_priority(file_info: dict) -> tuple:
     return (1, path)  # Default: same priority as services
 
 
+def _scanned_path(location: str, paths: set) -> Optional[str]:
+    """
+    Repo-relative path a stored component location refers to, if it is in paths.
+
+    Locations are raw URLs that embed the ref (which may itself contain
+    slashes), so the longest trailing segment run that is a scanned path wins.
+    """
+    parts = (location or "").split("/")
+    for i in range(1, len(parts)):
+        candidate = "/".join(parts[i:])
+        if candidate in paths:
+            return candidate
+    return None
+
+
+def _plan_delta_analysis(file_list: list, existing: list) -> dict:
+    """
+    Diff a freshly scanned tree against the repository's stored components.
+
+    Files are matched on their repo-relative path, not the raw URL, so a scan
+    of another branch still lines up with the components stored for it.
+
+    Args:
+        file_list: Full scan result [{"path", "url", "language", "sha"}, ...]
+        existing: Rows with (id, location, blob_sha, analysis_status) for the
+                  repository's File components
+
+    Returns:
+        {"to_analyze": [file_info...]  — added or modified blobs,
+         "unchanged_ids": [...]        — completed and same blob SHA (carried forward),
+         "deleted_ids": [...]          — components whose file left the tree,
+         "relocated": {id: url}        — matched components whose URL changed,
+         "added": int, "modified": int}
+    """
+    paths = {f.get("path", "") for f in file_list}
+    by_path, deleted_ids = {}, []
+    for row in existing:
+        path = _scanned_path(row.location, paths)
+        if path is None:
+            deleted_ids.append(row.id)
+        else:
+            by_path.setdefault(path, row)
+
+    to_analyze, unchanged_ids, relocated = [], [], {}
+    added = modified = 0
+    for file_info in file_list:
+        row = by_path.get(file_info.get("path", ""))
+        if row is None:
+            added += 1
+            to_analyze.append(file_info)
+            continue
+        url = file_info.get("url", "")
+        if row.location != url:
+            relocated[row.id] = url
+        if (
+            row.analysis_status == "completed"
+            and row.blob_sha
+            and row.blob_sha == file_info.get("sha")
+        ):
+            unchanged_ids.append(row.id)
+        else:
+            # Blob changed, never fingerprinted, or last attempt did not complete
+            modified += 1
+            to_analyze.append(file_info)
+
+    return {
+        "to_analyze": to_analyze,
+        "unchanged_ids": unchanged_ids,
+        "deleted_ids": deleted_ids,
+        "relocated": relocated,
+        "added": added,
+        "modified": modified,
+    }
+
+
 @celery_app.task(name="repo_analysis_task", bind=True, max_retries=1, time_limit=86400, soft_time_limit=82800)
 def repo_analysis_task(
     self, repo_id: int, tenant_id: int, file_list: list, github_token: Optional[str] = None,
-    analyzed_offset: int = 0
+    analyzed_offset: int = 0, analysis_mode: str = "full", commit_sha: Optional[str] = None,
 ):
     """
     Orchestrator: Iterates through the file list for a repository,
@@ -419,11 +516,16 @@ def repo_analysis_task(
     Args:
         repo_id: Repository ID
         tenant_id: Tenant ID for multi-tenancy
-        file_list: List of dicts [{"path": "src/foo.py", "url": "https://raw.../foo.py", "language": "python"}]
+        file_list: List of dicts [{"path": "src/foo.py", "url": "https://raw.../foo.py",
+                   "language": "python", "sha": "<git blob sha>"}]
+        analysis_mode: "full" analyzes every file not yet completed; "delta" expects
+                       the COMPLETE scanned tree and only fetches/analyzes blobs that
+                       were added or modified, retiring components for deleted files
+        commit_sha: Head commit of the scan, recorded as last_analyzed_commit on success
     """
     logger.info(
         f"REPO_AGENT started for repo_id={repo_id}, "
-        f"tenant_id={tenant_id}, files={len(file_list)}"
+        f"tenant_id={tenant_id}, files={len(file_list)}, mode={analysis_mode}"
     )
 
     db = SessionLocal()
@@ -433,6 +535,36 @@ def repo_analysis_task(
             logger.error(f"Repo agent: Repository {repo_id} not found")
             return {"status": "error", "reason": "repo_not_found"}
 
+        # Delta mode: diff the scanned tree against stored blob SHAs so unchanged
+        # files are carried forward without a fetch or an AI call
+        unchanged = retired = 0
+        if analysis_mode == "delta":
+            from app.models.code_component import CodeComponent
+            existing = db.query(
+                CodeComponent.id, CodeComponent.location,
+                CodeComponent.blob_sha, CodeComponent.analysis_status,
+            ).filter(
+                CodeComponent.repository_id == repo_id,
+                CodeComponent.tenant_id == tenant_id,
+                CodeComponent.component_type == "File",
+            ).all()
+            plan = _plan_delta_analysis(file_list, existing)
+            file_list = plan["to_analyze"]
+            unchanged = len(plan["unchanged_ids"])
+            analyzed_offset += unchanged
+            retired = crud.code_component.retire_many(
+                db, ids=plan["deleted_ids"], tenant_id=tenant_id
+            )
+            # Point matched components at this scan's URLs (e.g. after a branch
+            # switch) so the lookups and fetches below use the current ref
+            crud.code_component.relocate_many(
+                db, locations=plan["relocated"], tenant_id=tenant_id
+            )
+            logger.info(
+                f"Repo {repo_id} delta: {plan['added']} added, {plan['modified']} modified, "
+                f"{unchanged} unchanged, {retired} deleted"
+            )
+
         # Mark repo as analyzing — offset lets resume start from where it left off
         crud.repository.update_analysis_progress(
             db=db, repo_id=repo_id, tenant_id=tenant_id,
@@ -453,22 +585,29 @@ def repo_analysis_task(
         completed = 0
         failed = 0
 
-        # --- Parallel Batch Processing ---
-        # Process files in batches of 3 concurrently. With 3 concurrent requests and
-        # 12s between batches, throughput = 3x vs sequential while staying ≤15 RPM.
-        # Rate: 3 files/batch × 1 batch/12s = 15 files/min = 15 RPM (Gemini limit).
-        BATCH_SIZE = 3
-        BATCH_INTERVAL_SECS = 12  # seconds between batch starts
+        # Analysis-cache counters for this run (mirrored to Redis for live stats)
+        from app.services.cache_service import cache_service
+        cache_counts = {"hits": 0, "misses": 0}
+        cache_service.start_run_stats(
+            tenant_id=tenant_id, repo_id=repo_id, run_id=self.request.id or "local",
+        )
 
-        # Shared lock for updating progress counter from worker threads
-        progress_lock = threading.Lock()
+        # --- Adaptive Work-Queue Processing ---
+        # A sliding window of in-flight analyses (AIMD: grows on success, halves on
+        # 429/timeouts) fed in priority order. Request pacing is still enforced by
+        # the shared rate governor inside the provider call.
+        from app.core.config import settings
+        from app.tasks.adaptive_scheduler import (
+            AIMDConcurrencyLimiter, NEUTRAL, OVERLOAD, SUCCESS, is_overload_error, run_adaptive,
+        )
 
         def _prepare_component(file_info: dict):
             """Fetch content + create/look up CodeComponent. Returns (component, content, file_info) or None."""
             file_path = file_info.get("path", "unknown")
             file_url = file_info.get("url", "")
+            blob_sha = file_info.get("sha")
 
-            code_content = _fetch_file_content(file_url, github_token=github_token)
+            code_content = file_contents.get(file_url)
             if not code_content:
                 logger.warning(f"Empty content for {file_path}, skipping")
                 return None
@@ -484,10 +623,19 @@ def repo_analysis_task(
                 ).first()
 
                 if existing:
-                    # Skip files already completed — no need for cache hit
-                    if existing.analysis_status == "completed" and existing.structured_analysis:
+                    # Skip files already completed unless the blob is known to have changed
+                    # (delta mode has already filtered unchanged files out)
+                    blob_changed = bool(blob_sha and existing.blob_sha and blob_sha != existing.blob_sha)
+                    if (
+                        analysis_mode != "delta" and not blob_changed
+                        and existing.analysis_status == "completed" and existing.structured_analysis
+                    ):
                         logger.info(f"SKIP re-analysis for {file_path} (already completed)")
                         return ("cached", existing, code_content, file_info)
+                    if blob_sha and blob_sha != existing.blob_sha:
+                        crud.code_component.update(
+                            thread_db, db_obj=existing, obj_in={"blob_sha": blob_sha}
+                        )
                     return ("existing", existing, code_content, file_info)
                 else:
                     from app.schemas.code_component import CodeComponentCreate
@@ -496,6 +644,7 @@ def repo_analysis_task(
                         component_type="File",
                         location=file_url,
                         version=repo.last_analyzed_commit or "HEAD",
+                        blob_sha=blob_sha,
                     )
                     _repo = thread_db.query(crud.repository.model).filter_by(id=repo_id).first()
                     owner_id = _repo.owner_id if _repo else 1
@@ -512,18 +661,22 @@ def repo_analysis_task(
                 thread_db.close()
 
         def _analyze_one(prepare_result, context_snapshot: list):
-            """Run analysis for a single file. Returns ("completed"|"failed"|"cached", component)."""
+            """
+            Run analysis for a single file.
+            Returns {"status": "completed"|"failed"|"cached", "ctx": {...}|None,
+                     "cache_hit": bool, "error": str|None}.
+            """
             if prepare_result is None:
-                return ("failed", None)
+                return {"status": "failed", "ctx": None, "cache_hit": False, "error": None}
 
             tag, component, code_content, file_info = prepare_result
             if tag == "cached":
                 sa = component.structured_analysis or {}
-                return ("cached", component, {
+                return {"status": "cached", "cache_hit": False, "error": None, "ctx": {
                     "path": file_info.get("path"),
                     "summary": (component.summary or "")[:200],
                     "file_type": sa.get("language_info", {}).get("file_type", "Unknown"),
-                })
+                }}
 
             file_path = file_info.get("path", "unknown")
             file_language = file_info.get("language", "unknown")
@@ -546,77 +699,112 @@ def repo_analysis_task(
                 component.id, tenant_id, analysis_content,
                 repo_name=repo.name,
                 file_path=file_path,
-                language=file_language
+                language=file_language,
+                raw_content=code_content,
             )
+            cache_hit = bool(result.get("cache_hit"))
+            if result.get("status") != "completed":
+                return {"status": "failed", "ctx": None, "cache_hit": False, "error": result.get("error")}
 
-            if result.get("status") == "completed":
-                thread_db = SessionLocal()
-                try:
-                    comp_refreshed = crud.code_component.get(thread_db, id=component.id, tenant_id=tenant_id)
-                    if comp_refreshed and comp_refreshed.summary:
-                        sa = comp_refreshed.structured_analysis or {}
-                        ctx = {
-                            "path": file_path,
-                            "summary": (comp_refreshed.summary or "")[:200],
-                            "file_type": sa.get("language_info", {}).get("file_type", "Unknown"),
-                        }
-                        return ("completed", component, ctx)
-                finally:
-                    thread_db.close()
-                return ("completed", component, None)
-            return ("failed", component, None)
+            cache_service.record_run_cache_result(tenant_id=tenant_id, repo_id=repo_id, hit=cache_hit)
+            ctx = None
+            thread_db = SessionLocal()
+            try:
+                comp_refreshed = crud.code_component.get(thread_db, id=component.id, tenant_id=tenant_id)
+                if comp_refreshed and comp_refreshed.summary:
+                    sa = comp_refreshed.structured_analysis or {}
+                    ctx = {
+                        "path": file_path,
+                        "summary": (comp_refreshed.summary or "")[:200],
+                        "file_type": sa.get("language_info", {}).get("file_type", "Unknown"),
+                    }
+            finally:
+                thread_db.close()
+            return {"status": "completed", "ctx": ctx, "cache_hit": cache_hit, "error": None}
 
-        # Prepare all components first (DB setup only, no AI calls)
+        # Fetch all file contents over one pooled connection (or one tarball), then
+        # prepare components (DB setup only, no AI calls)
+        fetch_start = time.monotonic()
+        file_contents = _fetch_repo_contents(file_list, github_token=github_token)
+        logger.info(
+            f"Repo {repo_id}: fetched {sum(1 for c in file_contents.values() if c)}"
+            f"/{len(file_list)} files in {time.monotonic() - fetch_start:.1f}s"
+        )
         logger.info(f"Repo {repo_id}: preparing {len(file_list)} components...")
         prepare_results = []
         with ThreadPoolExecutor(max_workers=5) as prep_pool:
-            futures = {prep_pool.submit(_prepare_component, fi): fi for fi in file_list}
-            for future in as_completed(futures):
+            # Collect in submission order so the priority sort above is preserved
+            futures = [prep_pool.submit(_prepare_component, fi) for fi in file_list]
+            for future in futures:
                 try:
                     prepare_results.append(future.result())
                 except Exception as e:
                     logger.error(f"Prepare failed: {e}")
                     prepare_results.append(None)
 
-        # Process in batches of BATCH_SIZE, each batch runs concurrently
-        logger.info(f"Repo {repo_id}: analyzing {len(prepare_results)} files in batches of {BATCH_SIZE}")
-        for batch_idx in range(0, len(prepare_results), BATCH_SIZE):
-            batch = prepare_results[batch_idx: batch_idx + BATCH_SIZE]
-            batch_start = _time.monotonic()
-
-            # Snapshot current context for this batch (all threads share the same view)
-            context_snapshot = list(repo_context)
-
-            with ThreadPoolExecutor(max_workers=BATCH_SIZE) as pool:
-                futures = {pool.submit(_analyze_one, pr, context_snapshot): pr for pr in batch}
-                for future in as_completed(futures):
-                    try:
-                        result_tuple = future.result()
-                        status = result_tuple[0] if result_tuple else "failed"
-                        ctx_entry = result_tuple[2] if len(result_tuple) > 2 else None
-                        with progress_lock:
-                            if status in ("completed", "cached"):
-                                completed += 1
-                                if ctx_entry:
-                                    repo_context.append(ctx_entry)
-                            else:
-                                failed += 1
-                            crud.repository.update_analysis_progress(
-                                db=db, repo_id=repo_id, tenant_id=tenant_id,
-                                analyzed_files=completed + failed
-                            )
-                    except Exception as e:
-                        logger.error(f"Batch analysis error: {e}")
-                        with progress_lock:
-                            failed += 1
-
-            # Rate limiting: wait remainder of BATCH_INTERVAL after batch finishes
-            elapsed = _time.monotonic() - batch_start
-            wait = max(0.0, BATCH_INTERVAL_SECS - elapsed)
-            if wait > 0 and batch_idx + BATCH_SIZE < len(prepare_results):
-                logger.info(f"Repo {repo_id}: batch {batch_idx // BATCH_SIZE + 1} done, "
-                            f"waiting {wait:.1f}s before next batch")
-                _time.sleep(wait)
+        limiter = AIMDConcurrencyLimiter(
+            initial=settings.REPO_ANALYSIS_INITIAL_CONCURRENCY,
+            minimum=1,
+            maximum=settings.REPO_ANALYSIS_MAX_CONCURRENCY,
+        )
+
+        def _classify(outcome: Optional[dict], exc: Optional[BaseException]) -> str:
+            if exc is not None:
+                # Direct calls surface task.retry() as Retry; the cause is in __context__
+                return OVERLOAD if is_overload_error(f"{exc} {exc.__context__}") else NEUTRAL
+            if outcome["status"] == "completed" and not outcome["cache_hit"]:
+                return SUCCESS
+            if outcome["status"] == "failed" and is_overload_error(outcome["error"]):
+                return OVERLOAD
+            return NEUTRAL  # cache hits and skips say nothing about provider capacity
+
+        # Progress is counted here, on the orchestrator thread, and flushed to the DB
+        # at most every REPO_PROGRESS_FLUSH_SECONDS — no per-file lock + write
+        last_flush = time.monotonic()
+
+        def _on_done(_item, outcome: Optional[dict], exc: Optional[BaseException]) -> None:
+            nonlocal completed, failed, last_flush
+            if exc is not None:
+                logger.error(f"File analysis error: {exc}")
+                failed += 1
+            elif outcome["status"] in ("completed", "cached"):
+                completed += 1
+                if outcome["status"] == "completed":
+                    cache_counts["hits" if outcome["cache_hit"] else "misses"] += 1
+                if outcome["ctx"]:
+                    repo_context.append(outcome["ctx"])
+            else:
+                failed += 1
+
+            if time.monotonic() - last_flush >= settings.REPO_PROGRESS_FLUSH_SECONDS:
+                crud.repository.update_analysis_progress(
+                    db=db, repo_id=repo_id, tenant_id=tenant_id,
+                    analyzed_files=analyzed_offset + completed + failed
+                )
+                last_flush = time.monotonic()
+
+        logger.info(
+            f"Repo {repo_id}: analyzing {len(prepare_results)} files "
+            f"(adaptive concurrency {limiter.limit}→max {limiter.maximum})"
+        )
+        # Each analysis sees the summaries of the files finished before it was
+        # submitted: run_adaptive pulls jobs lazily on this thread, so the context
+        # slice is copied at submit time, not when a worker starts the job
+        jobs = (
+            functools.partial(_analyze_one, pr, list(repo_context[-10:]))
+            for pr in prepare_results
+        )
+        scheduler_stats = run_adaptive(
+            jobs,
+            lambda job: job(),
+            _on_done,
+            limiter,
+            _classify,
+        )
+        logger.info(
+            f"Repo {repo_id}: scheduler peak concurrency {scheduler_stats['peak_concurrency']}, "
+            f"{scheduler_stats['decreases']} backoffs"
+        )
 
         # Mark repo as completed or failed
         final_status = "completed" if failed == 0 else ("completed" if completed > 0 else "failed")
@@ -624,14 +812,17 @@ def repo_analysis_task(
 
         crud.repository.update_analysis_progress(
             db=db, repo_id=repo_id, tenant_id=tenant_id,
-            analyzed_files=completed + failed,
+            analyzed_files=analyzed_offset + completed + failed,
             status=final_status,
             error_message=error_msg
         )
+        if commit_sha and failed == 0:
+            crud.repository.update(db, db_obj=repo, obj_in={"last_analyzed_commit": commit_sha})
 
         logger.info(
             f"REPO_AGENT completed for repo {repo_id}: "
-            f"{completed} succeeded, {failed} failed out of {len(file_list)} files"
+            f"{completed} succeeded, {failed} failed out of {len(file_list)} files "
+            f"(analysis cache: {cache_counts['hits']} hits, {cache_counts['misses']} misses)"
         )
 
         # SPRINT 5: Notify repo owner about analysis completion
@@ -674,7 +865,7 @@ def repo_analysis_task(
             logger.debug(f"Notification send failed (non-fatal): {notif_err}")
 
         # Fire code ontology extraction to populate graph from code analysis
-        if completed > 0 and tenant_id:
+        if (completed > 0 or retired > 0) and tenant_id:
             try:
                 from app.tasks.ontology_tasks import extract_code_ontology_entities
                 extract_code_ontology_entities.delay(repo_id, tenant_id)
@@ -698,6 +889,12 @@ def repo_analysis_task(
             "completed": completed,
             "failed": failed,
             "total": len(file_list),
+            "cache_hits": cache_counts["hits"],
+            "cache_misses": cache_counts["misses"],
+            "mode": analysis_mode,
+            "unchanged": unchanged,
+            "retired": retired,
+            "peak_concurrency": scheduler_stats["peak_concurrency"],
         }
 
     except Exception as e:
@@ -742,10 +939,9 @@ def repo_analysis_task(
 @celery_app.task(name="batch_retry_failed_components", bind=True, max_retries=0)
 def batch_retry_failed_components(self, repo_id: int, tenant_id: int, component_ids: list):
     """
-    Sequential retry of failed components with 4s rate-limiting between calls.
-    This prevents flooding Gemini's 15 RPM limit when retrying many files at once.
+    Sequential retry of failed components. Provider throttling comes from the
+    shared rate governor, so retrying many files cannot flood the Gemini quota.
     """
-    import time
     logger.info(
         f"BATCH_RETRY started for repo {repo_id}: {len(component_ids)} components"
     )
@@ -765,13 +961,7 @@ def batch_retry_failed_components(self, repo_id: int, tenant_id: int, component_
                     continue
 
                 # Fetch file content
-                code_content = ""
-                try:
-                    import httpx
-                    resp = httpx.get(component.location, timeout=30, follow_redirects=True)
-                    code_content = resp.text if resp.status_code == 200 else ""
-                except Exception:
-                    pass
+                code_content = _fetch_file_content(component.location) or ""
 
                 if not code_content:
                     crud.code_component.update(
@@ -822,9 +1012,6 @@ def batch_retry_failed_components(self, repo_id: int, tenant_id: int, component_
                 except Exception:
                     pass
 
-                # Rate limit: 4s between analyses
-                time.sleep(4)
-
             except Exception as e:
                 logger.error(f"Batch retry failed for component {comp_id}: {e}")
                 failed += 1
@@ -1151,7 +1338,6 @@ def webhook_triggered_analysis(
             lang_map = {"py": "python", "js": "javascript", "ts": "typescript", "java": "java", "go": "go"}
             language = lang_map.get(ext, "")
 
-            import time
             result = static_analysis_worker(
                 component.id, tenant_id, code_content,
                 repo_name=repo.name, file_path=file_path, language=language,
@@ -1160,8 +1346,6 @@ def webhook_triggered_analysis(
             if result.get("status") == "completed":
                 completed += 1
 
-            time.sleep(4)  # Rate limiting
-
         # Update repo last_analyzed_commit
         if commit_hash:
             crud.repository.update(
@@ -1190,24 +1374,50 @@ def webhook_triggered_analysis(
 
 def _fetch_file_content(url: str, github_token: Optional[str] = None) -> Optional[str]:
     """Fetch raw file content from a URL (e.g., GitHub raw URL).
-    Passes Authorization header when github_token is provided (required for private repos).
+    Goes through the shared pooled fetcher; the token is only sent to GitHub hosts.
     """
     if not url:
         return None
-    try:
-        import httpx
-        from app.core.config import settings
-        headers = {}
-        token = github_token or settings.GITHUB_TOKEN
-        if token and "raw.githubusercontent.com" in url:
-            headers["Authorization"] = f"Bearer {token}"
-        with httpx.Client(timeout=30.0) as client:
-            response = client.get(url, headers=headers)
-            response.raise_for_status()
-            return response.text
-    except Exception as e:
-        logger.warning(f"Failed to fetch {url}: {e}")
-        return None
+    from app.services.github_fetcher import github_fetcher
+    return _run_async(github_fetcher.fetch_text(url, github_token=github_token))
+
+
+def _fetch_repo_contents(file_list: list, github_token: Optional[str] = None) -> dict:
+    """
+    Fetch every file in file_list up front. Returns {url: content or None}.
+
+    Large runs (>= GITHUB_ARCHIVE_MIN_FILES) pull the repository as a single
+    tarball streamed to a temp dir; anything missing from the archive, or any
+    archive failure, falls back to concurrent per-file fetches over the pooled
+    HTTP/2 client.
+    """
+    import tempfile
+    from app.core.config import settings
+    from app.services.github_fetcher import github_fetcher, parse_raw_url
+
+    contents: dict = {}
+    threshold = settings.GITHUB_ARCHIVE_MIN_FILES
+    if threshold and len(file_list) >= threshold:
+        sources = {parse_raw_url(f.get("url", ""), f.get("path", "")) for f in file_list}
+        if len(sources) == 1 and None not in sources:
+            owner, repo_name, ref = sources.pop()
+            try:
+                with tempfile.TemporaryDirectory(prefix="dokydoc-repo-") as tmp:
+                    root = _run_async(github_fetcher.download_archive(
+                        owner, repo_name, ref, tmp, github_token=github_token,
+                    ))
+                    for f in file_list:
+                        content = github_fetcher.read_archive_file(root, f["path"])
+                        if content is not None:
+                            contents[f["url"]] = content
+                logger.info(f"Archive fetch: {len(contents)}/{len(file_list)} files from {owner}/{repo_name}@{ref}")
+            except Exception as e:
+                logger.warning(f"Archive download failed, fetching files individually: {e}")
+
+    missing = [f.get("url", "") for f in file_list if f.get("url") not in contents]
+    if missing:
+        contents.update(_run_async(github_fetcher.fetch_many(missing, github_token=github_token)))
+    return contents
 
 
 def _detect_language(file_path: str) -> str:
@@ -1386,9 +1596,6 @@ def branch_preview_extraction(
                     entities.extend(file_entities)
                     relationships.extend(file_rels)
 
-                import time
-                time.sleep(4)  # Rate limiting
-
             except Exception as file_err:
                 logger.warning(f"Branch preview: failed to process {file_path}: {file_err}")
 
@@ -1464,47 +1671,31 @@ def promote_branch_preview(
             db=db, repo_id=repo_id, tenant_id=tenant_id
         )
 
+        from app.services.ontology_ingest_service import OntologyIngestBatch
+        batch = OntologyIngestBatch(tenant_id, "code", initiative_id=initiative_id)
+
         # Ingest entities into PostgreSQL as permanent concepts
+        promoted = {}  # lowered name -> batch key
         for entity in preview.get("entities", []):
-            try:
-                business_ontology_service.get_or_create_concept(
-                    db=db,
-                    name=entity.get("name", ""),
-                    concept_type=entity.get("type", "Entity"),
-                    tenant_id=tenant_id,
-                    description=f"From branch merge: {branch}",
-                    confidence_score=entity.get("confidence", 0.8),
-                    source_type="code",
-                    initiative_id=initiative_id,
-                )
-            except Exception as e:
-                logger.warning(f"Promote preview: failed to create concept {entity.get('name')}: {e}")
+            key = batch.concept(
+                entity.get("name", ""),
+                entity.get("type", "Entity"),
+                description=f"From branch merge: {branch}",
+                confidence_score=entity.get("confidence", 0.8),
+            )
+            if key:
+                promoted.setdefault(key[0], key)
 
-        # Ingest relationships
+        # Ingest relationships between promoted entities
         for rel in preview.get("relationships", []):
-            try:
-                source_name = rel.get("source", "")
-                target_name = rel.get("target", "")
-                if source_name and target_name:
-                    source_concept = crud.ontology_concept.get_by_name(
-                        db=db, name=source_name, tenant_id=tenant_id
-                    )
-                    target_concept = crud.ontology_concept.get_by_name(
-                        db=db, name=target_name, tenant_id=tenant_id
-                    )
-                    if source_concept and target_concept:
-                        crud.ontology_relationship.create_if_not_exists(
-                            db=db,
-                            source_concept_id=source_concept.id,
-                            target_concept_id=target_concept.id,
-                            relationship_type=rel.get("type", "relates_to"),
-                            tenant_id=tenant_id,
-                            confidence_score=rel.get("confidence", 0.75),
-                        )
-            except Exception as e:
-                logger.warning(f"Promote preview: failed to create relationship: {e}")
+            batch.relationship(
+                promoted.get((rel.get("source") or "").strip().lower()),
+                promoted.get((rel.get("target") or "").strip().lower()),
+                rel.get("type", "relates_to"),
+                confidence_score=rel.get("confidence", 0.75),
+            )
 
-        db.commit()
+        batch.flush(db)
 
         # Clean up Redis
         cache_service.delete_branch_preview(
@@ -146,6 +146,10 @@ async def _run_async_pipeline(db, document, storage_path, document_id, tenant_id
             crud.document.update(db=db, db_obj=document, obj_in={"status": "completed", "progress": 100, "error_message": None})
             logger.info(f"Multi-pass analysis completed successfully for document_id: {document_id}")
 
+            # Cached chat answers may cite the old analysis
+            from app.services.answer_cache_service import answer_cache_service
+            answer_cache_service.bump_epoch(tenant_id)
+
             # SPRINT 5: Notify document owner that analysis is complete
             try:
                 from app.services.notification_service import notify
@@ -24,7 +24,8 @@ def generate_concept_embeddings(self, concept_ids: list, tenant_id: int):
         stats = embedding_service.embed_concepts_batch(db, tenant_id, concept_ids)
         logger.info(
             f"EMBEDDING_TASK completed: embedded={stats['embedded']}, "
-            f"failed={stats['failed']}, skipped={stats['skipped']}"
+            f"failed={stats['failed']}, skipped={stats['skipped']}, "
+            f"batches={stats['batches']}, {stats['concepts_per_second']} concepts/s"
         )
         return stats
     except Exception as e:
@@ -82,3 +83,25 @@ def embed_all_tenant_concepts(self, tenant_id: int):
         return {"status": "failed", "error": str(e)}
     finally:
         db.close()
+
+
+@celery_app.task(name="build_vector_indexes", bind=True, max_retries=0)
+def build_vector_indexes(self, tenant_id: int = None):
+    """
+    Admin job: build per-tenant partial HNSW indexes for tenants with enough
+    embedded rows (all tenants, or just `tenant_id`). Run after large
+    embedding backfills; index builds use CREATE INDEX CONCURRENTLY.
+    """
+    logger.info(f"VECTOR_INDEX_TASK started (tenant={tenant_id or 'all'})")
+
+    db = SessionLocal()
+    try:
+        from app.services.vector_index_service import vector_index_service
+        summary = vector_index_service.build_tenant_indexes(db, tenant_id)
+        logger.info(f"VECTOR_INDEX_TASK completed: {summary}")
+        return summary
+    except Exception as e:
+        logger.error(f"VECTOR_INDEX_TASK failed: {e}")
+        return {"status": "failed", "error": str(e)}
+    finally:
+        db.close()
@@ -53,6 +53,8 @@ def extract_ontology_entities(self, document_id: int, tenant_id: int):
         result = business_ontology_service.build_graph_from_document_analysis(
             db=db, document_id=document_id, tenant_id=tenant_id
         )
+        from app.services.answer_cache_service import answer_cache_service
+        answer_cache_service.bump_epoch(tenant_id)
 
         logger.info(
             f"ONTOLOGY_TASK complete for document {document_id}: "
@@ -144,6 +146,8 @@ def run_cross_graph_mapping(self, tenant_id: int):
         result = mapping_service.run_full_mapping(
             db=db, tenant_id=tenant_id, use_ai_fallback=True
         )
+        from app.services.answer_cache_service import answer_cache_service
+        answer_cache_service.bump_epoch(tenant_id)
 
         logger.info(
             f"CROSS_GRAPH_MAPPING complete for tenant {tenant_id}: "
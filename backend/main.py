@@ -49,6 +49,11 @@ async def lifespan(app: FastAPI):
     
     logger.info("✅ Database initialized successfully")
 
+    # Probe pgvector / index capabilities once; search reads the cached flags
+    from app.db.capabilities import db_capabilities
+    from app.db.session import engine
+    db_capabilities.refresh(engine)
+
     # Sprint 6: Initialize field encryption listeners
     from app.services.field_encryption import register_encryption_listeners
     register_encryption_listeners()
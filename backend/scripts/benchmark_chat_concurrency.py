@@ -0,0 +1,100 @@
+"""
+Load benchmark: do concurrent chat requests still serialize on the event loop?
+
+Fires N chat messages at a running API at once and, while they are in
+flight, polls /health. If sync DB work blocked the loop, the chat requests
+would finish one after another (overlap ≈ 1x) and /health latency would
+climb to the length of a chat request. With the DB threadpool offload the
+requests overlap (overlap ≈ N) and /health stays fast.
+
+Each run creates its own conversations so the per-conversation message
+cap is never hit. Every message is a real, billed AI call — point this at
+a staging tenant.
+
+Usage:
+    python scripts/benchmark_chat_concurrency.py \\
+        --base-url http://localhost:8000 --token <JWT> --concurrency 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def _create_conversation(client: httpx.AsyncClient) -> int:
+    resp = await client.post("/api/v1/chat/conversations", json={"title": "Concurrency benchmark"})
+    resp.raise_for_status()
+    return resp.json()["id"]
+
+
+async def _send(client: httpx.AsyncClient, conversation_id: int, message: str) -> float:
+    start = time.perf_counter()
+    resp = await client.post(
+        f"/api/v1/chat/conversations/{conversation_id}/messages", json={"content": message},
+    )
+    resp.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def _poll_health(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            await client.get("/health")
+            latencies.append(time.perf_counter() - start)
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(interval)
+    return latencies
+
+
+def _pct(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def run(args) -> None:
+    headers = {"Authorization": f"Bearer {args.token}"}
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency + 2)
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, timeout=timeout, limits=limits) as client:
+        conversation_ids = [await _create_conversation(client) for _ in range(args.concurrency)]
+
+        # Warm-up: one request on its own gives the unloaded latency
+        baseline = await _send(client, conversation_ids[0], args.message)
+
+        stop = asyncio.Event()
+        health_task = asyncio.ensure_future(_poll_health(client, stop, args.health_interval))
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(_send(client, cid, args.message) for cid in conversation_ids))
+        wall = time.perf_counter() - start
+        stop.set()
+        health = await health_task
+
+    overlap = sum(latencies) / wall if wall else 0.0
+    print(f"requests:            {len(latencies)} concurrent")
+    print(f"single request:      {baseline:.2f}s")
+    print(f"wall time:           {wall:.2f}s (fully serialized would be ~{sum(latencies):.2f}s)")
+    print(f"latency p50 / p95:   {statistics.median(latencies):.2f}s / {_pct(latencies, 0.95):.2f}s")
+    print(f"overlap:             {overlap:.1f}x (1.0x = serialized, {len(latencies)}.0x = fully concurrent)")
+    if health:
+        print(f"/health during load: p50 {statistics.median(health) * 1000:.0f}ms, "
+              f"max {max(health) * 1000:.0f}ms over {len(health)} probes")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True, help="Bearer token of a user with CHAT_USE")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--message", default="Give me a short overview of this project.")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--health-interval", type=float, default=0.05)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -37,6 +37,35 @@ def db_session():
         session.close()
         Base.metadata.drop_all(bind=engine)
 
+@pytest.fixture
+def table_session():
+    """
+    Factory for sessions on a fresh in-memory SQLite database holding only
+    the given models' tables (with the indexes the models declare), for
+    tests that run real SQL without building the whole schema:
+
+        db = table_session(OntologyConcept, OntologyRelationship)
+
+    configure(sessionmaker) runs before the session is opened, e.g. to
+    register write-tracking listeners.
+    """
+    opened = []
+
+    def make(*models, configure=None):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine, tables=[model.__table__ for model in models])
+        factory = sessionmaker(bind=engine)
+        if configure is not None:
+            configure(factory)
+        session = factory()
+        opened.append((session, engine))
+        return session
+
+    yield make
+    for session, engine in opened:
+        session.close()
+        engine.dispose()
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """FastAPI test client with database override."""
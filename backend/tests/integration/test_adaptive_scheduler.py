@@ -0,0 +1,92 @@
+"""
+Adaptive Scheduler Tests — AIMD window and sliding work queue.
+"""
+import threading
+import time
+
+from app.tasks.adaptive_scheduler import (
+    AIMDConcurrencyLimiter,
+    NEUTRAL,
+    OVERLOAD,
+    SUCCESS,
+    is_overload_error,
+    run_adaptive,
+)
+
+
+class TestLimiter:
+    def test_additive_increase_about_one_per_window(self):
+        limiter = AIMDConcurrencyLimiter(initial=3, maximum=10)
+        for _ in range(3):
+            limiter.on_success()
+        assert limiter.limit == 3  # 3 + 1/3 + 1/3.33 + 1/3.63 ≈ 3.9
+        limiter.on_success()
+        assert limiter.limit == 4
+
+    def test_multiplicative_decrease_once_per_epoch(self):
+        limiter = AIMDConcurrencyLimiter(initial=8, maximum=8)
+        epoch = limiter.epoch
+        assert limiter.on_overload(epoch) is True
+        assert limiter.limit == 4
+        # A second 429 from a call started in the same window is ignored
+        assert limiter.on_overload(epoch) is False
+        assert limiter.limit == 4
+
+    def test_bounds(self):
+        limiter = AIMDConcurrencyLimiter(initial=1, minimum=1, maximum=2)
+        limiter.on_overload(limiter.epoch)
+        assert limiter.limit == 1
+        for _ in range(20):
+            limiter.on_success()
+        assert limiter.limit == 2
+
+
+class TestRunAdaptive:
+    def test_window_is_respected_and_callbacks_run_on_caller_thread(self):
+        limiter = AIMDConcurrencyLimiter(initial=2, maximum=2)
+        active, peak = [0], [0]
+        lock = threading.Lock()
+        caller = threading.get_ident()
+        done_threads, done_items = set(), []
+
+        def work(item):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+            return item
+
+        def on_done(item, result, exc):
+            done_threads.add(threading.get_ident())
+            done_items.append(item)
+
+        stats = run_adaptive(range(10), work, on_done, limiter, lambda r, e: SUCCESS)
+
+        assert peak[0] <= 2
+        assert sorted(done_items) == list(range(10))
+        assert done_threads == {caller}
+        assert stats["submitted"] == 10
+
+    def test_overload_shrinks_window(self):
+        limiter = AIMDConcurrencyLimiter(initial=4, maximum=4)
+
+        def classify(result, exc):
+            return OVERLOAD if exc else NEUTRAL
+
+        def work(item):
+            if item == 0:
+                raise RuntimeError("429 Resource exhausted")
+            return item
+
+        run_adaptive(range(6), work, lambda *a: None, limiter, classify)
+        assert limiter.decreases == 1
+        assert limiter.limit == 2
+
+
+def test_is_overload_error():
+    assert is_overload_error("429 RESOURCE_EXHAUSTED: quota")
+    assert is_overload_error("Request timed out")
+    assert not is_overload_error("SyntaxError in file")
+    assert not is_overload_error(None)
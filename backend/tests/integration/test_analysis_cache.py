@@ -0,0 +1,108 @@
+"""
+Content-addressed Analysis Cache Tests
+
+Redis is replaced with an in-memory dict so the tests check which keys are
+written and read, not the network.
+"""
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.ai.prompt_manager import PromptManager, PromptType
+from app.services.cache_service import CacheService
+
+
+class _DictRedis:
+    def __init__(self):
+        self.store = {}
+        self.hashes = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, name, time, value):
+        self.store[name] = value
+
+    def hincrby(self, key, field, amount):
+        h = self.hashes.setdefault(key, {})
+        h[field] = int(h.get(field, 0)) + amount
+
+    def hgetall(self, key):
+        return {k: str(v) for k, v in self.hashes.get(key, {}).items()}
+
+    def pipeline(self):
+        pipe = MagicMock()
+        pipe.hset.side_effect = lambda key, mapping: self.hashes.__setitem__(key, dict(mapping))
+        return pipe
+
+
+@pytest.fixture
+def cache():
+    service = CacheService.__new__(CacheService)
+    service.redis_client = _DictRedis()
+    return service
+
+
+def _parts(**overrides):
+    parts = {
+        "raw_content": "def add(a, b):\n    return a + b\n",
+        "prompt_type": "enhanced_semantic_analysis",
+        "prompt_version": "2.0-abcd1234",
+        "model_id": "gemini:gemini-2.5-flash",
+        "language": "python",
+        "tenant_id": 7,
+    }
+    parts.update(overrides)
+    return parts
+
+
+class TestFileAnalysisCache:
+    def test_round_trip(self, cache):
+        assert cache.get_cached_file_analysis(**_parts()) is None
+        assert cache.set_cached_file_analysis(**_parts(), result={"summary": "adds"})
+        assert cache.get_cached_file_analysis(**_parts()) == {"summary": "adds"}
+
+    def test_key_uses_full_sha256_and_tenant(self, cache):
+        cache.set_cached_file_analysis(**_parts(), result={})
+        (key,) = cache.redis_client.store
+        assert key.startswith("analysis:file:7:")
+        assert len(key.split(":")[3]) == 64
+
+    @pytest.mark.parametrize("field,value", [
+        ("tenant_id", 8),
+        ("prompt_version", "2.1-abcd1234"),
+        ("model_id", "claude:claude-sonnet-4-5"),
+        ("language", "javascript"),
+        ("prompt_type", "code_analysis"),
+        ("raw_content", "def add(a, b):\n    return b + a\n"),
+    ])
+    def test_any_key_component_change_misses(self, cache, field, value):
+        cache.set_cached_file_analysis(**_parts(), result={"summary": "adds"})
+        assert cache.get_cached_file_analysis(**_parts(**{field: value})) is None
+
+    def test_unavailable_redis_degrades(self):
+        service = CacheService.__new__(CacheService)
+        service.redis_client = None
+        assert service.get_cached_file_analysis(**_parts()) is None
+        assert service.set_cached_file_analysis(**_parts(), result={}) is False
+
+
+class TestRunStats:
+    def test_counts_hits_and_misses(self, cache):
+        cache.start_run_stats(tenant_id=7, repo_id=3, run_id="run-1")
+        cache.record_run_cache_result(tenant_id=7, repo_id=3, hit=True)
+        cache.record_run_cache_result(tenant_id=7, repo_id=3, hit=True)
+        cache.record_run_cache_result(tenant_id=7, repo_id=3, hit=False)
+        stats = cache.get_run_stats(tenant_id=7, repo_id=3)
+        assert stats == {"run_id": "run-1", "hits": 2, "misses": 1, "hit_rate": 0.667}
+
+
+class TestPromptVersion:
+    def test_version_includes_template_digest(self):
+        pm = PromptManager()
+        before = pm.get_prompt_version(PromptType.CODE_ANALYSIS)
+        assert before.startswith(pm.prompts[PromptType.CODE_ANALYSIS.value]["version"] + "-")
+
+        pm.prompts[PromptType.CODE_ANALYSIS.value]["prompt"] += "\nBe concise."
+        assert pm.get_prompt_version(PromptType.CODE_ANALYSIS) != before
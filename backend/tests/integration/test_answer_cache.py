@@ -0,0 +1,168 @@
+"""
+Answer Cache Tests
+
+A small in-memory Redis stand-in and a fake embedding model cover exact and
+semantic hits, the similarity threshold, epoch invalidation, role-scoped
+entries, uncacheable live-data intents and the hit-rate counters.
+"""
+from collections import defaultdict
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import settings
+from app.services.answer_cache_service import AnswerCacheService
+from app.services.rag_service import RAGService
+
+
+class MemoryRedis:
+    """Just the Redis commands the answer cache uses (decode_responses=True)."""
+
+    def __init__(self):
+        self.strings = {}
+        self.hashes = defaultdict(dict)
+        self.zsets = defaultdict(dict)
+
+    def get(self, key):
+        return self.strings.get(key)
+
+    def incr(self, key):
+        self.strings[key] = str(int(self.strings.get(key, 0)) + 1)
+        return int(self.strings[key])
+
+    def hget(self, key, field):
+        return self.hashes[key].get(field)
+
+    def hset(self, key, field, value):
+        self.hashes[key][field] = value
+
+    def hgetall(self, key):
+        return dict(self.hashes[key])
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes[key].pop(field, None)
+
+    def hincrby(self, key, field, amount):
+        self.hashes[key][field] = str(int(self.hashes[key].get(field, 0)) + amount)
+
+    def hincrbyfloat(self, key, field, amount):
+        self.hashes[key][field] = str(float(self.hashes[key].get(field, 0)) + amount)
+
+    def zadd(self, key, mapping):
+        self.zsets[key].update(mapping)
+
+    def zcard(self, key):
+        return len(self.zsets[key])
+
+    def zrange(self, key, start, end):
+        return sorted(self.zsets[key], key=self.zsets[key].get)[start:end + 1]
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.zsets[key].pop(member, None)
+
+    def expire(self, key, ttl):
+        pass
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+
+# Queries map onto 3-d "embeddings"; the paraphrase sits close to the
+# original, the unrelated question is far from both.
+VECTORS = {
+    "what does the payment service do?": [1.0, 0.0, 0.0],
+    "explain the payment service": [0.99, 0.1, 0.0],
+    "how is the login page styled?": [0.0, 1.0, 0.0],
+}
+
+RESULT = {"answer": "It settles invoices nightly.", "model_used": "gemini-2.5-flash",
+          "citations": [], "cost_usd": 0.002, "input_tokens": 900, "output_tokens": 60}
+
+
+@pytest.fixture
+def cache():
+    redis = MemoryRedis()
+    service = AnswerCacheService()
+    with patch("app.services.cache_service.cache_service.redis_client", redis), \
+            patch("app.services.embedding_service.embedding_service.generate_query_embedding",
+                  side_effect=lambda q: VECTORS.get(q.lower())), \
+            patch("app.services.answer_cache_service.answer_cache_service", service), \
+            patch.object(settings, "ANSWER_CACHE_ENABLED", True):
+        yield service
+
+
+def _lookup(query, roles=("DEVELOPER",)):
+    return RAGService().lookup_cached_answer(query, 1, user_roles=list(roles))
+
+
+def _prime(cache, query="What does the payment service do?", roles=("DEVELOPER",)):
+    probe = _lookup(query, roles)
+    assert probe is not None and probe.hit is None
+    cache.store(probe, result=RESULT, context_summary={"semantic_results": 3})
+
+
+class TestAnswerCache:
+    def test_exact_repeat_hits_without_tokens(self, cache):
+        _prime(cache)
+        probe = _lookup("  what does the Payment service do ")
+
+        assert probe.hit and probe.similarity == 1.0
+        result, summary = probe.served_result()
+        assert result["answer"] == RESULT["answer"]
+        assert (result["input_tokens"], result["cost_usd"]) == (0, 0.0)
+        assert summary["answer_cache"]["hit"] is True
+
+    def test_paraphrase_above_threshold_hits(self, cache):
+        _prime(cache)
+        probe = _lookup("Explain the payment service")
+        assert probe.hit and probe.similarity >= settings.ANSWER_CACHE_SIMILARITY
+
+    def test_unrelated_question_misses(self, cache):
+        _prime(cache)
+        assert _lookup("How is the login page styled?").hit is None
+
+    def test_epoch_bump_invalidates(self, cache):
+        _prime(cache)
+        cache.bump_epoch(1)
+        assert _lookup("What does the payment service do?").hit is None
+
+    def test_roles_do_not_share_answers(self, cache):
+        _prime(cache, roles=("CXO",))
+        assert _lookup("What does the payment service do?", roles=("DEVELOPER",)).hit is None
+
+    def test_per_user_context_fields_are_not_shared(self, cache):
+        probe = _lookup("What does the payment service do?")
+        cache.store(probe, result=RESULT, context_summary={
+            "concept_count": 4, "pending_approval_count": 2, "retrieval_ms": 310,
+        })
+        _, summary = _lookup("What does the payment service do?").served_result()
+
+        assert summary["concept_count"] == 4
+        assert "pending_approval_count" not in summary and "retrieval_ms" not in summary
+
+    def test_live_data_questions_are_not_cached(self, cache):
+        assert _lookup("What is my billing balance this month?") is None
+
+    def test_stats_report_hit_rate_and_savings(self, cache):
+        _prime(cache)
+        _lookup("What does the payment service do?")
+        stats = cache.get_stats(1)
+
+        assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 1, 1)
+        assert stats["hit_rate"] == 0.5
+        assert stats["saved_cost_usd"] == pytest.approx(0.002)
+
+
+def test_stats_endpoint_includes_query_embedding_cache():
+    from app.api.endpoints.chat import get_answer_cache_stats
+
+    with patch("app.services.cache_service.cache_service.redis_client", None):
+        stats = get_answer_cache_stats(tenant_id=1, current_user=None)
+
+    assert stats["enabled"] is False
+    assert {"memory_hits", "redis_hits", "misses", "hit_rate"} <= set(stats["query_embedding_cache"])
@@ -0,0 +1,116 @@
+"""
+Bulk Mapping Writer Tests
+
+Runs against an in-memory SQLite database holding only the tables the
+writer touches (with the partial uq_ontology_concepts_identity from the model), so the
+upsert / set-based promote SQL really executes.
+"""
+import pytest
+from sqlalchemy import event
+
+import app.models  # noqa: F401 — register all mappers
+from app import crud
+from app.models.concept_mapping import ConceptMapping
+from app.models.ontology_concept import OntologyConcept
+from app.models.ontology_relationship import OntologyRelationship
+from app.services.mapping_service import MappingService
+
+TENANT = 1
+
+
+@pytest.fixture
+def db(table_session):
+    return table_session(
+        OntologyConcept, ConceptMapping, OntologyRelationship,
+    )
+
+
+def _concept(db, id, name, source_type):
+    db.add(OntologyConcept(id=id, name=name, concept_type="Entity", tenant_id=TENANT, source_type=source_type))
+
+
+def _mapping(doc_id, code_id, method, score, status="candidate"):
+    return {
+        "document_concept_id": doc_id, "code_concept_id": code_id,
+        "mapping_method": method, "confidence_score": score, "status": status,
+    }
+
+
+class TestBulkUpsert:
+    def test_existing_pair_only_upgraded_by_higher_confidence(self, db):
+        for i, source in ((1, "document"), (2, "code")):
+            _concept(db, i, f"c{i}", source)
+        db.commit()
+
+        crud.concept_mapping.bulk_upsert_mappings(db=db, mappings=[_mapping(1, 2, "fuzzy", 0.6)], tenant_id=TENANT)
+        crud.concept_mapping.bulk_upsert_mappings(db=db, mappings=[_mapping(1, 2, "fuzzy", 0.3)], tenant_id=TENANT)
+        row = db.query(ConceptMapping).one()
+        assert row.confidence_score == 0.6
+
+        crud.concept_mapping.bulk_upsert_mappings(
+            db=db, mappings=[_mapping(1, 2, "exact", 1.0, status="confirmed")], tenant_id=TENANT
+        )
+        db.refresh(row)
+        assert (row.mapping_method, row.confidence_score) == ("exact", 1.0)
+        assert row.status == "candidate"  # status belongs to reviewers once the pair exists
+
+    def test_promote_many_is_idempotent(self, db):
+        for i in range(1, 4):
+            _concept(db, i, f"c{i}", "document")
+        db.commit()
+
+        assert crud.ontology_concept.promote_many_to_both(db=db, concept_ids=[1, 2, 2], tenant_id=TENANT) == 2
+        assert crud.ontology_concept.promote_many_to_both(db=db, concept_ids=[1, 2], tenant_id=TENANT) == 0
+        assert db.get(OntologyConcept, 3).source_type == "document"
+
+
+class TestRunFullMappingBulk:
+    def test_statement_count_does_not_grow_per_match(self, db):
+        n = 200
+        for i in range(n):
+            _concept(db, i + 1, f"Payment Step {i}", "document")
+            _concept(db, n + i + 1, f"payment_step_{i}", "code")
+        db.commit()
+
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute",
+                     lambda conn, cursor, sql, *a: statements.append(sql))
+
+        result = MappingService().run_full_mapping(db, tenant_id=TENANT, use_ai_fallback=False)
+
+        assert result["exact_matches"] == n
+        assert result["total_mappings"] == n
+        assert db.query(ConceptMapping).count() == n
+        assert db.query(OntologyConcept).filter(OntologyConcept.source_type == "both").count() == 2 * n
+        writes = [s for s in statements if s.lstrip().upper().startswith(("INSERT", "UPDATE"))]
+        assert len(writes) <= 2
+
+    def test_same_name_twins_both_survive_promotion(self, db):
+        _concept(db, 1, "Payment", "document")
+        _concept(db, 2, "Payment", "code")
+        _concept(db, 3, "Ledger", "document")
+        db.add(OntologyRelationship(tenant_id=TENANT, source_concept_id=2, target_concept_id=3, relationship_type="uses"))
+        db.commit()
+
+        result = MappingService().run_full_mapping(db, tenant_id=TENANT, use_ai_fallback=False)
+
+        assert (result["exact_matches"], result["total_gaps"]) == (1, 1)
+        payments = db.query(OntologyConcept).filter(OntologyConcept.name == "Payment").order_by(OntologyConcept.id)
+        assert [(c.id, c.source_type) for c in payments] == [(1, "both"), (2, "both")]
+        mapping = db.query(ConceptMapping).one()
+        assert (mapping.document_concept_id, mapping.code_concept_id, mapping.status) == (1, 2, "confirmed")
+        assert db.query(OntologyRelationship).count() == 1
+
+    def test_reanalysed_copies_promote_next_to_existing_both(self, db):
+        _concept(db, 1, "Payment", "both")
+        _concept(db, 5, "Payment", "document")
+        _concept(db, 6, "Payment", "code")
+        db.commit()
+
+        result = MappingService().run_full_mapping(db, tenant_id=TENANT, use_ai_fallback=False)
+
+        assert result["exact_matches"] == 1
+        concepts = db.query(OntologyConcept).order_by(OntologyConcept.id)
+        assert [(c.id, c.source_type) for c in concepts] == [(1, "both"), (5, "both"), (6, "both")]
+        mapping = db.query(ConceptMapping).one()
+        assert (mapping.document_concept_id, mapping.code_concept_id) == (5, 6)
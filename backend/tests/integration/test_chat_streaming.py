@@ -0,0 +1,190 @@
+"""
+Chat Streaming Tests
+
+Fake streaming providers stand in for Gemini / Claude, so these tests check
+token relay, Claude → Gemini fallback, partial results on early close and
+the SSE endpoint's disconnect handling without any network or database.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.api.endpoints import chat
+from app.services.answer_cache_service import AnswerCacheProbe
+from app.services.rag_service import AnswerStream, RAGService, RetrievedContext
+
+
+class FakeStream:
+    """Provider stream_content() stand-in that records whether it was closed early."""
+
+    def __init__(self, chunks, usage=None, fail_after=None):
+        self.chunks = chunks
+        self.usage = usage or {"input_tokens": 100, "output_tokens": 20}
+        self.fail_after = fail_after
+        self.closed_early = False
+        self.calls = 0
+
+    async def stream_content(self, prompt, **kwargs):
+        self.calls += 1
+        finished = False
+        try:
+            for i, text in enumerate(self.chunks):
+                if i == self.fail_after:
+                    raise RuntimeError("provider down")
+                await asyncio.sleep(0)
+                yield {"type": "token", "text": text}
+            if self.fail_after == len(self.chunks):
+                raise RuntimeError("provider down")
+            finished = True
+            yield {"type": "usage", **self.usage}
+        finally:
+            self.closed_early = not finished
+
+
+def _router(gemini, claude=None):
+    return SimpleNamespace(
+        gemini=gemini,
+        claude=claude,
+        claude_available=claude is not None,
+        calculate_claude_cost=lambda i, o: {"cost_usd": (i + o) / 1000, "model": "claude-test"},
+    )
+
+
+def _answer(router, use_claude=False):
+    return AnswerStream(
+        RAGService(), router, "prompt " * 40, RetrievedContext(),
+        use_claude=use_claude, tenant_id=1, user_id=2,
+    )
+
+
+async def _collect(answer, limit=None):
+    texts = []
+    async for event in answer:
+        texts.append(event["text"])
+        if limit and len(texts) == limit:
+            break
+    await answer.aclose()
+    return texts
+
+
+class TestAnswerStream:
+    def test_tokens_relayed_and_usage_billed(self):
+        gemini = FakeStream(["Pay", "ments ", "settle nightly."])
+        answer = _answer(_router(gemini))
+
+        assert asyncio.run(_collect(answer)) == ["Pay", "ments ", "settle nightly."]
+        result = answer.result
+        assert result["answer"] == "Payments settle nightly."
+        assert (result["input_tokens"], result["output_tokens"]) == (100, 20)
+        assert result["model_used"] == "gemini-2.5-flash"
+        assert not gemini.closed_early
+
+    def test_claude_failure_before_first_token_falls_back(self):
+        gemini = FakeStream(["from gemini"])
+        claude = FakeStream(["never"], fail_after=0)
+        answer = _answer(_router(gemini, claude), use_claude=True)
+
+        assert asyncio.run(_collect(answer)) == ["from gemini"]
+        assert answer.provider == "gemini"
+        assert answer.result["answer"] == "from gemini"
+
+    def test_claude_failure_mid_answer_keeps_partial_text(self):
+        gemini = FakeStream(["unused"])
+        claude = FakeStream(["half ", "an answer"], fail_after=2)
+        answer = _answer(_router(gemini, claude), use_claude=True)
+
+        asyncio.run(_collect(answer))
+        assert gemini.calls == 0
+        assert answer.error and answer.result["answer"] == "half an answer"
+        assert answer.result["model_used"] == "claude-test"
+
+    def test_early_close_cancels_upstream_with_estimated_usage(self):
+        gemini = FakeStream(["a" * 40] * 10)
+        answer = _answer(_router(gemini))
+
+        assert len(asyncio.run(_collect(answer, limit=2))) == 2
+        assert gemini.closed_early
+        result = answer.result
+        assert result["answer"] == "a" * 80
+        assert result["output_tokens"] == 21  # estimate_tokens() of the partial text
+        assert result["input_tokens"] > 0
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after=None):
+        self.checks = 0
+        self.disconnect_after = disconnect_after
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return self.disconnect_after is not None and self.checks > self.disconnect_after
+
+
+async def _run_endpoint(answer, request, cache_probe=None):
+    conv = SimpleNamespace(model_preference="gemini")
+    user_msg = SimpleNamespace(
+        id=1, conversation_id=5, role="user", content="hi", context_used=None,
+        input_tokens=0, output_tokens=0, cost_usd=0.0, model_used=None,
+        feedback=None, created_at="2026-01-01T00:00:00",
+    )
+    saved = []
+
+    def fake_save(db, **kwargs):
+        saved.append({**kwargs["result"], "cache_probe": kwargs["cache_probe"]})
+        return None
+
+    with patch.object(chat, "_start_turn", return_value=(conv, user_msg, RetrievedContext(), [], cache_probe)), \
+            patch("app.services.rag_service.rag_service.stream_answer", return_value=answer), \
+            patch.object(chat, "_save_assistant_reply", side_effect=fake_save):
+        response = await chat.stream_message.__wrapped__(
+            request=request, response=MagicMock(), conversation_id=5,
+            payload=SimpleNamespace(content="hi"), tenant_id=1, db=MagicMock(),
+            current_user=SimpleNamespace(id=2, roles=["DEVELOPER"]),
+        )
+        frames = [frame async for frame in response.body_iterator]
+    events = [frame.split("\n")[0].removeprefix("event: ") for frame in frames]
+    return events, frames, saved
+
+
+class TestStreamEndpoint:
+    def test_event_sequence_and_single_save(self):
+        answer = _answer(_router(FakeStream(["one ", "two"])))
+        events, frames, saved = asyncio.run(_run_endpoint(answer, FakeRequest()))
+
+        assert events == ["retrieval", "token", "token", "citations", "done"]
+        assert json.loads(frames[1].split("data: ")[1]) == {"text": "one "}
+        assert [r["answer"] for r in saved] == ["one two"]
+        assert saved[0]["completed"]
+
+    def test_failed_stream_is_not_offered_to_answer_cache(self):
+        probe = AnswerCacheProbe(tenant_id=1, namespace="ns", entry_id="e", query="hi")
+        claude = FakeStream(["half ", "an answer"], fail_after=2)
+        answer = _answer(_router(FakeStream(["unused"]), claude), use_claude=True)
+        events, _, saved = asyncio.run(_run_endpoint(answer, FakeRequest(), cache_probe=probe))
+
+        assert events == ["retrieval", "token", "token", "error", "citations", "done"]
+        assert saved[0]["answer"] == "half an answer" and not saved[0]["completed"]
+        assert saved[0]["cache_probe"] is None
+
+    def test_disconnect_cancels_upstream_and_saves_partial(self):
+        gemini = FakeStream(["t"] * 50)
+        answer = _answer(_router(gemini))
+        events, _, saved = asyncio.run(_run_endpoint(answer, FakeRequest(disconnect_after=3)))
+
+        assert events == ["retrieval", "token", "token", "token"]
+        assert gemini.closed_early
+        assert [r["answer"] for r in saved] == ["tttt"]
+
+    def test_cache_hit_streams_cached_answer_without_model_call(self):
+        probe = AnswerCacheProbe(
+            tenant_id=1, namespace="ns", entry_id="e", query="hi", similarity=0.97,
+            hit={"query": "hello", "context_summary": {}, "result": {
+                "answer": "cached answer", "model_used": "gemini-2.5-flash", "citations": [], "cost_usd": 0.01,
+            }},
+        )
+        events, frames, saved = asyncio.run(_run_endpoint(None, FakeRequest(), cache_probe=probe))
+
+        assert events == ["retrieval", "token", "citations", "done"]
+        assert json.loads(frames[1].split("data: ")[1]) == {"text": "cached answer"}
+        assert saved[0]["answer"] == "cached answer" and saved[0]["cost_usd"] == 0.0
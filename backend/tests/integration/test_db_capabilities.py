@@ -0,0 +1,94 @@
+"""
+Database Capability Registry Tests
+
+A fake PostgreSQL engine answers the catalog queries, so these tests check
+that capabilities are probed once per engine, refreshed on demand, retried
+after a failed probe, and that the pgvector check no longer queries the
+database on every call.
+"""
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+from app.db import capabilities
+from app.db.capabilities import CapabilityRegistry
+from app.services.embedding_service import _check_pgvector_available
+
+CATALOG = {
+    "pg_extension": [("vector", "0.7.0"), ("plpgsql", "1.0")],
+    "information_schema.columns": [
+        ("ontology_concepts", "embedding", "vector"),
+        ("knowledge_graph_versions", "embedding", "json"),  # migration's JSON fallback
+    ],
+    "pg_index": [("ontology_concepts", "idx_ontology_concepts_embedding_hnsw", "hnsw")],
+}
+
+
+def _fake_engine(fail=False):
+    engine = MagicMock(spec=Engine)
+    engine.dialect = MagicMock()
+    engine.dialect.name = "postgresql"
+    engine.engine = engine
+    conn = engine.connect.return_value.__enter__.return_value
+
+    def execute(stmt):
+        if fail:
+            raise RuntimeError("permission denied for pg_index")
+        sql = str(stmt)
+        return next(rows for table, rows in CATALOG.items() if table in sql)
+
+    conn.execute.side_effect = execute
+    return engine, conn
+
+
+class TestCapabilityRegistry:
+    def test_probe_reads_extensions_columns_and_indexes(self):
+        engine, _ = _fake_engine()
+        caps = CapabilityRegistry().get(engine)
+
+        assert caps.pgvector and not caps.pg_trgm
+        assert caps.vector_column("ontology_concepts")
+        assert not caps.vector_column("knowledge_graph_versions")
+        assert caps.has_index("ontology_concepts", "hnsw")
+        assert not caps.has_index("ontology_concepts", "gin")
+
+    def test_probed_once_per_engine_until_refresh(self):
+        engine, conn = _fake_engine()
+        registry = CapabilityRegistry()
+        session = MagicMock(get_bind=MagicMock(return_value=engine))
+
+        for _ in range(5):
+            registry.get(session)
+        assert conn.execute.call_count == 3
+
+        registry.refresh(engine)
+        assert conn.execute.call_count == 6
+
+    def test_failed_probe_is_retried_later(self):
+        engine, conn = _fake_engine(fail=True)
+        registry = CapabilityRegistry()
+
+        assert registry.get(engine).error and not registry.get(engine).pgvector
+        assert conn.execute.call_count == 1
+
+        with patch.object(capabilities, "PROBE_RETRY_SECONDS", -1):
+            registry.get(engine)
+        assert conn.execute.call_count == 2
+
+    def test_non_postgres_database_has_no_vector_support(self):
+        caps = CapabilityRegistry().get(create_engine("sqlite://"))
+        assert caps.dialect == "sqlite" and not caps.pgvector and caps.error is None
+
+
+class TestPgvectorCheck:
+    def test_check_uses_registry_not_a_query_per_call(self):
+        engine, _ = _fake_engine()
+        db = MagicMock(get_bind=MagicMock(return_value=engine))
+        with patch.object(capabilities, "db_capabilities", CapabilityRegistry()):
+            results = [_check_pgvector_available(db, "ontology_concepts") for _ in range(10)]
+            assert _check_pgvector_available(db)
+            assert not _check_pgvector_available(db, "knowledge_graph_versions")
+
+        assert all(results)
+        db.execute.assert_not_called()
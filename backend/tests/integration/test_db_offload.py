@@ -0,0 +1,116 @@
+"""
+DB Offload Tests
+
+run_db() must keep the event loop free while blocking Session work runs,
+so concurrent async chat requests overlap instead of serializing. Blocking
+work is simulated with time.sleep — no database needed.
+"""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.endpoints import chat
+from app.db.session import run_db
+from app.services.rag_service import RetrievedContext
+
+BLOCK = 0.2
+
+
+class TestRunDb:
+    def test_event_loop_keeps_running_during_blocking_call(self):
+        async def scenario():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.ensure_future(ticker())
+            await run_db(time.sleep, BLOCK)
+            task.cancel()
+            return ticks
+
+        assert asyncio.run(scenario()) >= 5
+
+    def test_errors_propagate_to_the_caller(self):
+        def not_found():
+            raise HTTPException(status_code=404, detail="Conversation not found")
+
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(run_db(not_found))
+        assert exc.value.status_code == 404
+
+
+class _FakeStream:
+    """generate_content_async(stream=True) stand-in: async iterable chunks plus final usage."""
+
+    def __init__(self, texts):
+        self._texts = texts
+        self.usage_metadata = SimpleNamespace(prompt_token_count=10, candidates_token_count=len(texts))
+
+    async def __aiter__(self):
+        for text in self._texts:
+            yield SimpleNamespace(text=text)
+
+
+class TestStreamBilling:
+    @pytest.mark.parametrize("read_all", [True, False])
+    def test_stream_cost_is_logged_off_the_event_loop(self, read_all):
+        from app.services.ai.gemini import GeminiService
+
+        service = GeminiService.__new__(GeminiService)
+        service.model = SimpleNamespace(generate_content_async=AsyncMock(return_value=_FakeStream(["a", "b", "c"])))
+        threads = []
+        service._auto_log_cost = lambda **kwargs: threads.append(threading.current_thread())
+
+        async def scenario():
+            stream = service.stream_content("prompt", tenant_id=7)
+            async for event in stream:
+                if not read_all:
+                    break
+            await stream.aclose()
+            return threading.current_thread()
+
+        with patch("app.services.ai.gemini.rate_governor.acquire_async", new_callable=AsyncMock):
+            loop_thread = asyncio.run(scenario())
+
+        assert len(threads) == 1 and threads[0] is not loop_thread
+
+
+def _blocking_turn(db, **kwargs):
+    time.sleep(BLOCK)  # stands in for validation + retrieval queries
+    conv = SimpleNamespace(model_preference="gemini")
+    return conv, SimpleNamespace(id=1), RetrievedContext(), [], None
+
+
+class TestConcurrentChat:
+    def test_send_message_requests_overlap(self):
+        result = {"answer": "ok", "input_tokens": 1, "output_tokens": 1, "cost_usd": 0.0,
+                  "model_used": "gemini-2.5-flash", "citations": []}
+
+        async def one_request():
+            return await chat.send_message.__wrapped__(
+                request=MagicMock(), response=MagicMock(), conversation_id=5,
+                payload=SimpleNamespace(content="hi"), tenant_id=1, db=MagicMock(),
+                current_user=SimpleNamespace(id=2, roles=[]),
+            )
+
+        async def scenario(n):
+            start = time.perf_counter()
+            await asyncio.gather(*(one_request() for _ in range(n)))
+            return time.perf_counter() - start
+
+        with patch.object(chat, "_start_turn", side_effect=_blocking_turn), \
+                patch("app.services.rag_service.rag_service.generate_answer", AsyncMock(return_value=result)), \
+                patch.object(chat, "_save_assistant_reply", return_value=None):
+            elapsed = asyncio.run(scenario(5))
+
+        # Serialized on the loop this would take 5 × BLOCK
+        assert elapsed < 3 * BLOCK
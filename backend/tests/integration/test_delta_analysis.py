@@ -0,0 +1,75 @@
+"""
+Delta Re-analysis Planning Tests
+
+_plan_delta_analysis diffs a scanned GitHub tree against stored component
+blob SHAs; no GitHub or database access is needed.
+"""
+from types import SimpleNamespace
+
+from app.tasks.code_analysis_tasks import _plan_delta_analysis
+
+
+def _row(id, path, sha, status="completed"):
+    return SimpleNamespace(id=id, location=f"https://raw/{path}", blob_sha=sha, analysis_status=status)
+
+
+def _file(path, sha):
+    return {"path": path, "url": f"https://raw/{path}", "language": "python", "sha": sha}
+
+
+class TestPlanDeltaAnalysis:
+    def test_classifies_added_modified_unchanged_deleted(self):
+        existing = [
+            _row(1, "a.py", "aaa"),
+            _row(2, "b.py", "bbb"),
+            _row(3, "gone.py", "ggg"),
+        ]
+        scan = [_file("a.py", "aaa"), _file("b.py", "b22"), _file("new.py", "nnn")]
+
+        plan = _plan_delta_analysis(scan, existing)
+
+        assert [f["path"] for f in plan["to_analyze"]] == ["b.py", "new.py"]
+        assert plan["unchanged_ids"] == [1]
+        assert plan["deleted_ids"] == [3]
+        assert plan["added"] == 1
+        assert plan["modified"] == 1
+
+    def test_incomplete_or_unfingerprinted_files_are_reanalyzed(self):
+        existing = [_row(1, "a.py", "aaa", status="failed"), _row(2, "b.py", None)]
+        scan = [_file("a.py", "aaa"), _file("b.py", "bbb")]
+
+        plan = _plan_delta_analysis(scan, existing)
+
+        assert len(plan["to_analyze"]) == 2
+        assert plan["unchanged_ids"] == []
+        assert plan["modified"] == 2
+
+    def test_unchanged_repo_analyzes_nothing(self):
+        existing = [_row(i, f"f{i}.py", f"sha{i}") for i in range(50)]
+        scan = [_file(f"f{i}.py", f"sha{i}") for i in range(50)]
+
+        plan = _plan_delta_analysis(scan, existing)
+
+        assert plan["to_analyze"] == []
+        assert len(plan["unchanged_ids"]) == 50
+        assert plan["deleted_ids"] == []
+
+    def test_branch_switch_matches_on_repo_path(self):
+        base = "https://raw.githubusercontent.com/acme/shop"
+        existing = [
+            SimpleNamespace(id=1, location=f"{base}/main/src/a.py", blob_sha="aaa", analysis_status="completed"),
+            SimpleNamespace(id=2, location=f"{base}/main/a.py", blob_sha="top", analysis_status="completed"),
+            SimpleNamespace(id=3, location=f"{base}/main/src/gone.py", blob_sha="ggg", analysis_status="completed"),
+        ]
+        scan = [
+            {"path": p, "url": f"{base}/feature/x/{p}", "language": "python", "sha": sha}
+            for p, sha in [("src/a.py", "aaa"), ("a.py", "top2")]
+        ]
+
+        plan = _plan_delta_analysis(scan, existing)
+
+        assert plan["unchanged_ids"] == [1]
+        assert [f["path"] for f in plan["to_analyze"]] == ["a.py"]
+        assert plan["deleted_ids"] == [3]
+        assert plan["added"] == 0
+        assert plan["relocated"] == {1: f"{base}/feature/x/src/a.py", 2: f"{base}/feature/x/a.py"}
@@ -0,0 +1,191 @@
+"""
+Embedding Service Tests — batched concept embedding pipeline.
+
+The Gemini embedding API and the database are mocked: these tests check
+that a chunk of concepts costs one multi-input request and one bulk write,
+and that repeated query embeddings are served from the query cache.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from app.services.ai.rate_governor import AIRateLimitTimeout
+from app.services.embedding_service import BATCH_SIZE, EMBEDDING_MODEL, EmbeddingService
+
+
+def _fake_genai(dim: int = 3):
+    genai = MagicMock()
+
+    def embed_content(model, content, task_type):
+        if isinstance(content, list):
+            return {"embedding": [[float(i)] * dim for i in range(len(content))]}
+        return {"embedding": [0.5] * dim}
+
+    genai.embed_content.side_effect = embed_content
+    return genai
+
+
+class TestGenerateEmbeddingsBatch:
+    def test_single_request_for_many_texts(self):
+        genai = _fake_genai()
+        with patch("app.services.embedding_service._get_genai", return_value=genai):
+            vectors = EmbeddingService().generate_embeddings_batch(["a", "b", "c"])
+        assert genai.embed_content.call_count == 1
+        assert len(vectors) == 3
+        assert all(v is not None for v in vectors)
+
+    def test_blank_texts_are_not_sent(self):
+        genai = _fake_genai()
+        with patch("app.services.embedding_service._get_genai", return_value=genai):
+            vectors = EmbeddingService().generate_embeddings_batch(["a", "  ", "c"])
+        sent = genai.embed_content.call_args.kwargs["content"]
+        assert sent == ["a", "c"]
+        assert vectors[1] is None
+        assert vectors[0] is not None and vectors[2] is not None
+
+    def test_request_failure_returns_nones(self):
+        genai = MagicMock()
+        genai.embed_content.side_effect = RuntimeError("quota")
+        with patch("app.services.embedding_service._get_genai", return_value=genai):
+            vectors = EmbeddingService().generate_embeddings_batch(["a", "b"])
+        assert vectors == [None, None]
+
+
+class TestEmbedConceptsBatch:
+    def _service(self, loaded: dict):
+        service = EmbeddingService()
+        service._load_concepts_for_embedding = MagicMock(
+            side_effect=lambda db, tid, chunk: {cid: loaded[cid] for cid in chunk if cid in loaded}
+        )
+        service._store_concept_embeddings = MagicMock(return_value=True)
+        service.build_concept_text = MagicMock(side_effect=lambda c: f"Concept: {c}")
+        return service
+
+    def test_chunks_by_batch_size(self):
+        ids = list(range(1, BATCH_SIZE + 6))
+        service = self._service({cid: (cid, None) for cid in ids})
+        genai = _fake_genai()
+        with patch("app.services.embedding_service._get_genai", return_value=genai), \
+             patch("app.services.embedding_service._check_pgvector_available", return_value=True):
+            stats = service.embed_concepts_batch(MagicMock(), 1, ids)
+
+        assert stats["embedded"] == len(ids)
+        assert stats["batches"] == 2
+        assert stats["api_calls"] == 2
+        assert genai.embed_content.call_count == 2
+        assert service._store_concept_embeddings.call_count == 2
+        assert "concepts_per_second" in stats
+        assert "duration_seconds" in stats
+
+    def test_skips_missing_and_recently_embedded(self):
+        loaded = {1: (1, None), 2: (2, datetime.utcnow())}
+        service = self._service(loaded)
+        with patch("app.services.embedding_service._get_genai", return_value=_fake_genai()), \
+             patch("app.services.embedding_service._check_pgvector_available", return_value=True):
+            stats = service.embed_concepts_batch(MagicMock(), 1, [1, 2, 3])
+
+        assert stats["embedded"] == 1
+        assert stats["skipped"] == 2
+        rows = service._store_concept_embeddings.call_args.args[2]
+        assert [cid for cid, _ in rows] == [1]
+
+    def test_failed_write_counts_as_failed(self):
+        service = self._service({1: (1, None), 2: (2, None)})
+        service._store_concept_embeddings.return_value = False
+        with patch("app.services.embedding_service._get_genai", return_value=_fake_genai()), \
+             patch("app.services.embedding_service._check_pgvector_available", return_value=False):
+            stats = service.embed_concepts_batch(MagicMock(), 1, [1, 2])
+
+        assert stats["embedded"] == 0
+        assert stats["failed"] == 2
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+
+class TestQueryEmbeddingCache:
+    def _run(self, fn, redis=None, genai=None):
+        genai = genai or _fake_genai()
+        with patch("app.services.embedding_service._get_genai", return_value=genai), \
+                patch("app.services.embedding_service._acquire_embedding_slot"), \
+                patch("app.services.cache_service.cache_service.redis_client", redis):
+            return fn(), genai
+
+    def test_normalized_repeat_costs_one_api_call(self):
+        service = EmbeddingService()
+        (first, second), genai = self._run(lambda: (
+            service.generate_query_embedding("Payment  Service"),
+            service.generate_query_embedding("  payment service "),
+        ))
+        assert first == second
+        assert genai.embed_content.call_count == 1
+        assert service.get_query_cache_stats()["memory_hits"] == 1
+
+    def test_redis_tier_shared_across_workers(self):
+        redis = FakeRedis()
+        self._run(lambda: EmbeddingService().generate_query_embedding("auth flow"), redis=redis)
+        other_worker = EmbeddingService()
+        vector, genai = self._run(lambda: other_worker.generate_query_embedding("auth flow"), redis=redis)
+
+        assert vector == [0.5, 0.5, 0.5]
+        assert genai.embed_content.call_count == 0
+        assert other_worker.get_query_cache_stats()["redis_hits"] == 1
+
+    def test_failures_are_not_cached(self):
+        service = EmbeddingService()
+        broken = MagicMock()
+        broken.embed_content.side_effect = RuntimeError("quota")
+        assert self._run(lambda: service.generate_query_embedding("q"), genai=broken)[0] is None
+        assert self._run(lambda: service.generate_query_embedding("q"))[0] == [0.5, 0.5, 0.5]
+
+    def test_lru_eviction_and_ttl(self):
+        service = EmbeddingService()
+        with patch("app.core.config.settings.QUERY_EMBEDDING_CACHE_SIZE", 2):
+            _, genai = self._run(lambda: [service.generate_query_embedding(q) for q in ("a", "b", "c", "a")])
+        assert genai.embed_content.call_count == 4  # "a" was evicted by "c"
+
+        with patch("app.core.config.settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS", -1):
+            _, genai = self._run(lambda: [service.generate_query_embedding("z") for _ in range(2)])
+        assert genai.embed_content.call_count == 2
+
+    def test_concurrent_callers_share_one_call(self):
+        service = EmbeddingService()
+        genai = _fake_genai()
+        slow = genai.embed_content.side_effect
+        genai.embed_content.side_effect = lambda **kw: (time.sleep(0.05), slow(**kw))[1]
+
+        def embed_in_threads():
+            threads = [threading.Thread(target=service.generate_query_embedding, args=("same query",))
+                       for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self._run(embed_in_threads, genai=genai)
+        assert genai.embed_content.call_count == 1
+
+
+class TestEmbeddingSlot:
+    def test_event_loop_caller_fails_fast_instead_of_sleeping(self):
+        async def on_loop():
+            return EmbeddingService()._embed_query("payment service")
+
+        with patch("app.services.embedding_service._get_genai", return_value=_fake_genai()), \
+                patch("app.services.ai.rate_governor.rate_governor.reserve",
+                      side_effect=AIRateLimitTimeout("queue full")) as reserve, \
+                patch("app.services.ai.rate_governor.time.sleep") as sleep:
+            assert asyncio.run(on_loop()) is None
+
+        reserve.assert_called_once_with("gemini-embedding", EMBEDDING_MODEL, max_wait=0)
+        sleep.assert_not_called()
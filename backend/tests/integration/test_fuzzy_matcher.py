@@ -0,0 +1,94 @@
+"""
+Fuzzy Matcher Tests
+
+The indexed matcher must pick the same winner as the old linear scan
+(max of token Jaccard and Levenshtein similarity, first item wins ties).
+"""
+import random
+from types import SimpleNamespace
+
+from app.services.fuzzy_matcher import (
+    FuzzyIndex,
+    bounded_levenshtein,
+    levenshtein_distance,
+    levenshtein_similarity,
+    normalize_name,
+    tokenize_name,
+)
+
+WORDS = [
+    "user", "auth", "authentication", "payment", "order", "invoice", "service",
+    "manager", "token", "refresh", "cart", "checkout", "account", "profile",
+    "billing", "report", "export", "handler", "gateway", "session",
+]
+
+
+def _concepts(names, start=1):
+    return [SimpleNamespace(id=start + i, name=n) for i, n in enumerate(names)]
+
+
+def _linear_best(name, items, min_score, exclude=()):
+    norm, tokens = normalize_name(name), tokenize_name(name)
+    best, best_score = None, 0.0
+    for item in items:
+        if item.id in exclude:
+            continue
+        other_tokens = tokenize_name(item.name)
+        token_score = (
+            len(tokens & other_tokens) / len(tokens | other_tokens)
+            if tokens and other_tokens else 0.0
+        )
+        score = max(token_score, levenshtein_similarity(norm, normalize_name(item.name)))
+        if score > best_score:
+            best, best_score = item, score
+    if best_score < min_score:
+        return None, 0.0
+    return best, best_score
+
+
+def _random_name(rng):
+    words = rng.sample(WORDS, rng.randint(1, 3))
+    if rng.random() < 0.3:  # typo
+        w = list(words[0])
+        w[rng.randrange(len(w))] = rng.choice("aeiou")
+        words[0] = "".join(w)
+    return rng.choice(["_", " ", "-"]).join(words)
+
+
+class TestBoundedLevenshtein:
+    def test_matches_full_dp_within_bound(self):
+        rng = random.Random(7)
+        for _ in range(500):
+            a = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 9)))
+            b = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 9)))
+            k = rng.randint(0, 6)
+            exact = levenshtein_distance(a, b)
+            assert bounded_levenshtein(a, b, k) == (exact if exact <= k else k + 1)
+
+
+class TestFuzzyIndex:
+    def test_same_winner_as_linear_scan(self):
+        rng = random.Random(42)
+        targets = _concepts([_random_name(rng) for _ in range(200)])
+        index = FuzzyIndex(targets)
+
+        for _ in range(120):
+            query = _random_name(rng)
+            got, got_score = index.best_match(query, min_score=0.25)
+            want, want_score = _linear_best(query, targets, 0.25)
+            assert got_score == want_score
+            assert (got.id if got else None) == (want.id if want else None)
+
+    def test_exclusions_and_min_score(self):
+        targets = _concepts(["user_auth_service", "user auth", "invoice export"])
+        index = FuzzyIndex(targets)
+
+        match, _ = index.best_match("User Auth Service", exclude_ids={1})
+        assert match.id == 2
+        assert index.best_match("zzzz", min_score=0.25) == (None, 0.0)
+
+    def test_spelling_variant_found_without_shared_token(self):
+        index = FuzzyIndex(_concepts(["authorization", "billing"]))
+        match, score = index.best_match("authorisation", min_score=0.5)
+        assert match.name == "authorization"
+        assert score > 0.9
@@ -0,0 +1,130 @@
+"""
+GitHub Fetcher Tests
+
+GitHub is replaced with an httpx.MockTransport on the fetcher's per-loop
+client, so these tests exercise retry, ETag and archive handling offline.
+"""
+import asyncio
+import io
+import tarfile
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.services.github_fetcher import GitHubFetcher, _LoopState, parse_raw_url
+
+RAW = "https://raw.githubusercontent.com/acme/shop/main/src/app.py"
+
+
+def _fetcher(handler) -> GitHubFetcher:
+    fetcher = GitHubFetcher()
+    state = _LoopState.__new__(_LoopState)
+    state.client = httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True)
+    state.semaphore = asyncio.Semaphore(4)
+    fetcher._state = lambda: state
+    return fetcher
+
+
+class TestGet:
+    @pytest.mark.asyncio
+    async def test_etag_revalidation_serves_cached_body(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("if-none-match"))
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, text="print('hi')", headers={"etag": '"v1"'})
+
+        fetcher = _fetcher(handler)
+        assert await fetcher.fetch_text(RAW) == "print('hi')"
+        assert await fetcher.fetch_text(RAW) == "print('hi')"
+        assert seen == [None, '"v1"']
+        assert fetcher.get_stats()["not_modified"] == 1
+
+    @pytest.mark.asyncio
+    async def test_retries_rate_limit_using_retry_after(self):
+        responses = iter([
+            httpx.Response(429, headers={"retry-after": "3"}),
+            httpx.Response(200, text="ok"),
+        ])
+        fetcher = _fetcher(lambda request: next(responses))
+        with patch("app.services.github_fetcher.asyncio.sleep", new_callable=AsyncMock) as sleep:
+            assert await fetcher.fetch_text(RAW) == "ok"
+        sleep.assert_awaited_once_with(3.0)
+
+    @pytest.mark.asyncio
+    async def test_permission_403_is_not_retried(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(403, text="forbidden")
+
+        fetcher = _fetcher(handler)
+        assert await fetcher.fetch_text(RAW) is None
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_token_only_sent_to_github_hosts(self):
+        auth = {}
+
+        def handler(request):
+            auth[request.url.host] = request.headers.get("authorization")
+            return httpx.Response(200, text="x")
+
+        fetcher = _fetcher(handler)
+        await fetcher.fetch_many([RAW, "https://example.com/file.py"], github_token="secret")
+        assert auth["raw.githubusercontent.com"] == "Bearer secret"
+        assert auth["example.com"] is None
+
+
+class TestLifecycle:
+    @pytest.mark.asyncio
+    async def test_etag_cache_is_bounded_by_bytes(self):
+        fetcher = _fetcher(lambda request: httpx.Response(200, text="x" * 10, headers={"etag": '"v"'}))
+        fetcher.etag_cache_max_bytes = 25
+        await fetcher.fetch_many([f"{RAW}?n={n}" for n in range(3)])
+
+        stats = fetcher.get_stats()
+        assert (stats["etag_entries"], stats["etag_bytes"]) == (2, 20)
+
+    def test_run_closes_the_one_shot_loop_client(self):
+        fetcher = GitHubFetcher()
+        clients = []
+
+        async def scan():
+            clients.append(fetcher._state().client)
+            return "done"
+
+        assert fetcher.run(scan()) == "done"
+        assert clients[0].is_closed
+        assert len(fetcher._states) == 0
+
+
+class TestArchive:
+    @pytest.mark.asyncio
+    async def test_tarball_download_and_read(self, tmp_path):
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w:gz") as tf:
+            data = b"def main():\n    pass\n"
+            info = tarfile.TarInfo("acme-shop-abc123/src/app.py")
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+
+        def handler(request):
+            assert request.url.path == "/repos/acme/shop/tarball/main"
+            return httpx.Response(200, content=buf.getvalue())
+
+        fetcher = _fetcher(handler)
+        root = await fetcher.download_archive("acme", "shop", "main", str(tmp_path))
+        assert root.name == "acme-shop-abc123"
+        assert fetcher.read_archive_file(root, "src/app.py") == "def main():\n    pass\n"
+        assert fetcher.read_archive_file(root, "../../etc/passwd") is None
+
+
+def test_parse_raw_url_handles_slashes_in_ref():
+    url = "https://raw.githubusercontent.com/acme/shop/feature/pay/src/app.py"
+    assert parse_raw_url(url, "src/app.py") == ("acme", "shop", "feature/pay")
+    assert parse_raw_url("https://example.com/x.py", "x.py") is None
@@ -0,0 +1,209 @@
+"""
+Graph Index Tests
+
+Traversals run on AdjacencyIndex built from edge tuples; freshness is
+checked end to end against an in-memory SQLite session with write tracking
+and a small in-memory Redis stand-in shared by two service instances (two
+"workers").
+"""
+from collections import defaultdict
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+
+import app.models  # noqa: F401 — register all mappers
+from app import crud
+from app.api.endpoints.ontology import get_document_source_subgraph
+from app.models.ontology_concept import OntologyConcept
+from app.models.ontology_relationship import OntologyRelationship
+from app.services.graph_index_service import AdjacencyIndex, GraphIndexService, track_adjacency_writes
+from app.services.rag_service import RAGService
+from app.services.semantic_search_service import SemanticSearchService
+
+TENANT = 1
+
+# a -uses-> b -uses-> c -calls-> d ; e -uses-> a ; f isolated from the rest but f -uses-> g
+EDGES = [(1, 2, "uses"), (2, 3, "uses"), (3, 4, "calls"), (5, 1, "uses"), (6, 7, "uses")]
+
+
+class MemoryRedis:
+    """Just the Redis commands the graph index uses (decode_responses=True)."""
+
+    def __init__(self):
+        self.strings = {}
+        self.hashes = defaultdict(dict)
+        self.lists = defaultdict(list)
+
+    def mget(self, *keys):
+        return [self.strings.get(key) for key in keys]
+
+    def incr(self, key):
+        self.strings[key] = str(int(self.strings.get(key, 0)) + 1)
+        return int(self.strings[key])
+
+    def hset(self, key, mapping):
+        self.hashes[key].update(mapping)
+
+    def hgetall(self, key):
+        return dict(self.hashes[key])
+
+    def rpush(self, key, *values):
+        self.lists[key].extend(values)
+
+    def lrange(self, key, start, end):
+        return self.lists[key][start:] if end == -1 else self.lists[key][start:end + 1]
+
+    def llen(self, key):
+        return len(self.lists[key])
+
+    def expire(self, key, ttl):
+        pass
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+
+@pytest.fixture
+def redis():
+    redis = MemoryRedis()
+    with patch("app.services.cache_service.cache_service.redis_client", redis), \
+            patch("app.core.config.settings.GRAPH_INDEX_REFRESH_SECONDS", 0):
+        yield redis
+
+
+@pytest.fixture
+def db(table_session):
+    return table_session(OntologyConcept, OntologyRelationship, configure=track_adjacency_writes)
+
+
+def _concepts(db, *names):
+    concepts = [OntologyConcept(name=name, concept_type="Entity", tenant_id=TENANT) for name in names]
+    db.add_all(concepts)
+    db.commit()
+    return [c.id for c in concepts]
+
+
+class TestTraversal:
+    def test_k_hop_respects_direction_and_types(self):
+        index = AdjacencyIndex.build(EDGES)
+        assert index.k_hop([1], 2) == {1: 0, 2: 1, 5: 1, 3: 2}
+        assert index.k_hop([1], 3, direction="out") == {1: 0, 2: 1, 3: 2, 4: 3}
+        assert index.k_hop([1], 3, direction="out", relationship_types=["uses"]) == {1: 0, 2: 1, 3: 2}
+        assert index.bfs([3], hops=1, direction="in")[2] == (1, 3, "uses")
+
+    def test_shortest_path(self):
+        index = AdjacencyIndex.build(EDGES)
+        assert index.shortest_path(5, 4) == [5, 1, 2, 3, 4]
+        assert index.shortest_path(4, 5, direction="out") is None
+        assert index.shortest_path(4, 5, direction="in") == [4, 3, 2, 1, 5]
+        assert index.shortest_path(5, 4, max_hops=3) is None
+        assert index.shortest_path(1, 6) is None
+
+    def test_personalized_pagerank_favours_nearby_nodes(self):
+        index = AdjacencyIndex.build(EDGES)
+        scores = dict(index.personalized_pagerank([1], top_k=10, epsilon=1e-6))
+        assert scores[1] > scores[2] > scores[3] > scores[4]
+        assert 6 not in scores and 7 not in scores
+        assert abs(sum(scores.values()) - 1.0) < 0.01
+
+    def test_serialization_and_idempotent_overlay(self):
+        index = AdjacencyIndex.from_bytes(*AdjacencyIndex.build(EDGES).to_bytes())
+        deltas = [["+", 4, 8, "uses"], ["-", 1, 2, "uses"], ["+", 4, 8, "uses"], ["-", 1, 2, "uses"]]
+        index.apply(deltas)
+        index.apply(deltas)
+        assert index.k_hop([4], 1, direction="out") == {4: 0, 8: 1}
+        assert index.neighbors(1) == [(5, "uses")]
+        assert index.edge_count == len(EDGES)
+
+
+class TestFreshness:
+    def test_writes_reach_other_workers(self, db, redis):
+        a, b, c = _concepts(db, "A", "B", "C")
+        crud.ontology_relationship.bulk_create_if_not_exists(db, tenant_id=TENANT, relationships=[
+            {"source_concept_id": a, "target_concept_id": b, "relationship_type": "uses"},
+        ])
+        writer, reader = GraphIndexService(), GraphIndexService()
+        assert reader.get(db, TENANT).k_hop([a], 2) == {a: 0, b: 1}
+
+        db.add(OntologyRelationship(source_concept_id=b, target_concept_id=c, relationship_type="uses", tenant_id=TENANT))
+        db.commit()
+        assert reader.get(db, TENANT).k_hop([a], 2) == {a: 0, b: 1, c: 2}
+        # Second worker loads the stored base and replays the delta log
+        assert writer.get(db, TENANT).k_hop([a], 2) == {a: 0, b: 1, c: 2}
+        assert len(redis.hashes) == 1
+
+        db.execute(delete(OntologyRelationship).where(
+            OntologyRelationship.tenant_id == TENANT, OntologyRelationship.target_concept_id == b,
+        ))
+        db.commit()
+        assert reader.get(db, TENANT).k_hop([a], 2) == {a: 0}
+
+    def test_without_redis_worker_applies_own_writes(self, db):
+        a, b = _concepts(db, "A", "B")
+        with patch("app.services.cache_service.cache_service.redis_client", None), \
+                patch("app.services.graph_index_service.graph_index_service", GraphIndexService()) as service:
+            assert service.get(db, TENANT).k_hop([a], 1) == {a: 0}
+            db.add(OntologyRelationship(source_concept_id=a, target_concept_id=b, relationship_type="uses", tenant_id=TENANT))
+            db.commit()
+            assert service.get(db, TENANT).k_hop([a], 1) == {a: 0, b: 1}
+
+
+    def test_edges_are_unique_so_a_delete_removes_them(self, db, redis):
+        a, b = _concepts(db, "A", "B")
+        edge = {"source_concept_id": a, "target_concept_id": b, "relationship_type": "uses", "tenant_id": TENANT}
+        row = crud.ontology_relationship.create_if_not_exists(db, **edge)
+        reader = GraphIndexService()
+        assert reader.get(db, TENANT).k_hop([a], 1) == {a: 0, b: 1}
+
+        db.add(OntologyRelationship(**edge))
+        with pytest.raises(IntegrityError):
+            db.commit()
+        db.rollback()
+        # An insert racing past the existence check is skipped, not duplicated
+        db.execute(crud.ontology_relationship._insert_stmt(db), [edge])
+        db.commit()
+        assert db.query(OntologyRelationship).count() == 1
+
+        db.delete(row)
+        db.commit()
+        assert reader.get(db, TENANT).k_hop([a], 1) == {a: 0}
+
+
+class TestConsumers:
+    def test_find_related_and_rag_expansion_use_index(self, db, redis):
+        a, b, c, d = _concepts(db, "Order", "Payment", "Ledger", "Audit")
+        crud.ontology_relationship.bulk_create_if_not_exists(db, tenant_id=TENANT, relationships=[
+            {"source_concept_id": a, "target_concept_id": b, "relationship_type": "uses"},
+            {"source_concept_id": b, "target_concept_id": c, "relationship_type": "writes"},
+            {"source_concept_id": c, "target_concept_id": d, "relationship_type": "feeds"},
+        ])
+        with patch("app.services.graph_index_service.graph_index_service", GraphIndexService()), \
+                patch("app.services.semantic_search_service._check_pgvector_available", return_value=False):
+            related = SemanticSearchService().find_related(db, a, TENANT, depth=2)
+            relationships = RAGService()._expand_relationships(db, TENANT, [a])
+
+        assert [(r["name"], r["distance"], r["relationship_type"]) for r in related] == [
+            ("Payment", 1, "uses"), ("Ledger", 2, "writes"),
+        ]
+        assert relationships == [{"source": "Order", "type": "uses", "target": "Payment"}]
+
+    def test_document_subgraph_keeps_edges_leaving_the_document(self, db):
+        a, b, c = _concepts(db, "Invoice", "Tax", "Currency")
+        db.query(OntologyConcept).filter(OntologyConcept.id.in_([a, b])).update(
+            {"source_document_id": 42}, synchronize_session=False,
+        )
+        crud.ontology_relationship.bulk_create_if_not_exists(db, tenant_id=TENANT, relationships=[
+            {"source_concept_id": a, "target_concept_id": b, "relationship_type": "uses"},
+            {"source_concept_id": b, "target_concept_id": c, "relationship_type": "uses"},
+        ])
+        with patch.object(crud.document, "get", return_value=SimpleNamespace(id=42)):
+            graph = get_document_source_subgraph(document_id=42, tenant_id=TENANT, db=db, current_user=None)
+
+        assert {n["id"] for n in graph["nodes"]} == {a, b}
+        assert {(e["source_concept_id"], e["target_concept_id"]) for e in graph["edges"]} == {(a, b), (b, c)}
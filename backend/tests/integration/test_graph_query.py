@@ -0,0 +1,111 @@
+"""
+Graph Query API Tests
+
+In-memory SQLite with the concept and relationship tables: cursor pages
+and field projection, k-hop neighborhoods bounded by max_nodes, and the
+super-node overview (communities and concept types).
+"""
+import pytest
+
+import app.models  # noqa: F401 — register all mappers
+from app.models.ontology_concept import OntologyConcept
+from app.models.ontology_relationship import OntologyRelationship
+from app.services.graph_query_service import GraphQueryService
+
+TENANT = 1
+
+
+@pytest.fixture
+def db(table_session):
+    return table_session(OntologyConcept, OntologyRelationship)
+
+
+def _graph(db, names, edges, tenant_id=TENANT, source_type="document"):
+    """Concepts named `names` plus (src, tgt) edges by name; returns {name: id}."""
+    concepts = {
+        name: OntologyConcept(name=name, concept_type=name.rstrip("0123456789") or "Entity",
+                              source_type=source_type, tenant_id=tenant_id)
+        for name in names
+    }
+    db.add_all(concepts.values())
+    db.flush()
+    db.add_all(
+        OntologyRelationship(source_concept_id=concepts[s].id, target_concept_id=concepts[t].id,
+                             relationship_type="uses", tenant_id=tenant_id)
+        for s, t in edges
+    )
+    db.commit()
+    return {name: c.id for name, c in concepts.items()}
+
+
+class TestPages:
+    def test_node_pages_cover_scope_with_projection(self, db):
+        _graph(db, [f"n{i}" for i in range(7)], [])
+        _graph(db, ["other"], [], tenant_id=2)
+        service = GraphQueryService()
+
+        seen, cursor = [], None
+        while True:
+            page = service.node_page(db, TENANT, cursor=cursor, page_size=3, fields=["name"])
+            seen.extend(page["items"])
+            if not page["has_more"]:
+                break
+            cursor = page["next_cursor"]
+
+        assert [n["name"] for n in seen] == [f"n{i}" for i in range(7)]
+        assert set(seen[0]) == {"id", "name"}
+        with pytest.raises(ValueError):
+            service.node_page(db, TENANT, fields=["password"])
+
+    def test_edge_page_only_between_visible_nodes(self, db):
+        ids = _graph(db, ["a", "b"], [("a", "b")])
+        code = _graph(db, ["c"], [], source_type="code")
+        db.add(OntologyRelationship(source_concept_id=ids["a"], target_concept_id=code["c"],
+                                    relationship_type="uses", tenant_id=TENANT))
+        db.commit()
+
+        page = GraphQueryService().edge_page(db, TENANT, layer="document")
+        assert [(e["source_concept_id"], e["target_concept_id"]) for e in page["items"]] == [(ids["a"], ids["b"])]
+
+
+class TestNeighborhood:
+    def test_hops_direction_and_distances(self, db):
+        # a -> b -> c -> d, e -> a
+        ids = _graph(db, list("abcde"), [("a", "b"), ("b", "c"), ("c", "d"), ("e", "a")])
+        service = GraphQueryService()
+
+        result = service.neighborhood(db, TENANT, [ids["a"]], hops=2)
+        hop = {n["id"]: n["hop"] for n in result["nodes"]}
+        assert hop == {ids["a"]: 0, ids["b"]: 1, ids["e"]: 1, ids["c"]: 2}
+        assert result["total_edges"] == 3 and not result["truncated"]
+
+        outgoing = service.neighborhood(db, TENANT, [ids["a"]], hops=3, direction="out")
+        assert {n["id"] for n in outgoing["nodes"]} == {ids[x] for x in "abcd"}
+
+    def test_max_nodes_truncates(self, db):
+        hub = _graph(db, ["hub"] + [f"leaf{i}" for i in range(20)], [("hub", f"leaf{i}") for i in range(20)])
+        result = GraphQueryService().neighborhood(db, TENANT, [hub["hub"]], hops=1, max_nodes=5)
+        assert result["total_nodes"] == 5 and result["truncated"]
+        assert all(e["source_concept_id"] == hub["hub"] for e in result["edges"])
+
+
+class TestOverview:
+    def test_communities_collapse_into_super_nodes(self, db):
+        # Two 4-cliques joined by a single bridge edge
+        left, right = [f"l{i}" for i in range(4)], [f"r{i}" for i in range(4)]
+        clique = lambda ns: [(a, b) for i, a in enumerate(ns) for b in ns[i + 1:]]
+        _graph(db, left + right, clique(left) + clique(right) + [("l0", "r0")])
+
+        overview = GraphQueryService().overview(db, TENANT)
+        assert sorted(c["size"] for c in overview["super_nodes"]) == [4, 4]
+        assert [e["weight"] for e in overview["super_edges"]] == [1]
+        assert all(c["internal_edges"] == 6 for c in overview["super_nodes"])
+        assert overview["total_nodes"] == 8 and overview["total_edges"] == 13
+
+    def test_type_clusters_fold_tail_into_other(self, db):
+        _graph(db, ["Api1", "Api2", "Api3", "Db1", "Db2", "Queue1"], [("Api1", "Db1"), ("Api2", "Queue1")])
+        overview = GraphQueryService().overview(db, TENANT, cluster_by="type", max_clusters=2)
+
+        labels = {c["label"]: c["size"] for c in overview["super_nodes"]}
+        assert labels == {"Api": 3, "Other": 3}
+        assert overview["super_edges"] == [{"source": "cluster:0", "target": "cluster:other", "weight": 2}]
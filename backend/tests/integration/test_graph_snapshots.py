@@ -0,0 +1,133 @@
+"""
+Graph Snapshot Tests
+
+A small in-memory Redis stand-in covers build-once serving, ETag / 304 and
+gzip pass-through; an in-memory SQLite session with write tracking checks
+that ORM and bulk writes bump only the touched tenant's epoch after commit.
+"""
+import gzip
+import json
+from collections import defaultdict
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import update
+from starlette.requests import Request
+
+import app.models  # noqa: F401 — register all mappers
+from app import crud
+from app.core.config import settings
+from app.models.ontology_concept import OntologyConcept
+from app.models.ontology_relationship import OntologyRelationship
+from app.services.graph_snapshot_service import GraphSnapshotService, track_graph_writes
+
+
+class MemoryRedis:
+    """Just the Redis commands the snapshot service uses (decode_responses=True)."""
+
+    def __init__(self):
+        self.strings = {}
+        self.hashes = defaultdict(dict)
+
+    def mget(self, *keys):
+        return [self.strings.get(key) for key in keys]
+
+    def incr(self, key):
+        self.strings[key] = str(int(self.strings.get(key, 0)) + 1)
+        return int(self.strings[key])
+
+    def hget(self, key, field):
+        return self.hashes[key].get(field)
+
+    def hset(self, key, mapping):
+        self.hashes[key].update(mapping)
+
+    def hgetall(self, key):
+        return dict(self.hashes[key])
+
+    def expire(self, key, ttl):
+        pass
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+
+@pytest.fixture
+def redis():
+    redis = MemoryRedis()
+    with patch("app.services.cache_service.cache_service.redis_client", redis), \
+            patch.object(settings, "GRAPH_SNAPSHOT_ENABLED", True):
+        yield redis
+
+
+@pytest.fixture
+def db(redis, table_session):
+    return table_session(OntologyConcept, OntologyRelationship, configure=track_graph_writes)
+
+
+def _request(**headers):
+    return Request({
+        "type": "http",
+        "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()],
+    })
+
+
+class TestServe:
+    def test_built_once_then_served_from_snapshot(self, redis):
+        service = GraphSnapshotService()
+        builds = []
+
+        def build():
+            builds.append(1)
+            return {"nodes": [{"id": 1}], "edges": []}
+
+        first = service.serve(_request(), 1, "graph", {"initiative_id": None}, build)
+        second = service.serve(_request(accept_encoding="gzip, br"), 1, "graph", {"initiative_id": None}, build)
+
+        assert len(builds) == 1
+        assert json.loads(first.body) == {"nodes": [{"id": 1}], "edges": []}
+        assert second.headers["content-encoding"] == "gzip" and second.headers["x-graph-snapshot"] == "hit"
+        assert json.loads(gzip.decompress(second.body)) == json.loads(first.body)
+
+    def test_if_none_match_returns_304(self, redis):
+        service = GraphSnapshotService()
+        etag = service.serve(_request(), 1, "graph.brain", {}, lambda: {"projects": []}).headers["etag"]
+
+        not_modified = service.serve(_request(if_none_match=f"W/{etag}"), 1, "graph.brain", {},
+                                     lambda: pytest.fail("snapshot should not be rebuilt"))
+        assert not_modified.status_code == 304 and not_modified.headers["etag"] == etag
+
+    def test_without_redis_etag_still_applies(self):
+        service = GraphSnapshotService()
+        with patch("app.services.cache_service.cache_service.redis_client", None):
+            etag = service.serve(_request(), 1, "graph", {}, lambda: {"nodes": []}).headers["etag"]
+            assert service.serve(_request(if_none_match=etag), 1, "graph", {}, lambda: {"nodes": []}).status_code == 304
+            assert service.serve(_request(if_none_match=etag), 1, "graph", {}, lambda: {"nodes": [1]}).status_code == 200
+
+
+class TestInvalidation:
+    def test_orm_and_bulk_writes_bump_only_touched_tenant(self, db, redis):
+        service = GraphSnapshotService()
+        db.add(OntologyConcept(name="Invoice", concept_type="Entity", tenant_id=1))
+        db.flush()
+        assert service.get_epoch(1) == "0.0"  # nothing until commit
+        db.commit()
+        assert service.get_epoch(1) == "0.1"
+
+        db.execute(update(OntologyConcept).where(OntologyConcept.tenant_id == 2).values(confidence_score=0.5))
+        db.commit()
+        crud.ontology_concept.bulk_get_or_create(db, tenant_id=1, concepts=[{"name": "Refund", "concept_type": "Entity"}])
+        assert (service.get_epoch(1), service.get_epoch(2)) == ("0.2", "0.1")
+
+        db.add(OntologyConcept(name="Ledger", concept_type="Entity", tenant_id=1))
+        db.flush()
+        db.rollback()
+        assert service.get_epoch(1) == "0.2"
+
+    def test_untenanted_bulk_write_bumps_global_epoch(self, db, redis):
+        db.execute(update(OntologyRelationship).values(confidence_score=None))
+        db.commit()
+        assert GraphSnapshotService().get_epoch(5) == "1.0"
@@ -0,0 +1,126 @@
+"""
+Knowledge Graph Versioning Tests
+
+Runs the version CRUD against an in-memory SQLite table (JSONB rendered as
+JSON) and checks snapshot/delta storage, rebuilding every version, and
+composed diffs against diffs of the full graphs.
+"""
+import hashlib
+import json
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+
+import app.models  # noqa: F401 — register all mappers
+from app import crud
+from app.models.knowledge_graph_version import KnowledgeGraphVersion
+from app.services.embedding_service import embedding_service
+
+TENANT = 1
+SCOPE = {"source_type": "component", "source_id": 7, "tenant_id": TENANT}
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_as_json(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def db(table_session):
+    with patch("app.core.config.settings.GRAPH_VERSION_SNAPSHOT_INTERVAL", 3):
+        yield table_session(KnowledgeGraphVersion)
+
+
+def _graph(step: int) -> dict:
+    """A graph that grows, renames a node and drops an edge as step increases."""
+    nodes = [{"id": i, "name": f"n{i}" if i != 1 or step < 3 else "renamed"} for i in range(step + 2)]
+    edges = [{"source": i, "target": i + 1, "type": "uses"} for i in range(step + 1) if (i, step) != (0, 5)]
+    return {"nodes": nodes, "edges": edges, "metadata": {"total_nodes": len(nodes)}}
+
+
+def _canonical(graph: dict) -> dict:
+    return {
+        "nodes": sorted(graph["nodes"], key=lambda n: n["id"]),
+        "edges": sorted(graph["edges"], key=lambda e: (e["source"], e["target"], e["type"])),
+        "metadata": graph["metadata"],
+    }
+
+
+def _normalized(delta: dict) -> dict:
+    return {k: sorted(map(json.dumps, v)) if isinstance(v, list) else v for k, v in delta.items() if k != "summary"}
+
+
+class TestStorage:
+    def test_superseded_versions_keep_deltas_between_snapshots(self, db):
+        for step in range(8):
+            crud.knowledge_graph_version.save_version(db, graph_data=_graph(step), **SCOPE)
+        db.commit()
+
+        rows = db.query(KnowledgeGraphVersion).order_by(KnowledgeGraphVersion.version).all()
+        full = [r.version for r in rows if r.graph_data is not None]
+        assert [r.version for r in rows if r.is_snapshot] == [1, 4, 7]
+        assert full == [1, 4, 7, 8]
+        assert [r.version for r in rows if r.graph_hashes is not None] == [8]
+        assert rows[3].graph_delta["summary"] == "+1 nodes, ~1 nodes, +1 edges"
+
+        for step in range(8):
+            rebuilt = crud.knowledge_graph_version.get_graph_data(db, version=step + 1, **SCOPE)
+            assert _canonical(rebuilt) == _canonical(_graph(step))
+
+    def test_unchanged_graph_keeps_current_version(self, db):
+        first = crud.knowledge_graph_version.save_version(db, graph_data=_graph(2), **SCOPE)
+        reordered = dict(_graph(2), nodes=list(reversed(_graph(2)["nodes"])))
+        assert crud.knowledge_graph_version.save_version(db, graph_data=reordered, **SCOPE) is first
+
+    def test_legacy_version_is_rehashed_not_duplicated(self, db):
+        graph = _graph(1)
+        db.add(KnowledgeGraphVersion(
+            version=1, is_current=True, graph_data=graph, graph_delta=None,
+            graph_hash=hashlib.sha256(json.dumps(graph, sort_keys=True).encode()).hexdigest(), **SCOPE,
+        ))
+        db.flush()
+
+        current = crud.knowledge_graph_version.save_version(db, graph_data=graph, **SCOPE)
+        assert current.version == 1 and current.graph_hashes is not None
+        assert db.query(KnowledgeGraphVersion).count() == 1
+
+
+    def test_superseded_delta_version_embeds_rebuilt_graph(self, db):
+        for step in range(3):
+            crud.knowledge_graph_version.save_version(db, graph_data=_graph(step), **SCOPE)
+        db.commit()
+        row = db.query(KnowledgeGraphVersion).filter_by(version=2).one()
+        assert row.graph_data is None
+
+        with patch.object(embedding_service, "generate_embedding", return_value=None) as embed:
+            embedding_service.embed_graph_version(db, row.id, TENANT)
+
+        summary = embed.call_args.args[0]
+        assert "Nodes: 3, Edges: 2" in summary and "n2" in summary
+
+
+class TestDiff:
+    def test_composed_diff_matches_full_graph_diff(self, db):
+        for step in range(8):
+            crud.knowledge_graph_version.save_version(db, graph_data=_graph(step), **SCOPE)
+
+        for a, b in [(1, 8), (8, 1), (2, 6), (6, 3), (5, 5)]:
+            composed = crud.knowledge_graph_version.get_diff(db, version_a=a, version_b=b, **SCOPE)
+            direct = crud.knowledge_graph_version._compute_delta(_graph(a - 1), _graph(b - 1))
+            assert _normalized(composed) == _normalized(direct), (a, b)
+            assert composed["summary"] == direct["summary"]
+
+        assert crud.knowledge_graph_version.get_diff(db, version_a=1, version_b=9, **SCOPE) is None
+
+    def test_legacy_deltas_fall_back_to_graph_diff(self, db):
+        for version, step in ((1, 0), (2, 3)):
+            db.add(KnowledgeGraphVersion(
+                version=version, is_current=version == 2, graph_data=_graph(step),
+                graph_hash="legacy", graph_delta={"summary": "legacy"}, **SCOPE,
+            ))
+        db.flush()
+
+        diff = crud.knowledge_graph_version.get_diff(db, version_a=1, version_b=2, **SCOPE)
+        assert diff["summary"] == "+3 nodes, ~1 nodes, +3 edges"
@@ -0,0 +1,113 @@
+"""
+Hybrid Search Tests
+
+The per-source retrievers are replaced with canned ranked lists, so these
+tests cover reciprocal rank fusion, the single cross-source ranking with
+per-source scores, concurrent retrieval on separate sessions, and the
+term-coverage rerank.
+"""
+import threading
+from contextlib import ExitStack
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.services import hybrid_search_service as hybrid
+from app.services.hybrid_search_service import HybridSearchService, reciprocal_rank_fusion
+from app.services.semantic_search_service import SemanticSearchService, semantic_search_service
+
+CONCEPT_VECTOR = [
+    {"id": 1, "name": "Payment Gateway", "similarity": 0.91},
+    {"id": 2, "name": "Invoice", "similarity": 0.80},
+]
+CONCEPT_LEXICAL = [
+    {"id": 2, "name": "Invoice", "similarity": None, "lexical_score": 0.4},
+    {"id": 3, "name": "Refund", "similarity": None, "lexical_score": 0.2},
+]
+DOCUMENTS = [{"id": 1, "filename": "payment-gateway-spec.pdf", "relevance": 0.7}]
+
+
+def _patched(calls=None, vector=True):
+    """Context manager replacing every retriever with a canned list."""
+    def canned(rows):
+        def fn(db, query, tenant_id, **kwargs):
+            if calls is not None:
+                calls.append((threading.current_thread().name, db))
+            return [dict(r) for r in rows]
+        return fn
+
+    stack = ExitStack()
+    stack.enter_context(patch.object(hybrid, "_check_pgvector_available", return_value=vector))
+    for attr, rows in {
+        "_vector_search_concepts": CONCEPT_VECTOR,
+        "_text_search_concepts": CONCEPT_LEXICAL,
+        "_vector_search_graphs": [],
+        "_text_search_graphs": [],
+        "search_documents": DOCUMENTS,
+        "search_document_segments": [],
+        "search_code_components": [],
+    }.items():
+        stack.enter_context(patch.object(semantic_search_service, attr, side_effect=canned(rows)))
+    return stack
+
+
+class TestReciprocalRankFusion:
+    def test_agreement_outranks_single_list(self):
+        fused = reciprocal_rank_fusion({"vector": ["a", "b"], "lexical": ["b", "c"]}, k=60)
+        assert list(fused) == ["b", "a", "c"]
+        score, ranks = fused["b"]
+        assert ranks == {"vector": 2, "lexical": 1}
+        assert abs(score - (1 / 62 + 1 / 61)) < 1e-12
+
+    def test_duplicates_within_a_list_count_once(self):
+        fused = reciprocal_rank_fusion({"lexical": ["a", "a", "b"]}, k=0)
+        assert fused["a"] == (1.0, {"lexical": 1})
+        assert fused["b"][1] == {"lexical": 3}
+
+
+class TestSearchConcepts:
+    def test_vector_and_lexical_lists_are_fused(self):
+        service = SemanticSearchService()
+        with patch("app.services.semantic_search_service._check_pgvector_available", return_value=True), \
+                patch.object(service, "_vector_search_concepts", return_value=[dict(r) for r in CONCEPT_VECTOR]), \
+                patch.object(service, "_text_search_concepts", return_value=[dict(r) for r in CONCEPT_LEXICAL]):
+            results = service.search_concepts(None, "invoice", 1, limit=2)
+
+        assert [r["id"] for r in results] == [2, 1]
+        assert results[0]["match_type"] == "hybrid"
+        assert results[0]["similarity"] == 0.80 and results[0]["lexical_score"] == 0.4
+
+
+class TestHybridSearch:
+    def test_single_ranking_with_per_source_scores(self):
+        with _patched(), patch.object(hybrid.settings, "RAG_PARALLEL_STAGES", False):
+            out = HybridSearchService().search(MagicMock(), "invoice", 1, rerank=False)
+
+        results = out["results"]
+        assert results[0]["category"] == "concept" and results[0]["id"] == 2
+        assert results[0]["ranks"] == {"vector": 2, "lexical": 1}
+        assert results[0]["scores"]["vector"] == 0.80 and results[0]["scores"]["lexical"] == 0.4
+        assert results[0]["relevance"] == 1.0
+        # Top of its own (single) list ties with the top vector-only concept
+        assert {(r["category"], r["id"]) for r in results[1:3]} == {("concept", 1), ("document", 1)}
+        assert out["facets"] == {"concepts": 3, "documents": 1, "segments": 0, "code": 0, "graphs": 0}
+
+    def test_retrievers_run_concurrently_on_own_sessions(self):
+        calls = []
+        db = Session(bind=create_engine("sqlite://"))
+        with _patched(calls), patch.object(hybrid.settings, "RAG_PARALLEL_STAGES", True):
+            out = HybridSearchService().search(db, "invoice", 1, categories=["concepts", "documents"])
+
+        assert len(calls) == 3
+        assert all(thread.startswith("rag-stage") and session is not db for thread, session in calls)
+        assert set(out["retrieval"]["timings_ms"]) == {"concepts.vector", "concepts.lexical", "documents.lexical"}
+
+    def test_rerank_promotes_term_coverage(self):
+        with _patched(vector=False), patch.object(hybrid.settings, "RAG_PARALLEL_STAGES", False):
+            plain = HybridSearchService().search(MagicMock(), "payment gateway", 1, rerank=False)
+            reranked = HybridSearchService().search(MagicMock(), "payment gateway", 1, rerank=True)
+
+        assert plain["results"][0]["id"] == 2  # concept "Invoice", first in its list
+        assert reranked["results"][0]["filename"] == "payment-gateway-spec.pdf"
+        assert reranked["results"][0]["scores"]["rerank"] == 1.0
@@ -0,0 +1,88 @@
+"""
+Lexical Search Tests
+
+Capabilities are injected directly, so these tests check the full-text
+SQL each search emits once the search_vector columns exist, and that the
+ILIKE path is kept for databases without them.
+"""
+from unittest.mock import MagicMock, patch
+
+from app.db.capabilities import DatabaseCapabilities
+from app.services.lexical_search_service import LexicalSearchService
+from app.services.rag_service import RAGService
+from app.services.semantic_search_service import SemanticSearchService
+
+SEARCH_TABLES = ("ontology_concepts", "code_components", "documents", "document_segments")
+
+
+def _caps(fts=True, trgm=True):
+    return DatabaseCapabilities(
+        dialect="postgresql",
+        extensions={"pg_trgm": "1.6"} if trgm else {},
+        column_types={f"{t}.search_vector": "tsvector" for t in SEARCH_TABLES} if fts else {},
+    )
+
+
+def _run(caps, fn, *args, **kwargs):
+    db = MagicMock()
+    db.execute.return_value.fetchall.return_value = []
+    with patch("app.services.lexical_search_service.db_capabilities.get", return_value=caps):
+        fn(db, *args, **kwargs)
+    sql, params = db.execute.call_args_list[0].args
+    return str(sql), params
+
+
+class TestBuild:
+    def test_none_without_search_column(self):
+        service = LexicalSearchService()
+        with patch("app.services.lexical_search_service.db_capabilities.get", return_value=_caps(fts=False)):
+            assert service.build(MagicMock(), "documents", "d", "invoice") is None
+
+    def test_tsquery_modes(self):
+        service = LexicalSearchService()
+        with patch("app.services.lexical_search_service.db_capabilities.get", return_value=_caps(trgm=False)):
+            strict = service.build(MagicMock(), "documents", "d", "payment gateway")
+            loose = service.build(MagicMock(), "documents", "d", "payment gateway", mode="any")
+            blank = service.build(MagicMock(), "documents", "d", "   ")
+
+        assert strict.where == "d.search_vector @@ websearch_to_tsquery('english', :fts_q)"
+        assert "' & ', ' | '" in loose.where
+        assert strict.params == {"fts_q": "payment gateway"}
+        assert blank is None
+
+    def test_fuzzy_column_needs_pg_trgm(self):
+        service = LexicalSearchService()
+        with patch("app.services.lexical_search_service.db_capabilities.get", return_value=_caps()):
+            match = service.build(MagicMock(), "ontology_concepts", "c", "Paymnet", fuzzy_column="name")
+        with patch("app.services.lexical_search_service.db_capabilities.get", return_value=_caps(trgm=False)):
+            plain = service.build(MagicMock(), "ontology_concepts", "c", "Paymnet", fuzzy_column="name")
+
+        assert "c.name % :fts_raw" in match.where
+        assert "similarity(c.name, :fts_raw)" in match.rank
+        assert "fts_raw" not in plain.params
+
+
+class TestSearchQueries:
+    def test_searches_use_search_vector(self):
+        service = SemanticSearchService()
+        for fn in (service.search_documents, service.search_code_components):
+            sql, params = _run(_caps(), fn, "payment gateway", 1)
+            assert "search_vector @@" in sql
+            assert "ILIKE" not in sql
+            assert "ts_rank_cd" in sql and params["fts_q"] == "payment gateway"
+
+        sql, _ = _run(_caps(), service._text_search_concepts, "payment", 1, concept_type=None,
+                      source_type=None, initiative_id=None, min_confidence=0.0, limit=5)
+        assert "c.search_vector @@" in sql and "ILIKE" not in sql
+
+    def test_ilike_fallback_without_index(self):
+        sql, params = _run(_caps(fts=False), SemanticSearchService().search_documents, "invoice", 1)
+        assert "ILIKE :q" in sql and params["q"] == "%invoice%"
+
+    def test_rag_segments_read_text_from_parent_document(self):
+        rag = RAGService()
+        for caps, marker in ((_caps(), "ds.search_vector @@"), (_caps(fts=False), "ILIKE :q")):
+            sql, _ = _run(caps, rag._fetch_document_segments, 1, "refund policy", "general", None)
+            assert marker in sql
+            assert "JOIN documents d ON d.id = ds.document_id" in sql
+            assert "ds.content" not in sql and "ds.title" not in sql
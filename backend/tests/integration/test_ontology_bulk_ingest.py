@@ -0,0 +1,115 @@
+"""
+Ontology Bulk Ingestion Tests
+
+Runs against an in-memory SQLite database holding the concept and
+relationship tables (with the uq_ontology_concepts_identity index from the
+model), so the ON CONFLICT upserts and CASE updates really execute.
+"""
+import pytest
+from sqlalchemy import event
+
+import app.models  # noqa: F401 — register all mappers
+from app import crud
+from app.models.ontology_concept import OntologyConcept
+from app.models.ontology_relationship import OntologyRelationship
+from app.services.code_analysis_service import CodeAnalysisService
+from app.services.ontology_ingest_service import OntologyIngestBatch
+
+TENANT = 1
+
+
+@pytest.fixture
+def db(table_session):
+    return table_session(OntologyConcept, OntologyRelationship)
+
+
+def _statements(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, sql, *a: statements.append(sql.lstrip().split(None, 1)[0].upper()))
+    return statements
+
+
+class TestBulkGetOrCreate:
+    def test_matches_get_or_create_identity(self, db):
+        existing = crud.ontology_concept.get_or_create(
+            db, name="Payment", concept_type="Entity", tenant_id=TENANT, confidence_score=0.5,
+        )
+        ids = crud.ontology_concept.bulk_get_or_create(db, tenant_id=TENANT, concepts=[
+            {"name": " payment ", "concept_type": "Entity", "confidence_score": 0.9, "source_document_id": None},
+            {"name": "PAYMENT", "concept_type": "Entity", "confidence_score": 0.7},
+            {"name": "Payment", "concept_type": "Entity", "source_type": "code"},
+            {"name": "Payment", "concept_type": "Entity", "initiative_id": 7},
+        ])
+
+        assert ids[("payment", "Entity", "document", None)] == existing.id
+        assert len(set(ids.values())) == 3
+        db.refresh(existing)
+        assert existing.confidence_score == 0.9 and existing.name == "Payment"
+        assert db.query(OntologyConcept).count() == 3
+
+    def test_confidence_only_raised_and_links_backfilled(self, db):
+        crud.ontology_concept.bulk_get_or_create(db, tenant_id=TENANT, concepts=[
+            {"name": "Invoice", "concept_type": "Entity", "confidence_score": 0.8},
+            {"name": "Refund", "concept_type": "Entity", "confidence_score": 0.2},
+        ])
+        crud.ontology_concept.bulk_get_or_create(db, tenant_id=TENANT, concepts=[
+            {"name": "invoice", "concept_type": "Entity", "confidence_score": 0.4, "source_document_id": 3},
+            {"name": "refund", "concept_type": "Entity", "confidence_score": 0.6},
+        ])
+
+        rows = {c.name: c for c in db.query(OntologyConcept)}
+        assert (rows["Invoice"].confidence_score, rows["Invoice"].source_document_id) == (0.8, 3)
+        assert rows["Refund"].confidence_score == 0.6
+
+
+class TestBulkRelationships:
+    def test_dedupes_skips_self_edges_and_raises_confidence(self, db):
+        ids = crud.ontology_concept.bulk_get_or_create(db, tenant_id=TENANT, concepts=[
+            {"name": "A", "concept_type": "Entity"}, {"name": "B", "concept_type": "Entity"},
+        ])
+        a, b = ids[("a", "Entity", "document", None)], ids[("b", "Entity", "document", None)]
+        edge = {"source_concept_id": a, "target_concept_id": b, "relationship_type": "uses"}
+
+        created = crud.ontology_relationship.bulk_create_if_not_exists(db, tenant_id=TENANT, relationships=[
+            dict(edge, confidence_score=0.5), dict(edge, confidence_score=0.6),
+            {"source_concept_id": a, "target_concept_id": a, "relationship_type": "uses"},
+        ])
+        assert created == 1
+        assert crud.ontology_relationship.bulk_create_if_not_exists(
+            db, tenant_id=TENANT, relationships=[dict(edge, confidence_score=0.9)],
+        ) == 0
+        assert db.query(OntologyRelationship).one().confidence_score == 0.9
+
+
+class TestIngestBatch:
+    def test_flush_writes_graph_in_constant_statements(self, db):
+        statements = _statements(db)
+        batch = OntologyIngestBatch(TENANT, "code", source_component_id=None)
+        hub = batch.concept("Service", "Service")
+        for i in range(300):
+            batch.relationship(batch.concept(f"fn_{i}", "Process"), hub, "defined_in")
+        batch.flush(db)
+
+        assert db.query(OntologyConcept).count() == 301
+        assert db.query(OntologyRelationship).count() == 300
+        assert statements.count("INSERT") == 2
+        assert len(statements) <= 6
+
+    def test_code_extraction_commits_once(self, db):
+        analysis = {
+            "language_info": {"file_type": "Utility"},
+            "components": [{"type": "Function", "name": f"handler_{i}"} for i in range(50)],
+            "component_interactions": [{"source": "handler_0", "target": "handler_1", "interaction_type": "calls"}],
+        }
+        commits = []
+        event.listen(db, "after_commit", lambda session: commits.append(1))
+
+        CodeAnalysisService()._extract_ontology_from_analysis(
+            db, structured_analysis=analysis, component_name="src/handlers.py",
+            tenant_id=TENANT, source_component_id=None,
+        )
+
+        assert len(commits) == 1
+        assert db.query(OntologyConcept).filter(OntologyConcept.source_type == "code").count() == 51
+        assert db.query(OntologyRelationship).count() == 51
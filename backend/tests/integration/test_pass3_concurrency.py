@@ -0,0 +1,147 @@
+"""
+Pass 3 Concurrent Extraction Tests
+
+Segments, CRUD and Gemini are replaced with in-memory fakes; these tests
+check bounded fan-out, batched writes, stop handling and cost accounting.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.models import SegmentStatus
+from app.services.analysis_service import DocumentAnalysisEngine, SEGMENT_CONTEXT_SIZE
+
+MODULE = "app.services.analysis_service"
+
+
+def _segments(n, size=100):
+    return [
+        SimpleNamespace(
+            id=i + 1, tenant_id=7, segment_type="REQUIREMENT",
+            start_char_index=i * size, end_char_index=(i + 1) * size,
+            status=None, last_error=None,
+        )
+        for i in range(n)
+    ]
+
+
+def _primary(prompt):
+    return prompt.split("--- PRIMARY SEGMENT TO ANALYZE ---\n")[1].split("\n")[0]
+
+
+class _FakeGemini:
+    def __init__(self, fail_ids=()):
+        self.active = 0
+        self.peak = 0
+        self.prompts = []
+        self.fail_ids = set(fail_ids)
+
+    async def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if any(_primary(prompt).startswith(f"SEG-{i}-") for i in self.fail_ids):
+            raise RuntimeError("boom")
+        return SimpleNamespace(text=json.dumps({"ok": True}))
+
+    @staticmethod
+    def extract_token_usage(response):
+        return {"input_tokens": 10, "output_tokens": 5, "thinking_tokens": 1}
+
+
+def _run(segments, gemini, *, concurrency=3, flush_every=4, stop_after_checks=None):
+    engine = DocumentAnalysisEngine()
+    engine._cost_tracker[1] = {}
+    raw_text = "".join(f"SEG-{s.id}-".ljust(s.end_char_index - s.start_char_index, "x") for s in segments)
+    document = SimpleNamespace(id=1, tenant_id=7, raw_text=raw_text)
+    writes = []
+    checks = [0]
+
+    def stop_signal(db, document_id, tenant_id):
+        checks[0] += 1
+        return stop_after_checks is not None and checks[0] > stop_after_checks
+
+    def create_many(db, *, objs_in, tenant_id, commit=True):
+        writes.append(list(objs_in))
+        return objs_in
+
+    with patch(f"{MODULE}.crud") as crud, \
+            patch(f"{MODULE}.gemini_service", gemini), \
+            patch(f"{MODULE}.prompt_manager") as prompts, \
+            patch(f"{MODULE}.cost_service") as costs, \
+            patch(f"{MODULE}.settings", SimpleNamespace(PASS3_CONCURRENCY=concurrency, PASS3_FLUSH_EVERY=flush_every)), \
+            patch.object(engine, "_check_stop_signal", side_effect=stop_signal):
+        crud.document_segment.get_by_document.return_value = segments
+        crud.document.get.return_value = document
+        crud.analysis_result.create_many_for_document.side_effect = create_many
+        prompts.get_prompt.return_value = "EXTRACT"
+        costs.calculate_cost_from_actual_tokens.return_value = {"cost_inr": 0.5}
+
+        ok = asyncio.run(engine._pass_3_structured_extraction(MagicMock(), 1, 7))
+        return ok, engine, writes, crud
+
+
+class TestPass3Concurrency:
+    def test_fan_out_is_bounded_and_results_are_batched(self):
+        segments = _segments(10)
+        gemini = _FakeGemini()
+
+        ok, engine, writes, crud = _run(segments, gemini, concurrency=3, flush_every=4)
+
+        assert ok is True
+        assert 1 < gemini.peak <= 3
+        assert [len(batch) for batch in writes] == [4, 4, 2]
+        assert all(s.status == SegmentStatus.COMPLETED for s in segments)
+        assert crud.document.update.call_count == 3  # one progress update per batch
+
+    def test_cost_accounting_and_failures(self):
+        segments = _segments(5)
+        gemini = _FakeGemini(fail_ids={2})
+
+        ok, engine, writes, _ = _run(segments, gemini)
+
+        assert ok is True
+        assert segments[1].status == SegmentStatus.FAILED
+        assert segments[1].last_error == "boom"
+        assert sum(len(batch) for batch in writes) == 4
+        cost = engine._cost_tracker[1]["pass_3_extraction"]
+        assert cost["cost_inr"] == pytest.approx(2.0)  # failed call has no usage
+        assert cost["input_tokens"] == 40
+        assert cost["segments_analyzed"] == 5
+
+    def test_prompt_keeps_context_window(self):
+        segments = _segments(3, size=SEGMENT_CONTEXT_SIZE + 500)
+        gemini = _FakeGemini()
+
+        _run(segments, gemini)
+
+        middle = next(p for p in gemini.prompts if _primary(p).startswith("SEG-2-"))
+        before = middle.split("--- CONTEXT BEFORE (for reference only) ---\n")[1].split("\n\n--- PRIMARY")[0]
+        assert len(before) == SEGMENT_CONTEXT_SIZE
+
+    def test_stop_signal_is_checked_per_batch(self):
+        segments = _segments(12)
+        gemini = _FakeGemini()
+
+        ok, engine, writes, _ = _run(segments, gemini, concurrency=2, flush_every=4, stop_after_checks=1)
+
+        assert ok is False
+        assert len(gemini.prompts) < 12
+        assert "pass_3_extraction" not in engine._cost_tracker[1]
+
+    def test_stop_leaves_no_segment_processing(self):
+        segments = _segments(12)
+        gemini = _FakeGemini()
+
+        ok, _, writes, _ = _run(segments, gemini, concurrency=2, flush_every=4, stop_after_checks=1)
+
+        assert ok is False
+        assert not any(s.status == SegmentStatus.PROCESSING for s in segments)
+        finished = [s for s in segments if s.status == SegmentStatus.COMPLETED]
+        assert len(finished) == sum(len(batch) for batch in writes)
+        assert {s.status for s in segments if s not in finished} == {SegmentStatus.PENDING}
@@ -0,0 +1,103 @@
+"""
+RAG Parallel Retrieval Tests
+
+Stage helpers are replaced with slow fakes, so these tests check the stage
+executor's concurrency, dependency ordering, timeouts and timing output
+without a database.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.services.rag_service import RAGService
+from app.services.stage_executor import StageExecutor
+
+STAGE_DELAY = 0.1
+
+
+def _settings(parallel=True, timeout=2.0):
+    return SimpleNamespace(RAG_PARALLEL_STAGES=parallel, RAG_STAGE_WORKERS=8, RAG_STAGE_TIMEOUT_SECONDS=timeout)
+
+
+def _service(calls, slow_stage=None, slow_delay=0.0):
+    service = RAGService()
+
+    def stage(name, result):
+        def fn(db, *args):
+            calls.append((name, db, args))
+            time.sleep(slow_delay if name == slow_stage else STAGE_DELAY)
+            return result
+        return fn
+
+    service._search_concepts = stage("concepts", [{"id": 11, "name": "Payment"}, {"id": 12, "name": "Refund"}])
+    service._fetch_analysis_summaries = stage("analysis_summaries", [{"document_name": "Spec", "summary": "s"}])
+    service._fetch_document_segments = stage("document_segments", [{"document_id": 5, "title": "T", "text": "x"}])
+    service._fetch_code_summaries = stage("code_summaries", [{"name": "pay.py", "summary": "y"}])
+    service._fetch_pending_approvals = stage("pending_approvals", [])
+    service._fetch_project_overview_context = stage("project_overview", [{"label": "PROJECT", "content": "p"}])
+    service._expand_relationships = stage("relationships", [{"source": "a", "type": "uses", "target": "b"}])
+    service._fetch_cross_graph_links = stage("cross_graph_links", [])
+    service._fetch_requirement_traces = stage("requirement_traces", [])
+    return service
+
+
+def _retrieve(service, settings, **kwargs):
+    with patch("app.services.rag_service.settings", settings):
+        return service.retrieve_context(MagicMock(), "how does payment work", 1, user_id=3, **kwargs)
+
+
+class TestParallelRetrieval:
+    def test_independent_stages_overlap(self):
+        calls = []
+        ctx = _retrieve(_service(calls), _settings())
+
+        # 7 stages but only 3 dependency levels → well under the sequential sum
+        assert ctx.retrieval_ms < 5 * STAGE_DELAY * 1000
+        summary = ctx.to_summary_dict()
+        assert set(summary["stage_timings_ms"]) == {name for name, _, _ in calls}
+        assert summary["retrieval_ms"] == ctx.retrieval_ms
+        assert ctx.relationships and ctx.live_data[0]["label"] == "PROJECT"
+
+    def test_dependent_stages_get_upstream_ids(self):
+        calls = []
+        _retrieve(_service(calls), _settings(), context_type="document", context_id=9)
+        args = {name: a for name, _, a in calls}
+
+        assert args["relationships"] == (1, [11, 12])
+        assert args["requirement_traces"] == (1, {9, 5})
+        assert args["analysis_summaries"][2] == {9}  # only the chat's own document
+
+    def test_stage_over_budget_is_skipped(self):
+        calls = []
+        ctx = _retrieve(_service(calls, slow_stage="code_summaries", slow_delay=1.0), _settings(timeout=0.3))
+
+        assert ctx.code_summaries == []
+        assert ctx.timed_out_stages == ["code_summaries"]
+        assert ctx.document_segments  # other stages unaffected
+
+    def test_queue_time_does_not_count_against_budget(self):
+        def sleep_for(delay):
+            def fn(db):
+                time.sleep(delay)
+                return delay
+            return fn
+
+        with patch("app.services.stage_executor._stage_pool", ThreadPoolExecutor(max_workers=1)):
+            stages = StageExecutor(MagicMock(), parallel=True, timeout=0.25)
+            stages.submit("first", sleep_for(0.2))
+            stages.submit("queued", sleep_for(0.1))
+
+            assert stages.result("first") == 0.2
+            assert stages.result("queued") == 0.1  # 0.3s after submit, 0.1s after start
+        assert stages.timed_out == []
+
+    def test_sequential_mode_uses_callers_session(self):
+        calls = []
+        db = MagicMock()
+        with patch("app.services.rag_service.settings", _settings(parallel=False)):
+            ctx = _service(calls).retrieve_context(db, "payment", 1, user_id=3)
+
+        assert {d for _, d, _ in calls} == {db}
+        assert [name for name, _, _ in calls][:2] == ["project_overview", "concepts"]
+        assert "relationships" in ctx.stage_timings_ms
@@ -0,0 +1,76 @@
+"""
+RAG Context Token Budget Tests
+
+Token counts come from a stub counter (one token per word), so these tests
+check the single-pass selection: priority order, kept minimums, skipping an
+item that doesn't fit, and that every item is tokenized only once.
+"""
+from unittest.mock import patch
+
+import pytest
+
+from app.services import rag_service as rag_module
+from app.services.rag_service import RAGService, RetrievedContext
+
+
+@pytest.fixture(autouse=True)
+def word_tokens():
+    rag_module._count_tokens.cache_clear()
+    with patch("app.services.cost_service.cost_service.count_tokens",
+               side_effect=lambda text: len(text.split())) as counter:
+        yield counter
+    rag_module._count_tokens.cache_clear()
+
+
+def _context(traces=8, concepts=10):
+    return RetrievedContext(
+        concepts=[{"name": f"Concept{i}", "concept_type": "Entity", "description": "word " * 10}
+                  for i in range(concepts)],
+        relationships=[{"source": "A", "type": "uses", "target": "B"}],
+        requirement_traces=[{"requirement_key": f"REQ-{i}", "requirement_text": "word " * 5,
+                             "coverage_status": "not_covered"} for i in range(traces)],
+    )
+
+
+def _trim(ctx, budget):
+    service = RAGService()
+    service.MAX_CONTEXT_TOKENS = budget
+    service._trim_context(ctx)
+    return ctx
+
+
+class TestTokenBudget:
+    def test_under_budget_keeps_everything(self):
+        ctx = _context()
+        expected = ctx.to_prompt_text()
+        _trim(ctx, 10_000)
+
+        assert len(ctx.concepts) == 10 and len(ctx.requirement_traces) == 8
+        assert ctx.prompt_text == expected
+        assert ctx.token_estimate >= len(expected.split())
+
+    def test_lowest_priority_trimmed_first_down_to_minimums(self):
+        # 14 tokens per concept line, 10 per trace line: kept minimums take
+        # 112, the other 5 concepts 70, which leaves room for 2 more traces
+        ctx = _trim(_context(), 210)
+        assert len(ctx.concepts) == 10
+        assert [t["requirement_key"] for t in ctx.requirement_traces] == [f"REQ-{i}" for i in range(5)]
+        assert ctx.token_estimate == 202
+
+        tiny = _trim(_context(), 1)
+        assert len(tiny.concepts) == 5 and len(tiny.requirement_traces) == 3
+        assert tiny.relationships  # never trimmed
+        assert "REQ-2" in tiny.to_prompt_text() and "REQ-3" not in tiny.to_prompt_text()
+
+    def test_item_that_does_not_fit_is_skipped_not_the_rest(self):
+        ctx = _context(traces=0, concepts=7)
+        ctx.concepts[5]["name"] = "Huge " + "word " * 200
+        _trim(ctx, 120)
+        names = [c["name"] for c in ctx.concepts]
+        assert "Concept6" in names and not any(n.startswith("Huge") for n in names)
+
+    def test_each_item_tokenized_once(self, word_tokens):
+        _trim(_context(), 150)
+        _trim(_context(), 150)
+        # 10 concepts + 8 traces + 1 relationship + 4 section headers, across both calls
+        assert word_tokens.call_count == 10 + 8 + 1 + 4
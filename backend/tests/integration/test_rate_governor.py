@@ -0,0 +1,93 @@
+"""
+AI Rate Governor Tests
+
+Exercises the token-bucket math through the per-process fallback path
+(Redis is disabled on the instance under test) and the async acquire.
+"""
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.ai.rate_governor import (
+    AIRateGovernor,
+    AIRateLimitTimeout,
+    BURST_FRACTION,
+    estimate_tokens,
+)
+
+
+@pytest.fixture
+def governor():
+    gov = AIRateGovernor()
+    gov.redis_client = None
+    gov._script = None
+    gov.enabled = True
+    return gov
+
+
+def _budget(rpm, tpm=0):
+    return patch.object(AIRateGovernor, "get_budget", return_value=(rpm, tpm))
+
+
+class TestReserve:
+    def test_burst_is_free_then_requests_queue(self, governor):
+        with _budget(rpm=60):
+            burst = int(60 * BURST_FRACTION)
+            waits = [governor.reserve("gemini", "m") for _ in range(burst)]
+            assert all(w == 0 for w in waits)
+            # Next request must wait ~1s (60 RPM refills one slot per second)
+            assert governor.reserve("gemini", "m") == pytest.approx(1.0, abs=0.05)
+            # And the one after that is queued behind it
+            assert governor.reserve("gemini", "m") == pytest.approx(2.0, abs=0.05)
+
+    def test_buckets_are_keyed_per_model(self, governor):
+        with _budget(rpm=4):
+            assert governor.reserve("gemini", "model-a") == 0
+            assert governor.reserve("gemini", "model-a") > 0
+            assert governor.reserve("gemini", "model-b") == 0
+
+    def test_tpm_budget_applies(self, governor):
+        with _budget(rpm=1000, tpm=600):
+            # Burst capacity is 150 tokens; a 150-token request drains it
+            assert governor.reserve("gemini", "m", tokens=150) == 0
+            assert governor.reserve("gemini", "m", tokens=10) == pytest.approx(1.0, abs=0.05)
+
+    def test_max_wait_exceeded_raises(self, governor):
+        with _budget(rpm=4):
+            governor.reserve("gemini", "m")
+            with pytest.raises(AIRateLimitTimeout, match="rate limit"):
+                governor.reserve("gemini", "m", max_wait=1)
+
+    def test_disabled_governor_never_waits(self, governor):
+        governor.enabled = False
+        with _budget(rpm=1):
+            assert all(governor.reserve("gemini", "m") == 0 for _ in range(5))
+
+    def test_unbudgeted_provider_is_unlimited(self, governor):
+        assert governor.reserve("unknown", "m") == 0
+
+
+class TestAcquireAsync:
+    @pytest.mark.asyncio
+    async def test_acquire_async_sleeps_without_blocking(self, governor):
+        with _budget(rpm=4), patch("app.services.ai.rate_governor.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            await governor.acquire_async("gemini", "m")
+            await governor.acquire_async("gemini", "m")
+        mock_sleep.assert_called_once()
+        assert mock_sleep.call_args.args[0] == pytest.approx(15.0, abs=0.1)
+
+
+class TestMetrics:
+    def test_queue_wait_metrics_recorded(self, governor):
+        with _budget(rpm=4):
+            governor.reserve("gemini", "m")
+            governor.reserve("gemini", "m")
+            metrics = governor.get_metrics()["local"]["gemini:m"]
+        assert metrics["requests"] == 2
+        assert metrics["queued"] == 1
+        assert metrics["wait_seconds_max"] > 0
+        assert metrics["wait_seconds_avg"] > 0
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("x" * 400) == 101
@@ -58,7 +58,7 @@ class TestAnthropicService:
         mock_response.content = [MagicMock(text='{"summary": "test"}')]
         mock_response.usage.input_tokens = 100
         mock_response.usage.output_tokens = 50
-        mock_anthropic.Anthropic.return_value.messages.create.return_value = mock_response
+        mock_anthropic.AsyncAnthropic.return_value.messages.create = AsyncMock(return_value=mock_response)
 
         with patch("app.services.ai.anthropic.settings") as mock_settings, \
              patch.dict("sys.modules", {"anthropic": mock_anthropic}):
@@ -73,6 +73,39 @@ class TestAnthropicService:
             assert result["input_tokens"] == 100
             assert result["output_tokens"] == 50
 
+    @pytest.mark.asyncio
+    async def test_generate_content_does_not_block_event_loop(self):
+        """A Claude call in flight must let other coroutines (e.g. Gemini calls) run."""
+        import asyncio
+        order = []
+        mock_response = MagicMock()
+        mock_response.content = [MagicMock(text="ok")]
+        mock_response.usage.input_tokens = 1
+        mock_response.usage.output_tokens = 1
+
+        async def slow_create(**kwargs):
+            await asyncio.sleep(0.05)
+            order.append("claude")
+            return mock_response
+
+        async def other():
+            order.append("other")
+
+        mock_anthropic = MagicMock()
+        mock_anthropic.AsyncAnthropic.return_value.messages.create = slow_create
+
+        with patch("app.services.ai.anthropic.settings") as mock_settings, \
+             patch.dict("sys.modules", {"anthropic": mock_anthropic}):
+            mock_settings.ANTHROPIC_API_KEY = "test-key"
+            mock_settings.ANTHROPIC_MODEL = "claude-sonnet-4-5-20250929"
+            mock_settings.ANTHROPIC_MAX_TOKENS = 4096
+            mock_settings.ANTHROPIC_TIMEOUT = 120
+            from app.services.ai.anthropic import AnthropicService
+            service = AnthropicService()
+            await asyncio.gather(service.generate_content("analyze"), other())
+
+        assert order == ["other", "claude"]
+
     def test_parse_json_response_valid(self):
         """_parse_json_response should parse valid JSON."""
         with patch("app.services.ai.anthropic.settings") as mock_settings:
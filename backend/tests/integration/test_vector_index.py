@@ -0,0 +1,91 @@
+"""
+Vector Index Tests
+
+Capabilities are injected directly, so these tests cover the per-query ANN
+knobs, per-tenant index DDL and build bookkeeping, and the typed vector
+bind parameter without a PostgreSQL server.
+"""
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from app.db.capabilities import DatabaseCapabilities
+from app.services.vector_index_service import VectorIndexService, vector_bindparam
+
+
+def _caps(version="0.8.0", methods=None, column_type="vector"):
+    return DatabaseCapabilities(
+        dialect="postgresql",
+        extensions={"vector": version},
+        column_types={"ontology_concepts.embedding": column_type},
+        index_methods={"ontology_concepts": methods if methods is not None else {
+            "idx_ontology_concepts_embedding_hnsw_active": "hnsw",
+        }},
+    )
+
+
+def _executed(db):
+    return [str(call.args[0]) for call in db.execute.call_args_list]
+
+
+def _apply(caps, recall=None):
+    db = MagicMock()
+    with patch("app.services.vector_index_service.db_capabilities.get", return_value=caps):
+        VectorIndexService().apply_search_knobs(db, "ontology_concepts", recall)
+    return _executed(db)
+
+
+class TestSearchKnobs:
+    def test_recall_profiles_set_ef_search(self):
+        assert _apply(_caps(), "high")[0] == "SET LOCAL hnsw.ef_search = 200"
+        assert _apply(_caps(), "fast")[0] == "SET LOCAL hnsw.ef_search = 20"
+        assert _apply(_caps())[0] == "SET LOCAL hnsw.ef_search = 40"
+
+    def test_iterative_scan_only_on_pgvector_0_8(self):
+        assert "SET LOCAL hnsw.iterative_scan = relaxed_order" in _apply(_caps("0.8.0"))
+        assert len(_apply(_caps("0.7.4"))) == 1
+
+    def test_ivfflat_probes_and_no_knobs_without_index(self):
+        assert _apply(_caps(methods={"ix": "ivfflat"}), "high") == ["SET LOCAL ivfflat.probes = 40"]
+        assert _apply(_caps(methods={})) == []
+        assert _apply(_caps(column_type="json")) == []
+
+
+class TestTenantIndexes:
+    def test_ddl_is_partial_and_concurrent(self):
+        ddl = VectorIndexService().tenant_index_ddl("ontology_concepts", 7)
+        assert ddl.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_oc_embedding_hnsw_t7")
+        assert ddl.endswith("WHERE tenant_id = 7 AND is_active = true")
+
+    def test_build_skips_existing_and_cleans_up_failures(self):
+        service = VectorIndexService()
+        caps = _caps(methods={"ix_oc_embedding_hnsw_t1": "hnsw"})
+        db = MagicMock()
+        conn = db.get_bind.return_value.connect.return_value.execution_options.return_value.__enter__.return_value
+        conn.execute.side_effect = lambda stmt: (_ for _ in ()).throw(RuntimeError("disk full")) \
+            if "t3" in str(stmt) and "CREATE" in str(stmt) else None
+
+        with patch("app.services.vector_index_service.db_capabilities") as registry, \
+                patch.object(service, "tenants_needing_index", return_value=[1, 2, 3]):
+            registry.get.return_value = caps
+            summary = service.build_tenant_indexes(db)
+
+        assert summary["existing"] == ["ix_oc_embedding_hnsw_t1"]
+        assert summary["created"] == ["ix_oc_embedding_hnsw_t2"]
+        assert summary["failed"] == ["ix_oc_embedding_hnsw_t3"]
+        assert summary["skipped_tables"] == ["knowledge_graph_versions"]
+        assert any("DROP INDEX CONCURRENTLY IF EXISTS ix_oc_embedding_hnsw_t3" in str(c.args[0])
+                   for c in conn.execute.call_args_list)
+        registry.refresh.assert_called_once_with(db)
+
+
+class TestVectorBinding:
+    def test_query_vector_is_a_bound_parameter(self):
+        stmt = text("SELECT id FROM ontology_concepts ORDER BY embedding <=> :emb LIMIT 5")
+        stmt = stmt.bindparams(vector_bindparam())
+        compiled = stmt.compile(dialect=postgresql.psycopg2.dialect())
+
+        assert "%(emb)s" in str(compiled)
+        processor = compiled.binds["emb"].type.bind_processor(postgresql.psycopg2.dialect())
+        assert processor([0.5] * 768) == "[" + ",".join(["0.5"] * 768) + "]"